@@ -0,0 +1,18 @@
+# Generated by Django 4.2.28 on 2026-10-18 23:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('OBE', '0068_obe_template_preset_and_audit'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='obeeditnotificationlog',
+            name='status',
+            field=models.CharField(choices=[('SUCCESS', 'Success'), ('FAILED', 'Failed'), ('SKIPPED', 'Skipped'), ('QUEUED', 'Queued')], db_index=True, max_length=16),
+        ),
+    ]
@@ -1025,10 +1025,13 @@ class ObeEditNotificationLog(models.Model):
     STATUS_SUCCESS = 'SUCCESS'
     STATUS_FAILED = 'FAILED'
     STATUS_SKIPPED = 'SKIPPED'
+    # Handed to the outbound queue (accounts.OutboundMessage); delivery status lives there.
+    STATUS_QUEUED = 'QUEUED'
     STATUS_CHOICES = (
         (STATUS_SUCCESS, 'Success'),
         (STATUS_FAILED, 'Failed'),
         (STATUS_SKIPPED, 'Skipped'),
+        (STATUS_QUEUED, 'Queued'),
     )
 
     edit_request = models.ForeignKey('ObeEditRequest', on_delete=models.CASCADE, related_name='notification_logs')
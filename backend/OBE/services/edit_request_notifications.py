@@ -235,6 +235,25 @@ def _send_email(edit_request, message: str) -> NotificationOutcome:
         )
 
 
+def _enqueue_whatsapp(recipient: str, message: str, *, tag: str) -> NotificationOutcome:
+    """Queue the message for `dispatch_outbound_messages` instead of calling the gateway inline."""
+    try:
+        from accounts.services import outbox
+
+        queued = outbox.enqueue_whatsapp(recipient, message, tag=tag)
+    except Exception as exc:
+        logger.exception('WhatsApp notification enqueue failed (tag=%s)', tag)
+        return NotificationOutcome(status=ObeEditNotificationLog.STATUS_FAILED, recipient=recipient, message=message, error=str(exc))
+    if queued is None:
+        return NotificationOutcome(status=ObeEditNotificationLog.STATUS_SKIPPED, recipient=recipient, message=message, error='Empty message')
+    return NotificationOutcome(
+        status=ObeEditNotificationLog.STATUS_QUEUED,
+        recipient=recipient,
+        message=message,
+        response_body=f'outbound_message={queued.pk}',
+    )
+
+
 def _send_whatsapp(edit_request, message: str) -> NotificationOutcome:
     enabled = bool(getattr(settings, 'OBE_EDIT_NOTIFICATION_WHATSAPP_ENABLED', True))
     if not enabled:
@@ -257,42 +276,7 @@ def _send_whatsapp(edit_request, message: str) -> NotificationOutcome:
     if not recipient:
         return NotificationOutcome(status=ObeEditNotificationLog.STATUS_SKIPPED, message=message, error='No recipient WhatsApp number configured')
 
-    payload = {
-        'api_key': api_key,
-        'to': recipient,
-        'message': message,
-    }
-
-    try:
-        import requests
-
-        timeout = float(getattr(settings, 'OBE_WHATSAPP_TIMEOUT_SECONDS', 8.0) or 8.0)
-        response = requests.post(endpoint, json=payload, timeout=timeout)
-        body = response.text or ''
-        if 200 <= response.status_code < 300:
-            return NotificationOutcome(
-                status=ObeEditNotificationLog.STATUS_SUCCESS,
-                recipient=recipient,
-                message=message,
-                response_status_code=response.status_code,
-                response_body=body,
-            )
-        return NotificationOutcome(
-            status=ObeEditNotificationLog.STATUS_FAILED,
-            recipient=recipient,
-            message=message,
-            response_status_code=response.status_code,
-            response_body=body,
-            error=f'Non-success status code: {response.status_code}',
-        )
-    except Exception as exc:
-        logger.exception('WhatsApp notification failed for edit_request=%s', getattr(edit_request, 'id', None))
-        return NotificationOutcome(
-            status=ObeEditNotificationLog.STATUS_FAILED,
-            recipient=recipient,
-            message=message,
-            error=str(exc),
-        )
+    return _enqueue_whatsapp(recipient, message, tag='obe_edit_request')
 
 
 def notify_edit_request_approved(edit_request) -> None:
@@ -420,36 +404,7 @@ def _send_whatsapp_to_user(user, message: str, edit_request=None) -> Notificatio
     if not recipient:
         return NotificationOutcome(status=ObeEditNotificationLog.STATUS_SKIPPED, message=message, error='No WhatsApp number configured for user')
 
-    payload = {'api_key': api_key, 'to': recipient, 'message': message}
-    try:
-        import requests
-        timeout = float(getattr(settings, 'OBE_WHATSAPP_TIMEOUT_SECONDS', 8.0) or 8.0)
-        response = requests.post(endpoint, json=payload, timeout=timeout)
-        body = response.text or ''
-        if 200 <= response.status_code < 300:
-            return NotificationOutcome(
-                status=ObeEditNotificationLog.STATUS_SUCCESS,
-                recipient=recipient,
-                message=message,
-                response_status_code=response.status_code,
-                response_body=body,
-            )
-        return NotificationOutcome(
-            status=ObeEditNotificationLog.STATUS_FAILED,
-            recipient=recipient,
-            message=message,
-            response_status_code=response.status_code,
-            response_body=body,
-            error=f'Non-success status code: {response.status_code}',
-        )
-    except Exception as exc:
-        logger.exception('WhatsApp send failed for user=%s edit_request=%s', getattr(user, 'id', None), getattr(edit_request, 'id', None))
-        return NotificationOutcome(
-            status=ObeEditNotificationLog.STATUS_FAILED,
-            recipient=recipient,
-            message=message,
-            error=str(exc),
-        )
+    return _enqueue_whatsapp(recipient, message, tag='obe_edit_request_approver')
 
 
 def notify_approver_of_new_request(edit_request, hod_user=None, routed_to: str = 'IQAC', department=None, staff_name: str = '') -> None:
@@ -32,6 +32,7 @@ from datetime import date
 
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
+from django.utils import timezone
 
 from academics.models import (
     Batch,
@@ -41,6 +42,7 @@ from academics.models import (
     StudentProfile,
     StudentSectionAssignment,
 )
+from applications.signals import refresh_inbox_for_profiles
 
 
 class Command(BaseCommand):
@@ -137,7 +139,8 @@ class Command(BaseCommand):
                         continue
                     home_dept = inferred_dept
                     if not dry_run:
-                        StudentProfile.objects.filter(pk=student.pk).update(home_department=home_dept)
+                        StudentProfile.objects.filter(pk=student.pk).update(home_department=home_dept, updated_at=timezone.now())
+                        refresh_inbox_for_profiles(student_ids=[student.pk])
                     self.stdout.write(
                         f'  Backfill home_department → {home_dept.code} for {student.reg_no}'
                     )
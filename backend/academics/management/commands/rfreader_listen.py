@@ -1,11 +1,26 @@
+import queue
+import threading
 import time
-from typing import Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
 from django.core.management.base import BaseCommand
+from django.db import InterfaceError, OperationalError, close_old_connections, transaction
+from django.db.models.functions import Upper
 from django.utils import timezone
 
 from academics.models import RFReaderGate, RFReaderStudent, RFReaderScan
 
+# DB unavailable (restart, network, PgBouncer): retry the whole batch later.
+# Anything else is a problem with the rows themselves.
+TRANSIENT_DB_ERRORS = (OperationalError, InterfaceError)
+
+UID_MAX_LENGTH = RFReaderScan._meta.get_field('uid').max_length
+ROLL_MAX_LENGTH = RFReaderStudent._meta.get_field('roll_no').max_length
+NAME_MAX_LENGTH = RFReaderStudent._meta.get_field('name').max_length
+IMPRES_MAX_LENGTH = RFReaderStudent._meta.get_field('impres_code').max_length
+
 
 def _parse_line(line: str) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
     """Parse a CSV-ish line from the reader.
@@ -16,7 +31,9 @@ def _parse_line(line: str) -> Tuple[Optional[str], Optional[str], Optional[str],
     - UID,ROLL,NAME
     - UID,ROLL,NAME,IMPRES
 
-    Returns (uid, roll, name, impres).
+    Returns (uid, roll, name, impres). A UID longer than the column (garbled
+    serial input) rejects the line; an oversized roll is ignored and name/impres
+    are truncated, so one bad line cannot fail a whole batch.
     """
     raw = (line or '').strip()
     if not raw:
@@ -27,12 +44,74 @@ def _parse_line(line: str) -> Tuple[Optional[str], Optional[str], Optional[str],
         return None, None, None, None
 
     uid = parts[0].upper()
+    if len(uid) > UID_MAX_LENGTH:
+        return None, None, None, None
     roll = parts[1] if len(parts) >= 2 else None
-    name = parts[2] if len(parts) >= 3 else None
-    impres = parts[3] if len(parts) >= 4 else None
+    if roll and len(roll) > ROLL_MAX_LENGTH:
+        roll = None
+    name = parts[2][:NAME_MAX_LENGTH] if len(parts) >= 3 else None
+    impres = parts[3][:IMPRES_MAX_LENGTH] if len(parts) >= 4 else None
     return uid, roll, name, impres
 
 
+@dataclass(frozen=True)
+class _Tap:
+    uid: str
+    roll: Optional[str]
+    name: Optional[str]
+    impres: Optional[str]
+    line: str
+    scanned_at: datetime
+
+
+@dataclass(frozen=True)
+class _StudentRef:
+    id: int
+    roll_no: str
+    name: str
+    impres_code: str
+
+
+class _StudentMap:
+    """In-memory UID -> student map, refreshed periodically by the writer thread."""
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self.by_uid: Dict[str, _StudentRef] = {}
+        self.misses: set = set()
+        self.loaded_at = 0.0
+
+    def refresh_if_due(self, force: bool = False):
+        if not force and time.monotonic() - self.loaded_at < self.refresh_interval:
+            return
+        rows = RFReaderStudent.objects.filter(rf_uid__isnull=False).values_list('id', 'rf_uid', 'roll_no', 'name', 'impres_code')
+        self.by_uid = {
+            str(rf_uid).upper(): _StudentRef(pk, roll_no, name, impres_code or '')
+            for pk, rf_uid, roll_no, name, impres_code in rows
+            if rf_uid
+        }
+        self.misses = set()
+        self.loaded_at = time.monotonic()
+
+    def resolve_missing(self, uids):
+        """One query for UIDs not in the map (cards enrolled since the last refresh)."""
+        missing = {uid for uid in uids if uid not in self.by_uid and uid not in self.misses}
+        if not missing:
+            return
+        rows = (
+            RFReaderStudent.objects.annotate(uid_upper=Upper('rf_uid'))
+            .filter(uid_upper__in=missing)
+            .values_list('id', 'uid_upper', 'roll_no', 'name', 'impres_code')
+        )
+        for pk, uid, roll_no, name, impres_code in rows:
+            self.by_uid[uid] = _StudentRef(pk, roll_no, name, impres_code or '')
+        self.misses |= missing - set(self.by_uid)
+
+    def put(self, uid: str, student: RFReaderStudent):
+        self.by_uid[uid] = _StudentRef(student.id, student.roll_no, student.name, student.impres_code or '')
+        self.misses.discard(uid)
+
+
 class Command(BaseCommand):
     help = 'Listen to an RF reader over serial (USB) and store scans in the DB.'
 
@@ -45,6 +124,110 @@ class Command(BaseCommand):
             action='store_true',
             help='If line includes roll/name/impres, auto-create/update RFReaderStudent records.',
         )
+        parser.add_argument('--batch-size', type=int, default=50, help='Flush scans when this many are buffered (default: 50)')
+        parser.add_argument('--flush-interval', type=float, default=0.5, help='Max seconds a scan waits before flush (default: 0.5)')
+        parser.add_argument('--debounce', type=float, default=3.0, help='Ignore repeat taps of the same UID within N seconds (0 disables)')
+        parser.add_argument('--refresh-interval', type=float, default=60.0, help='Seconds between UID->student map reloads (default: 60)')
+
+    def _read_serial(self, ser, taps: 'queue.Queue[_Tap]', stop_event: threading.Event, debounce: float, stats: dict):
+        """Reader thread: only reads, parses, stamps and debounces. Never touches the DB."""
+        last_tap: Dict[str, float] = {}
+        while not stop_event.is_set():
+            try:
+                raw = ser.readline()
+            except Exception as e:
+                self.stderr.write(f'Serial read error: {e}')
+                time.sleep(0.25)
+                continue
+            if not raw:
+                continue
+            line = raw.decode('utf-8', errors='ignore').strip()
+            if not line:
+                continue
+
+            uid, roll, name, impres = _parse_line(line)
+            if not uid:
+                continue
+
+            now = time.monotonic()
+            if debounce > 0 and now - last_tap.get(uid, float('-inf')) < debounce:
+                stats['debounced'] += 1
+                continue
+            last_tap[uid] = now
+            if len(last_tap) > 10000:
+                cutoff = now - debounce
+                for key in [k for k, seen in last_tap.items() if seen < cutoff]:
+                    del last_tap[key]
+
+            taps.put(_Tap(uid, roll, name, impres, line, timezone.now()))
+
+    def _upsert_students(self, batch: List[_Tap], students: _StudentMap):
+        latest_by_roll: Dict[str, _Tap] = {}
+        for tap in batch:
+            if tap.roll:
+                latest_by_roll[tap.roll] = tap
+        for roll, tap in latest_by_roll.items():
+            known = students.by_uid.get(tap.uid)
+            obj, _created = RFReaderStudent.objects.update_or_create(
+                roll_no=roll,
+                defaults={
+                    'name': tap.name or (known.name if known else roll),
+                    'impres_code': tap.impres or (known.impres_code if known else ''),
+                    'rf_uid': tap.uid,
+                    'is_active': True,
+                },
+            )
+            students.put(tap.uid, obj)
+
+    def _flush(self, batch: List[_Tap], gate: RFReaderGate, students: _StudentMap, create_student: bool):
+        students.refresh_if_due()
+        with transaction.atomic():
+            if create_student:
+                self._upsert_students(batch, students)
+            students.resolve_missing(tap.uid for tap in batch)
+            RFReaderScan.objects.bulk_create([
+                RFReaderScan(
+                    gate=gate,
+                    uid=tap.uid,
+                    student_id=students.by_uid[tap.uid].id if tap.uid in students.by_uid else None,
+                    raw_line=tap.line,
+                    source='SERIAL',
+                    scanned_at=tap.scanned_at,
+                )
+                for tap in batch
+            ])
+
+        for tap in batch:
+            disp = f'{tap.uid}'
+            student = students.by_uid.get(tap.uid)
+            if student:
+                disp += f' -> {student.roll_no} {student.name}'
+            self.stdout.write(self.style.SUCCESS(f'SCAN: {disp}'))
+
+    def _flush_each(self, batch: List[_Tap], gate: RFReaderGate, students: _StudentMap,
+                    create_student: bool) -> List[_Tap]:
+        """Save `batch` tap by tap after it failed as a whole on its data.
+
+        A tap whose student upsert fails (e.g. its UID is already another roll's
+        rf_uid) is saved as a plain scan; a tap that still fails is logged and
+        dropped. Returns the taps left unsaved by a transient DB error, to retry.
+        """
+        for idx, tap in enumerate(batch):
+            try:
+                try:
+                    self._flush([tap], gate, students, create_student)
+                except TRANSIENT_DB_ERRORS:
+                    raise
+                except Exception as e:
+                    if not create_student or not tap.roll:
+                        raise
+                    self.stderr.write(f'Student update failed for {tap.line!r}: {e}; saving the scan only')
+                    self._flush([tap], gate, students, False)
+            except TRANSIENT_DB_ERRORS:
+                return batch[idx:]
+            except Exception as e:
+                self.stderr.write(f'Dropping scan {tap.line!r}: {e}')
+        return []
 
     def handle(self, *args, **opts):
         try:
@@ -58,8 +241,12 @@ class Command(BaseCommand):
         baud: int = opts['baud']
         gate_name: str = opts['gate']
         create_student: bool = bool(opts['create_student_from_line'])
+        batch_size: int = max(1, opts['batch_size'])
+        flush_interval: float = max(0.05, opts['flush_interval'])
 
         gate, _ = RFReaderGate.objects.get_or_create(name=gate_name, defaults={'is_active': True})
+        students = _StudentMap(refresh_interval=max(1.0, opts['refresh_interval']))
+        students.refresh_if_due(force=True)
 
         self.stdout.write(self.style.SUCCESS(f'RFReader listening on {port} @ {baud}'))
         self.stdout.write('Tip: Close Arduino Serial Monitor to avoid "port busy" errors.')
@@ -76,57 +263,87 @@ class Command(BaseCommand):
             dsrdtr=False,
         )
 
+        # Unbounded queue: the reader keeps accepting taps however slow the DB is;
+        # the writer catches up in larger batches once it recovers.
+        taps: 'queue.Queue[_Tap]' = queue.Queue()
+        stop_event = threading.Event()
+        stats = {'debounced': 0}
+        reader = threading.Thread(
+            target=self._read_serial,
+            args=(ser, taps, stop_event, opts['debounce'], stats),
+            name='rfreader-serial',
+            daemon=True,
+        )
+        reader.start()
+
+        pending: List[_Tap] = []
+        deadline = None
+        retry_delay = 0.25
         try:
             while True:
                 try:
-                    raw = ser.readline()
-                    if not raw:
-                        continue
-                    line = raw.decode('utf-8', errors='ignore').strip()
-                    if not line:
-                        continue
+                    timeout = flush_interval if deadline is None else max(0.0, deadline - time.monotonic())
+                    try:
+                        tap = taps.get(timeout=timeout)
+                        pending.append(tap)
+                        if deadline is None:
+                            deadline = time.monotonic() + flush_interval
+                        while len(pending) < batch_size:
+                            pending.append(taps.get_nowait())
+                    except queue.Empty:
+                        pass
 
-                    uid, roll, name, impres = _parse_line(line)
-                    if not uid:
+                    if not pending:
+                        deadline = None
+                        continue
+                    if len(pending) < batch_size and time.monotonic() < deadline:
                         continue
 
-                    student = None
-                    if uid:
-                        student = RFReaderStudent.objects.filter(rf_uid__iexact=uid).first()
-
-                    if create_student and roll:
-                        obj, _created = RFReaderStudent.objects.update_or_create(
-                            roll_no=roll,
-                            defaults={
-                                'name': name or (student.name if student else roll),
-                                'impres_code': impres or (student.impres_code if student else ''),
-                                'rf_uid': uid,
-                                'is_active': True,
-                            },
-                        )
-                        student = obj
-
-                    RFReaderScan.objects.create(
-                        gate=gate,
-                        uid=uid,
-                        student=student,
-                        raw_line=line,
-                        source='SERIAL',
-                        scanned_at=timezone.now(),
-                    )
-
-                    disp = f'{uid}'
-                    if student:
-                        disp += f' -> {student.roll_no} {student.name}'
-                    self.stdout.write(self.style.SUCCESS(f'SCAN: {disp}'))
+                    try:
+                        try:
+                            self._flush(pending, gate, students, create_student)
+                            pending = []
+                        except TRANSIENT_DB_ERRORS:
+                            raise
+                        except Exception as e:
+                            self.stderr.write(f'Batch of {len(pending)} scans failed ({e}); saving one by one')
+                            pending = self._flush_each(pending, gate, students, create_student)
+                            if pending:
+                                raise OperationalError('database unavailable')
+                        deadline = None
+                        retry_delay = 0.25
+                    except TRANSIENT_DB_ERRORS as e:
+                        # Keep the batch; the reader keeps buffering until the DB is back.
+                        self.stderr.write(f'Error: {e} ({len(pending)} scans buffered, {taps.qsize()} queued)')
+                        close_old_connections()
+                        time.sleep(retry_delay)
+                        retry_delay = min(retry_delay * 2, 10.0)
                 except KeyboardInterrupt:
                     break
-                except Exception as e:
-                    self.stderr.write(f'Error: {e}')
-                    time.sleep(0.25)
         finally:
+            stop_event.set()
+            reader.join(timeout=2)
+            while True:
+                try:
+                    pending.append(taps.get_nowait())
+                except queue.Empty:
+                    break
+            if pending:
+                try:
+                    try:
+                        self._flush(pending, gate, students, create_student)
+                    except TRANSIENT_DB_ERRORS:
+                        raise
+                    except Exception:
+                        pending = self._flush_each(pending, gate, students, create_student)
+                        if pending:
+                            raise OperationalError('database unavailable')
+                except Exception as e:
+                    self.stderr.write(f'Error flushing {len(pending)} buffered scans on shutdown: {e}')
             try:
                 ser.close()
             except Exception:
                 pass
+            if stats['debounced']:
+                self.stdout.write(f"Ignored {stats['debounced']} repeat taps (debounce).")
             self.stdout.write('Stopped.')
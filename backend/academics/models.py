@@ -439,6 +439,14 @@ STUDENT_STATUS_CHOICES = (
 )
 
 
+def _with_updated_at(update_fields):
+    """Partial saves skip auto_now fields unless listed; keep the roster watermark moving."""
+    fields = list(update_fields)
+    if 'updated_at' not in fields:
+        fields.append('updated_at')
+    return fields
+
+
 class StudentProfile(models.Model):
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL,
@@ -470,6 +478,8 @@ class StudentProfile(models.Model):
     # RFID UID assigned via IDCSScan hardware scanner
     rfid_uid = models.CharField(max_length=32, blank=True, default='', db_index=True,
                                 help_text='RFID card UID (e.g. 539EA5BB) assigned by the physical scanner.')
+    # Roster delta-sync watermark (idcsscan roster/sync/); also bumped on user/section changes.
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"Student {self.reg_no} ({self.user.username})"
@@ -535,6 +545,8 @@ class StudentProfile(models.Model):
         # run full clean to enforce validations (skip for partial updates)
         if not kwargs.get('update_fields'):
             self.full_clean()
+        else:
+            kwargs['update_fields'] = _with_updated_at(kwargs['update_fields'])
         super().save(*args, **kwargs)
 
 
@@ -642,6 +654,14 @@ class StudentSectionAssignment(models.Model):
         super().save(*args, **kwargs)
 
 
+def _refresh_approver_inbox(student_id):
+    # `.update()` sends no post_save; the student's pending applications may now
+    # resolve to another advisor/HOD.
+    from applications.signals import refresh_inbox_for_profiles
+
+    refresh_inbox_for_profiles(student_ids=[student_id])
+
+
 # Signal handlers to keep StudentProfile.section in sync with active StudentSectionAssignment
 @receiver(post_save, sender=StudentSectionAssignment)
 def _sync_student_section_on_assignment_save(sender, instance: StudentSectionAssignment, created, **kwargs):
@@ -664,7 +684,8 @@ def _sync_student_section_on_assignment_save(sender, instance: StudentSectionAss
         # If this is an active assignment (no end_date), update the student's section
         if instance.end_date is None:
             # Always update to ensure sync
-            StudentProfile.objects.filter(pk=student.pk).update(section=instance.section)
+            StudentProfile.objects.filter(pk=student.pk).update(section=instance.section, updated_at=timezone.now())
+            _refresh_approver_inbox(student.pk)
         else:
             # If this assignment was ended, find the newest active PRIMARY assignment
             active_assignment = StudentSectionAssignment.objects.filter(
@@ -674,7 +695,8 @@ def _sync_student_section_on_assignment_save(sender, instance: StudentSectionAss
             ).select_related('section').order_by('-start_date').first()
             
             if active_assignment:
-                StudentProfile.objects.filter(pk=student.pk).update(section=active_assignment.section)
+                StudentProfile.objects.filter(pk=student.pk).update(section=active_assignment.section, updated_at=timezone.now())
+                _refresh_approver_inbox(student.pk)
             # Don't clear section if no active assignment - it might be created in same transaction
     except Exception:
         # Silently fail to avoid breaking the save operation
@@ -701,10 +723,12 @@ def _sync_student_section_on_assignment_delete(sender, instance: StudentSectionA
         
         if active_assignment:
             if student.section_id != active_assignment.section_id:
-                StudentProfile.objects.filter(pk=student.pk).update(section=active_assignment.section)
+                StudentProfile.objects.filter(pk=student.pk).update(section=active_assignment.section, updated_at=timezone.now())
+                _refresh_approver_inbox(student.pk)
         else:
             if student.section_id is not None:
-                StudentProfile.objects.filter(pk=student.pk).update(section=None)
+                StudentProfile.objects.filter(pk=student.pk).update(section=None, updated_at=timezone.now())
+                _refresh_approver_inbox(student.pk)
     except Exception:
         pass
 
@@ -765,6 +789,8 @@ class StaffProfile(models.Model):
     # RFID UID assigned via IDCSScan hardware scanner (for staff)
     rfid_uid = models.CharField(max_length=32, blank=True, default='', db_index=True,
                                 help_text='RFID card UID (e.g. 539EA5BB) assigned by the physical scanner.')
+    # Roster delta-sync watermark (idcsscan roster/sync/); also bumped on user/department changes.
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         """Return staff name and ID for display in dropdowns and admin."""
@@ -846,6 +872,8 @@ class StaffProfile(models.Model):
                     self.full_clean()
             else:
                 self.full_clean()
+        else:
+            kwargs['update_fields'] = _with_updated_at(kwargs['update_fields'])
         super().save(*args, **kwargs)
 
 
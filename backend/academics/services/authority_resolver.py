@@ -20,6 +20,8 @@ from academics.models import (
 from academics.models import StudentProfile
 from academics.models import StaffProfile
 from applications.models import ApprovalFlow, ApprovalStep
+from applications.services import resolution_cache
+from applications.services.resolution_cache import AUTHORITY
 
 
 def _get_student_department(student: StudentProfile):
@@ -67,36 +69,62 @@ def _get_application_department(application_instance):
     return None
 
 
-def get_department_hod_by_department(dept, academic_year: AcademicYear) -> Optional[StaffProfile]:
-    if not dept or academic_year is None:
+def _load_staff(staff_id) -> Optional[StaffProfile]:
+    if not staff_id:
         return None
+    return resolution_cache.memoize(
+        AUTHORITY,
+        ('staff', staff_id),
+        lambda: StaffProfile.objects.select_related('user', 'department').filter(pk=staff_id).first(),
+    )
 
-    hod = (
-        DepartmentRole.objects
-        .filter(department=dept, role='HOD', academic_year=academic_year, is_active=True)
-        .select_related('staff__user', 'staff__department')
-        .first()
+
+def get_active_academic_year() -> Optional[AcademicYear]:
+    """Current active academic year (newest as fallback), cached until AcademicYear changes."""
+    return resolution_cache.cached(
+        AUTHORITY,
+        'academic_year',
+        lambda: AcademicYear.objects.filter(is_active=True).first() or AcademicYear.objects.order_by('-id').first(),
     )
-    if not hod:
+
+
+def get_department_hod_by_department(dept, academic_year: AcademicYear) -> Optional[StaffProfile]:
+    if not dept or academic_year is None:
         return None
-    staff = hod.staff
-    return staff if is_staff_available(staff) else None
+
+    def _compute():
+        hod = (
+            DepartmentRole.objects
+            .filter(department=dept, role='HOD', academic_year=academic_year, is_active=True)
+            .select_related('staff__user')
+            .first()
+        )
+        if not hod:
+            return None
+        return hod.staff_id if is_staff_available(hod.staff) else None
+
+    staff_id = resolution_cache.cached(AUTHORITY, ('hod', dept.pk, academic_year.pk), _compute)
+    return _load_staff(staff_id)
 
 
 def get_department_ahod_by_department(dept, academic_year: AcademicYear) -> Optional[StaffProfile]:
     if not dept or academic_year is None:
         return None
 
-    ahods = (
-        DepartmentRole.objects
-        .filter(department=dept, role='AHOD', academic_year=academic_year, is_active=True)
-        .select_related('staff__user', 'staff__department')
-        .order_by('id')
-    )
-    for a in ahods:
-        if is_staff_available(a.staff):
-            return a.staff
-    return None
+    def _compute():
+        ahods = (
+            DepartmentRole.objects
+            .filter(department=dept, role='AHOD', academic_year=academic_year, is_active=True)
+            .select_related('staff__user')
+            .order_by('id')
+        )
+        for a in ahods:
+            if is_staff_available(a.staff):
+                return a.staff_id
+        return None
+
+    staff_id = resolution_cache.cached(AUTHORITY, ('ahod', dept.pk, academic_year.pk), _compute)
+    return _load_staff(staff_id)
 
 
 def is_staff_available(staff: StaffProfile, when=None) -> bool:
@@ -242,7 +270,7 @@ def resolve_approver(role_code: str, application_instance) -> Optional[StaffProf
     role_key = role_code.strip().upper()
 
     # pick current active academic year if exists in DB
-    academic_year = AcademicYear.objects.filter(is_active=True).first() or AcademicYear.objects.order_by('-id').first()
+    academic_year = get_active_academic_year()
 
     student = getattr(application_instance, 'student_profile', None)
     if student is None:
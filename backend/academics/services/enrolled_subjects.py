@@ -0,0 +1,140 @@
+"""Cached per-student enrolment facts (elective choices, resolved subject lists).
+
+Several student-facing pages resolve "which subjects is this student taking"
+from scratch on every request: the feedback subject list
+(`feedback.services.student_subjects`), submission eligibility, the section
+subject roster (`StudentSectionSubjectsView`) and the timetable's elective
+display (`SectionTimetableView`). They share two things here:
+
+- `elective_choices(student_ids)`: each student's active ElectiveChoice rows
+  as plain dicts, read with one ``get_many`` and one query for the misses;
+- `cached(student_id, parts, compute)`: a cache slot for a derived per-student
+  result keyed by (student, *parts*), e.g. (section, semesters).
+
+Keys carry two generations, a global one and one per student.
+`academics.signals` switches the global generation when teaching assignments,
+subject batches, curriculum or elective subjects, sections, batches or the
+academic year change, and a student's generation when their elective choices,
+profile or subject batch membership change. Old keys simply expire after
+ENROLLED_SUBJECTS_CACHE_SECONDS, which also bounds staff renames.
+"""
+import hashlib
+import json
+import logging
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+_PREFIX = 'enrolled_subjects'
+_MISSING = object()
+
+
+def _timeout() -> int:
+    return int(getattr(settings, 'ENROLLED_SUBJECTS_CACHE_SECONDS', 3600) or 3600)
+
+
+def _gen_key(student_id=None) -> str:
+    return f'{_PREFIX}:gen:{student_id}' if student_id else f'{_PREFIX}:gen'
+
+
+def _generations(keys: List[str]) -> Dict[str, str]:
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            gen = uuid.uuid4().hex[:12]
+            # add() so concurrent first readers agree on one generation.
+            if not cache.add(key, gen, timeout=None):
+                gen = cache.get(key) or gen
+            found[key] = gen
+    return found
+
+
+def invalidate(student_ids: Optional[Iterable[int]] = None) -> None:
+    """Retire cached results of `student_ids` (every student when None) once the change commits."""
+    keys = [_gen_key(sid) for sid in student_ids if sid] if student_ids is not None else [_gen_key()]
+    if not keys:
+        return
+
+    def _run():
+        try:
+            cache.delete_many(keys)
+        except Exception:
+            logger.warning('Could not invalidate enrolled subject cache (%s)', keys, exc_info=True)
+
+    transaction.on_commit(_run)
+
+
+def _slot_keys(student_ids: List[int], parts) -> Dict[int, str]:
+    gens = _generations([_gen_key()] + [_gen_key(sid) for sid in student_ids])
+    digest = hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+    global_gen = gens[_gen_key()]
+    return {
+        sid: f'{_PREFIX}:{global_gen}:{gens[_gen_key(sid)]}:{sid}:{digest}'
+        for sid in student_ids
+    }
+
+
+def cached(student_id: int, parts, compute: Callable[[], Any]):
+    """Return the cached value of `compute()` for (student, parts); values must be picklable."""
+    key = _slot_keys([student_id], parts)[student_id]
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = compute()
+        cache.set(key, value, timeout=_timeout())
+    return value
+
+
+def _choice_rows(student_ids: List[int]) -> Dict[int, List[dict]]:
+    from curriculum.models import ElectiveChoice
+
+    rows = {sid: [] for sid in student_ids}
+    choices = (
+        ElectiveChoice.objects.filter(student_id__in=student_ids, is_active=True)
+        .select_related('academic_year', 'elective_subject', 'elective_subject__semester')
+        .order_by('pk')
+    )
+    for choice in choices:
+        subject = choice.elective_subject
+        rows[choice.student_id].append({
+            'id': choice.id,
+            'academic_year_id': choice.academic_year_id,
+            'academic_year_active': bool(choice.academic_year and choice.academic_year.is_active),
+            'elective_subject_id': subject.id,
+            'course_code': subject.course_code,
+            'course_name': subject.course_name,
+            'department_id': subject.department_id,
+            'regulation': subject.regulation,
+            'semester_id': subject.semester_id,
+            'semester_number': subject.semester.number if subject.semester else None,
+            'parent_id': subject.parent_id,
+        })
+    return rows
+
+
+def elective_choices(student_ids: Iterable[int]) -> Dict[int, List[dict]]:
+    """Active elective choices per student id (oldest first), from the cache where possible."""
+    student_ids = [sid for sid in dict.fromkeys(student_ids) if sid]
+    if not student_ids:
+        return {}
+    keys = _slot_keys(student_ids, 'elective_choices')
+    found = cache.get_many(list(keys.values()))
+    result = {sid: found[key] for sid, key in keys.items() if key in found}
+    missing = [sid for sid in student_ids if sid not in result]
+    if missing:
+        loaded = _choice_rows(missing)
+        cache.set_many({keys[sid]: loaded[sid] for sid in missing}, timeout=_timeout())
+        result.update(loaded)
+    return result
+
+
+def chosen_elective(student_id: int, parent_id: int) -> Optional[dict]:
+    """The student's active choice under elective parent `parent_id` in the active academic year."""
+    for choice in elective_choices([student_id]).get(student_id, []):
+        if choice['parent_id'] == parent_id and choice['academic_year_active']:
+            return choice
+    return None
@@ -0,0 +1,60 @@
+"""Retire cached enrolment results (`academics.services.enrolled_subjects`).
+
+Changes that can move many students (teaching assignments, curriculum rows,
+elective subjects, subject batches, sections, batches, the active academic
+year) switch the global generation; a student's elective choices, profile and
+subject batch membership only switch that student's.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from curriculum.models import CurriculumDepartment, ElectiveChoice, ElectiveSubject
+
+from .models import AcademicYear, Batch, Section, StudentProfile, StudentSubjectBatch, TeachingAssignment
+from .services import enrolled_subjects
+
+
+@receiver(post_save, sender=TeachingAssignment)
+@receiver(post_delete, sender=TeachingAssignment)
+@receiver(post_save, sender=StudentSubjectBatch)
+@receiver(post_delete, sender=StudentSubjectBatch)
+@receiver(post_save, sender=CurriculumDepartment)
+@receiver(post_delete, sender=CurriculumDepartment)
+@receiver(post_save, sender=ElectiveSubject)
+@receiver(post_delete, sender=ElectiveSubject)
+@receiver(post_save, sender=Section)
+@receiver(post_delete, sender=Section)
+@receiver(post_save, sender=Batch)
+@receiver(post_save, sender=AcademicYear)
+def enrolment_source_changed(sender, raw=False, **kwargs):
+    if raw:
+        return
+    enrolled_subjects.invalidate()
+
+
+@receiver(post_save, sender=ElectiveChoice)
+@receiver(post_delete, sender=ElectiveChoice)
+def elective_choice_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    enrolled_subjects.invalidate([instance.student_id])
+
+
+@receiver(post_save, sender=StudentProfile)
+def student_profile_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    enrolled_subjects.invalidate([instance.pk])
+
+
+@receiver(m2m_changed, sender=StudentSubjectBatch.students.through)
+def subject_batch_students_changed(sender, instance, action, reverse, pk_set=None, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # instance is the StudentProfile.
+        enrolled_subjects.invalidate([instance.pk])
+    elif pk_set:
+        enrolled_subjects.invalidate(pk_set)
+    else:
+        enrolled_subjects.invalidate()
@@ -30,7 +30,17 @@ def get_user_hod_department_ids(user) -> List[int]:
 
     Includes departments from active DepartmentRole entries for the user's
     `staff_profile`. Returns an empty list if no staff_profile or no roles.
+    Served from the user's cached permission snapshot.
     """
+    if not user or not getattr(user, 'pk', None):
+        return []
+    from accounts.services.permission_snapshot import get_snapshot
+
+    return list(get_snapshot(user).hod_department_ids)
+
+
+def resolve_hod_department_ids(user) -> List[int]:
+    """Uncached `get_user_hod_department_ids`; used to build permission snapshots."""
     staff_profile = get_user_staff_profile(user)
     if not staff_profile:
         return []
@@ -44,8 +54,17 @@ def get_user_effective_departments(user) -> List[int]:
 
     This combines the staff's `current_department` (if any) with HOD/AHOD
     assignments from DepartmentRole so multi-department HODs see all mapped
-    departments.
+    departments. Served from the user's cached permission snapshot.
     """
+    if not user or not getattr(user, 'pk', None):
+        return []
+    from accounts.services.permission_snapshot import get_snapshot
+
+    return list(get_snapshot(user).effective_department_ids)
+
+
+def resolve_effective_department_ids(user) -> List[int]:
+    """Uncached `get_user_effective_departments`; used to build permission snapshots."""
     depts = []
     staff_profile = get_user_staff_profile(user)
     if staff_profile:
@@ -75,7 +94,7 @@ def get_user_effective_departments(user) -> List[int]:
             pass
 
     # include HOD/AHOD mapped departments
-    depts += get_user_hod_department_ids(user)
+    depts += resolve_hod_department_ids(user)
     # dedupe and filter falsy
     return [d for d in sorted(set([int(x) for x in depts if x]))]
 
@@ -6025,7 +6025,11 @@ class StaffImportView(APIView):
                             staff_updates['date_of_join'] = parsed_doj
 
                         if staff_updates:
-                            StaffProfile.objects.filter(pk=existing_staff.pk).update(**staff_updates)
+                            StaffProfile.objects.filter(pk=existing_staff.pk).update(updated_at=timezone.now(), **staff_updates)
+                            if 'department' in staff_updates:
+                                from applications.signals import refresh_inbox_for_profiles
+
+                                refresh_inbox_for_profiles(staff_ids=[existing_staff.pk])
                         imported += 1
                 except Exception as exc:
                     errors.append({'row': idx, 'errors': [str(exc)]})
@@ -10191,35 +10195,36 @@ class StudentSectionSubjectsView(APIView):
 
         core_set = set([str(c).strip() for c in core_codes if c])
 
+        students = list(students_qs)
+
         electives_by_student_id = defaultdict(set)
         all_elective_codes = set()
         try:
             if ElectiveChoice is not None:
+                from .services import enrolled_subjects
+
                 try:
                     ay = AcademicYear.objects.filter(is_active=True).first()
                 except Exception:
                     ay = None
 
-                eqs = ElectiveChoice.objects.filter(student__in=students_qs, is_active=True).select_related('elective_subject', 'student')
-                if ay is not None:
-                    eqs = eqs.filter(models.Q(academic_year=ay) | models.Q(academic_year__isnull=True))
-
-                for ch in eqs:
-                    st = getattr(ch, 'student', None)
-                    es = getattr(ch, 'elective_subject', None)
-                    if not st or not es:
-                        continue
-                    if dept is not None and getattr(es, 'department_id', None) != getattr(dept, 'id', None):
-                        continue
-                    if regulation_code and str(getattr(es, 'regulation', '') or '').strip() != str(regulation_code):
-                        continue
-                    if getattr(es, 'semester_id', None) != getattr(semester, 'id', None):
-                        continue
-                    code = str(getattr(es, 'course_code', '') or '').strip()
-                    if not code:
-                        continue
-                    electives_by_student_id[getattr(st, 'id', None)].add(code)
-                    all_elective_codes.add(code)
+                # Per-student choices are cached (academics.services.enrolled_subjects).
+                choices_by_student = enrolled_subjects.elective_choices([st.id for st in students])
+                for student_id, choices in choices_by_student.items():
+                    for ch in choices:
+                        if ay is not None and ch['academic_year_id'] not in (ay.id, None):
+                            continue
+                        if dept is not None and ch['department_id'] != getattr(dept, 'id', None):
+                            continue
+                        if regulation_code and str(ch['regulation'] or '').strip() != str(regulation_code):
+                            continue
+                        if ch['semester_id'] != getattr(semester, 'id', None):
+                            continue
+                        code = str(ch['course_code'] or '').strip()
+                        if not code:
+                            continue
+                        electives_by_student_id[student_id].add(code)
+                        all_elective_codes.add(code)
         except Exception:
             electives_by_student_id = defaultdict(set)
             all_elective_codes = set()
@@ -10241,7 +10246,7 @@ class StudentSectionSubjectsView(APIView):
                 base_subjects_list = []
 
         out = []
-        for s in students_qs:
+        for s in students:
             u = getattr(s, 'user', None)
             display_name = ' '.join([x for x in [getattr(u, 'first_name', ''), getattr(u, 'last_name', '')] if x]).strip()
             if not display_name:
@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
 from django.utils.html import format_html
-from .models import User, Role, UserRole, Permission, RolePermission, UserQuery, ProfileImageUpdateRequest
+from .models import User, Role, UserRole, Permission, RolePermission, UserQuery, ProfileImageUpdateRequest, OutboundMessage
 from django.contrib import messages
 from academics.models import StudentProfile, StaffProfile, Section, Department
 from django import forms
@@ -874,6 +874,14 @@ class RolePermissionAdmin(admin.ModelAdmin):
     list_display = ('role', 'permission')
 
 
+@admin.register(OutboundMessage)
+class OutboundMessageAdmin(admin.ModelAdmin):
+    list_display = ('id', 'channel', 'recipient', 'tag', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at')
+    list_filter = ('channel', 'status', 'tag')
+    search_fields = ('recipient', 'tag', 'dedupe_key')
+    readonly_fields = ('created_at', 'updated_at', 'sent_at', 'response_status', 'last_error')
+
+
 @admin.register(UserQuery)
 class UserQueryAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'status', 'created_at', 'updated_at', 'query_preview')
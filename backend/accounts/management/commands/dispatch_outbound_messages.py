@@ -0,0 +1,71 @@
+"""Management command: dispatch_outbound_messages
+
+Long-running worker that delivers queued WhatsApp/SMS messages
+(`accounts.OutboundMessage`). Run it next to the web workers, e.g. under
+systemd; several instances may run at once.
+
+Usage:
+    python manage.py dispatch_outbound_messages
+    python manage.py dispatch_outbound_messages --once          # drain due messages and exit
+    python manage.py dispatch_outbound_messages --batch-size 20 --idle-sleep 2
+"""
+
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from accounts.services import outbox
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued WhatsApp/SMS messages with per-channel rate limits and retries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Process due messages until none are left, then exit')
+        parser.add_argument('--batch-size', type=int, default=50, help='Messages claimed per round (default: 50)')
+        parser.add_argument('--idle-sleep', type=float, default=1.0, help='Seconds to sleep when nothing is due (default: 1)')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        idle_sleep = max(0.1, options['idle_sleep'])
+        limiters = outbox.default_rate_limiters()
+
+        self.stdout.write(self.style.SUCCESS('Outbound message dispatcher started'))
+        totals = outbox.DispatchStats()
+        try:
+            while True:
+                close_old_connections()
+                try:
+                    stats = outbox.dispatch_batch(batch_size, limiters=limiters)
+                except Exception as e:
+                    # DB hiccup: back off and try again; rows stay leased/pending.
+                    self.stderr.write(f'Dispatch round failed: {e}')
+                    if options['once']:
+                        raise
+                    time.sleep(min(30.0, idle_sleep * 5))
+                    continue
+
+                for line in stats.errors:
+                    self.stderr.write(f'FAILED {line}')
+                totals.sent += stats.sent
+                totals.retried += stats.retried
+                totals.failed += stats.failed
+                totals.fallbacks += stats.fallbacks
+
+                if stats.sent or stats.retried or stats.failed:
+                    self.stdout.write(
+                        f'sent={stats.sent} retry={stats.retried} failed={stats.failed} fallback={stats.fallbacks}'
+                    )
+                    continue
+                if options['once']:
+                    break
+                time.sleep(idle_sleep)
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(
+            f'Stopped. sent={totals.sent} retry={totals.retried} failed={totals.failed} fallback={totals.fallbacks}'
+        )
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.28 on 2026-10-18 23:54
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0030_add_academic_calendar_admin_permission'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel', models.CharField(choices=[('WHATSAPP', 'WhatsApp'), ('SMS', 'SMS')], max_length=10)),
+                ('recipient', models.CharField(max_length=32)),
+                ('message', models.TextField()),
+                ('tag', models.CharField(blank=True, default='', max_length=64)),
+                ('dedupe_key', models.CharField(blank=True, max_length=128, null=True, unique=True)),
+                ('fallback_channel', models.CharField(blank=True, choices=[('WHATSAPP', 'WhatsApp'), ('SMS', 'SMS')], default='', max_length=10)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('SENDING', 'Sending'), ('SENT', 'Sent'), ('FAILED', 'Failed')], default='PENDING', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('max_attempts', models.PositiveSmallIntegerField(default=6)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('response_status', models.IntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='accounts_outbox_due_idx'), models.Index(fields=['tag', '-created_at'], name='accounts_outbox_tag_idx')],
+            },
+        ),
+    ]
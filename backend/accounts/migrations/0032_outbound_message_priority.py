@@ -0,0 +1,26 @@
+# Generated by Django 4.2.28 on 2026-10-19 01:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0031_outbound_message'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='outboundmessage',
+            name='accounts_outbox_due_idx',
+        ),
+        migrations.AddField(
+            model_name='outboundmessage',
+            name='priority',
+            field=models.PositiveSmallIntegerField(choices=[(0, 'Normal'), (10, 'OTP')], default=0),
+        ),
+        migrations.AddIndex(
+            model_name='outboundmessage',
+            index=models.Index(fields=['status', '-priority', 'next_attempt_at'], name='accounts_outbox_claim_idx'),
+        ),
+    ]
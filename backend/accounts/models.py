@@ -313,6 +313,61 @@ class NotificationTemplate(models.Model):
         return self.code
 
 
+class OutboundMessage(models.Model):
+    """Durable WhatsApp/SMS outbox.
+
+    Requests only insert a row (inside their own transaction); delivery,
+    rate limiting and retries happen in `manage.py dispatch_outbound_messages`.
+    """
+
+    class Channel(models.TextChoices):
+        WHATSAPP = 'WHATSAPP', 'WhatsApp'
+        SMS = 'SMS', 'SMS'
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        SENDING = 'SENDING', 'Sending'
+        SENT = 'SENT', 'Sent'
+        FAILED = 'FAILED', 'Failed'
+
+    class Priority(models.IntegerChoices):
+        NORMAL = 0, 'Normal'
+        OTP = 10, 'OTP'
+
+    channel = models.CharField(max_length=10, choices=Channel.choices)
+    recipient = models.CharField(max_length=32)
+    message = models.TextField()
+    tag = models.CharField(max_length=64, blank=True, default='')
+    # Optional idempotency key; enqueueing the same key twice keeps one message.
+    dedupe_key = models.CharField(max_length=128, null=True, blank=True, unique=True)
+    # Channel to enqueue once this message has permanently failed (e.g. OTP WhatsApp -> SMS).
+    fallback_channel = models.CharField(max_length=10, choices=Channel.choices, blank=True, default='')
+
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    # Dispatchers claim higher priorities first, so OTPs are not stuck behind a notification backlog.
+    priority = models.PositiveSmallIntegerField(choices=Priority.choices, default=Priority.NORMAL)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=6)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    # Lease for SENDING rows; expired leases (crashed dispatcher) are re-queued.
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    response_status = models.IntegerField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', '-priority', 'next_attempt_at'], name='accounts_outbox_claim_idx'),
+            models.Index(fields=['tag', '-created_at'], name='accounts_outbox_tag_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.channel} to {self.recipient} ({self.status})"
+
+
 class UserQuery(models.Model):
     """User queries, doubts, errors, and bug reports.
     
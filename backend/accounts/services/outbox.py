@@ -0,0 +1,212 @@
+"""Durable outbound WhatsApp/SMS queue.
+
+Request handlers call `enqueue()`, which only inserts an `OutboundMessage`
+row. Because the insert runs in the caller's transaction, a message exists
+exactly when the business change (approval, OTP issue...) commits, and the
+request never waits on the WhatsApp bridge.
+
+`python manage.py dispatch_outbound_messages` drains the table:
+
+- claims due rows with `SELECT ... FOR UPDATE SKIP LOCKED` and a lease, so
+  several dispatchers can run and a crashed one releases its rows; higher
+  `priority` rows (OTPs) are claimed first;
+- sends through a pooled keep-alive HTTP session (`sms.deliver_whatsapp`);
+- paces each channel with a token bucket (`OUTBOX_*_RATE_PER_SECOND`);
+- retries failures with exponential backoff and jitter up to `max_attempts`,
+  then marks the row FAILED and enqueues its `fallback_channel`, if any.
+"""
+import hashlib
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.models import OutboundMessage
+
+log = logging.getLogger(__name__)
+
+Channel = OutboundMessage.Channel
+Status = OutboundMessage.Status
+
+MIN_LEASE_SECONDS = 120
+
+
+def dedupe_key_for(*parts) -> str:
+    """Stable idempotency key from arbitrary parts (e.g. tag, recipient, message)."""
+    raw = '|'.join(str(p or '') for p in parts)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def enqueue(channel: str, to_number: str, message: str, *, tag: str = '', dedupe_key: Optional[str] = None,
+            fallback_channel: str = '', max_attempts: Optional[int] = None,
+            priority: int = OutboundMessage.Priority.NORMAL) -> Optional[OutboundMessage]:
+    """Queue a message for delivery. Returns None when there is nothing to send."""
+    to_number = str(to_number or '').strip()
+    message = str(message or '').strip()
+    if not to_number or not message:
+        return None
+
+    values = dict(
+        channel=channel,
+        recipient=to_number[:32],
+        message=message,
+        tag=str(tag or '')[:64],
+        dedupe_key=dedupe_key,
+        fallback_channel=fallback_channel or '',
+        priority=priority,
+        max_attempts=max_attempts or int(getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 6) or 6),
+    )
+    if not dedupe_key:
+        return OutboundMessage.objects.create(**values)
+    try:
+        with transaction.atomic():
+            return OutboundMessage.objects.create(**values)
+    except IntegrityError:
+        return OutboundMessage.objects.filter(dedupe_key=dedupe_key).first()
+
+
+def enqueue_whatsapp(to_number: str, message: str, **kwargs) -> Optional[OutboundMessage]:
+    return enqueue(Channel.WHATSAPP, to_number, message, **kwargs)
+
+
+def enqueue_sms(to_number: str, message: str, **kwargs) -> Optional[OutboundMessage]:
+    return enqueue(Channel.SMS, to_number, message, **kwargs)
+
+
+# ── Dispatcher ──────────────────────────────────────────────────────────────
+
+class RateLimiter:
+    """Token bucket per channel; `wait()` blocks until one send is allowed."""
+
+    def __init__(self, rate_per_second: float, burst: int = 1):
+        self.rate = max(0.01, float(rate_per_second))
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def wait(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            time.sleep((1 - self.tokens) / self.rate)
+
+
+def default_rate_limiters() -> Dict[str, RateLimiter]:
+    return {
+        Channel.WHATSAPP: RateLimiter(getattr(settings, 'OUTBOX_WHATSAPP_RATE_PER_SECOND', 1.0)),
+        Channel.SMS: RateLimiter(getattr(settings, 'OUTBOX_SMS_RATE_PER_SECOND', 2.0)),
+    }
+
+
+def retry_delay(attempts: int) -> timedelta:
+    base = float(getattr(settings, 'OUTBOX_RETRY_BASE_SECONDS', 15.0) or 15.0)
+    cap = float(getattr(settings, 'OUTBOX_RETRY_MAX_SECONDS', 1800.0) or 1800.0)
+    delay = min(cap, base * (2 ** max(0, attempts - 1)))
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def claim_batch(limit: int, lease_seconds: int = MIN_LEASE_SECONDS) -> List[OutboundMessage]:
+    """Lease up to `limit` due messages (PENDING, or SENDING with an expired lease)."""
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            OutboundMessage.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=Status.PENDING, next_attempt_at__lte=now)
+                | Q(status=Status.SENDING, locked_until__lt=now)
+            )
+            .order_by('-priority', 'next_attempt_at', 'id')[:limit]
+        )
+        if rows:
+            OutboundMessage.objects.filter(id__in=[m.id for m in rows]).update(
+                status=Status.SENDING,
+                locked_until=now + timedelta(seconds=lease_seconds),
+                updated_at=now,
+            )
+    return rows
+
+
+def _deliver(msg: OutboundMessage):
+    from accounts.services import sms
+
+    if msg.channel == Channel.WHATSAPP:
+        return sms.deliver_whatsapp(msg.recipient, msg.message)
+    result = sms.send_sms(msg.recipient, msg.message)
+    # SMS backends do not classify failures; gateway hiccups are the common case.
+    if not result.ok:
+        result.retryable = True
+    return result
+
+
+@dataclass
+class DispatchStats:
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+    fallbacks: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+def dispatch_message(msg: OutboundMessage, stats: DispatchStats):
+    try:
+        result = _deliver(msg)
+    except Exception as e:
+        log.exception('Outbound message %s raised during delivery', msg.id)
+        from accounts.services.sms import SmsSendResult
+
+        result = SmsSendResult(ok=False, message=str(e), retryable=True)
+
+    now = timezone.now()
+    attempts = msg.attempts + 1
+    update = dict(attempts=attempts, locked_until=None, response_status=result.status_code, updated_at=now)
+
+    if result.ok:
+        update.update(status=Status.SENT, sent_at=now, last_error='')
+        stats.sent += 1
+    elif result.retryable and attempts < msg.max_attempts:
+        update.update(status=Status.PENDING, next_attempt_at=now + retry_delay(attempts), last_error=result.message[:2000])
+        stats.retried += 1
+    else:
+        update.update(status=Status.FAILED, last_error=result.message[:2000])
+        stats.failed += 1
+        stats.errors.append(f'#{msg.id} {msg.channel} {msg.recipient}: {result.message}')
+
+    with transaction.atomic():
+        OutboundMessage.objects.filter(pk=msg.pk).update(**update)
+        if update['status'] == Status.FAILED and msg.fallback_channel and msg.fallback_channel != msg.channel:
+            enqueue(
+                msg.fallback_channel,
+                msg.recipient,
+                msg.message,
+                tag=msg.tag,
+                dedupe_key=f'fallback:{msg.pk}',
+                priority=msg.priority,
+            )
+            stats.fallbacks += 1
+
+
+def dispatch_batch(limit: int = 50, limiters: Optional[Dict[str, RateLimiter]] = None) -> DispatchStats:
+    limiters = limiters or default_rate_limiters()
+    stats = DispatchStats()
+    # The lease must outlive a worst-case batch (every send paced and timing out),
+    # otherwise another dispatcher could re-claim rows still being sent.
+    timeout = float(getattr(settings, 'OBE_WHATSAPP_TIMEOUT_SECONDS', 8.0) or 8.0)
+    slowest = min(limiter.rate for limiter in limiters.values()) if limiters else 1.0
+    lease_seconds = max(MIN_LEASE_SECONDS, int(limit * (timeout + 1.0 / slowest)) + 60)
+    for msg in claim_batch(limit, lease_seconds=lease_seconds):
+        limiter = limiters.get(msg.channel)
+        if limiter is not None:
+            limiter.wait()
+        dispatch_message(msg, stats)
+    return stats
@@ -0,0 +1,133 @@
+"""Cached per-user permission snapshots.
+
+`get_user_permissions` and the department helpers in `academics.utils` are
+called many times per request across feedback, COE, OBE, idcsscan and
+staff_requests. Their inputs (role grants, role membership, HOD/AHOD and
+advisor mappings, staff department) change rarely, so each user's
+permission codes, role names, effective department ids and HOD/AHOD
+department ids are resolved together into one `PermissionSnapshot`:
+
+- per request: the snapshot is kept on the user instance, so repeated checks
+  in one request are set lookups;
+- Redis: keyed by a global role *version*. Receivers in `accounts.signals`
+  call `bump_version()` when any of those tables change; snapshots of the old
+  version simply expire (PERMISSION_SNAPSHOT_CACHE_SECONDS).
+"""
+import logging
+from dataclasses import dataclass
+from typing import FrozenSet, Iterable, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+_VERSION_KEY = 'accounts:perm:version'
+_ATTR = '_permission_snapshot'
+
+# Bumped in-process alongside the Redis version so a snapshot memoized on a
+# user instance earlier in the same request is not reused after a change.
+_local_epoch = 0
+
+
+@dataclass(frozen=True)
+class PermissionSnapshot:
+    user_id: int
+    permissions: FrozenSet[str]
+    roles: FrozenSet[str]
+    effective_department_ids: Tuple[int, ...]
+    hod_department_ids: Tuple[int, ...]
+
+    def has_perm(self, code: str) -> bool:
+        return str(code or '').strip().rstrip('.') in self.permissions
+
+    def has_any_perm(self, codes: Iterable[str]) -> bool:
+        return any(self.has_perm(code) for code in codes)
+
+    def has_role(self, name: str) -> bool:
+        return str(name or '').strip().upper() in self.roles
+
+
+def _timeout() -> int:
+    return int(getattr(settings, 'PERMISSION_SNAPSHOT_CACHE_SECONDS', 600) or 600)
+
+
+def current_version() -> int:
+    version = cache.get(_VERSION_KEY)
+    if version is None:
+        cache.add(_VERSION_KEY, 1, timeout=None)
+        version = cache.get(_VERSION_KEY) or 1
+    return int(version)
+
+
+def _bump():
+    global _local_epoch
+    _local_epoch += 1
+    try:
+        cache.incr(_VERSION_KEY)
+    except ValueError:
+        # Key missing (evicted or never read): any new value retires old snapshots.
+        cache.set(_VERSION_KEY, current_version() + 1, timeout=None)
+    except Exception:
+        logger.warning('Could not bump permission snapshot version', exc_info=True)
+
+
+def bump_version():
+    """Retire every cached snapshot now and again after commit.
+
+    The post-commit bump discards snapshots that concurrent requests built
+    from pre-commit data while the writing transaction was still open.
+    """
+    _bump()
+    transaction.on_commit(_bump)
+
+
+def invalidate_user(user_id) -> None:
+    """Drop one user's snapshot (for changes that cannot affect anyone else)."""
+    global _local_epoch
+    if not user_id:
+        return
+    _local_epoch += 1
+
+    def _drop():
+        cache.delete(f'accounts:perm:{current_version()}:{user_id}')
+
+    _drop()
+    transaction.on_commit(_drop)
+
+
+def _build(user) -> PermissionSnapshot:
+    from academics import utils as academics_utils
+    from accounts.models import RolePermission
+
+    codes = (
+        RolePermission.objects.filter(role__user_roles__user=user)
+        .values_list('permission__code', flat=True)
+        .distinct()
+    )
+    role_names = user.roles.values_list('name', flat=True)
+    return PermissionSnapshot(
+        user_id=user.pk,
+        permissions=frozenset(str(p).strip().rstrip('.') for p in codes if p),
+        roles=frozenset(str(r).strip().upper() for r in role_names if r),
+        effective_department_ids=tuple(academics_utils.resolve_effective_department_ids(user)),
+        hod_department_ids=tuple(academics_utils.resolve_hod_department_ids(user)),
+    )
+
+
+def get_snapshot(user) -> PermissionSnapshot:
+    memo = getattr(user, _ATTR, None)
+    if memo is not None and memo[0] == _local_epoch:
+        return memo[1]
+
+    key = f'accounts:perm:{current_version()}:{user.pk}'
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = _build(user)
+        try:
+            cache.set(key, snapshot, timeout=_timeout())
+        except Exception:
+            logger.warning('Could not cache permission snapshot for user %s', user.pk, exc_info=True)
+    setattr(user, _ATTR, (_local_epoch, snapshot))
+    return snapshot
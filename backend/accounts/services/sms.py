@@ -1,9 +1,11 @@
 import logging
 import re
+import threading
 import urllib.parse
 import urllib.request
 import time
 from dataclasses import dataclass
+from typing import Optional
 from django.conf import settings
 
 try:
@@ -21,6 +23,9 @@ log = logging.getLogger(__name__)
 class SmsSendResult:
     ok: bool
     message: str = ''
+    # Set by single-attempt senders so the outbox knows whether a retry can help.
+    retryable: bool = False
+    status_code: Optional[int] = None
 
 
 @dataclass
@@ -156,13 +161,29 @@ def send_sms(to_number: str, message: str) -> SmsSendResult:
     return SmsSendResult(ok=False, message=f'Unsupported SMS_BACKEND: {backend}')
 
 
-def send_whatsapp(to_number: str, message: str) -> SmsSendResult:
-    """Send a WhatsApp text message via the local whatsapp-web.js microservice.
+_session_lock = threading.Lock()
+_session = None
 
-    This uses the same `OBE_WHATSAPP_*` settings as OBE edit-request notifications.
-    Unlike `send_sms`, this function always attempts WhatsApp delivery regardless of `SMS_BACKEND`.
-    """
 
+def _http_session():
+    """Process-wide keep-alive session for the whatsapp-web.js gateway."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session = session
+    return _session
+
+
+def _whatsapp_request(to_number: str, message: str):
+    """Return (endpoint, payload) for the gateway, or an SmsSendResult describing why not."""
     endpoint = str(getattr(settings, 'OBE_WHATSAPP_API_URL', '') or '').strip()
     api_key = str(getattr(settings, 'OBE_WHATSAPP_API_KEY', '') or '').strip()
     if not endpoint or not api_key:
@@ -183,35 +204,64 @@ def send_whatsapp(to_number: str, message: str) -> SmsSendResult:
         'to': recipient,
         'message': str(message).strip(),
     }
+    return endpoint, payload
+
 
-    def _post_once():
-        import requests
+def _is_transient_whatsapp_failure(status_code: int, response_text: str) -> bool:
+    # whatsapp-web.js + Puppeteer can intermittently fail with detached-frame errors.
+    text = (response_text or '').lower()
+    return status_code >= 500 or 'detached frame' in text or 'execution context was destroyed' in text
 
-        timeout = float(getattr(settings, 'OBE_WHATSAPP_TIMEOUT_SECONDS', 8.0) or 8.0)
-        return requests.post(endpoint, json=payload, timeout=timeout)
 
+def deliver_whatsapp(to_number: str, message: str) -> SmsSendResult:
+    """Single delivery attempt over the pooled session; retries are the caller's job (outbox)."""
+    prepared = _whatsapp_request(to_number, message)
+    if isinstance(prepared, SmsSendResult):
+        return prepared
+    endpoint, payload = prepared
+
+    timeout = float(getattr(settings, 'OBE_WHATSAPP_TIMEOUT_SECONDS', 8.0) or 8.0)
     try:
-        response = _post_once()
-        status_code = int(getattr(response, 'status_code', 0) or 0)
-        response_text = str(getattr(response, 'text', '') or '')
-        if 200 <= status_code < 300:
-            return SmsSendResult(ok=True, message='Sent via WhatsApp')
-
-        # whatsapp-web.js + Puppeteer can intermittently fail with detached-frame errors;
-        # retry once for transient provider faults.
-        transient = status_code >= 500 or 'detached frame' in response_text.lower() or 'execution context was destroyed' in response_text.lower()
-        if transient:
+        response = _http_session().post(endpoint, json=payload, timeout=timeout)
+    except Exception as e:
+        # Gateway down / timeout: always worth retrying later.
+        return SmsSendResult(ok=False, message=str(e), retryable=True)
+
+    status_code = int(getattr(response, 'status_code', 0) or 0)
+    response_text = str(getattr(response, 'text', '') or '')
+    if 200 <= status_code < 300:
+        return SmsSendResult(ok=True, message='Sent via WhatsApp', status_code=status_code)
+    return SmsSendResult(
+        ok=False,
+        message=f'WhatsApp HTTP {status_code}: {response_text[:500]!r}',
+        retryable=_is_transient_whatsapp_failure(status_code, response_text) or status_code == 429,
+        status_code=status_code,
+    )
+
+
+def send_whatsapp(to_number: str, message: str) -> SmsSendResult:
+    """Send a WhatsApp text message via the local whatsapp-web.js microservice.
+
+    This uses the same `OBE_WHATSAPP_*` settings as OBE edit-request notifications.
+    Unlike `send_sms`, this function always attempts WhatsApp delivery regardless of `SMS_BACKEND`.
+
+    Blocks the caller; request handlers should enqueue via `accounts.services.outbox` instead.
+    """
+    try:
+        result = deliver_whatsapp(to_number, message)
+        if result.ok or result.status_code is None:
+            if not result.ok and result.retryable:
+                log.warning('WhatsApp send failed: %s', result.message)
+            return result
+
+        # Retry once for transient provider faults.
+        if result.retryable:
             try:
                 time.sleep(0.7)
             except Exception:
                 pass
-            retry = _post_once()
-            retry_status = int(getattr(retry, 'status_code', 0) or 0)
-            if 200 <= retry_status < 300:
-                return SmsSendResult(ok=True, message='Sent via WhatsApp')
-            return SmsSendResult(ok=False, message=f'WhatsApp HTTP {retry_status}: {getattr(retry, "text", "")!r}')
-
-        return SmsSendResult(ok=False, message=f'WhatsApp HTTP {status_code}: {response_text!r}')
+            return deliver_whatsapp(to_number, message)
+        return result
     except Exception as e:
         log.exception('WhatsApp send failed')
         return SmsSendResult(ok=False, message=str(e))
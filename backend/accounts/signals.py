@@ -0,0 +1,74 @@
+"""Keep cached permission snapshots (`accounts.services.permission_snapshot`) current.
+
+Role grants and role/HOD membership retire every snapshot through the global
+role version; a staff member's own department and advisor mappings only drop
+that user's snapshot.
+"""
+import logging
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from academics.models import AcademicYear, DepartmentRole, SectionAdvisor, StaffDepartmentAssignment, StaffProfile
+from accounts.models import Permission, Role, RolePermission, User, UserRole
+from accounts.services import permission_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+def _bump_version():
+    try:
+        permission_snapshot.bump_version()
+    except Exception:
+        logger.exception('Permission snapshot version bump failed')
+
+
+def _invalidate_user(user_id):
+    try:
+        permission_snapshot.invalidate_user(user_id)
+    except Exception:
+        logger.exception('Permission snapshot invalidation failed for user %s', user_id)
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+@receiver(post_save, sender=RolePermission)
+@receiver(post_delete, sender=RolePermission)
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+@receiver(post_save, sender=DepartmentRole)
+@receiver(post_delete, sender=DepartmentRole)
+def role_config_changed(sender, **kwargs):
+    _bump_version()
+
+
+@receiver(m2m_changed, sender=User.roles.through)
+def user_roles_changed(sender, action, **kwargs):
+    # user.roles.add()/remove()/clear() write UserRole rows without post_save.
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        _bump_version()
+
+
+@receiver(post_save, sender=AcademicYear)
+def academic_year_saved(sender, instance, update_fields=None, **kwargs):
+    # Advisor and HOD mappings are scoped to the active academic year.
+    if update_fields is None or 'is_active' in update_fields:
+        _bump_version()
+
+
+@receiver(post_save, sender=StaffProfile)
+@receiver(post_delete, sender=StaffProfile)
+def staff_profile_changed(sender, instance, **kwargs):
+    _invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=StaffDepartmentAssignment)
+@receiver(post_delete, sender=StaffDepartmentAssignment)
+@receiver(post_save, sender=SectionAdvisor)
+@receiver(post_delete, sender=SectionAdvisor)
+def staff_department_mapping_changed(sender, instance, **kwargs):
+    staff_id = getattr(instance, 'staff_id', None) or getattr(instance, 'advisor_id', None)
+    user_id = StaffProfile.objects.filter(pk=staff_id).values_list('user_id', flat=True).first() if staff_id else None
+    _invalidate_user(user_id)
@@ -1,6 +1,6 @@
 from typing import Set
 
-from .models import RolePermission
+from .services.permission_snapshot import get_snapshot
 
 
 def get_user_permissions(user) -> Set[str]:
@@ -11,8 +11,8 @@ def get_user_permissions(user) -> Set[str]:
     permissions from department-role or assignment tables — this ensures the
     UI shows items only when the user actually has the Role record.
     """
-    if user is None:
+    if user is None or not getattr(user, 'pk', None):
         return set()
 
-    qs = RolePermission.objects.filter(role__user_roles__user=user).values_list('permission__code', flat=True).distinct()
-    return {str(p).strip().rstrip('.') for p in qs if p}
+    # Resolved once per role version and cached (accounts.services.permission_snapshot).
+    return set(get_snapshot(user).permissions)
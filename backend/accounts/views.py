@@ -33,9 +33,10 @@ import uuid
 import secrets
 import time
 
-from .models import MobileOtp, NotificationTemplate, UserQuery, Role
+from .models import MobileOtp, NotificationTemplate, OutboundMessage, UserQuery, Role
 from .models import ProfileImageUpdateRequest
-from .services.sms import send_sms, send_whatsapp, verify_otp
+from .services import outbox
+from .services.sms import verify_otp
 from .permissions_api import HasPermissionCode
 from .utils import get_user_permissions
 from .views_impersonate import (
@@ -426,8 +427,8 @@ class MobileOtpVerifyView(APIView):
                     for k, v in ctx.items():
                         confirmation_message = confirmation_message.replace(k, v)
                     
-                    # Send confirmation via WhatsApp
-                    send_whatsapp(mobile, confirmation_message)
+                    # Send confirmation via WhatsApp (queued; never blocks verification)
+                    outbox.enqueue_whatsapp(mobile, confirmation_message, tag='mobile_verified')
                 except Exception as e:
                     log.warning(f'Failed to send WhatsApp confirmation: {e}')
 
@@ -662,6 +663,24 @@ def _resolve_user_mobile_for_reset(user) -> str:
     return ''
 
 
+def _enqueue_reset_otp(mobile: str, message: str):
+    """Queue a reset OTP over WhatsApp, falling back to SMS if WhatsApp keeps failing.
+
+    Few attempts: the OTP expires in minutes, so prefer switching channel over long retries.
+    """
+    queued = outbox.enqueue_whatsapp(
+        mobile,
+        message,
+        tag='password_reset_otp',
+        fallback_channel=OutboundMessage.Channel.SMS,
+        max_attempts=2,
+        priority=OutboundMessage.Priority.OTP,
+    )
+    if queued is None:
+        raise ValueError('Invalid mobile number.')
+    return queued
+
+
 class ForgotPasswordRequestOtpView(APIView):
     """Request OTP via email or mobile for forgot-password flow."""
     authentication_classes = []
@@ -719,22 +738,14 @@ class ForgotPasswordRequestOtpView(APIView):
                     connection=connection,
                 )
             else:
-                sent = send_whatsapp(normalized_target, message)
-                if not sent.ok:
-                    sms_sent = send_sms(normalized_target, message)
-                    if not sms_sent.ok:
-                        return Response({'detail': sent.message or sms_sent.message or 'Failed to send OTP.'}, status=status.HTTP_502_BAD_GATEWAY)
+                _enqueue_reset_otp(normalized_target, message)
         except Exception as exc:
             log.exception('Failed to send forgot-password OTP (%s)', method)
             if method == 'email':
                 fallback_mobile = _resolve_user_mobile_for_reset(user)
                 if fallback_mobile:
                     try:
-                        sent = send_whatsapp(fallback_mobile, message)
-                        if not sent.ok:
-                            sms_sent = send_sms(fallback_mobile, message)
-                            if not sms_sent.ok:
-                                raise Exception(sent.message or sms_sent.message or 'Mobile OTP fallback failed')
+                        _enqueue_reset_otp(fallback_mobile, message)
 
                         return Response(
                             {
@@ -1028,7 +1039,7 @@ class ProfileUpdateView(APIView):
                     old_value = ''
                 try:
                     from academics.models import StudentProfile
-                    StudentProfile.objects.filter(pk=student_profile.pk).update(profile_image=saved_name)
+                    StudentProfile.objects.filter(pk=student_profile.pk).update(profile_image=saved_name, updated_at=timezone.now())
                 except Exception:
                     log.exception('Failed saving student_profile.profile_image (user_id=%s) saved_name=%s', getattr(user, 'id', None), saved_name)
                     return Response({'detail': 'Failed to save profile image.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -1039,7 +1050,7 @@ class ProfileUpdateView(APIView):
                     old_value = ''
                 try:
                     from academics.models import StaffProfile
-                    StaffProfile.objects.filter(pk=staff_profile.pk).update(profile_image=saved_name)
+                    StaffProfile.objects.filter(pk=staff_profile.pk).update(profile_image=saved_name, updated_at=timezone.now())
                 except Exception:
                     log.exception('Failed saving staff_profile.profile_image (user_id=%s) saved_name=%s', getattr(user, 'id', None), saved_name)
                     return Response({'detail': 'Failed to save profile image.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
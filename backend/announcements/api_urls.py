@@ -4,16 +4,24 @@ from .api_views import (
     AnnouncementCreateView,
     AnnouncementDetailView,
     AnnouncementListView,
+    AnnouncementMarkAllReadView,
     AnnouncementMarkReadView,
     AnnouncementOptionsView,
+    AnnouncementReadReceiptsView,
+    AnnouncementReadStatsView,
     AnnouncementReadersView,
     AnnouncementSentListView,
     AnnouncementUnreadCountView,
     LegacyAnnouncementCreateView,
     LegacyAnnouncementListView,
+    LegacyAnnouncementMarkAllReadView,
     LegacyAnnouncementMarkReadView,
     LegacyAnnouncementOptionsView,
+    LegacyAnnouncementReadReceiptsView,
+    LegacyAnnouncementReadStatsView,
+    LegacyAnnouncementReadersView,
     LegacyAnnouncementSentListView,
+    LegacyAnnouncementUnreadCountView,
 )
 
 urlpatterns = [
@@ -22,16 +30,24 @@ urlpatterns = [
     path('announcements/<uuid:announcement_id>/', AnnouncementDetailView.as_view(), name='announcement-detail'),
     path('announcements/<uuid:announcement_id>/mark-read/', AnnouncementMarkReadView.as_view(), name='announcement-mark-read'),
     path('announcements/<uuid:announcement_id>/readers/', AnnouncementReadersView.as_view(), name='announcement-readers'),
+    path('announcements/<uuid:announcement_id>/read-stats/', AnnouncementReadStatsView.as_view(), name='announcement-read-stats'),
+    path('announcements/read-receipts/', AnnouncementReadReceiptsView.as_view(), name='announcement-read-receipts'),
     path('announcements/options/', AnnouncementOptionsView.as_view(), name='announcement-options'),
     path('announcements/sent/', AnnouncementSentListView.as_view(), name='announcement-sent-list'),
     path('announcements/unread-count/', AnnouncementUnreadCountView.as_view(), name='announcement-unread-count'),
+    path('announcements/mark-all-read/', AnnouncementMarkAllReadView.as_view(), name='announcement-mark-all-read'),
 
     # Backward-compatible aliases
     path('announcements/announcements/', LegacyAnnouncementListView.as_view(), name='legacy-announcement-list'),
     path('announcements/announcements/create/', LegacyAnnouncementCreateView.as_view(), name='legacy-announcement-create'),
     path('announcements/announcements/<uuid:announcement_id>/mark-read/', LegacyAnnouncementMarkReadView.as_view(), name='legacy-announcement-mark-read-v2'),
     path('announcements/announcements/<uuid:announcement_id>/mark_as_read/', LegacyAnnouncementMarkReadView.as_view(), name='legacy-announcement-mark-read'),
+    path('announcements/announcements/<uuid:announcement_id>/readers/', LegacyAnnouncementReadersView.as_view(), name='legacy-announcement-readers'),
+    path('announcements/announcements/<uuid:announcement_id>/read-stats/', LegacyAnnouncementReadStatsView.as_view(), name='legacy-announcement-read-stats'),
+    path('announcements/announcements/read-receipts/', LegacyAnnouncementReadReceiptsView.as_view(), name='legacy-announcement-read-receipts'),
     path('announcements/announcements/options/', LegacyAnnouncementOptionsView.as_view(), name='legacy-announcement-options-v2'),
     path('announcements/announcements/available_courses/', LegacyAnnouncementOptionsView.as_view(), name='legacy-announcement-options'),
     path('announcements/announcements/sent/', LegacyAnnouncementSentListView.as_view(), name='legacy-announcement-sent-list'),
+    path('announcements/announcements/unread-count/', LegacyAnnouncementUnreadCountView.as_view(), name='legacy-announcement-unread-count'),
+    path('announcements/announcements/mark-all-read/', LegacyAnnouncementMarkAllReadView.as_view(), name='legacy-announcement-mark-all-read'),
 ]
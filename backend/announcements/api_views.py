@@ -1,7 +1,7 @@
 import logging
+import uuid
 
 from django.core.exceptions import ValidationError as DjangoValidationError
-from django.utils import timezone
 from rest_framework import status
 from rest_framework.exceptions import ValidationError as DRFValidationError
 from rest_framework.pagination import PageNumberPagination
@@ -21,7 +21,12 @@ from .serializers import (
     AnnouncementReadStatusSerializer,
     AnnouncementUpdateSerializer,
 )
-from .services import AnnouncementScopeService
+from .services import (
+    AnnouncementReadStatsService,
+    AnnouncementScopeService,
+    AnnouncementUnreadService,
+    ReadReceiptBuffer,
+)
 from .services import ROLE_STUDENT, get_actor_role
 
 
@@ -38,8 +43,7 @@ class AnnouncementListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        scope = AnnouncementScopeService.build_scope(request.user)
-        queryset = AnnouncementScopeService.queryset_for_user(request.user, scope)
+        queryset = AnnouncementScopeService.queryset_for_user(request.user)
 
         paginator = AnnouncementPagination()
         page = paginator.paginate_queryset(queryset, request)
@@ -172,50 +176,123 @@ class AnnouncementMarkReadView(APIView):
     permission_classes = [IsAuthenticated, HasAnnouncementPagePermission]
 
     def post(self, request, announcement_id):
-        scope = AnnouncementScopeService.build_scope(request.user)
-        announcement = AnnouncementScopeService.queryset_for_user(request.user, scope).filter(id=announcement_id).first()
+        announcement = AnnouncementScopeService.queryset_for_user(request.user).filter(id=announcement_id).first()
         if announcement is None:
             return Response({'detail': 'Announcement not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-        AnnouncementReadStatus.objects.update_or_create(
-            announcement=announcement,
-            user=request.user,
-            defaults={'is_read': True, 'read_at': timezone.now()},
-        )
+        AnnouncementUnreadService.mark_read(request.user, announcement)
         return Response({'status': 'ok'})
 
 
+class AnnouncementMarkAllReadView(APIView):
+    permission_classes = [IsAuthenticated, HasAnnouncementPagePermission]
+
+    def post(self, request):
+        marked = AnnouncementUnreadService.mark_all_read(request.user)
+        return Response({'status': 'ok', 'marked': marked, 'unread_count': 0})
+
+
 class AnnouncementUnreadCountView(APIView):
     permission_classes = [IsAuthenticated, HasAnnouncementPagePermission]
 
     def get(self, request):
-        scope = AnnouncementScopeService.build_scope(request.user)
-        count = AnnouncementScopeService.unread_count_for_user(request.user, scope)
-        return Response({'unread_count': count})
+        return Response({'unread_count': AnnouncementUnreadService.count(request.user)})
+
+
+class AnnouncementReadReceiptsView(APIView):
+    """Mark many announcements read in one call: ``{"announcement_ids": [...]}``."""
+
+    permission_classes = [IsAuthenticated, HasAnnouncementPagePermission]
+    max_ids = 500
+
+    def post(self, request):
+        raw_ids = request.data.get('announcement_ids')
+        if not isinstance(raw_ids, list) or not raw_ids:
+            return Response({'announcement_ids': 'Provide a non-empty list of announcement ids.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(raw_ids) > self.max_ids:
+            return Response({'announcement_ids': f'At most {self.max_ids} ids per request.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            requested = {uuid.UUID(str(value)) for value in raw_ids}
+        except ValueError:
+            return Response({'announcement_ids': 'Announcement ids must be UUIDs.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        visible = set(
+            AnnouncementScopeService.queryset_for_user(request.user)
+            .filter(id__in=requested)
+            .order_by()
+            .values_list('id', flat=True)
+        )
+        with ReadReceiptBuffer() as buffer:
+            buffer.add(request.user.id, visible)
+        return Response({
+            'status': 'ok',
+            'accepted': len(visible),
+            'marked': buffer.flushed,
+            'not_found': sorted(str(i) for i in requested - visible),
+        })
+
+
+def _readable_stats_announcement(request, announcement_id):
+    """Return (announcement, error_response) for the sender/manager read views."""
+    scope = AnnouncementScopeService.build_scope(request.user)
+    announcement = AnnouncementScopeService.queryset_for_user(request.user, scope).filter(id=announcement_id).first()
+    if announcement is None:
+        return None, Response({'detail': 'Announcement not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+    if not (
+        request.user.is_superuser
+        or announcement.created_by_id == request.user.id
+        or 'announcements.manage_announcement' in scope.permissions
+    ):
+        return None, Response({'detail': 'You do not have permission to view readers for this announcement.'}, status=status.HTTP_403_FORBIDDEN)
+    return announcement, None
+
+
+class AnnouncementReadStatsView(APIView):
+    permission_classes = [IsAuthenticated, HasAnnouncementPagePermission]
+
+    def get(self, request, announcement_id):
+        announcement, error = _readable_stats_announcement(request, announcement_id)
+        if error is not None:
+            return error
+
+        departments = AnnouncementReadStatsService.for_announcement(announcement)
+        audience_count = sum(row['audience_count'] for row in departments)
+        read_count = sum(row['read_count'] for row in departments)
+        return Response({
+            'id': str(announcement.id),
+            'audience_count': audience_count,
+            'read_count': read_count,
+            'read_rate': round(read_count / audience_count, 4) if audience_count else 0.0,
+            'departments': departments,
+        })
 
 
 class AnnouncementReadersView(APIView):
     permission_classes = [IsAuthenticated, HasAnnouncementPagePermission]
+    default_limit = 200
+    max_limit = 1000
 
     def get(self, request, announcement_id):
-        scope = AnnouncementScopeService.build_scope(request.user)
-        announcement = AnnouncementScopeService.queryset_for_user(request.user, scope).filter(id=announcement_id).first()
-        if announcement is None:
-            return Response({'detail': 'Announcement not found.'}, status=status.HTTP_404_NOT_FOUND)
+        announcement, error = _readable_stats_announcement(request, announcement_id)
+        if error is not None:
+            return error
 
-        if not (
-            request.user.is_superuser
-            or announcement.created_by_id == request.user.id
-            or 'announcements.manage_announcement' in scope.permissions
-        ):
-            return Response({'detail': 'You do not have permission to view readers for this announcement.'}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            limit = int(request.query_params.get('limit') or self.default_limit)
+        except (TypeError, ValueError):
+            limit = self.default_limit
+        limit = max(1, min(limit, self.max_limit))
 
+        # Most recent readers only; per-department totals come from the read-stat table.
         read_statuses = (
             AnnouncementReadStatus.objects.filter(announcement=announcement, is_read=True)
             .select_related('user')
-            .order_by('-read_at')
+            .prefetch_related('user__roles')
+            .order_by('-read_at')[:limit]
         )
 
+        departments = AnnouncementReadStatsService.for_announcement(announcement)
         serializer = AnnouncementReadStatusSerializer(read_statuses, many=True)
         payload = {
             'id': str(announcement.id),
@@ -224,6 +301,9 @@ class AnnouncementReadersView(APIView):
             'target_roles': announcement.target_roles,
             'department_name': getattr(announcement.department, 'name', None),
             'class_name': str(getattr(announcement, 'target_class', '') or '') or None,
+            'read_count': sum(row['read_count'] for row in departments),
+            'audience_count': sum(row['audience_count'] for row in departments),
+            'departments': departments,
             'readers': serializer.data,
         }
         return Response(payload)
@@ -242,6 +322,26 @@ class LegacyAnnouncementMarkReadView(AnnouncementMarkReadView):
     pass
 
 
+class LegacyAnnouncementMarkAllReadView(AnnouncementMarkAllReadView):
+    pass
+
+
+class LegacyAnnouncementUnreadCountView(AnnouncementUnreadCountView):
+    pass
+
+
+class LegacyAnnouncementReadReceiptsView(AnnouncementReadReceiptsView):
+    pass
+
+
+class LegacyAnnouncementReadersView(AnnouncementReadersView):
+    pass
+
+
+class LegacyAnnouncementReadStatsView(AnnouncementReadStatsView):
+    pass
+
+
 class LegacyAnnouncementOptionsView(AnnouncementOptionsView):
     pass
 
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class AnnouncementsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'announcements'
+
+    def ready(self):
+        # import signals to ensure receivers are registered
+        try:
+            from . import signals  # noqa: F401
+        except Exception:
+            pass
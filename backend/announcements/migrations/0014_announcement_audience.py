@@ -0,0 +1,64 @@
+# Generated by Django 4.2.28 on 2026-10-19 00:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def _target_keys(announcement, department_ids):
+    roles = [str(r or '').strip().upper() for r in (announcement.target_roles or []) if str(r or '').strip()]
+    target_type = announcement.target_type
+    if target_type == 'ALL':
+        keys = {f'role:{r}' for r in roles} if roles else {'all'}
+    elif target_type == 'ROLE':
+        keys = {f'role:{r}' for r in roles}
+    elif target_type == 'DEPARTMENT':
+        keys = {f'dept:{d}:{r}' for d in department_ids if d for r in roles}
+    elif target_type == 'CLASS' and announcement.target_class_id:
+        keys = {f'class:{announcement.target_class_id}:{r}' for r in roles}
+    else:
+        keys = set()
+    keys.add(f'user:{announcement.created_by_id}')
+    return keys
+
+
+def materialize_existing(apps, schema_editor):
+    Announcement = apps.get_model('announcements', 'Announcement')
+    AnnouncementAudience = apps.get_model('announcements', 'AnnouncementAudience')
+    rows = []
+    for announcement in Announcement.objects.prefetch_related('target_departments'):
+        department_ids = {d.id for d in announcement.target_departments.all()}
+        if announcement.department_id:
+            department_ids.add(announcement.department_id)
+        rows.extend(
+            AnnouncementAudience(announcement_id=announcement.id, key=key, created_at=announcement.created_at)
+            for key in sorted(_target_keys(announcement, department_ids))
+        )
+        if len(rows) >= 1000:
+            AnnouncementAudience.objects.bulk_create(rows, ignore_conflicts=True)
+            rows = []
+    if rows:
+        AnnouncementAudience.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('announcements', '0013_alter_announcement_target_type_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnnouncementAudience',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=80)),
+                ('created_at', models.DateTimeField()),
+                ('announcement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='audience', to='announcements.announcement')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['key', '-created_at'], name='announcemen_key_afa931_idx')],
+                'unique_together': {('announcement', 'key')},
+            },
+        ),
+        migrations.RunPython(materialize_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.28 on 2026-10-19 00:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0091_profile_updated_at'),
+        ('announcements', '0014_announcement_audience'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnnouncementReadStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('audience_count', models.PositiveIntegerField(default=0)),
+                ('read_count', models.PositiveIntegerField(default=0)),
+                ('rebuilt_at', models.DateTimeField()),
+                ('announcement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_stats', to='announcements.announcement')),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='announcement_read_stats', to='academics.department')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='announcementreadstat',
+            constraint=models.UniqueConstraint(condition=models.Q(('department__isnull', False)), fields=('announcement', 'department'), name='ann_read_stat_dept_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='announcementreadstat',
+            constraint=models.UniqueConstraint(condition=models.Q(('department__isnull', True)), fields=('announcement',), name='ann_read_stat_nodept_uniq'),
+        ),
+    ]
@@ -115,3 +115,71 @@ class AnnouncementReadStatus(models.Model):
     def __str__(self):
         state = 'read' if self.is_read else 'unread'
         return f"{self.user.username} {state} {self.announcement.title}"
+
+
+class AnnouncementAudience(models.Model):
+    """Materialized audience key of an announcement (see `AnnouncementAudienceService`).
+
+    Keys are resolved from the announcement targets when it is saved, so a
+    user's feed is one indexed lookup on the user's own keys.
+    """
+
+    announcement = models.ForeignKey(
+        Announcement,
+        on_delete=models.CASCADE,
+        related_name='audience',
+    )
+    key = models.CharField(max_length=80)
+    # Copy of Announcement.created_at so feed pages can be read off the (key, created_at) index.
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ['announcement', 'key']
+        indexes = [
+            models.Index(fields=['key', '-created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.key} -> {self.announcement_id}"
+
+
+class AnnouncementReadStat(models.Model):
+    """Read-rate counters of an announcement per department (see `AnnouncementReadStatsService`).
+
+    `audience_count` is resolved when the row set is rebuilt; `read_count` is
+    incremented as read receipts are written, so the sender's summary never
+    scans raw receipts. `department` is NULL for recipients without one.
+    """
+
+    announcement = models.ForeignKey(
+        Announcement,
+        on_delete=models.CASCADE,
+        related_name='read_stats',
+    )
+    department = models.ForeignKey(
+        'academics.Department',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='announcement_read_stats',
+    )
+    audience_count = models.PositiveIntegerField(default=0)
+    read_count = models.PositiveIntegerField(default=0)
+    rebuilt_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['announcement', 'department'],
+                condition=models.Q(department__isnull=False),
+                name='ann_read_stat_dept_uniq',
+            ),
+            models.UniqueConstraint(
+                fields=['announcement'],
+                condition=models.Q(department__isnull=True),
+                name='ann_read_stat_nodept_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.announcement_id} dept={self.department_id}: {self.read_count}/{self.audience_count}"
@@ -73,7 +73,7 @@ class AnnouncementListSerializer(serializers.ModelSerializer):
 
     def get_created_by_role(self, obj):
         try:
-            roles = list(obj.created_by.roles.values_list('name', flat=True))
+            roles = [r.name for r in obj.created_by.roles.all()]
         except Exception:
             roles = []
         if not roles:
@@ -97,7 +97,7 @@ class AnnouncementListSerializer(serializers.ModelSerializer):
         return getattr(department, 'name', None) if department else None
 
     def get_target_department_ids(self, obj):
-        return list(obj.target_departments.values_list('id', flat=True))
+        return [d.id for d in obj.target_departments.all()]
 
     def get_attachment_url(self, obj):
         request = self.context.get('request')
@@ -138,7 +138,7 @@ class AnnouncementReadStatusSerializer(serializers.ModelSerializer):
 
     def get_role(self, obj):
         try:
-            roles = list(obj.user.roles.values_list('name', flat=True))
+            roles = [r.name for r in obj.user.roles.all()]
         except Exception:
             roles = []
         if not roles:
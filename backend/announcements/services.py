@@ -1,7 +1,16 @@
+import math
+import uuid
+from collections import Counter
 from dataclasses import dataclass
-from typing import Iterable, Optional, Sequence, Set
-
-from django.db.models import Q
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Exists, F, Min, OuterRef, Q
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 from accounts.utils import get_user_permissions
@@ -17,7 +26,7 @@ from academics.models import (
     StudentProfile,
 )
 
-from .models import Announcement, AnnouncementReadStatus
+from .models import Announcement, AnnouncementAudience, AnnouncementReadStat, AnnouncementReadStatus
 
 ROLE_PRINCIPAL = 'PRINCIPAL'
 ROLE_IQAC = 'IQAC'
@@ -167,33 +176,32 @@ class AnnouncementScopeService:
 
     @classmethod
     def queryset_for_user(cls, user, scope: Optional[AnnouncementScope] = None):
-        if scope is None:
-            scope = cls.build_scope(user)
+        """Active, unexpired announcements visible to `user`, newest first.
 
+        Visibility is one indexed lookup on the user's audience keys (see
+        `AnnouncementAudienceService`); creators always see their own items.
+        Each row is annotated with `user_is_read`.
+        """
         if not user or not getattr(user, 'is_authenticated', False):
             return Announcement.objects.none()
 
         now = timezone.now()
-        base_qs = (
-            Announcement.objects.filter(is_active=True)
+        audience_ids = AnnouncementAudience.objects.filter(
+            key__in=AnnouncementAudienceService.keys_for_user(user),
+        ).values('announcement_id')
+        return (
+            Announcement.objects.filter(is_active=True, id__in=audience_ids)
             .filter(Q(expiry_date__isnull=True) | Q(expiry_date__gt=now))
+            .annotate(
+                user_is_read=Exists(
+                    AnnouncementReadStatus.objects.filter(announcement=OuterRef('pk'), user=user, is_read=True)
+                )
+            )
             .select_related('created_by', 'department', 'target_class')
-            .prefetch_related('target_departments')
+            .prefetch_related('target_departments', 'created_by__roles')
             .order_by('-created_at')
         )
 
-        visible_ids = []
-        for announcement in base_qs:
-            # Keep creator visibility so users can track their own sent items in All.
-            if announcement.created_by_id == getattr(user, 'id', None):
-                visible_ids.append(announcement.id)
-                continue
-            if cls.can_user_see(user, announcement):
-                visible_ids.append(announcement.id)
-        if not visible_ids:
-            return Announcement.objects.none()
-        return base_qs.filter(id__in=visible_ids)
-
     @classmethod
     def sent_queryset_for_user(cls, user):
         if not user or not getattr(user, 'is_authenticated', False):
@@ -203,7 +211,7 @@ class AnnouncementScopeService:
             Announcement.objects.filter(created_by=user, is_active=True)
             .filter(Q(expiry_date__isnull=True) | Q(expiry_date__gt=now))
             .select_related('created_by', 'department', 'target_class')
-            .prefetch_related('target_departments')
+            .prefetch_related('target_departments', 'created_by__roles')
             .order_by('-created_at')
         )
 
@@ -304,17 +312,7 @@ class AnnouncementScopeService:
 
     @classmethod
     def unread_count_for_user(cls, user, scope: Optional[AnnouncementScope] = None) -> int:
-        if scope is None:
-            scope = cls.build_scope(user)
-        announcements = cls.queryset_for_user(user, scope)
-        count = 0
-        for announcement in announcements:
-            if announcement.created_by_id == getattr(user, 'id', None):
-                continue
-            read = AnnouncementReadStatus.objects.filter(announcement=announcement, user=user, is_read=True).exists()
-            if not read:
-                count += 1
-        return count
+        return AnnouncementUnreadService.count(user)
 
     @staticmethod
     def can_user_see(user, announcement: Announcement) -> bool:
@@ -341,11 +339,11 @@ class AnnouncementScopeService:
 
         if announcement.target_type == Announcement.TARGET_DEPARTMENT:
             user_dept_id = AnnouncementScopeService._user_department_id(user)
-            if announcement.department_id and user_dept_id:
-                return announcement.department_id == user_dept_id
-            if user_dept_id:
-                return announcement.target_departments.filter(id=user_dept_id).exists()
-            return False
+            if not user_dept_id:
+                return False
+            if announcement.department_id == user_dept_id:
+                return True
+            return announcement.target_departments.filter(id=user_dept_id).exists()
 
         if announcement.target_type == Announcement.TARGET_CLASS:
             user_class_id = AnnouncementScopeService._user_class_id(user)
@@ -435,4 +433,409 @@ class AnnouncementScopeService:
             return [Announcement.TARGET_CLASS]
         if actor_role == ROLE_STUDENT:
             return []
-        return [Announcement.TARGET_ALL]
\ No newline at end of file
+        return [Announcement.TARGET_ALL]
+
+
+class AnnouncementAudienceService:
+    """Resolve announcement targets and users to audience keys.
+
+    An announcement is visible to a user when they share a key:
+
+    - ``all``                  TARGET_ALL without roles
+    - ``role:<ROLE>``          TARGET_ALL with roles, TARGET_ROLE
+    - ``dept:<id>:<ROLE>``     TARGET_DEPARTMENT (primary and every target department)
+    - ``class:<id>:<ROLE>``    TARGET_CLASS
+    - ``user:<id>``            the creator
+
+    A user holds the keys for their actor role (`get_actor_role`), department
+    (`_user_department_id`) and class (`_user_class_id`), mirroring `can_user_see`.
+    Announcement keys are rebuilt by `announcements.signals` whenever the
+    announcement or its departments change.
+    """
+
+    @staticmethod
+    def keys_for_targets(target_type: str, target_roles: Iterable[str], department_ids: Iterable[int],
+                         class_id: Optional[int]) -> Set[str]:
+        roles = [str(r or '').strip().upper() for r in (target_roles or []) if str(r or '').strip()]
+        if target_type == Announcement.TARGET_ALL:
+            return {f'role:{r}' for r in roles} if roles else {'all'}
+        if target_type == Announcement.TARGET_ROLE:
+            return {f'role:{r}' for r in roles}
+        if target_type == Announcement.TARGET_DEPARTMENT:
+            return {f'dept:{d}:{r}' for d in set(department_ids) if d for r in roles}
+        if target_type == Announcement.TARGET_CLASS and class_id:
+            return {f'class:{class_id}:{r}' for r in roles}
+        return set()
+
+    @classmethod
+    def keys_for_announcement(cls, announcement: Announcement) -> Set[str]:
+        department_ids = set(announcement.target_departments.values_list('id', flat=True))
+        if announcement.department_id:
+            department_ids.add(announcement.department_id)
+        keys = cls.keys_for_targets(
+            announcement.target_type,
+            announcement.target_roles,
+            department_ids,
+            announcement.target_class_id,
+        )
+        keys.add(f'user:{announcement.created_by_id}')
+        return keys
+
+    @staticmethod
+    def keys_for_user(user) -> list:
+        keys = ['all', f'user:{user.id}']
+        role = get_actor_role(user=user)
+        if not role:
+            return keys
+        keys.append(f'role:{role}')
+        dept_id = AnnouncementScopeService._user_department_id(user)
+        if dept_id:
+            keys.append(f'dept:{dept_id}:{role}')
+        class_id = AnnouncementScopeService._user_class_id(user)
+        if class_id:
+            keys.append(f'class:{class_id}:{role}')
+        return keys
+
+    @classmethod
+    def materialize(cls, announcement: Announcement) -> int:
+        """Replace the audience rows of `announcement`; returns the number of keys."""
+        keys = cls.keys_for_announcement(announcement)
+        with transaction.atomic():
+            AnnouncementAudience.objects.filter(announcement=announcement).delete()
+            AnnouncementAudience.objects.bulk_create([
+                AnnouncementAudience(announcement=announcement, key=key, created_at=announcement.created_at)
+                for key in sorted(keys)
+            ])
+        return len(keys)
+
+
+class AnnouncementUnreadService:
+    """Per-user unread badge counts kept in the cache.
+
+    A user's count lives under ``announcements:unread:<version>:<user_id>``.
+    Publishing, editing or deleting an announcement switches to a new version
+    (`invalidate`, called from `announcements.signals`), so each badge is
+    recomputed once with a single COUNT query; reads in between are a key
+    lookup. Marking an announcement read decrements the counter in place. An
+    entry never outlives the next `expiry_date` among the counted announcements,
+    so expired items leave the badge on time.
+    """
+
+    _VERSION_KEY = 'announcements:unread:version'
+
+    @staticmethod
+    def _timeout() -> int:
+        return int(getattr(settings, 'ANNOUNCEMENT_UNREAD_CACHE_SECONDS', 300) or 300)
+
+    @classmethod
+    def _key(cls, user_id) -> str:
+        version = cache.get(cls._VERSION_KEY)
+        if version is None:
+            version = uuid.uuid4().hex[:12]
+            # add() so concurrent first readers agree on one version.
+            if not cache.add(cls._VERSION_KEY, version, timeout=None):
+                version = cache.get(cls._VERSION_KEY) or version
+        return f'announcements:unread:{version}:{user_id}'
+
+    @staticmethod
+    def unread_queryset(user):
+        return (
+            AnnouncementScopeService.queryset_for_user(user)
+            .exclude(created_by=user)
+            .filter(user_is_read=False)
+        )
+
+    @classmethod
+    def _compute(cls, user):
+        stats = cls.unread_queryset(user).order_by().aggregate(count=Count('id'), next_expiry=Min('expiry_date'))
+        timeout = cls._timeout()
+        if stats['next_expiry'] is not None:
+            remaining = (stats['next_expiry'] - timezone.now()).total_seconds()
+            timeout = max(1, min(timeout, math.ceil(remaining)))
+        return int(stats['count'] or 0), timeout
+
+    @classmethod
+    def count(cls, user) -> int:
+        if not user or not getattr(user, 'is_authenticated', False):
+            return 0
+        key = cls._key(user.id)
+        cached = cache.get(key)
+        if cached is not None:
+            return max(0, int(cached))
+        count, timeout = cls._compute(user)
+        cache.set(key, count, timeout=timeout)
+        return count
+
+    @classmethod
+    def _decrement(cls, user_id, delta: int = 1):
+        try:
+            cache.decr(cls._key(user_id), delta)
+        except ValueError:
+            # Not cached: the next count() recomputes it.
+            pass
+
+    @classmethod
+    def mark_read(cls, user, announcement: Announcement) -> bool:
+        """Record `user` as having read `announcement`; returns True when it was unread."""
+        now = timezone.now()
+        with transaction.atomic():
+            status, created = AnnouncementReadStatus.objects.get_or_create(
+                announcement=announcement,
+                user=user,
+                defaults={'is_read': True, 'read_at': now},
+            )
+            newly_read = created or not status.is_read
+            if not created:
+                AnnouncementReadStatus.objects.filter(pk=status.pk).update(is_read=True, read_at=now)
+            if newly_read and announcement.created_by_id != user.id:
+                AnnouncementReadStatsService.record_reads({(announcement.id, _user_department_key(user)): 1})
+                transaction.on_commit(lambda: cls._decrement(user.id))
+        return newly_read
+
+    @classmethod
+    def mark_all_read(cls, user) -> int:
+        """Mark every visible unread announcement read in one row-set; returns how many were unread."""
+        ids = list(cls.unread_queryset(user).order_by().values_list('id', flat=True))
+        with transaction.atomic():
+            buffer = ReadReceiptBuffer()
+            buffer.add(user.id, ids)
+            marked = buffer.flush()
+            transaction.on_commit(lambda: cache.set(cls._key(user.id), 0, timeout=cls._timeout()))
+        return marked
+
+    @classmethod
+    def invalidate(cls):
+        """Drop every cached count now and again after commit (audiences changed)."""
+
+        def _bump():
+            cache.set(cls._VERSION_KEY, uuid.uuid4().hex[:12], timeout=None)
+
+        _bump()
+        transaction.on_commit(_bump)
+
+
+def _department_expr(prefix: str = ''):
+    """Department used for read analytics: staff department, else student home department."""
+    return Coalesce(f'{prefix}staff_profile__department_id', f'{prefix}student_profile__home_department_id')
+
+
+def _user_department_key(user) -> Optional[int]:
+    User = get_user_model()
+    return (
+        User.objects.filter(pk=user.pk)
+        .annotate(department_key=_department_expr())
+        .values_list('department_key', flat=True)
+        .first()
+    )
+
+
+class ReadReceiptBuffer:
+    """Collect read receipts and write them in bulk.
+
+    `add()` only records (user, announcement) pairs; `flush()` (also called when
+    `max_pending` is reached and on leaving a ``with`` block) writes them with
+    one UPDATE for existing unread rows and one ``bulk_create(ignore_conflicts=True)``,
+    then bumps `AnnouncementReadStat` and the cached unread counters by the
+    receipts that were actually new.
+    """
+
+    def __init__(self, max_pending: int = 2000):
+        self.max_pending = max_pending
+        self._pending: Set[tuple] = set()
+        self.flushed = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+
+    def add(self, user_id: int, announcement_ids: Iterable) -> None:
+        self._pending.update((user_id, announcement_id) for announcement_id in announcement_ids)
+        if len(self._pending) >= self.max_pending:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write pending receipts; returns how many announcements became read."""
+        pairs, self._pending = self._pending, set()
+        if not pairs:
+            return 0
+        user_ids = {u for u, _ in pairs}
+        announcement_ids = {a for _, a in pairs}
+        existing: Dict[tuple, tuple] = {
+            (u, a): (pk, is_read)
+            for pk, u, a, is_read in AnnouncementReadStatus.objects.filter(
+                user_id__in=user_ids, announcement_id__in=announcement_ids,
+            ).values_list('id', 'user_id', 'announcement_id', 'is_read')
+        }
+        new_pairs = [pair for pair in pairs if not existing.get(pair, (None, False))[1]]
+        if not new_pairs:
+            return 0
+
+        now = timezone.now()
+        creators = dict(Announcement.objects.filter(id__in=announcement_ids).values_list('id', 'created_by_id'))
+        User = get_user_model()
+        departments = dict(
+            User.objects.filter(id__in=user_ids).annotate(department_key=_department_expr()).values_list('id', 'department_key')
+        )
+        with transaction.atomic():
+            unread_ids = [existing[pair][0] for pair in new_pairs if pair in existing]
+            if unread_ids:
+                AnnouncementReadStatus.objects.filter(id__in=unread_ids, is_read=False).update(is_read=True, read_at=now)
+            AnnouncementReadStatus.objects.bulk_create(
+                [
+                    AnnouncementReadStatus(user_id=u, announcement_id=a, is_read=True, read_at=now)
+                    for u, a in new_pairs
+                    if (u, a) not in existing
+                ],
+                ignore_conflicts=True,
+                batch_size=500,
+            )
+            counted = [(u, a) for u, a in new_pairs if creators.get(a) != u]
+            AnnouncementReadStatsService.record_reads(Counter((a, departments.get(u)) for u, a in counted))
+            per_user = Counter(u for u, _ in counted)
+            transaction.on_commit(lambda: [AnnouncementUnreadService._decrement(u, n) for u, n in per_user.items()])
+        self.flushed += len(new_pairs)
+        return len(new_pairs)
+
+
+class AnnouncementReadStatsService:
+    """Per-department audience and read counts for the sender's "who has seen this" view.
+
+    Rows are rebuilt lazily (first view, or after `reset()` when the announcement
+    or its audience changed, or when older than `MAX_AGE`) with grouped counts of
+    the audience and of existing receipts. Between rebuilds `record_reads()`
+    increments `read_count` as receipts are written.
+
+    The audience mirrors `AnnouncementAudienceService` keys using each user's
+    highest role and primary department (staff department, else student home
+    department), so it is an estimate for users with unusual profiles.
+    """
+
+    MAX_AGE = timedelta(hours=1)
+    ROLE_PRIORITY = [ROLE_PRINCIPAL, ROLE_IQAC, ROLE_HOD, ROLE_STAFF, ROLE_STUDENT]
+
+    @classmethod
+    def _actor_role_ids(cls, role: str):
+        User = get_user_model()
+        higher = cls.ROLE_PRIORITY[:cls.ROLE_PRIORITY.index(role)] if role in cls.ROLE_PRIORITY else []
+        qs = User.objects.filter(roles__name__iexact=role)
+        for name in higher:
+            qs = qs.exclude(roles__name__iexact=name)
+        return qs.values('id')
+
+    @classmethod
+    def audience_by_department(cls, announcement: Announcement) -> Dict[Optional[int], int]:
+        User = get_user_model()
+        condition = Q(pk__in=[])
+        for key in AnnouncementAudience.objects.filter(announcement=announcement).values_list('key', flat=True):
+            kind, _, rest = key.partition(':')
+            if kind == 'all':
+                condition = Q()
+                break
+            if kind == 'role':
+                condition |= Q(id__in=cls._actor_role_ids(rest))
+            elif kind == 'dept':
+                dept_id, _, role = rest.partition(':')
+                condition |= Q(id__in=cls._actor_role_ids(role), department_key=dept_id)
+            elif kind == 'class':
+                class_id, _, role = rest.partition(':')
+                condition |= Q(id__in=cls._actor_role_ids(role), student_profile__section_id=class_id)
+        rows = (
+            User.objects.filter(is_active=True)
+            .annotate(department_key=_department_expr())
+            .filter(condition)
+            .exclude(id=announcement.created_by_id)
+            .values('department_key')
+            .annotate(n=Count('id'))
+            .order_by()
+        )
+        return {row['department_key']: row['n'] for row in rows}
+
+    @classmethod
+    def rebuild(cls, announcement: Announcement) -> List[AnnouncementReadStat]:
+        audience = cls.audience_by_department(announcement)
+        reads = {
+            row['department_key']: row['n']
+            for row in AnnouncementReadStatus.objects.filter(announcement=announcement, is_read=True)
+            .exclude(user_id=announcement.created_by_id)
+            .annotate(department_key=_department_expr('user__'))
+            .values('department_key')
+            .annotate(n=Count('id'))
+            .order_by()
+        }
+        now = timezone.now()
+        # Always keep at least one row so an empty audience is not rebuilt on every view.
+        department_ids = (set(audience) | set(reads)) or {None}
+        rows = [
+            AnnouncementReadStat(
+                announcement=announcement,
+                department_id=dept_id,
+                audience_count=audience.get(dept_id, 0),
+                read_count=reads.get(dept_id, 0),
+                rebuilt_at=now,
+            )
+            for dept_id in department_ids
+        ]
+        with transaction.atomic():
+            AnnouncementReadStat.objects.filter(announcement=announcement).delete()
+            AnnouncementReadStat.objects.bulk_create(rows)
+        return rows
+
+    @staticmethod
+    def reset(announcement: Announcement) -> None:
+        AnnouncementReadStat.objects.filter(announcement=announcement).delete()
+
+    @staticmethod
+    def record_reads(counts: Dict[tuple, int]) -> None:
+        """Add `counts` ({(announcement_id, department_id): n}) to already-built stats.
+
+        Announcements without rows are skipped: their next rebuild counts the receipts.
+        """
+        if not counts:
+            return
+        built = set(
+            AnnouncementReadStat.objects.filter(announcement_id__in={a for a, _ in counts})
+            .values_list('announcement_id', flat=True)
+            .distinct()
+        )
+        now = timezone.now()
+        for (announcement_id, dept_id), n in counts.items():
+            if announcement_id not in built or not n:
+                continue
+            updated = AnnouncementReadStat.objects.filter(
+                announcement_id=announcement_id, department_id=dept_id,
+            ).update(read_count=F('read_count') + n)
+            if not updated:
+                # Reader outside the resolved audience (e.g. moved department since the rebuild).
+                AnnouncementReadStat.objects.bulk_create(
+                    [AnnouncementReadStat(
+                        announcement_id=announcement_id, department_id=dept_id, read_count=n, rebuilt_at=now,
+                    )],
+                    ignore_conflicts=True,
+                )
+
+    @classmethod
+    def for_announcement(cls, announcement: Announcement) -> List[dict]:
+        rows = list(
+            AnnouncementReadStat.objects.filter(announcement=announcement)
+            .select_related('department')
+        )
+        if not rows or min(r.rebuilt_at for r in rows) < timezone.now() - cls.MAX_AGE:
+            cls.rebuild(announcement)
+            rows = list(
+                AnnouncementReadStat.objects.filter(announcement=announcement)
+                .select_related('department')
+            )
+        result = []
+        for row in sorted(rows, key=lambda r: (r.department is None, getattr(r.department, 'name', '') or '')):
+            audience = max(row.audience_count, row.read_count)
+            result.append({
+                'department_id': row.department_id,
+                'department_name': getattr(row.department, 'name', None),
+                'audience_count': audience,
+                'read_count': row.read_count,
+                'read_rate': round(row.read_count / audience, 4) if audience else 0.0,
+            })
+        return result
@@ -0,0 +1,45 @@
+"""Keep audience rows, read stats and cached unread counts in step with announcements."""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Announcement
+from .services import AnnouncementAudienceService, AnnouncementReadStatsService, AnnouncementUnreadService
+
+
+@receiver(post_save, sender=Announcement)
+def materialize_audience_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    AnnouncementAudienceService.materialize(instance)
+    AnnouncementReadStatsService.reset(instance)
+    AnnouncementUnreadService.invalidate()
+
+
+@receiver(post_delete, sender=Announcement)
+def invalidate_unread_on_delete(sender, instance, **kwargs):
+    AnnouncementUnreadService.invalidate()
+
+
+@receiver(m2m_changed, sender=Announcement.target_departments.through)
+def materialize_audience_on_departments(sender, instance, action, reverse, pk_set=None, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            AnnouncementAudienceService.materialize(instance)
+            AnnouncementReadStatsService.reset(instance)
+            AnnouncementUnreadService.invalidate()
+        return
+
+    # Department side changed (department.department_announcements.add/remove/clear()).
+    if action == 'pre_clear':
+        instance._announcement_ids_before_clear = list(
+            Announcement.objects.filter(target_departments=instance).values_list('id', flat=True)
+        )
+        return
+    if action == 'post_clear':
+        pk_set = getattr(instance, '_announcement_ids_before_clear', None) or []
+    elif action not in ('post_add', 'post_remove'):
+        return
+    for announcement in Announcement.objects.filter(pk__in=pk_set or []):
+        AnnouncementAudienceService.materialize(announcement)
+        AnnouncementReadStatsService.reset(announcement)
+    AnnouncementUnreadService.invalidate()
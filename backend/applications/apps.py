@@ -5,3 +5,10 @@ class ApplicationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'applications'
     verbose_name = 'Applications / Workflow'
+
+    def ready(self):
+        # import signals to ensure receivers are registered
+        try:
+            from . import signals  # noqa: F401
+        except Exception:
+            pass
@@ -1,6 +1,7 @@
 from django.urls import path
-from applications.views.attachments_views import ApplicationAttachmentDeleteView
+from applications.views.attachments_views import ApplicationAttachmentDeleteView, ApplicationAttachmentDownloadView
 
 urlpatterns = [
     path('<int:id>/', ApplicationAttachmentDeleteView.as_view(), name='application-attachment-delete'),
+    path('<int:id>/download/', ApplicationAttachmentDownloadView.as_view(), name='application-attachment-download'),
 ]
@@ -1,24 +1,30 @@
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 
-from applications import models as app_models
 from applications.services import sla_engine
 
 
 class Command(BaseCommand):
-    help = 'Find IN_REVIEW applications and escalate overdue steps.'
+    help = (
+        'Escalate IN_REVIEW applications whose current step is past its SLA deadline. '
+        'Only overdue, not-yet-escalated rows are read (indexed on step_due_at), so this can run every minute.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument(
+            '--backfill',
+            action='store_true',
+            help='First fill step_started_at/step_due_at for IN_REVIEW rows still missing them (migration 0024 fills existing rows).',
+        )
 
     def handle(self, *args, **options):
-        qs = app_models.Application.objects.filter(current_state=app_models.Application.ApplicationState.IN_REVIEW).select_related('application_type', 'current_step')
-        now = timezone.now()
-        count = 0
-        for app in qs.iterator():
-            try:
-                escalated = sla_engine.escalate_overdue_application(app)
-                if escalated:
-                    count += 1
-                    self.stdout.write(f'Escalated application {app.id} at {now}')
-            except Exception as exc:
-                self.stderr.write(f'Error processing application {app.id}: {exc}')
+        if options['backfill']:
+            filled = sla_engine.backfill_step_due()
+            self.stdout.write(f'Backfilled SLA deadlines for {filled} application(s)')
 
-        self.stdout.write(f'Done. Escalations sent: {count}')
+        now = timezone.now()
+        stats = sla_engine.escalate_due_applications(now=now, batch_size=max(1, options['batch_size']))
+        if stats.notify_errors:
+            self.stderr.write(f'Escalation notifications failed for {stats.notify_errors} application(s)')
+        self.stdout.write(f'Done at {now}. Escalations sent: {stats.escalated}')
@@ -1,7 +1,6 @@
 """Management command: expire_gatepasses
 
-Runs at midnight (12:00 AM IST) to expire gatepass applications whose
-selected date has passed.
+Cancels gatepass applications whose selected date has passed.
 
 Behaviour:
   - SUBMITTED / IN_REVIEW gatepasses whose gatepass date is yesterday or
@@ -10,21 +9,30 @@ Behaviour:
     (midnight of the next day after the gatepass date) has passed → mark as
     CANCELLED (auto-cancelled at midnight).
 
-Schedule this command via Windows Task Scheduler or cron to run daily at
-00:01 IST (or just after midnight).
+Both cases are "hard expiry has passed": the expiry is stored on submit in
+`Application.gatepass_expires_at`, and rows are selected through the
+(current_state, gatepass_expires_at) index, so the command only reads expired
+rows and can run every minute.
+
+Rows submitted before that column existed get their expiry from migration
+applications 0024; --backfill recomputes any that are still missing.
 
 Usage:
-    python manage.py expire_gatepasses [--dry-run]
+    python manage.py expire_gatepasses [--dry-run] [--backfill]
 """
 
 from __future__ import annotations
 
+from datetime import timedelta
+
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from django.utils import timezone
 
 from applications import models as app_models
-from applications.services.gatepass_utils import extract_gate_date, gatepass_hard_expiry, is_gatepass_application
+from applications.services.gatepass_utils import backfill_gatepass_expiry
+
+PENDING_STATES = ("SUBMITTED", "IN_REVIEW")
 
 
 class Command(BaseCommand):
@@ -37,11 +45,32 @@ class Command(BaseCommand):
             default=False,
             help="Print what would be done without making any DB changes.",
         )
+        parser.add_argument(
+            "--backfill",
+            action="store_true",
+            default=False,
+            help="Compute gatepass_expires_at for live gatepasses that predate the column.",
+        )
+
+    def _cancel(self, app_id: int, now, *, allowed_states, require_unscanned: bool = False) -> bool:
+        with transaction.atomic():
+            locked = app_models.Application.objects.select_for_update().get(pk=app_id)
+            # Re-check state inside lock
+            if locked.current_state not in allowed_states:
+                return False
+            if require_unscanned and locked.gatepass_scanned_at is not None:
+                return False
+            locked.current_state = app_models.Application.ApplicationState.CANCELLED
+            locked.status = app_models.Application.ApplicationState.CANCELLED
+            locked.final_decision_at = now
+            locked.current_step = None
+            locked.step_due_at = None
+            locked.save(update_fields=["current_state", "status", "final_decision_at", "current_step", "step_due_at"])
+        return True
 
     def handle(self, *args, **options):
         dry_run: bool = options["dry_run"]
         now = timezone.now()
-        today_local = timezone.localtime(now).date()
 
         cancelled_pending = 0
         cancelled_approved = 0
@@ -53,101 +82,57 @@ class Command(BaseCommand):
             + (" [DRY RUN]" if dry_run else "")
         )
 
+        if options["backfill"]:
+            filled = backfill_gatepass_expiry(dry_run=dry_run)
+            self.stdout.write(f"  [BACKFILL] gatepass_expires_at set on {filled} application(s)")
+
         # ── 1. Cancel SUBMITTED / IN_REVIEW gatepasses whose date has passed ──
-        pending_qs = (
+        # (gate date strictly before today ⇔ midnight after the gate date has passed)
+        pending = list(
             app_models.Application.objects
-            .filter(current_state__in=["SUBMITTED", "IN_REVIEW"])
-            .select_related("application_type")
-            .prefetch_related("data__field")
+            .filter(current_state__in=PENDING_STATES, gatepass_expires_at__lte=now)
+            .values_list("id", "current_state", "gatepass_expires_at")
         )
 
-        for app in pending_qs.iterator(chunk_size=200):
+        for app_id, state, expiry in pending:
             try:
-                if not is_gatepass_application(app):
-                    skipped += 1
-                    continue
-
-                gate_date = extract_gate_date(app)
-                if gate_date is None:
-                    skipped += 1
-                    continue
-
-                # Cancel if gate date is strictly before today (yesterday or older)
-                if gate_date >= today_local:
-                    skipped += 1
-                    continue
-
                 self.stdout.write(
-                    f"  [PENDING->CANCELLED] app_id={app.id} gate_date={gate_date} "
-                    f"state={app.current_state}"
+                    f"  [PENDING->CANCELLED] app_id={app_id} gate_date={timezone.localtime(expiry).date() - timedelta(days=1)} "
+                    f"state={state}"
                 )
-
-                if not dry_run:
-                    with transaction.atomic():
-                        locked = app_models.Application.objects.select_for_update().get(pk=app.pk)
-                        # Re-check state inside lock
-                        if locked.current_state not in ("SUBMITTED", "IN_REVIEW"):
-                            continue
-                        locked.current_state = app_models.Application.ApplicationState.CANCELLED
-                        locked.status = app_models.Application.ApplicationState.CANCELLED
-                        locked.final_decision_at = now
-                        locked.current_step = None
-                        locked.save(update_fields=["current_state", "status", "final_decision_at", "current_step"])
-
+                if not dry_run and not self._cancel(app_id, now, allowed_states=PENDING_STATES):
+                    skipped += 1
+                    continue
                 cancelled_pending += 1
 
             except Exception as exc:
                 errors += 1
-                self.stderr.write(f"  [ERROR] app_id={app.id}: {exc}")
+                self.stderr.write(f"  [ERROR] app_id={app_id}: {exc}")
 
         # ── 2. Cancel APPROVED gatepasses that expired (not scanned out) ──
-        approved_qs = (
+        approved = list(
             app_models.Application.objects
             .filter(
                 current_state="APPROVED",
+                gatepass_expires_at__lte=now,
                 gatepass_scanned_at__isnull=True,  # no OUT scan yet
             )
-            .select_related("application_type")
-            .prefetch_related("data__field")
+            .values_list("id", "gatepass_expires_at")
         )
 
-        for app in approved_qs.iterator(chunk_size=200):
+        for app_id, expiry in approved:
             try:
-                if not is_gatepass_application(app):
-                    skipped += 1
-                    continue
-
-                expiry = gatepass_hard_expiry(app)
-                if expiry is None:
-                    skipped += 1
-                    continue
-
-                # Cancel only if hard expiry has passed
-                if now < expiry:
-                    skipped += 1
-                    continue
-
                 self.stdout.write(
-                    f"  [APPROVED->CANCELLED] app_id={app.id} expiry={timezone.localtime(expiry).strftime('%Y-%m-%d %H:%M')}"
+                    f"  [APPROVED->CANCELLED] app_id={app_id} expiry={timezone.localtime(expiry).strftime('%Y-%m-%d %H:%M')}"
                 )
-
-                if not dry_run:
-                    with transaction.atomic():
-                        locked = app_models.Application.objects.select_for_update().get(pk=app.pk)
-                        # Re-check state inside lock
-                        if locked.current_state != "APPROVED" or locked.gatepass_scanned_at is not None:
-                            continue
-                        locked.current_state = app_models.Application.ApplicationState.CANCELLED
-                        locked.status = app_models.Application.ApplicationState.CANCELLED
-                        locked.final_decision_at = now
-                        locked.current_step = None
-                        locked.save(update_fields=["current_state", "status", "final_decision_at", "current_step"])
-
+                if not dry_run and not self._cancel(app_id, now, allowed_states=("APPROVED",), require_unscanned=True):
+                    skipped += 1
+                    continue
                 cancelled_approved += 1
 
             except Exception as exc:
                 errors += 1
-                self.stderr.write(f"  [ERROR] app_id={app.id}: {exc}")
+                self.stderr.write(f"  [ERROR] app_id={app_id}: {exc}")
 
         self.stdout.write(
             f"[expire_gatepasses] Done. "
@@ -0,0 +1,34 @@
+"""Management command: rebuild_application_list
+
+Rebuilds the application list read-model (`ApplicationListEntry`) used by the
+admin submissions list and applicant history. Run once after deploying the
+read-model, and after bulk changes that bypass model signals or after editing
+approval flows (step labels / SLA deadlines of existing rows).
+
+Usage:
+    python manage.py rebuild_application_list
+    python manage.py rebuild_application_list --application 123 --application 456
+"""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from applications import models as app_models
+from applications.services import list_projection
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the application list read-model'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--application', type=int, action='append', dest='application_ids',
+                            help='Only refresh this application id (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        ids = options.get('application_ids')
+        written = list_projection.rebuild(ids, batch_size=max(1, options['batch_size']))
+        total = app_models.ApplicationListEntry.objects.count()
+        scope = f'{len(set(ids))} application(s)' if ids else 'all applications'
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt application list for {scope}: wrote {written} rows ({total} total)'))
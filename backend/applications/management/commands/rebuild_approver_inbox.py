@@ -0,0 +1,40 @@
+"""Management command: rebuild_approver_inbox
+
+Rebuilds the approver inbox index (`ApproverInboxEntry`) used by the
+approver inbox. Run once after deploying the index, and after bulk changes
+that bypass model signals (QuerySet.update on mappings, raw SQL imports).
+With --if-requested it only rebuilds when a change asked for it
+(`inbox_index.request_rebuild`, e.g. a new active academic year); the
+application-deadlines timer runs it that way every minute.
+
+Usage:
+    python manage.py rebuild_approver_inbox
+    python manage.py rebuild_approver_inbox --application 123 --application 456
+    python manage.py rebuild_approver_inbox --if-requested
+"""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from applications import models as app_models
+from applications.services import inbox_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the approver inbox index for IN_REVIEW applications'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--application', type=int, action='append', dest='application_ids',
+                            help='Only refresh this application id (repeatable)')
+        parser.add_argument('--if-requested', action='store_true',
+                            help='Rebuild only if a full rebuild was requested since the last run')
+
+    def handle(self, *args, **options):
+        if options['if_requested'] and not inbox_index.take_rebuild_request():
+            return
+        ids = options.get('application_ids')
+        written = inbox_index.rebuild(ids)
+        total = app_models.ApproverInboxEntry.objects.count()
+        scope = f'{len(set(ids))} application(s)' if ids else 'all IN_REVIEW applications'
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt inbox index for {scope}: wrote {written} rows ({total} total)'))
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.28 on 2026-10-18 23:51
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0030_add_academic_calendar_admin_permission'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('applications', '0018_cancel_notification_settings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApproverInboxEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('APPROVER', 'Resolved approver'), ('CANDIDATE', 'Candidate'), ('UNASSIGNED', 'Unassigned')], max_length=12)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_entries', to='applications.application')),
+                ('role', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.role')),
+                ('step', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='applications.approvalstep')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='approver_inbox_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'kind'], name='app_inbox_user_kind_idx'), models.Index(fields=['role', 'kind'], name='app_inbox_role_kind_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.28 on 2026-10-19 00:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0019_approver_inbox_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='gatepass_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='sla_escalated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='step_due_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='step_started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['current_state', 'step_due_at'], name='app_state_step_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['current_state', 'gatepass_expires_at'], name='app_state_gp_expiry_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.28 on 2026-10-19 00:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0091_profile_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('applications', '0020_application_step_due_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationListEntry',
+            fields=[
+                ('application', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='list_entry', serialize=False, to='applications.application')),
+                ('application_type_name', models.CharField(blank=True, max_length=150)),
+                ('application_type_code', models.CharField(blank=True, max_length=50)),
+                ('applicant_name', models.CharField(blank=True, max_length=255)),
+                ('applicant_username', models.CharField(blank=True, max_length=150)),
+                ('applicant_identifier', models.CharField(blank=True, max_length=64)),
+                ('department_name', models.CharField(blank=True, max_length=255)),
+                ('current_state', models.CharField(max_length=20)),
+                ('status', models.CharField(max_length=20)),
+                ('current_step_label', models.CharField(blank=True, max_length=255)),
+                ('last_action', models.CharField(blank=True, max_length=20)),
+                ('last_action_by_name', models.CharField(blank=True, max_length=255)),
+                ('last_action_at', models.DateTimeField(blank=True, null=True)),
+                ('attachments_count', models.PositiveIntegerField(default=0)),
+                ('history_count', models.PositiveIntegerField(default=0)),
+                ('is_gatepass', models.BooleanField(default=False)),
+                ('final_step_is_security', models.BooleanField(default=False)),
+                ('gatepass_window_start', models.DateTimeField(blank=True, null=True)),
+                ('gatepass_window_end', models.DateTimeField(blank=True, null=True)),
+                ('gatepass_scanned_at', models.DateTimeField(blank=True, null=True)),
+                ('gatepass_in_scanned_at', models.DateTimeField(blank=True, null=True)),
+                ('sla_deadline', models.DateTimeField(blank=True, null=True)),
+                ('submitted_at', models.DateTimeField(blank=True, null=True)),
+                ('final_decision_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+                ('applicant_user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('application_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='applications.applicationtype')),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='academics.department')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-created_at', '-application'], name='app_list_created_idx'), models.Index(fields=['current_state', '-created_at'], name='app_list_state_idx'), models.Index(fields=['application_type', '-created_at'], name='app_list_type_idx'), models.Index(fields=['department', '-created_at'], name='app_list_dept_idx'), models.Index(fields=['applicant_user', '-created_at'], name='app_list_applicant_idx')],
+            },
+        ),
+    ]
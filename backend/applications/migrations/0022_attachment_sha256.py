@@ -0,0 +1,18 @@
+# Generated by Django 4.2.28 on 2026-10-19 00:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0021_application_list_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicationattachment',
+            name='sha256',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.28 on 2026-10-19 01:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0022_attachment_sha256'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(condition=models.Q(('current_state', 'IN_REVIEW')), fields=['id'], name='app_in_review_idx'),
+        ),
+    ]
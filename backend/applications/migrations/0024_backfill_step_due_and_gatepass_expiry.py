@@ -0,0 +1,28 @@
+# Fill step_due_at / gatepass_expires_at on applications that predate 0020
+
+from django.db import migrations
+
+
+def backfill_deadlines(apps, schema_editor):
+    """Give live legacy rows the deadlines the SLA and gatepass timers select on.
+
+    The due dates come from the flow configuration and the gatepass date in
+    ApplicationData, so the service helpers (current models) are reused rather
+    than re-derived here.
+    """
+    from applications.services import sla_engine
+    from applications.services.gatepass_utils import backfill_gatepass_expiry
+
+    sla_engine.backfill_step_due()
+    backfill_gatepass_expiry()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0023_application_in_review_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_deadlines, migrations.RunPython.noop),
+    ]
@@ -136,8 +136,22 @@ class Application(models.Model):
         default=GatepassScanMode.ONLINE,
     )
 
+    # SLA bookkeeping for `current_step`, maintained on every step transition by
+    # `application_state` (see `sla_engine.escalate_due_applications`).
+    step_started_at = models.DateTimeField(null=True, blank=True)
+    step_due_at = models.DateTimeField(null=True, blank=True)
+    sla_escalated_at = models.DateTimeField(null=True, blank=True)
+    # Gatepass hard expiry (midnight after the gate date), set on submit; used by `expire_gatepasses`.
+    gatepass_expires_at = models.DateTimeField(null=True, blank=True)
+
     class Meta:
         ordering = ('-created_at',)
+        indexes = [
+            models.Index(fields=['current_state', 'step_due_at'], name='app_state_step_due_idx'),
+            models.Index(fields=['current_state', 'gatepass_expires_at'], name='app_state_gp_expiry_idx'),
+            # Pending set for the approver inbox self-heal anti-join (inbox_index.unindexed_application_ids).
+            models.Index(fields=['id'], condition=models.Q(current_state='IN_REVIEW'), name='app_in_review_idx'),
+        ]
 
     def __str__(self):
         return f"{self.application_type.code} by {self.applicant_user} ({self.status})"
@@ -384,6 +398,111 @@ class ApplicationRoleHierarchyStageUser(models.Model):
         return f"{self.stage} -> {self.user}"
 
 
+class ApproverInboxEntry(models.Model):
+    """Precomputed "who may act" index for IN_REVIEW applications.
+
+    Maintained by `applications.services.inbox_index`; read by the approver inbox.
+    """
+    class Kind(models.TextChoices):
+        # Concrete approver resolved for the current step: exact, no further checks.
+        APPROVER = 'APPROVER', 'Resolved approver'
+        # User/role that may be able to act (role, stage, override, escalation);
+        # confirmed with approval_engine.user_can_act when the inbox is read.
+        CANDIDATE = 'CANDIDATE', 'Candidate'
+        # Indexed, but nobody can be resolved for the current step.
+        UNASSIGNED = 'UNASSIGNED', 'Unassigned'
+
+    application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='inbox_entries')
+    step = models.ForeignKey(ApprovalStep, null=True, blank=True, on_delete=models.CASCADE, related_name='+')
+    kind = models.CharField(max_length=12, choices=Kind.choices)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='approver_inbox_entries',
+    )
+    role = models.ForeignKey('accounts.Role', null=True, blank=True, on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'kind'], name='app_inbox_user_kind_idx'),
+            models.Index(fields=['role', 'kind'], name='app_inbox_role_kind_idx'),
+        ]
+
+    def __str__(self):
+        who = self.user or self.role or '-'
+        return f"{self.application_id} {self.kind} {who}"
+
+
+class ApplicationListEntry(models.Model):
+    """Denormalized list row of an application for admin and history lists.
+
+    Maintained by `applications.services.list_projection` (refreshed after every
+    application, action, attachment or data change); read by list endpoints so
+    they page with one indexed query and no per-row lookups.
+    """
+    application = models.OneToOneField(
+        Application,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='list_entry',
+    )
+    application_type = models.ForeignKey(ApplicationType, on_delete=models.CASCADE, related_name='+')
+    application_type_name = models.CharField(max_length=150, blank=True)
+    application_type_code = models.CharField(max_length=50, blank=True)
+    applicant_user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+    )
+    applicant_name = models.CharField(max_length=255, blank=True)
+    applicant_username = models.CharField(max_length=150, blank=True)
+    applicant_identifier = models.CharField(max_length=64, blank=True)
+    department = models.ForeignKey(
+        'academics.Department',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+    )
+    department_name = models.CharField(max_length=255, blank=True)
+    current_state = models.CharField(max_length=20)
+    status = models.CharField(max_length=20)
+    current_step_label = models.CharField(max_length=255, blank=True)
+    last_action = models.CharField(max_length=20, blank=True)
+    last_action_by_name = models.CharField(max_length=255, blank=True)
+    last_action_at = models.DateTimeField(null=True, blank=True)
+    attachments_count = models.PositiveIntegerField(default=0)
+    history_count = models.PositiveIntegerField(default=0)
+    is_gatepass = models.BooleanField(default=False)
+    final_step_is_security = models.BooleanField(default=False)
+    gatepass_window_start = models.DateTimeField(null=True, blank=True)
+    gatepass_window_end = models.DateTimeField(null=True, blank=True)
+    gatepass_scanned_at = models.DateTimeField(null=True, blank=True)
+    gatepass_in_scanned_at = models.DateTimeField(null=True, blank=True)
+    sla_deadline = models.DateTimeField(null=True, blank=True)
+    submitted_at = models.DateTimeField(null=True, blank=True)
+    final_decision_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-application'], name='app_list_created_idx'),
+            models.Index(fields=['current_state', '-created_at'], name='app_list_state_idx'),
+            models.Index(fields=['application_type', '-created_at'], name='app_list_type_idx'),
+            models.Index(fields=['department', '-created_at'], name='app_list_dept_idx'),
+            models.Index(fields=['applicant_user', '-created_at'], name='app_list_applicant_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.application_id} {self.application_type_code} {self.current_state}"
+
+
 class ApplicationFormVersion(models.Model):
     application_type = models.ForeignKey(
         ApplicationType,
@@ -416,6 +535,9 @@ class ApplicationAttachment(models.Model):
         related_name='uploaded_attachments'
     )
     file = models.FileField(upload_to='applications/attachments/%Y/%m/%d/')
+    # Set when the upload is stored under its content-addressed name (see
+    # erp.file_serving); identical files then share one stored copy.
+    sha256 = models.CharField(max_length=64, blank=True, default='', db_index=True)
     label = models.CharField(max_length=255, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     is_deleted = models.BooleanField(default=False)
@@ -1,6 +1,7 @@
 from .application import (
     ApplicationCreateSerializer,
     ApplicationListSerializer,
+    ApplicationListEntrySerializer,
     ApplicationDetailSerializer,
 )
 
@@ -15,6 +16,7 @@ from .types import (
 __all__ = [
     'ApplicationCreateSerializer',
     'ApplicationListSerializer',
+    'ApplicationListEntrySerializer',
     'ApplicationDetailSerializer',
     'ApprovalActionSerializer',
     'ApplicationFieldSerializer',
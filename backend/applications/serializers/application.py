@@ -471,6 +471,58 @@ class ApplicationListSerializer(serializers.ModelSerializer):
         return timezone.now() > window['end']
 
 
+def _local_iso(value):
+    return timezone.localtime(value).isoformat() if value else None
+
+
+class ApplicationListEntrySerializer(serializers.ModelSerializer):
+    """`ApplicationListSerializer` output read from the `ApplicationListEntry` read-model."""
+
+    id = serializers.IntegerField(source='application_id', read_only=True)
+    current_step_role = serializers.SerializerMethodField()
+    needs_gatepass_scan = serializers.SerializerMethodField()
+    sla_deadline = serializers.SerializerMethodField()
+    time_window_active = serializers.SerializerMethodField()
+    gatepass_window_start = serializers.SerializerMethodField()
+    gatepass_window_end = serializers.SerializerMethodField()
+    gatepass_expired = serializers.SerializerMethodField()
+
+    class Meta:
+        model = app_models.ApplicationListEntry
+        fields = ApplicationListSerializer.Meta.fields
+
+    def get_current_step_role(self, obj):
+        return obj.current_step_label or None
+
+    def get_needs_gatepass_scan(self, obj):
+        return obj.current_state == 'APPROVED' and not obj.gatepass_scanned_at and obj.final_step_is_security
+
+    def get_sla_deadline(self, obj):
+        if obj.sla_deadline is None:
+            return None
+        # Gatepass deadlines are window ends (local time); others derive from submitted_at (UTC).
+        return _local_iso(obj.sla_deadline) if obj.is_gatepass else obj.sla_deadline.isoformat()
+
+    def get_time_window_active(self, obj):
+        if not obj.is_gatepass or obj.gatepass_window_start is None or obj.gatepass_window_end is None:
+            return False
+        return obj.gatepass_window_start <= timezone.now() <= obj.gatepass_window_end
+
+    def get_gatepass_window_start(self, obj):
+        return _local_iso(obj.gatepass_window_start) if obj.is_gatepass else None
+
+    def get_gatepass_window_end(self, obj):
+        return _local_iso(obj.gatepass_window_end) if obj.is_gatepass else None
+
+    def get_gatepass_expired(self, obj):
+        state = str(obj.current_state or '').upper()
+        if state in ('REJECTED', 'CANCELLED', 'DRAFT'):
+            return False
+        if not obj.is_gatepass or obj.gatepass_scanned_at or obj.gatepass_window_end is None:
+            return False
+        return timezone.now() > obj.gatepass_window_end
+
+
 class ApplicationDetailSerializer(serializers.ModelSerializer):
     application_type = serializers.SerializerMethodField()
     dynamic_fields = serializers.SerializerMethodField()
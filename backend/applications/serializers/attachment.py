@@ -1,15 +1,20 @@
+from django.urls import reverse
 from rest_framework import serializers
 
 from applications import models as app_models
+from erp.file_serving import store_content_addressed
+
+ATTACHMENT_CONTENT_PREFIX = 'applications/attachments/sha256'
 
 
 class ApplicationAttachmentSerializer(serializers.ModelSerializer):
     uploaded_by = serializers.SerializerMethodField(read_only=True)
     file_url = serializers.SerializerMethodField(read_only=True)
+    download_url = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = app_models.ApplicationAttachment
-        fields = ('id', 'label', 'file_url', 'uploaded_by', 'uploaded_at')
+        fields = ('id', 'label', 'file_url', 'download_url', 'uploaded_by', 'uploaded_at')
         read_only_fields = fields
 
     def get_uploaded_by(self, obj):
@@ -23,8 +28,17 @@ class ApplicationAttachmentSerializer(serializers.ModelSerializer):
         except Exception:
             return None
 
+    def get_download_url(self, obj):
+        return reverse('application-attachment-download', kwargs={'id': obj.id})
+
 
 class ApplicationAttachmentCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = app_models.ApplicationAttachment
         fields = ('id', 'label', 'file')
+
+    def create(self, validated_data):
+        upload = validated_data.get('file')
+        if upload is not None:
+            validated_data['file'], validated_data['sha256'] = store_content_addressed(upload, ATTACHMENT_CONTENT_PREFIX)
+        return super().create(validated_data)
@@ -11,7 +11,10 @@ from django.core.exceptions import ValidationError
 from applications import models as app_models
 from applications.services import approval_engine
 from applications.services import notification_service
-from applications.services import form_validator
+from applications.services import form_schema
+from applications.services import resolution_cache
+from applications.services import sla_engine
+from applications.services.gatepass_utils import gatepass_hard_expiry, is_gatepass_application
 
 
 def _snapshot_schema_for_application_type(application_type: app_models.ApplicationType) -> app_models.ApplicationFormVersion:
@@ -43,12 +46,16 @@ def _snapshot_schema_for_application_type(application_type: app_models.Applicati
         schema={'fields': fields},
         is_active=True,
     )
+    # A new active version: drop the cached form state of every type (also done by signals).
+    resolution_cache.invalidate(resolution_cache.FORMS)
     return fv
 
 
 def _save_state(application: app_models.Application, state: str, current_step=None, final_at=None):
     """Internal helper to persist state changes atomically and keep legacy status in sync."""
     fields = []
+    previous_step_id = application.current_step_id
+    previous_state = application.current_state
     application.current_state = state
     fields.append('current_state')
     # keep legacy status for compatibility
@@ -60,6 +67,18 @@ def _save_state(application: app_models.Application, state: str, current_step=No
     if final_at is not None:
         application.final_decision_at = final_at
         fields.append('final_decision_at')
+
+    # SLA deadline of the (new) current step; cleared once the application leaves review.
+    if state == app_models.Application.ApplicationState.IN_REVIEW and current_step is not None:
+        # Re-entering the same step (idempotent move_to_in_review) keeps its deadline.
+        same_step = previous_state == state and previous_step_id == current_step.pk
+        if application.step_started_at is None or not same_step:
+            application.step_started_at = timezone.now()
+            application.step_due_at = sla_engine.compute_step_due_at(current_step, application.step_started_at)
+            application.sla_escalated_at = None
+    elif state != app_models.Application.ApplicationState.IN_REVIEW:
+        application.step_due_at = None
+    fields += ['step_started_at', 'step_due_at', 'sla_escalated_at']
     application.save(update_fields=fields)
 
 
@@ -85,38 +104,30 @@ def submit_application(application: app_models.Application, user):
     first_step = flow.steps.order_by('order').first()
     if first_step is None:
         raise ValidationError('Approval flow has no steps configured for this application type')
-    # Snapshot or bind form version
-    active_fv = app_models.ApplicationFormVersion.objects.filter(application_type=application.application_type, is_active=True).first()
-    if active_fv is None:
-        # Create snapshot from current ApplicationField definitions
-        active_fv = _snapshot_schema_for_application_type(application.application_type)
-    else:
-        # Re-snapshot if live fields have drifted from the stored form version
-        # (e.g. admin added/removed/renamed fields since last snapshot).
-        live_keys = set(
-            app_models.ApplicationField.objects
-            .filter(application_type=application.application_type)
-            .values_list('field_key', flat=True)
-        )
-        fv_keys = {f['field_key'] for f in (active_fv.schema or {}).get('fields', [])}
-        if live_keys != fv_keys:
-            active_fv = _snapshot_schema_for_application_type(application.application_type)
+    # Bind the active form version; snapshot live ApplicationField rows when there
+    # is none or the fields drifted (admin added/removed/renamed fields since the
+    # last snapshot). The active version and live fields are cached per type.
+    form_state = form_schema.active_form_state(application.application_type_id)
+    if form_state.has_drifted:
+        _snapshot_schema_for_application_type(application.application_type)
+        form_state = form_schema.active_form_state(application.application_type_id)
+    compiled = form_state.schema
 
     # Bind form_version + mark submission time
-    application.form_version = active_fv
+    application.form_version_id = compiled.form_version_id
     if application.submitted_at is None:
         application.submitted_at = timezone.now()
     update_fields = ['form_version']
     if application.submitted_at is not None:
         update_fields.append('submitted_at')
+    if is_gatepass_application(application):
+        # Indexed hard expiry so `expire_gatepasses` never has to parse pending rows.
+        application.gatepass_expires_at = gatepass_hard_expiry(application)
+        update_fields.append('gatepass_expires_at')
     application.save(update_fields=update_fields)
 
-    # Validate application data against bound form version
-    try:
-        # pass queryset of ApplicationData
-        form_validator.validate_application_data(active_fv, application.data.select_related('field').all())
-    except Exception as exc:
-        raise
+    # Validate application data against the compiled form version
+    compiled.validate(form_state.data_map(application.data.values_list('field_id', 'value')))
 
     _save_state(application, app_models.Application.ApplicationState.IN_REVIEW, current_step=first_step)
     # notify initial approver(s)
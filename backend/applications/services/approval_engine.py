@@ -1,6 +1,7 @@
 from typing import Optional
 
 from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 from django.core.exceptions import PermissionDenied
 
@@ -9,6 +10,8 @@ from accounts.models import Role
 from applications.services import application_state
 from applications.services import notification_service
 from applications.services import flow_selection
+from applications.services import resolution_cache
+from applications.services.resolution_cache import FLOWS, ROLES
 
 
 def _get_applicant_department(application):
@@ -53,74 +56,114 @@ def _get_applicant_department(application):
     return None
 
 
-def _get_flow_for_application(application) -> Optional[app_models.ApprovalFlow]:
-    """Return the best-matching ApprovalFlow for the application.
+def _flow_has_steps(flow_id) -> bool:
+    return resolution_cache.cached(
+        FLOWS,
+        ('has_steps', flow_id),
+        lambda: app_models.ApprovalStep.objects.filter(approval_flow_id=flow_id).exists(),
+    )
 
-    Prefer department-specific flow, fallback to global (department is NULL).
-    """
-    # If the application already has a current_step, keep the original flow
-    # when it is still active. This prevents existing in-progress applications
-    # from "jumping" to a different flow when multiple flows exist.
-    try:
-        current_step = getattr(application, 'current_step', None)
-        current_flow = getattr(current_step, 'approval_flow', None) if current_step is not None else None
-        if current_flow is not None and getattr(current_flow, 'is_active', False):
-            if getattr(current_flow, 'application_type_id', None) == getattr(application.application_type, 'id', None):
-                try:
-                    if current_flow.steps.exists():
-                        return current_flow
-                except Exception:
-                    return current_flow
-    except Exception:
-        pass
 
-    dept = _get_applicant_department(application)
-    qs = app_models.ApprovalFlow.objects.filter(application_type=application.application_type, is_active=True)
+def _load_flow(flow_id) -> Optional[app_models.ApprovalFlow]:
+    if not flow_id:
+        return None
+    return resolution_cache.memoize(
+        FLOWS,
+        ('flow', flow_id),
+        lambda: app_models.ApprovalFlow.objects.select_related('application_type').filter(pk=flow_id).first(),
+    )
+
+
+def _select_flow_id(application_type_id, dept, applicant_user) -> Optional[int]:
+    """Uncached flow selection for (application type, department, applicant)."""
+    qs = app_models.ApprovalFlow.objects.filter(application_type_id=application_type_id, is_active=True)
     # Only consider flows that have at least one step configured.
     qs_with_steps = qs.filter(steps__isnull=False).distinct()
     dept_flow = None
     global_flow = None
 
-    applicant_user = None
-    try:
-        applicant_user = getattr(application, 'applicant_user', None)
-    except Exception:
-        applicant_user = None
-
     if dept is not None:
         dept_qs = qs_with_steps.filter(department=dept)
         dept_flow = flow_selection.select_best_initiable_flow(
             dept_qs,
             applicant_user,
-            application_type_id=getattr(application, 'application_type_id', None),
+            application_type_id=application_type_id,
         )
         if dept_flow is not None:
             try:
                 if dept_flow.steps.exists():
-                    return dept_flow
+                    return dept_flow.id
             except Exception:
-                return dept_flow
+                return dept_flow.id
 
     global_qs = qs_with_steps.filter(department__isnull=True)
     global_flow = flow_selection.select_best_initiable_flow(
         global_qs,
         applicant_user,
-        application_type_id=getattr(application, 'application_type_id', None),
+        application_type_id=application_type_id,
     )
     if global_flow is None:
         global_flow = global_qs.order_by('-id').first()
     if global_flow is not None:
         try:
             if global_flow.steps.exists():
-                return global_flow
+                return global_flow.id
         except Exception:
-            return global_flow
+            return global_flow.id
 
     # No flow with steps; keep legacy preference order.
     # Fall back to newest dept/global even if user couldn't initiate.
     if dept is not None and dept_flow is None:
         dept_flow = qs_with_steps.filter(department=dept).order_by('-id').first()
-    return dept_flow or global_flow
+    flow = dept_flow or global_flow
+    return flow.id if flow is not None else None
+
+
+def _get_flow_for_application(application) -> Optional[app_models.ApprovalFlow]:
+    """Return the best-matching ApprovalFlow for the application.
+
+    Prefer department-specific flow, fallback to global (department is NULL).
+
+    The selection only depends on (application type, applicant department,
+    applicant role signature), so it is cached on that key; see
+    `resolution_cache` for scope and invalidation.
+    """
+    # If the application already has a current_step, keep the original flow
+    # when it is still active. This prevents existing in-progress applications
+    # from "jumping" to a different flow when multiple flows exist.
+    try:
+        current_step = getattr(application, 'current_step', None)
+        current_flow = getattr(current_step, 'approval_flow', None) if current_step is not None else None
+        if current_flow is not None and getattr(current_flow, 'is_active', False):
+            if getattr(current_flow, 'application_type_id', None) == getattr(application.application_type, 'id', None):
+                try:
+                    if _flow_has_steps(current_flow.id):
+                        return current_flow
+                except Exception:
+                    return current_flow
+    except Exception:
+        pass
+
+    dept = _get_applicant_department(application)
+    application_type_id = getattr(application, 'application_type_id', None)
+
+    applicant_user = None
+    try:
+        applicant_user = getattr(application, 'applicant_user', None)
+    except Exception:
+        applicant_user = None
+
+    signature = flow_selection.get_user_role_signature(applicant_user)
+    if applicant_user is not None and signature is None:
+        # Unsaved applicant: nothing stable to key on.
+        return _load_flow(_select_flow_id(application_type_id, dept, applicant_user))
+
+    flow_id = resolution_cache.cached(
+        FLOWS,
+        ('selected', application_type_id, getattr(dept, 'pk', None), signature),
+        lambda: _select_flow_id(application_type_id, dept, applicant_user),
+    )
+    return _load_flow(flow_id)
 
 
 def get_current_approval_step(application) -> Optional[app_models.ApprovalStep]:
@@ -134,7 +177,7 @@ def get_current_approval_step(application) -> Optional[app_models.ApprovalStep]:
 
     if application.current_step_id:
         # Refresh from DB to ensure up-to-date instance
-        step = app_models.ApprovalStep.objects.select_related('approval_flow', 'role', 'stage').filter(pk=application.current_step_id).first()
+        step = _load_step(application.current_step_id)
         if step is None:
             return None
 
@@ -144,7 +187,7 @@ def get_current_approval_step(application) -> Optional[app_models.ApprovalStep]:
         if flow is not None:
             if step.approval_flow_id == flow.id:
                 return step
-            return flow.steps.select_related('role', 'stage').order_by('order').first()
+            return _first_step(flow)
 
         # No active flow configured; keep legacy behavior.
         return step
@@ -152,46 +195,42 @@ def get_current_approval_step(application) -> Optional[app_models.ApprovalStep]:
     if not flow:
         return None
 
-    return flow.steps.select_related('role', 'stage').order_by('order').first()
+    return _first_step(flow)
+
+
+def _load_step(step_id) -> Optional[app_models.ApprovalStep]:
+    # Request-scoped only: step edits clear the memo via `resolution_cache.invalidate`.
+    return resolution_cache.memoize(
+        FLOWS,
+        ('step', step_id),
+        lambda: app_models.ApprovalStep.objects.select_related('approval_flow', 'role', 'stage').filter(pk=step_id).first(),
+    )
+
+
+def _first_step(flow: app_models.ApprovalFlow) -> Optional[app_models.ApprovalStep]:
+    return resolution_cache.memoize(
+        FLOWS,
+        ('first_step', flow.id),
+        lambda: flow.steps.select_related('role', 'stage').order_by('order').first(),
+    )
 
 
 def _user_matches_stage_step(application: app_models.Application, step: app_models.ApprovalStep, user) -> bool:
     if step is None or not getattr(step, 'stage_id', None):
         return False
 
-    try:
-        # If the user is pinned to ANY stage for this application_type,
-        # they should behave like a "temporary role" of that stage only.
-        pinned_stage_id = (
-            app_models.ApplicationRoleHierarchyStageUser.objects
-            .filter(user=user, stage__application_type=application.application_type)
-            .values_list('stage_id', flat=True)
-            .first()
-        )
-        if pinned_stage_id:
-            # Pinned user may act only for their pinned stage.
-            return int(pinned_stage_id) == int(step.stage_id)
-    except Exception:
-        pass
+    # If the user is pinned to ANY stage for this application_type,
+    # they should behave like a "temporary role" of that stage only.
+    pinned_stage_id = _user_pinned_stage_id(user, application.application_type_id)
+    if pinned_stage_id:
+        # Pinned user may act only for their pinned stage.
+        return int(pinned_stage_id) == int(step.stage_id)
 
     # Not pinned anywhere for this application_type — allow stage membership by roles.
-    try:
-        if app_models.ApplicationRoleHierarchyStageUser.objects.filter(user=user, stage_id=step.stage_id).exists():
-            return True
-    except Exception:
-        pass
-
-    stage_role_ids = []
-    try:
-        stage_role_ids = list(
-            app_models.ApplicationRoleHierarchyStageRole.objects
-            .filter(stage_id=step.stage_id)
-            .values_list('role_id', flat=True)
-            .distinct()
-        )
-    except Exception:
-        stage_role_ids = []
+    if step.stage_id in _user_stage_pins(user)[1]:
+        return True
 
+    stage_role_ids = list(_stage_role_ids(step.stage_id))
     if not stage_role_ids:
         return False
 
@@ -211,7 +250,7 @@ def _user_matches_stage_step(application: app_models.Application, step: app_mode
             def __init__(self, role):
                 self.role = role
 
-        for role in Role.objects.filter(id__in=stage_role_ids):
+        for role in _roles_by_ids(stage_role_ids):
             resolved = approver_resolver.resolve_current_approver(application, _StepLike(role))
             if resolved is not None and getattr(resolved, 'id', None) == getattr(user, 'id', None):
                 return True
@@ -249,7 +288,62 @@ def is_approver_available(role, application) -> bool:
 
 def _user_roles(user):
     # Using the `roles` m2m on user
-    return list(user.roles.all())
+    user_id = getattr(user, 'pk', None)
+    if not user_id:
+        return list(user.roles.all())
+    return list(resolution_cache.cached(ROLES, ('roles', user_id), lambda: tuple(user.roles.all())))
+
+
+def _user_stage_pins(user) -> tuple:
+    """({application_type_id: first pinned stage_id}, {all pinned stage ids}) for the user."""
+    user_id = getattr(user, 'pk', None)
+    if not user_id:
+        return {}, set()
+
+    def _compute():
+        by_type = {}
+        stage_ids = set()
+        rows = (
+            app_models.ApplicationRoleHierarchyStageUser.objects
+            .filter(user_id=user_id)
+            .order_by('id')
+            .values_list('stage__application_type_id', 'stage_id')
+        )
+        for application_type_id, stage_id in rows:
+            by_type.setdefault(application_type_id, stage_id)
+            stage_ids.add(stage_id)
+        return by_type, frozenset(stage_ids)
+
+    try:
+        return resolution_cache.cached(ROLES, ('stage_pins', user_id), _compute)
+    except Exception:
+        return {}, set()
+
+
+def _user_pinned_stage_id(user, application_type_id) -> Optional[int]:
+    return _user_stage_pins(user)[0].get(application_type_id)
+
+
+def _stage_role_ids(stage_id) -> tuple:
+    def _compute():
+        try:
+            return tuple(
+                app_models.ApplicationRoleHierarchyStageRole.objects
+                .filter(stage_id=stage_id)
+                .values_list('role_id', flat=True)
+                .distinct()
+            )
+        except Exception:
+            return ()
+
+    return resolution_cache.cached(FLOWS, ('stage_role_ids', stage_id), _compute)
+
+
+def _roles_by_ids(role_ids) -> list:
+    key = tuple(sorted(set(role_ids)))
+    if not key:
+        return []
+    return list(resolution_cache.cached(FLOWS, ('roles_by_ids', key), lambda: tuple(Role.objects.filter(id__in=key))))
 
 
 def _user_roles_with_stage_pins(user, application: app_models.Application):
@@ -262,28 +356,32 @@ def _user_roles_with_stage_pins(user, application: app_models.Application):
     base_roles = _user_roles(user)
 
     try:
-        stage_id = (
-            app_models.ApplicationRoleHierarchyStageUser.objects
-            .filter(user=user, stage__application_type=application.application_type)
-            .values_list('stage_id', flat=True)
-            .first()
-        )
+        stage_id = _user_pinned_stage_id(user, application.application_type_id)
         if not stage_id:
             return base_roles
 
-        role_ids = (
-            app_models.ApplicationRoleHierarchyStageRole.objects
-            .filter(stage_id=stage_id)
-            .values_list('role_id', flat=True)
-            .distinct()
-        )
-        extra_roles = list(Role.objects.filter(id__in=role_ids))
+        extra_roles = _roles_by_ids(_stage_role_ids(stage_id))
         by_id = {r.id: r for r in (base_roles + extra_roles) if getattr(r, 'id', None) is not None}
         return list(by_id.values())
     except Exception:
         return base_roles
 
 
+def _override_role_ids(flow: app_models.ApprovalFlow, application_type_id) -> frozenset:
+    """Role ids that may override `flow`: flow.override_roles plus override/edit-all permissions."""
+
+    def _compute():
+        ids = set(flow.override_roles.values_list('id', flat=True))
+        ids.update(
+            app_models.RoleApplicationPermission.objects.filter(application_type_id=application_type_id)
+            .filter(Q(can_override_flow=True) | Q(can_edit_all=True))
+            .values_list('role_id', flat=True)
+        )
+        return frozenset(ids)
+
+    return resolution_cache.cached(FLOWS, ('override_role_ids', flow.id, application_type_id), _compute)
+
+
 def _user_has_override(user, application) -> bool:
     """Return True if the user may override the approval flow for this application.
 
@@ -300,20 +398,19 @@ def _user_has_override(user, application) -> bool:
     if not user_roles:
         return False
 
-    # Flow-level overrides
-    override_roles = set(flow.override_roles.all())
-    if any(r in override_roles for r in user_roles):
-        return True
+    override_ids = _override_role_ids(flow, application.application_type_id)
+    return any(getattr(r, 'id', None) in override_ids for r in user_roles)
 
-    # RoleApplicationPermission checks
-    perms = app_models.RoleApplicationPermission.objects.filter(
-        application_type=application.application_type,
-        role__in=user_roles
-    )
-    if perms.filter(can_override_flow=True).exists() or perms.filter(can_edit_all=True).exists():
-        return True
 
-    return False
+def _final_step_is_security(flow: app_models.ApprovalFlow) -> bool:
+    def _compute():
+        try:
+            final_step = flow.steps.filter(is_final=True).select_related('role').order_by('order').first()
+        except Exception:
+            final_step = None
+        return bool(final_step and final_step.role and str(getattr(final_step.role, 'name', '') or '').upper() == 'SECURITY')
+
+    return resolution_cache.cached(FLOWS, ('final_is_security', flow.id), _compute)
 
 
 def _is_gatepass_application_strict(application: app_models.Application) -> bool:
@@ -327,12 +424,7 @@ def _is_gatepass_application_strict(application: app_models.Application) -> bool
     if not flow:
         return False
 
-    try:
-        final_step = flow.steps.filter(is_final=True).select_related('role').order_by('order').first()
-    except Exception:
-        final_step = None
-
-    if not (final_step and final_step.role and str(getattr(final_step.role, 'name', '') or '').upper() == 'SECURITY'):
+    if not _final_step_is_security(flow):
         return False
 
     try:
@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import Optional, Set
 
 from applications import models as app_models
+from applications.services import resolution_cache
 
 
 def _norm_role_name(value) -> str:
@@ -33,8 +34,49 @@ def get_user_effective_role_names(user) -> Set[str]:
     - Staff DepartmentRole roles (HOD/AHOD)
     - Staff RoleAssignment roles (time-bound authority roles)
 
-    Returns uppercase role names.
+    Returns uppercase role names. Cached per user (see `resolution_cache`).
     """
+    user_id = getattr(user, 'pk', None)
+    if not user_id:
+        return _compute_effective_role_names(user)
+    names = resolution_cache.cached(
+        resolution_cache.ROLES,
+        ('effective_names', user_id),
+        lambda: frozenset(_compute_effective_role_names(user)),
+    )
+    return set(names)
+
+
+def get_user_role_signature(user) -> Optional[tuple]:
+    """Everything about `user` that flow selection depends on, as a hashable key.
+
+    (effective role names, pinned stage ids, has student profile, has staff profile).
+    Two applicants with the same signature always get the same flow for a given
+    application type and department.
+    """
+    user_id = getattr(user, 'pk', None)
+    if not user_id:
+        return None
+
+    def _compute():
+        try:
+            pinned = tuple(sorted(
+                app_models.ApplicationRoleHierarchyStageUser.objects.filter(user_id=user_id)
+                .values_list('stage_id', flat=True)
+            ))
+        except Exception:
+            pinned = ()
+        return (
+            tuple(sorted(get_user_effective_role_names(user))),
+            pinned,
+            _user_has_role(user, 'STUDENT', set()),
+            _user_has_role(user, 'STAFF', set()),
+        )
+
+    return resolution_cache.cached(resolution_cache.ROLES, ('signature', user_id), _compute)
+
+
+def _compute_effective_role_names(user) -> Set[str]:
     roles: Set[str] = set()
 
     if user is None:
@@ -0,0 +1,188 @@
+"""Compiled application form schemas.
+
+A form version's field map and per-field validators are compiled once per
+process and kept by (version id, schema digest) (`compile_form_version`).
+The schema can still be edited in the admin; an edited schema has a new
+digest, so every process recompiles it on its next read, and
+`applications.signals` also drops the saving process's compiled copies.
+
+The submit path also needs the active version of a type and the live
+ApplicationField ids/keys (to detect drift and to map ApplicationData rows to
+keys). That state is cached in the FORMS namespace of `resolution_cache`
+(`active_form_state`); `applications.signals` invalidates it whenever a field
+or form version is saved or deleted, i.e. when a new version is published.
+A warm submit therefore validates without reading the schema tables.
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+
+from applications import models as app_models
+from applications.services import resolution_cache
+from applications.services.resolution_cache import FORMS
+
+FieldCheck = Callable[[Any], Optional[str]]
+
+_MAX_COMPILED = 512
+
+
+def _type_check(value, field_type) -> bool:
+    if value is None:
+        return True
+    if field_type == 'TEXT':
+        return isinstance(value, str)
+    if field_type == 'DATE':
+        # Expect ISO date string or date object; basic check
+        return isinstance(value, (str, date))
+    if field_type == 'BOOLEAN':
+        return isinstance(value, bool)
+    if field_type == 'NUMBER':
+        return isinstance(value, (int, float))
+    # SELECT is checked against its choices below; FILE uploads are handled elsewhere.
+    return True
+
+
+def _compile_field(spec: dict) -> FieldCheck:
+    field_key = spec['field_key']
+    field_type = spec.get('field_type')
+    meta = spec.get('meta') or {}
+    is_required = bool(spec.get('is_required'))
+    max_length = meta.get('max_length') if field_type == 'TEXT' else None
+    min_length = meta.get('min_length') if field_type == 'TEXT' else None
+    choices = meta.get('choices', []) if field_type == 'SELECT' and 'choices' in meta else None
+
+    def check(value) -> Optional[str]:
+        if value is None or value == '':
+            return 'This field is required.' if is_required else None
+        if not _type_check(value, field_type):
+            return f'Invalid type for field {field_key} (expected {field_type}).'
+        error = None
+        if isinstance(value, str):
+            if max_length is not None and len(value) > max_length:
+                error = f'Maximum length is {max_length}.'
+            if min_length is not None and len(value) < min_length:
+                error = f'Minimum length is {min_length}.'
+        if choices is not None and value not in choices:
+            error = f'Invalid choice: {value}.'
+        return error
+
+    return check
+
+
+@dataclass(frozen=True)
+class CompiledFormSchema:
+    form_version_id: Optional[int]
+    version: Optional[int]
+    field_map: Dict[str, dict]
+    checks: Tuple[Tuple[str, FieldCheck], ...]
+
+    @property
+    def field_keys(self) -> FrozenSet[str]:
+        return frozenset(self.field_map)
+
+    def errors(self, data_map: Dict[str, Any]) -> Dict[str, str]:
+        errors = {}
+        for field_key, check in self.checks:
+            error = check(data_map.get(field_key))
+            if error:
+                errors[field_key] = error
+        return errors
+
+    def validate(self, data_map: Dict[str, Any]) -> bool:
+        errors = self.errors(data_map)
+        if errors:
+            raise ValidationError(errors)
+        return True
+
+
+def compile_schema(schema: Optional[dict], form_version_id: Optional[int] = None,
+                   version: Optional[int] = None) -> CompiledFormSchema:
+    fields: List[dict] = list((schema or {}).get('fields', []))
+    field_map = {f['field_key']: f for f in fields}
+    return CompiledFormSchema(
+        form_version_id=form_version_id,
+        version=version,
+        field_map=field_map,
+        checks=tuple((key, _compile_field(spec)) for key, spec in field_map.items()),
+    )
+
+
+_compiled: Dict[Tuple[int, str], CompiledFormSchema] = {}
+
+
+def schema_digest(schema: Optional[dict]) -> str:
+    raw = json.dumps(schema or {}, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def clear_compiled() -> None:
+    """Drop this process's compiled schemas (other processes notice the new digest)."""
+    _compiled.clear()
+
+
+def _compiled_for(form_version_id: int, version: Optional[int], schema: Optional[dict],
+                  digest: Optional[str] = None) -> CompiledFormSchema:
+    key = (form_version_id, digest or schema_digest(schema))
+    compiled = _compiled.get(key)
+    if compiled is None:
+        compiled = compile_schema(schema, form_version_id, version)
+        if len(_compiled) >= _MAX_COMPILED:
+            _compiled.clear()
+        _compiled[key] = compiled
+    return compiled
+
+
+def compile_form_version(form_version: app_models.ApplicationFormVersion) -> CompiledFormSchema:
+    if form_version.pk is None:
+        return compile_schema(form_version.schema, None, form_version.version)
+    return _compiled_for(form_version.pk, form_version.version, form_version.schema)
+
+
+@dataclass(frozen=True)
+class ActiveFormState:
+    """Active form version of an application type plus its live field definitions."""
+
+    schema: Optional[CompiledFormSchema]
+    live_fields: Dict[int, str]
+
+    @property
+    def form_version_id(self) -> Optional[int]:
+        return self.schema.form_version_id if self.schema else None
+
+    @property
+    def has_drifted(self) -> bool:
+        return self.schema is None or set(self.live_fields.values()) != self.schema.field_keys
+
+    def data_map(self, rows: Iterable[Tuple[int, Any]]) -> Dict[str, Any]:
+        """Map (field_id, value) rows to {field_key: value}."""
+        return {self.live_fields[field_id]: value for field_id, value in rows if field_id in self.live_fields}
+
+
+def _load_active_form(application_type_id: int) -> tuple:
+    active = (
+        app_models.ApplicationFormVersion.objects
+        .filter(application_type_id=application_type_id, is_active=True)
+        .values_list('id', 'version', 'schema')
+        .first()
+    )
+    if active:
+        # Hashed once per cache fill rather than on every submit.
+        active = (*active, schema_digest(active[2]))
+    live_fields = dict(
+        app_models.ApplicationField.objects
+        .filter(application_type_id=application_type_id)
+        .values_list('id', 'field_key')
+    )
+    return active, live_fields
+
+
+def active_form_state(application_type_id: int) -> ActiveFormState:
+    active, live_fields = resolution_cache.cached(
+        FORMS, ('active', application_type_id), lambda: _load_active_form(application_type_id)
+    )
+    schema = _compiled_for(*active) if active else None
+    return ActiveFormState(schema=schema, live_fields=live_fields)
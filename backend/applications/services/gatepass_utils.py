@@ -103,3 +103,32 @@ def is_gatepass_application(app: app_models.Application) -> bool:
         return code == "GATEPASS" or name == "GATEPASS" or "GATEPASS" in name
     except Exception:
         return False
+
+
+def backfill_gatepass_expiry(batch_size: int = 200, dry_run: bool = False) -> int:
+    """Set `gatepass_expires_at` on live, unscanned gatepasses that predate the column."""
+    qs = (
+        app_models.Application.objects
+        .filter(gatepass_expires_at__isnull=True, current_state__in=("SUBMITTED", "IN_REVIEW", "APPROVED"))
+        .filter(gatepass_scanned_at__isnull=True)
+        .select_related("application_type")
+        .prefetch_related("data__field")
+        .order_by("id")
+    )
+    filled = 0
+    last_id = 0
+    while True:
+        batch = list(qs.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            return filled
+        last_id = batch[-1].id
+        updates = []
+        for app in batch:
+            if not is_gatepass_application(app):
+                continue
+            app.gatepass_expires_at = gatepass_hard_expiry(app)
+            if app.gatepass_expires_at is not None:
+                updates.append(app)
+        if updates and not dry_run:
+            app_models.Application.objects.bulk_update(updates, ["gatepass_expires_at"])
+        filled += len(updates)
@@ -0,0 +1,195 @@
+"""Approver inbox index: who may act on each IN_REVIEW application.
+
+`inbox_service.get_pending_approvals_for_user` used to resolve the current
+step and approver for every IN_REVIEW application on each inbox load. The
+resolution is done here instead, once per application change, and stored as
+`ApproverInboxEntry` rows:
+
+- APPROVER: the concrete approver for the current step (mentor/advisor/HOD...).
+  When present it is the only user whose inbox shows the application.
+- CANDIDATE: users/roles that *may* act when no concrete approver resolves
+  (step role, stage users/roles, override roles, escalation role). The inbox
+  confirms these with `approval_engine.user_can_act`, so semantics (stage pins,
+  SLA overdue, gatepass restrictions) stay exactly those of the engine.
+- UNASSIGNED: indexed, nobody to resolve; lets the inbox tell "not indexed yet"
+  apart from "no approver".
+
+Entries are refreshed by the receivers in `applications.signals` and can be
+rebuilt with `python manage.py rebuild_approver_inbox`. Changes that touch
+every pending application (switching the active academic year) only
+`request_rebuild()`; the application-deadlines timer runs
+`rebuild_approver_inbox --if-requested` to do it out of the request.
+"""
+import logging
+from typing import Iterable, List, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+
+from accounts.models import Role
+from applications import models as app_models
+from applications.services import approval_engine
+from applications.services import approver_resolver
+
+logger = logging.getLogger(__name__)
+
+Entry = app_models.ApproverInboxEntry
+
+_REBUILD_REQUESTED_KEY = 'applications:inbox:rebuild_requested'
+
+
+def _application_queryset():
+    return app_models.Application.objects.select_related(
+        'application_type',
+        'applicant_user',
+        'student_profile__section__batch__course__department',
+        'student_profile__home_department',
+        'staff_profile__department',
+        'current_step__approval_flow',
+        'current_step__role',
+        'current_step__stage',
+        'current_step__escalate_to_role',
+    )
+
+
+def _resolve_user(application, role) -> Optional[object]:
+    class _StepLike:
+        def __init__(self, role):
+            self.role = role
+
+    try:
+        return approver_resolver.resolve_current_approver(application, _StepLike(role))
+    except Exception:
+        return None
+
+
+def compute_entries(application: app_models.Application) -> List[app_models.ApproverInboxEntry]:
+    """Unsaved index rows for `application` (empty when it is not IN_REVIEW)."""
+    if application.current_state != app_models.Application.ApplicationState.IN_REVIEW:
+        return []
+
+    step = approval_engine.get_current_approval_step(application)
+    if step is None:
+        return [Entry(application=application, kind=Entry.Kind.UNASSIGNED)]
+
+    resolved = approver_resolver.resolve_current_approver(application, step)
+    if resolved is not None:
+        return [Entry(application=application, step=step, kind=Entry.Kind.APPROVER, user=resolved)]
+
+    user_ids = set()
+    role_ids = set()
+
+    if step.role_id:
+        role_ids.add(step.role_id)
+
+    if step.stage_id:
+        user_ids.update(
+            app_models.ApplicationRoleHierarchyStageUser.objects.filter(stage_id=step.stage_id).values_list('user_id', flat=True)
+        )
+        stage_role_ids = set(
+            app_models.ApplicationRoleHierarchyStageRole.objects.filter(stage_id=step.stage_id).values_list('role_id', flat=True)
+        )
+        role_ids.update(stage_role_ids)
+        for role in Role.objects.filter(id__in=stage_role_ids):
+            stage_user = _resolve_user(application, role)
+            if stage_user is not None:
+                user_ids.add(stage_user.id)
+
+    if not approval_engine._is_gatepass_application_strict(application):
+        flow = approval_engine._get_flow_for_application(application)
+        if flow is not None:
+            role_ids.update(flow.override_roles.values_list('id', flat=True))
+        role_ids.update(
+            app_models.RoleApplicationPermission.objects.filter(application_type_id=application.application_type_id)
+            .filter(Q(can_override_flow=True) | Q(can_edit_all=True))
+            .values_list('role_id', flat=True)
+        )
+
+    if step.escalate_to_role_id:
+        esc_user = _resolve_user(application, step.escalate_to_role)
+        if esc_user is not None:
+            user_ids.add(esc_user.id)
+        else:
+            role_ids.add(step.escalate_to_role_id)
+
+    user_ids.discard(application.applicant_user_id)
+    entries = [Entry(application=application, step=step, kind=Entry.Kind.CANDIDATE, user_id=uid) for uid in sorted(user_ids)]
+    entries += [Entry(application=application, step=step, kind=Entry.Kind.CANDIDATE, role_id=rid) for rid in sorted(role_ids)]
+    return entries or [Entry(application=application, step=step, kind=Entry.Kind.UNASSIGNED)]
+
+
+def refresh_application(application_id: int) -> int:
+    """Recompute index rows for one application. Returns the number of rows written."""
+    application = _application_queryset().filter(pk=application_id).first()
+    with transaction.atomic():
+        Entry.objects.filter(application_id=application_id).delete()
+        if application is None:
+            return 0
+        entries = compute_entries(application)
+        Entry.objects.bulk_create(entries)
+    return len(entries)
+
+
+def refresh_applications(application_ids: Iterable[int]) -> int:
+    written = 0
+    for application_id in sorted(set(application_ids)):
+        try:
+            written += refresh_application(application_id)
+        except Exception:
+            logger.exception('Approver inbox index refresh failed for application %s', application_id)
+    return written
+
+
+def pending_application_ids(extra_filter: Optional[Q] = None) -> List[int]:
+    qs = app_models.Application.objects.filter(current_state=app_models.Application.ApplicationState.IN_REVIEW)
+    if extra_filter is not None:
+        qs = qs.filter(extra_filter)
+    return list(qs.values_list('id', flat=True).distinct())
+
+
+def unindexed_application_ids() -> List[int]:
+    """IN_REVIEW applications without any index row (e.g. created before the index existed).
+
+    Runs on every inbox read: ``NOT EXISTS`` lets the planner anti-join the
+    IN_REVIEW partial index (app_in_review_idx) against the entries'
+    application_id index instead of scanning either table.
+    """
+    return list(
+        app_models.Application.objects.filter(current_state=app_models.Application.ApplicationState.IN_REVIEW)
+        .filter(~Exists(Entry.objects.filter(application_id=OuterRef('pk'))))
+        .order_by()
+        .values_list('id', flat=True)
+    )
+
+
+def rebuild(application_ids: Optional[Iterable[int]] = None) -> int:
+    """Rebuild the whole index (or the given applications) and drop rows of non-pending ones."""
+    if application_ids is None:
+        Entry.objects.exclude(application__current_state=app_models.Application.ApplicationState.IN_REVIEW).delete()
+        application_ids = pending_application_ids()
+    return refresh_applications(application_ids)
+
+
+def effective_role_ids(user) -> set:
+    """Static roles plus roles of every role-hierarchy stage the user is pinned to.
+
+    Superset of `approval_engine._user_roles_with_stage_pins` across application types;
+    candidates found through it are confirmed with `user_can_act`.
+    """
+    role_ids = set(user.roles.values_list('id', flat=True))
+    pinned_stage_ids = app_models.ApplicationRoleHierarchyStageUser.objects.filter(user=user).values_list('stage_id', flat=True)
+    role_ids.update(
+        app_models.ApplicationRoleHierarchyStageRole.objects.filter(stage_id__in=pinned_stage_ids).values_list('role_id', flat=True)
+    )
+    return role_ids
+
+
+def request_rebuild() -> None:
+    """Ask the next `rebuild_approver_inbox --if-requested` run for a full rebuild."""
+    cache.set(_REBUILD_REQUESTED_KEY, 1, timeout=None)
+
+
+def take_rebuild_request() -> bool:
+    """Clear a pending rebuild request; True when there was one."""
+    return bool(cache.delete(_REBUILD_REQUESTED_KEY))
@@ -1,31 +1,57 @@
 """Inbox service: list applications pending action for a user."""
 from typing import List
 
+from django.db.models import Q
+
 from applications import models as app_models
-from applications.services import approver_resolver
 from applications.services import approval_engine
+from applications.services import inbox_index
 
 
 def get_pending_approvals_for_user(user):
     """Return a list of Application objects requiring `user`'s action.
 
-    Strategy:
-    - Start with applications in state IN_REVIEW with a non-null current_step.
-    - Prefetch related student, section, and current_step.role to minimize DB hits.
-    - For each candidate, attempt to resolve a concrete approver via
-      `approver_resolver.resolve_current_approver`. If that resolves to a
-      user, include the application only when it matches `user`.
-    - If no concrete approver found, fall back to `approval_engine.user_can_act`
-      which covers override roles and role-based eligibility.
+    Strategy (see `inbox_index` for how the index is maintained):
+    - One indexed query over `ApproverInboxEntry` for rows naming `user`
+      or one of the user's (stage-pin inclusive) roles.
+    - APPROVER rows are the resolved concrete approver for the current step
+      and are included as-is.
+    - CANDIDATE rows (no concrete approver resolvable) are confirmed with
+      `approval_engine.user_can_act`, which covers override roles, stage
+      membership, role-based eligibility and SLA escalation.
 
     Returns a list of Applications sorted by newest first.
     """
     Application = app_models.Application
+    Entry = app_models.ApproverInboxEntry
+    user_id = getattr(user, 'id', None)
+
+    # Self-heal rows never indexed (e.g. pending before the index existed).
+    missing = inbox_index.unindexed_application_ids()
+    if missing:
+        inbox_index.refresh_applications(missing)
+
+    entries = (
+        Entry.objects.filter(
+            Q(kind=Entry.Kind.APPROVER, user_id=user_id)
+            | Q(kind=Entry.Kind.CANDIDATE, user_id=user_id)
+            | Q(kind=Entry.Kind.CANDIDATE, role_id__in=inbox_index.effective_role_ids(user))
+        )
+        .exclude(application__applicant_user_id=user_id)
+        .values_list('application_id', 'step_id', 'kind')
+    )
+    step_by_app = {}
+    exact_ids = set()
+    for application_id, step_id, kind in entries:
+        step_by_app[application_id] = step_id
+        if kind == Entry.Kind.APPROVER:
+            exact_ids.add(application_id)
+    if not step_by_app:
+        return []
 
     qs = Application.objects.filter(
+        id__in=list(step_by_app),
         current_state=Application.ApplicationState.IN_REVIEW,
-    ).exclude(
-        applicant_user_id=getattr(user, 'id', None),
     ).select_related(
         'application_type',
         'applicant_user',
@@ -34,32 +60,26 @@ def get_pending_approvals_for_user(user):
         'current_step__stage',
     ).order_by('-created_at')
 
-    pending_apps = []
-    for app in qs.iterator():
-        # Never show a user's own submissions as items to approve.
-        if getattr(app, 'applicant_user_id', None) == getattr(user, 'id', None):
-            continue
+    steps = app_models.ApprovalStep.objects.select_related('role', 'stage').in_bulk(
+        {sid for sid in step_by_app.values() if sid}
+    )
 
-        current_step = approval_engine.get_current_approval_step(app)
-        if current_step is None:
+    pending_apps: List = []
+    for app in qs:
+        step = steps.get(step_by_app[app.id])
+        if step is None:
             continue
 
-        # First try to resolve a concrete approver for the resolved current step
-        resolved = approver_resolver.resolve_current_approver(app, current_step)
-        if resolved is not None:
-            if resolved.id == user.id:
-                # Override the in-memory step so serialization shows the active-flow step.
-                app.current_step = current_step
-                pending_apps.append(app)
-            continue
+        if app.id not in exact_ids:
+            try:
+                if not approval_engine.user_can_act(app, user):
+                    continue
+            except Exception:
+                # defensive: skip problematic applications
+                continue
 
-        # No concrete approver — check if user has override/role-based eligibility
-        try:
-            if approval_engine.user_can_act(app, user):
-                app.current_step = current_step
-                pending_apps.append(app)
-        except Exception:
-            # defensive: skip problematic applications
-            continue
+        # Override the in-memory step so serialization shows the active-flow step.
+        app.current_step = step
+        pending_apps.append(app)
 
     return pending_apps
@@ -0,0 +1,212 @@
+"""Application list read-model (`ApplicationListEntry`).
+
+Admin submission lists and applicant history used to serialize `Application`
+rows through wide select_related chains plus per-row lookups into
+ApplicationData, ApprovalAction and the approval flow. Those values are
+computed here once per change and stored as one `ApplicationListEntry` per
+application:
+
+- display fields: type, applicant name/identifier, department, current step
+  label, last action, attachment/history counts;
+- gate times: gatepass window, scan times, SLA deadline, and the flags the
+  time-dependent list fields (`gatepass_expired`, `time_window_active`,
+  `needs_gatepass_scan`) are derived from at read time.
+
+Rows are refreshed after commit by the receivers in `applications.signals`
+and can be rebuilt with `python manage.py rebuild_application_list`.
+Applications written before the read-model existed are projected on first
+read (`unprojected_application_ids`).
+Flow configuration edits do not refresh existing rows; rebuild after those
+if step labels or SLA deadlines must follow immediately.
+"""
+import logging
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Prefetch
+from django.utils import timezone
+
+from applications import models as app_models
+from applications.services import approval_engine
+
+logger = logging.getLogger(__name__)
+
+Entry = app_models.ApplicationListEntry
+
+_UPDATE_FIELDS = [
+    f.name for f in Entry._meta.concrete_fields
+    if f.name not in ('application', 'refreshed_at')
+] + ['refreshed_at']
+
+
+def _application_queryset():
+    return (
+        app_models.Application.objects.select_related(
+            'application_type',
+            'applicant_user',
+            'student_profile__section__batch__course__department',
+            'student_profile__home_department',
+            'staff_profile__department',
+            'current_step__approval_flow',
+            'current_step__role',
+            'current_step__stage',
+        )
+        .prefetch_related(
+            Prefetch(
+                'actions',
+                queryset=app_models.ApprovalAction.objects.select_related('acted_by').order_by('-acted_at', '-id'),
+            ),
+            Prefetch(
+                'attachments',
+                queryset=app_models.ApplicationAttachment.objects.filter(is_deleted=False).only('id', 'application_id'),
+            ),
+        )
+    )
+
+
+def _display_name(user) -> str:
+    if user is None:
+        return ''
+    full = f"{getattr(user, 'first_name', '') or ''} {getattr(user, 'last_name', '') or ''}".strip()
+    return full or getattr(user, 'username', '') or ''
+
+
+def _department(application):
+    student = getattr(application, 'student_profile', None)
+    if student is not None:
+        if student.home_department_id:
+            return student.home_department
+        try:
+            return student.section.batch.course.department
+        except AttributeError:
+            return None
+    staff = getattr(application, 'staff_profile', None)
+    if staff is not None:
+        return staff.department
+    return None
+
+
+def _identifier(application) -> str:
+    student = getattr(application, 'student_profile', None)
+    if student is not None:
+        return student.reg_no or ''
+    staff = getattr(application, 'staff_profile', None)
+    if staff is not None:
+        return staff.staff_id or ''
+    return ''
+
+
+def _parse_iso(value) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def build_entry(application: app_models.Application) -> app_models.ApplicationListEntry:
+    # The list serializer holds the canonical step-label/SLA/gatepass rules.
+    from applications.serializers.application import (
+        ApplicationListSerializer,
+        _extract_time_window,
+        _is_gatepass_application,
+    )
+
+    serializer = ApplicationListSerializer()
+    is_gatepass = _is_gatepass_application(application)
+    window = _extract_time_window(application) if is_gatepass else None
+    try:
+        flow = approval_engine._get_flow_for_application(application)
+        final_is_security = bool(flow) and approval_engine._final_step_is_security(flow)
+    except Exception:
+        final_is_security = False
+
+    actions = list(application.actions.all())
+    last = actions[0] if actions else None
+    department = _department(application)
+    application_type = application.application_type
+    return Entry(
+        application_id=application.pk,
+        application_type_id=application.application_type_id,
+        application_type_name=getattr(application_type, 'name', '') or '',
+        application_type_code=getattr(application_type, 'code', '') or '',
+        applicant_user_id=application.applicant_user_id,
+        applicant_name=_display_name(application.applicant_user)[:255],
+        applicant_username=getattr(application.applicant_user, 'username', '') or '',
+        applicant_identifier=_identifier(application)[:64],
+        department_id=getattr(department, 'pk', None),
+        department_name=(getattr(department, 'name', '') or '')[:255],
+        current_state=application.current_state,
+        status=application.status,
+        current_step_label=(serializer.get_current_step_role(application) or '')[:255],
+        last_action=getattr(last, 'action', '') or '',
+        last_action_by_name=_display_name(getattr(last, 'acted_by', None))[:255],
+        last_action_at=getattr(last, 'acted_at', None),
+        attachments_count=len(application.attachments.all()),
+        history_count=len(actions),
+        is_gatepass=is_gatepass,
+        final_step_is_security=final_is_security,
+        gatepass_window_start=window['start'] if window else None,
+        gatepass_window_end=window['end'] if window else None,
+        gatepass_scanned_at=application.gatepass_scanned_at,
+        gatepass_in_scanned_at=application.gatepass_in_scanned_at,
+        sla_deadline=_parse_iso(serializer.get_sla_deadline(application)),
+        submitted_at=application.submitted_at,
+        final_decision_at=application.final_decision_at,
+        created_at=application.created_at,
+        refreshed_at=timezone.now(),
+    )
+
+
+def refresh_applications(application_ids: Iterable[int], batch_size: int = 200) -> int:
+    """Upsert list rows of `application_ids`; returns the number written."""
+    ids = sorted(set(application_ids))
+    written = 0
+    for start in range(0, len(ids), batch_size):
+        chunk = ids[start:start + batch_size]
+        entries = []
+        for application in _application_queryset().filter(id__in=chunk):
+            try:
+                entries.append(build_entry(application))
+            except Exception:
+                logger.exception('Application list row build failed for application %s', application.pk)
+        if not entries:
+            continue
+        with transaction.atomic():
+            Entry.objects.bulk_create(
+                entries,
+                update_conflicts=True,
+                unique_fields=['application'],
+                update_fields=_UPDATE_FIELDS,
+            )
+        written += len(entries)
+    return written
+
+
+def unprojected_application_ids() -> List[int]:
+    """Applications without a list row; ``NOT EXISTS`` anti-joins the entry primary key."""
+    return list(
+        app_models.Application.objects.filter(~Exists(Entry.objects.filter(application_id=OuterRef('pk'))))
+        .order_by()
+        .values_list('id', flat=True)
+    )
+
+
+def rebuild(application_ids: Optional[Iterable[int]] = None, batch_size: int = 200) -> int:
+    """Refresh the given applications, or every application in id order (keyset batches)."""
+    if application_ids is not None:
+        return refresh_applications(application_ids, batch_size=batch_size)
+    written = 0
+    last_id = 0
+    while True:
+        chunk = list(
+            app_models.Application.objects.filter(id__gt=last_id)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not chunk:
+            return written
+        written += refresh_applications(chunk, batch_size=batch_size)
+        last_id = chunk[-1]
@@ -5,7 +5,7 @@ from applications import models as app_models
 from django.conf import settings
 from django.contrib.auth import get_user_model
 
-from accounts.services.sms import send_whatsapp
+from accounts.services import outbox
 
 logger = logging.getLogger(__name__)
 
@@ -110,7 +110,13 @@ def _resolve_whatsapp_number_for_user(user) -> str:
     return str(getattr(user, 'mobile_no', '') or '').strip()
 
 
-def _send_whatsapp_safe(to_number: str, message: str, *, tag: str = ''):
+def _event_key(application, *parts) -> str:
+    """Identity of one notification-worthy event of `application` (e.g. step + action)."""
+    app_id = getattr(application, 'pk', None) or getattr(application, 'id', None) or ''
+    return ':'.join(str(p if p is not None else '') for p in (app_id,) + parts)
+
+
+def _send_whatsapp_safe(to_number: str, message: str, *, tag: str = '', event: str = '', raise_errors: bool = False):
     if not _whatsapp_enabled():
         return
     try:
@@ -121,11 +127,16 @@ def _send_whatsapp_safe(to_number: str, message: str, *, tag: str = ''):
             if footer.lower() not in msg.lower():
                 msg = f'{msg}\n\n{footer}'.strip()
 
-        result = send_whatsapp(to_number, msg)
-        if not getattr(result, 'ok', False):
-            logger.info('whatsapp_send_failed tag=%s to=%s msg=%s', tag, to_number, getattr(result, 'message', ''))
+        # Queued in the caller's transaction; dispatch_outbound_messages delivers it.
+        # The same event (application + step + action) to the same recipient is sent
+        # once, so a double submit or repeated signal does not repeat it, while an
+        # identical text for another application or a later step still goes out.
+        dedupe_key = outbox.dedupe_key_for('app', tag, to_number, event) if event else None
+        outbox.enqueue_whatsapp(to_number, msg, tag=tag, dedupe_key=dedupe_key)
     except Exception:
-        logger.exception('whatsapp_send_exception tag=%s to=%s', tag, to_number)
+        if raise_errors:
+            raise
+        logger.exception('whatsapp_enqueue_exception tag=%s to=%s', tag, to_number)
 
 
 def _format_application_header(application: app_models.Application) -> str:
@@ -184,6 +195,7 @@ def notify_whatsapp_application_submitted(application: app_models.Application, f
         'current_role': step_role,
         'link': link,
     }
+    submit_event = _event_key(application, 'submit', getattr(step, 'pk', None))
 
     # Applicant confirmation - only if enabled in settings
     notify_applicant = True
@@ -202,7 +214,7 @@ def notify_whatsapp_application_submitted(application: app_models.Application, f
                 f'Status: Pending{(" at " + step_role) if step_role else ""}.\n'
                 f'{("Track: " + link) if link else ""}'
             ).strip()
-        _send_whatsapp_safe(to_applicant, msg, tag='application_submitted_applicant')
+        _send_whatsapp_safe(to_applicant, msg, tag='application_submitted_applicant', event=submit_event)
 
     # Approver notification - only if forward notifications enabled
     notify_approver = True
@@ -229,7 +241,7 @@ def notify_whatsapp_application_submitted(application: app_models.Application, f
                     f'Pending at: {step_role or "Your role"}\n'
                     f'{("Open: " + link) if link else ""}'
                 ).strip()
-            _send_whatsapp_safe(to, msg, tag='application_submitted_approver')
+            _send_whatsapp_safe(to, msg, tag='application_submitted_approver', event=submit_event)
 
 
 def notify_whatsapp_step_action(
@@ -327,6 +339,8 @@ def notify_whatsapp_step_action(
         'link': link,
     }
 
+    step_event = _event_key(application, action_norm, getattr(approved_step, 'pk', None))
+
     # Skip applicant status-change notification if the actor IS the applicant
     # (self-submit / starter step — submission notification already sent separately)
     applicant_user = getattr(application, 'applicant_user', None)
@@ -382,7 +396,7 @@ def notify_whatsapp_step_action(
                     f'{("Track: " + link) if link else ""}'
                 ).strip()
 
-        _send_whatsapp_safe(to_applicant, msg, tag=f'application_{action_norm.lower()}_applicant')
+        _send_whatsapp_safe(to_applicant, msg, tag=f'application_{action_norm.lower()}_applicant', event=step_event)
 
     # Also notify applicant about forward (if enabled separately)
     if action_norm == 'APPROVE' and next_step is not None and to_applicant and notify_forward:
@@ -390,7 +404,7 @@ def notify_whatsapp_step_action(
             forward_msg = _render_template(notification_settings.forward_applicant_template, context)
             # Only send if it's different from approval message (to avoid duplicate)
             if not (notify_status and notification_settings.approve_template):
-                _send_whatsapp_safe(to_applicant, forward_msg, tag='application_forward_applicant')
+                _send_whatsapp_safe(to_applicant, forward_msg, tag='application_forward_applicant', event=step_event)
 
     # Next approver heads-up (only on approve when a next step exists and forward notifications enabled)
     if action_norm == 'APPROVE' and next_step is not None and notify_forward:
@@ -414,7 +428,7 @@ def notify_whatsapp_step_action(
                         f'Pending at: {next_role or "Your role"}\n'
                         f'{("Open: " + link) if link else ""}'
                     ).strip()
-                _send_whatsapp_safe(to, msg, tag='application_next_approver')
+                _send_whatsapp_safe(to, msg, tag='application_next_approver', event=step_event)
 
 
 def _target_user_ids_for_step(application: app_models.Application, step) -> List[int]:
@@ -494,7 +508,8 @@ def notify_whatsapp_application_cancelled(application: app_models.Application, c
                 f'{header}\n'
                 f'{("View: " + link) if link else ""}'
             ).strip()
-        _send_whatsapp_safe(to_applicant, msg, tag='application_cancelled_applicant')
+        _send_whatsapp_safe(to_applicant, msg, tag='application_cancelled_applicant',
+                            event=_event_key(application, 'cancel'))
 
 
 def notify_application_submitted(application: app_models.Application):
@@ -540,9 +555,54 @@ def notify_application_override(application: app_models.Application, actor):
     _log('application_override', application, [uid] if uid else [], f'Override by user {uid}')
 
 
-def notify_application_escalation(application: app_models.Application, escalate_role):
+def notify_whatsapp_application_escalated(application: app_models.Application, escalate_role, *,
+                                          raise_errors: bool = False):
+    """Queue a WhatsApp to the concrete user behind `escalate_role` (HOD/AHOD/advisor...), if resolvable.
+
+    With `raise_errors`, a failure to resolve the approver or queue the message raises
+    instead of being logged; having nobody to message is not an error.
+    """
+    if not _whatsapp_enabled():
+        return
+
+    try:
+        from academics.services import authority_resolver
+
+        staff = authority_resolver.resolve_approver(str(getattr(escalate_role, 'name', '') or ''), application)
+    except Exception:
+        if raise_errors:
+            raise
+        staff = None
+    user = getattr(staff, 'user', None) if staff is not None else None
+    to = _resolve_whatsapp_number_for_user(user)
+    if not to:
+        return
+
+    step = getattr(application, 'current_step', None)
+    link = _frontend_application_link(getattr(application, 'pk', None))
+    msg = (
+        f'Hello {_display_name(user)},\n'
+        f'Approval SLA exceeded; this application has been escalated to you.\n'
+        f'{_format_application_header(application)}\n'
+        f'Applicant: {_display_name(getattr(application, "applicant_user", None))}\n'
+        f'Pending at: {getattr(getattr(step, "role", None), "name", "") or "Current step"}\n'
+        f'{("Open: " + link) if link else ""}'
+    ).strip()
+    # A refreshed SLA (new step_due_at) may escalate the same step again.
+    due_at = getattr(application, 'step_due_at', None)
+    event = _event_key(application, 'escalate', getattr(step, 'pk', None), due_at.isoformat() if due_at else '')
+    _send_whatsapp_safe(to, msg, tag='application_sla_escalated', event=event, raise_errors=raise_errors)
+
+
+def notify_application_escalation(application: app_models.Application, escalate_role, *, raise_errors: bool = False):
     """Notify that an application step was escalated to a role."""
     role_id = getattr(escalate_role, 'id', None)
     reason = f'Escalation to role {getattr(escalate_role, "name", None)}'
     # We cannot resolve concrete users here reliably; include role id in target_user_ids for now.
     _log('application_escalated', application, [role_id] if role_id else [], reason)
+    try:
+        notify_whatsapp_application_escalated(application, escalate_role, raise_errors=raise_errors)
+    except Exception:
+        if raise_errors:
+            raise
+        logger.exception('whatsapp_escalation_exception application=%s', getattr(application, 'pk', None))
@@ -0,0 +1,132 @@
+"""Two-level cache for approval resolution (flow, effective roles, HOD/AHOD, forms).
+
+`approval_engine` helpers are called many times per application and per list
+row (`user_can_act`, `get_current_approval_step`, serializers, inbox index).
+Their inputs change rarely, so results are cached at two levels:
+
+- request scope: a per-request dict (`request_scope()`, installed by
+  `erp.middleware.ResolutionCacheMiddleware`); repeated lookups in one request
+  cost nothing. Outside a scope (management commands) only Redis is used.
+- Redis: keyed by a namespace *generation*. Receivers in
+  `applications.signals` call `invalidate(namespace)` when the underlying
+  configuration changes, which switches to a new generation; old keys simply
+  expire.
+
+Namespaces:
+- FLOWS: flow selection and per-flow facts (steps, override roles, stage roles).
+- ROLES: effective roles / stage pins per user.
+- AUTHORITY: active academic year and HOD/AHOD per (department, academic year).
+- FORMS: active form version and live fields per application type (`form_schema`).
+
+Values must be picklable; store ids or small tuples rather than querysets.
+"""
+import hashlib
+import logging
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Hashable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+FLOWS = 'flows'
+ROLES = 'roles'
+AUTHORITY = 'authority'
+FORMS = 'forms'
+
+_PREFIX = 'resolution'
+_MISSING = object()
+
+_memo: ContextVar[Optional[dict]] = ContextVar('approval_resolution_memo', default=None)
+
+
+@contextmanager
+def request_scope():
+    """Enable the request-level memo for the enclosed block (nesting reuses the outer one)."""
+    if _memo.get() is not None:
+        yield
+        return
+    token = _memo.set({})
+    try:
+        yield
+    finally:
+        _memo.reset(token)
+
+
+def _timeout() -> int:
+    return int(getattr(settings, 'APPROVAL_RESOLUTION_CACHE_SECONDS', 600) or 600)
+
+
+def _gen_key(namespace: str) -> str:
+    return f'{_PREFIX}:gen:{namespace}'
+
+
+def _generation(namespace: str) -> str:
+    memo = _memo.get()
+    if memo is not None and (namespace, '__gen__') in memo:
+        return memo[(namespace, '__gen__')]
+    gen = cache.get(_gen_key(namespace))
+    if gen is None:
+        gen = uuid.uuid4().hex[:12]
+        # add() so concurrent first readers agree on one generation.
+        if not cache.add(_gen_key(namespace), gen, timeout=None):
+            gen = cache.get(_gen_key(namespace)) or gen
+    if memo is not None:
+        memo[(namespace, '__gen__')] = gen
+    return gen
+
+
+def memoize(namespace: str, key: Hashable, compute: Callable[[], Any]) -> Any:
+    """Request-scoped only (for values that are not worth a Redis round trip or not picklable)."""
+    memo = _memo.get()
+    if memo is None:
+        return compute()
+    memo_key = (namespace, key)
+    value = memo.get(memo_key, _MISSING)
+    if value is _MISSING:
+        value = compute()
+        memo[memo_key] = value
+    return value
+
+
+def cached(namespace: str, key: Hashable, compute: Callable[[], Any]) -> Any:
+    """Request memo, then Redis (current generation of `namespace`), then `compute()`."""
+
+    def _from_redis():
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        redis_key = f'{_PREFIX}:{namespace}:{_generation(namespace)}:{digest}'
+        hit = cache.get(redis_key)
+        if hit is not None:
+            # Stored as a 1-tuple so that a cached None is distinguishable from a miss.
+            return hit[0]
+        value = compute()
+        try:
+            cache.set(redis_key, (value,), timeout=_timeout())
+        except Exception:
+            logger.warning('Could not cache %s resolution %r', namespace, key, exc_info=True)
+        return value
+
+    return memoize(namespace, key, _from_redis)
+
+
+def _bump(namespace: str):
+    cache.set(_gen_key(namespace), uuid.uuid4().hex[:12], timeout=None)
+
+
+def invalidate(*namespaces: str):
+    """Drop cached resolutions of `namespaces` now and again after commit.
+
+    The post-commit bump discards values that concurrent requests computed from
+    pre-commit data while the writing transaction was still open.
+    """
+    memo = _memo.get()
+    for namespace in namespaces:
+        if memo is not None:
+            for memo_key in [k for k in memo if k[0] == namespace]:
+                del memo[memo_key]
+        _bump(namespace)
+        transaction.on_commit(lambda ns=namespace: _bump(ns))
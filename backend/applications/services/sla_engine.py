@@ -1,31 +1,49 @@
+import logging
+from dataclasses import dataclass
 from datetime import timedelta
-from typing import Optional
+from typing import Optional, Set
+
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
 from django.utils import timezone
 
 from applications import models as app_models
 from applications.services import notification_service
 
+logger = logging.getLogger(__name__)
+
+
+def compute_step_due_at(step, started_at) -> Optional[timezone.datetime]:
+    """Deadline for `step` when it became current at `started_at` (None when the step has no SLA)."""
+    if step is None or started_at is None or getattr(step, 'sla_hours', None) is None:
+        return None
+    return started_at + timedelta(hours=step.sla_hours)
+
+
+def _legacy_step_start(application: app_models.Application):
+    latest_action = application.actions.order_by('-acted_at').first()
+    if latest_action and latest_action.acted_at:
+        return latest_action.acted_at
+    if application.submitted_at:
+        return application.submitted_at
+    return application.created_at
+
 
 def get_step_deadline(application: app_models.Application) -> Optional[timezone.datetime]:
     """Return the datetime when the current step's SLA deadline elapses, or None.
 
-    Heuristic: use the latest ApprovalAction acted_at if present, else application.submitted_at,
-    else application.created_at as the step start time.
+    Uses the stored `step_due_at` when the step transition recorded it. Rows from
+    before that column existed fall back to the old heuristic: latest
+    ApprovalAction acted_at, else submitted_at, else created_at as the step start.
     """
     step = getattr(application, 'current_step', None)
     if step is None or getattr(step, 'sla_hours', None) is None:
         return None
 
-    # Determine start time
-    latest_action = application.actions.order_by('-acted_at').first()
-    if latest_action and latest_action.acted_at:
-        start = latest_action.acted_at
-    elif application.submitted_at:
-        start = application.submitted_at
-    else:
-        start = application.created_at
+    if getattr(application, 'step_started_at', None) is not None:
+        return application.step_due_at
 
-    return start + timedelta(hours=step.sla_hours)
+    return compute_step_due_at(step, _legacy_step_start(application))
 
 
 def is_step_overdue(application: app_models.Application) -> bool:
@@ -44,6 +62,8 @@ def escalate_overdue_application(application: app_models.Application) -> bool:
       send notification to escalation role (via notification_service.notify_application_escalation).
     - Do not auto-approve. Do not modify application state here.
     - Idempotent: calling multiple times will re-notify but will not change DB.
+
+    The scheduled path is `escalate_due_applications`, which notifies once per step.
     """
     step = getattr(application, 'current_step', None)
     if step is None:
@@ -67,3 +87,124 @@ def escalate_overdue_application(application: app_models.Application) -> bool:
         pass
 
     return True
+
+
+# ── Scheduler (set-based) ───────────────────────────────────────────────────
+
+@dataclass
+class EscalationStats:
+    escalated: int = 0
+    notify_errors: int = 0
+
+
+def overdue_queryset(now=None):
+    """IN_REVIEW rows whose current step is past due and not yet escalated (uses app_state_step_due_idx)."""
+    now = now or timezone.now()
+    return app_models.Application.objects.filter(
+        current_state=app_models.Application.ApplicationState.IN_REVIEW,
+        step_due_at__lte=now,
+        sla_escalated_at__isnull=True,
+        current_step__escalate_to_role__isnull=False,
+    )
+
+
+def escalate_due_applications(now=None, batch_size: int = 200) -> EscalationStats:
+    """Escalate every overdue step exactly once.
+
+    Each batch is claimed with `SELECT ... FOR UPDATE SKIP LOCKED`; every row's
+    notification is queued (outbox) in the batch transaction and only the rows
+    whose notification was queued are stamped with `sla_escalated_at`, in one
+    UPDATE before the commit. Overlapping runs never double-notify, and a row
+    whose notification failed stays due for the next run (it is skipped for
+    the rest of this one).
+    """
+    now = now or timezone.now()
+    stats = EscalationStats()
+    failed_ids: Set[int] = set()
+    while True:
+        with transaction.atomic():
+            batch = list(
+                overdue_queryset(now)
+                .exclude(id__in=failed_ids)
+                .select_for_update(skip_locked=True, of=('self',))
+                .select_related(
+                    'application_type',
+                    'applicant_user',
+                    'student_profile__section__batch__course__department',
+                    'student_profile__home_department',
+                    'staff_profile__department',
+                    'current_step__role',
+                    'current_step__escalate_to_role',
+                )
+                .order_by('step_due_at', 'id')[:batch_size]
+            )
+            if not batch:
+                return stats
+            escalated_ids = []
+            for application in batch:
+                try:
+                    with transaction.atomic():
+                        notification_service.notify_application_escalation(
+                            application, application.current_step.escalate_to_role, raise_errors=True,
+                        )
+                except Exception:
+                    logger.exception('SLA escalation notification failed for application %s', application.id)
+                    stats.notify_errors += 1
+                    failed_ids.add(application.id)
+                    continue
+                escalated_ids.append(application.id)
+            if escalated_ids:
+                app_models.Application.objects.filter(id__in=escalated_ids).update(sla_escalated_at=now)
+            stats.escalated += len(escalated_ids)
+        if len(batch) < batch_size:
+            return stats
+
+
+def refresh_due_for_step(step) -> int:
+    """Re-derive `step_due_at` for applications sitting on `step` (after its sla_hours changed).
+
+    A row whose new deadline is still ahead has its `sla_escalated_at` cleared,
+    so it escalates again if the extended SLA also runs out.
+    """
+    qs = app_models.Application.objects.filter(
+        current_state=app_models.Application.ApplicationState.IN_REVIEW,
+        current_step_id=step.pk,
+        step_started_at__isnull=False,
+    )
+    if getattr(step, 'sla_hours', None) is None:
+        return qs.exclude(step_due_at__isnull=True, sla_escalated_at__isnull=True).update(
+            step_due_at=None, sla_escalated_at=None,
+        )
+    sla = timedelta(hours=step.sla_hours)
+    return qs.update(
+        step_due_at=F('step_started_at') + sla,
+        sla_escalated_at=Case(
+            When(Q(step_started_at__gt=timezone.now() - sla), then=Value(None)),
+            default=F('sla_escalated_at'),
+        ),
+    )
+
+
+def backfill_step_due(batch_size: int = 500) -> int:
+    """Fill step_started_at/step_due_at for IN_REVIEW rows that predate the columns."""
+    qs = (
+        app_models.Application.objects.filter(
+            current_state=app_models.Application.ApplicationState.IN_REVIEW,
+            current_step__isnull=False,
+            step_started_at__isnull=True,
+        )
+        .select_related('current_step')
+        .order_by('id')
+    )
+    done = 0
+    last_id = 0
+    while True:
+        batch = list(qs.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            return done
+        for application in batch:
+            application.step_started_at = _legacy_step_start(application)
+            application.step_due_at = compute_step_due_at(application.current_step, application.step_started_at)
+        app_models.Application.objects.bulk_update(batch, ['step_started_at', 'step_due_at'])
+        done += len(batch)
+        last_id = batch[-1].id
@@ -0,0 +1,387 @@
+"""Keep the approver inbox index (`ApproverInboxEntry`), the application list
+read-model (`ApplicationListEntry`) and the approval resolution cache
+(`resolution_cache`) in sync.
+
+Refreshes run after commit and never fail the triggering write; the indexes can
+always be rebuilt with `python manage.py rebuild_approver_inbox` and
+`python manage.py rebuild_application_list`. Bulk
+`QuerySet.update()` calls bypass these receivers — rebuild after those (cached
+resolutions also expire after `APPROVAL_RESOLUTION_CACHE_SECONDS`), or, for
+applicant section/department changes, call `refresh_inbox_for_profiles`.
+"""
+import logging
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from academics.models import (
+    AcademicYear,
+    DepartmentRole,
+    RoleAssignment,
+    SectionAdvisor,
+    StaffProfile,
+    StudentMentorMap,
+    StudentProfile,
+)
+from accounts.models import Role, UserRole
+from applications import models as app_models
+from applications.services import resolution_cache
+from applications.services.resolution_cache import AUTHORITY, FLOWS, FORMS, ROLES
+
+logger = logging.getLogger(__name__)
+
+
+def _refresh_after_commit(get_application_ids):
+    """Defer a refresh of the applications returned by `get_application_ids()`."""
+
+    def _run():
+        from applications.services import inbox_index
+
+        try:
+            inbox_index.refresh_applications(get_application_ids())
+        except Exception:
+            logger.exception('Approver inbox index refresh failed')
+
+    transaction.on_commit(_run)
+
+
+def _refresh_pending(extra_filter=None):
+    from applications.services import inbox_index
+
+    _refresh_after_commit(lambda: inbox_index.pending_application_ids(extra_filter))
+
+
+# ── Application state / step changes ────────────────────────────────────────
+
+@receiver(post_save, sender=app_models.Application)
+def refresh_inbox_for_application(sender, instance, **kwargs):
+    application_id = instance.pk
+    _refresh_after_commit(lambda: [application_id])
+
+
+# ── Application list read-model ─────────────────────────────────────────────
+
+def _refresh_list_after_commit(application_id):
+    """Queue `application_id` for a list-row refresh; one refresh per id per commit."""
+    if not application_id:
+        return
+    connection = transaction.get_connection()
+    pending = connection.__dict__.setdefault('_application_list_pending', set())
+    pending.add(application_id)
+
+    def _run():
+        ids = set(pending)
+        pending.clear()
+        if not ids:
+            return
+        from applications.services import list_projection
+
+        try:
+            list_projection.refresh_applications(ids)
+        except Exception:
+            logger.exception('Application list read-model refresh failed')
+
+    transaction.on_commit(_run)
+
+
+@receiver(post_save, sender=app_models.Application)
+def refresh_list_for_application(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _refresh_list_after_commit(instance.pk)
+
+
+@receiver(post_save, sender=app_models.ApprovalAction)
+@receiver(post_delete, sender=app_models.ApprovalAction)
+@receiver(post_save, sender=app_models.ApplicationAttachment)
+@receiver(post_delete, sender=app_models.ApplicationAttachment)
+@receiver(post_save, sender=app_models.ApplicationData)
+@receiver(post_delete, sender=app_models.ApplicationData)
+def refresh_list_for_application_child(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _refresh_list_after_commit(instance.application_id)
+
+
+# ── Flow configuration (scoped to the application type) ─────────────────────
+
+def _refresh_application_type(application_type_id):
+    if application_type_id:
+        _refresh_pending(Q(application_type_id=application_type_id))
+
+
+@receiver(post_save, sender=app_models.ApprovalFlow)
+@receiver(post_delete, sender=app_models.ApprovalFlow)
+@receiver(post_save, sender=app_models.RoleApplicationPermission)
+@receiver(post_delete, sender=app_models.RoleApplicationPermission)
+def refresh_inbox_for_flow_config(sender, instance, **kwargs):
+    _refresh_application_type(instance.application_type_id)
+
+
+@receiver(m2m_changed, sender=app_models.ApprovalFlow.override_roles.through)
+def refresh_inbox_for_override_roles(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear') and isinstance(instance, app_models.ApprovalFlow):
+        _refresh_application_type(instance.application_type_id)
+
+
+@receiver(post_save, sender=app_models.ApprovalStep)
+@receiver(post_delete, sender=app_models.ApprovalStep)
+def refresh_inbox_for_step(sender, instance, **kwargs):
+    flow = app_models.ApprovalFlow.objects.filter(pk=instance.approval_flow_id).values_list('application_type_id', flat=True).first()
+    _refresh_application_type(flow)
+
+
+@receiver(post_save, sender=app_models.ApplicationRoleHierarchyStageRole)
+@receiver(post_delete, sender=app_models.ApplicationRoleHierarchyStageRole)
+@receiver(post_save, sender=app_models.ApplicationRoleHierarchyStageUser)
+@receiver(post_delete, sender=app_models.ApplicationRoleHierarchyStageUser)
+def refresh_inbox_for_stage_membership(sender, instance, **kwargs):
+    application_type_id = (
+        app_models.ApplicationRoleHierarchyStage.objects.filter(pk=instance.stage_id)
+        .values_list('application_type_id', flat=True)
+        .first()
+    )
+    _refresh_application_type(application_type_id)
+
+
+# ── Authority mappings (mentor / advisor / HOD / AHOD) ──────────────────────
+
+@receiver(post_save, sender=StudentMentorMap)
+@receiver(post_delete, sender=StudentMentorMap)
+def refresh_inbox_for_mentor(sender, instance, **kwargs):
+    student_id = instance.student_id
+    _refresh_pending(Q(student_profile_id=student_id) | Q(applicant_user__student_profile__id=student_id))
+
+
+@receiver(post_save, sender=SectionAdvisor)
+@receiver(post_delete, sender=SectionAdvisor)
+def refresh_inbox_for_advisor(sender, instance, **kwargs):
+    section_id = instance.section_id
+    _refresh_pending(Q(student_profile__section_id=section_id) | Q(applicant_user__student_profile__section_id=section_id))
+
+
+@receiver(post_save, sender=DepartmentRole)
+@receiver(post_delete, sender=DepartmentRole)
+def refresh_inbox_for_department_role(sender, instance, **kwargs):
+    dept_id = instance.department_id
+    _refresh_pending(
+        Q(student_profile__section__batch__course__department_id=dept_id)
+        | Q(student_profile__home_department_id=dept_id)
+        | Q(applicant_user__student_profile__section__batch__course__department_id=dept_id)
+        | Q(applicant_user__student_profile__home_department_id=dept_id)
+        | Q(staff_profile__department_id=dept_id)
+        | Q(applicant_user__staff_profile__department_id=dept_id)
+    )
+
+
+def refresh_inbox_for_profiles(student_ids=(), staff_ids=()):
+    """Re-index the pending applications of these applicants once the transaction commits.
+
+    Their mentor/advisor/HOD depends on the applicant's section and department;
+    code that changes those with `QuerySet.update()` calls this itself.
+    """
+    student_ids = [pk for pk in student_ids if pk]
+    staff_ids = [pk for pk in staff_ids if pk]
+    condition = Q()
+    if student_ids:
+        condition |= Q(student_profile_id__in=student_ids) | Q(applicant_user__student_profile__id__in=student_ids)
+    if staff_ids:
+        condition |= Q(staff_profile_id__in=staff_ids) | Q(applicant_user__staff_profile__id__in=staff_ids)
+    if condition:
+        _refresh_pending(condition)
+
+
+_APPLICANT_SCOPE_FIELDS = {'section', 'section_id', 'home_department', 'home_department_id', 'department', 'department_id'}
+
+
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_save, sender=StaffProfile)
+def refresh_inbox_for_profile(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and not _APPLICANT_SCOPE_FIELDS.intersection(update_fields)):
+        return
+    if sender is StudentProfile:
+        refresh_inbox_for_profiles(student_ids=[instance.pk])
+    else:
+        refresh_inbox_for_profiles(staff_ids=[instance.pk])
+
+
+@receiver(pre_save, sender=AcademicYear)
+def remember_academic_year_active_flag(sender, instance, update_fields=None, **kwargs):
+    if not instance.pk or (update_fields is not None and 'is_active' not in update_fields):
+        return
+    instance._inbox_was_active = (
+        sender.objects.filter(pk=instance.pk).values_list('is_active', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=AcademicYear)
+def refresh_inbox_for_academic_year(sender, instance, created, **kwargs):
+    # Advisor/HOD mappings are year-scoped and resolved against the active year,
+    # so switching it re-resolves every pending application: too much for the
+    # saving request, left to `rebuild_approver_inbox --if-requested`.
+    was_active = getattr(instance, '_inbox_was_active', None)
+    if created:
+        if not instance.is_active:
+            return
+    elif was_active is None or bool(was_active) == bool(instance.is_active):
+        return
+
+    def _request():
+        from applications.services import inbox_index
+
+        try:
+            inbox_index.request_rebuild()
+        except Exception:
+            logger.exception('Approver inbox rebuild request failed')
+
+    transaction.on_commit(_request)
+
+
+# ── Approver availability (is_active) ───────────────────────────────────────
+
+@receiver(pre_save, sender=get_user_model())
+def remember_user_active_flag(sender, instance, update_fields=None, **kwargs):
+    if not instance.pk or (update_fields is not None and 'is_active' not in update_fields):
+        return
+    instance._inbox_was_active = (
+        sender.objects.filter(pk=instance.pk).values_list('is_active', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=get_user_model())
+def refresh_inbox_for_user_active(sender, instance, created, **kwargs):
+    was_active = getattr(instance, '_inbox_was_active', None)
+    if created or was_active is None or bool(was_active) == bool(instance.is_active):
+        return
+    # Only applications this user applied for or is indexed on move; a
+    # reactivated approver may also take over steps with no resolved approver.
+    condition = Q(inbox_entries__user_id=instance.pk) | Q(applicant_user_id=instance.pk)
+    if instance.is_active:
+        condition |= ~Exists(app_models.ApproverInboxEntry.objects.filter(
+            application_id=OuterRef('pk'),
+            kind=app_models.ApproverInboxEntry.Kind.APPROVER,
+        ))
+    _refresh_pending(condition)
+
+
+# ── Resolution cache (flow selection, effective roles, HOD/AHOD) ────────────
+
+def _invalidate(*namespaces):
+    try:
+        resolution_cache.invalidate(*namespaces)
+    except Exception:
+        logger.exception('Approval resolution cache invalidation failed')
+
+
+@receiver(post_save, sender=app_models.ApprovalFlow)
+@receiver(post_delete, sender=app_models.ApprovalFlow)
+@receiver(post_save, sender=app_models.ApprovalStep)
+@receiver(post_delete, sender=app_models.ApprovalStep)
+@receiver(post_save, sender=app_models.RoleApplicationPermission)
+@receiver(post_delete, sender=app_models.RoleApplicationPermission)
+@receiver(post_save, sender=app_models.ApplicationRoleHierarchy)
+@receiver(post_delete, sender=app_models.ApplicationRoleHierarchy)
+@receiver(post_save, sender=app_models.ApplicationRoleHierarchyStage)
+@receiver(post_delete, sender=app_models.ApplicationRoleHierarchyStage)
+@receiver(post_save, sender=app_models.ApplicationRoleHierarchyStageRole)
+@receiver(post_delete, sender=app_models.ApplicationRoleHierarchyStageRole)
+def invalidate_flow_resolution(sender, **kwargs):
+    _invalidate(FLOWS)
+
+
+@receiver(m2m_changed, sender=app_models.ApprovalFlow.override_roles.through)
+def invalidate_flow_override_roles(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        _invalidate(FLOWS)
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def invalidate_role_resolution(sender, **kwargs):
+    # Role names feed both effective-role sets and flow starter matching.
+    _invalidate(FLOWS, ROLES)
+
+
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+@receiver(post_save, sender=RoleAssignment)
+@receiver(post_delete, sender=RoleAssignment)
+@receiver(post_save, sender=app_models.ApplicationRoleHierarchyStageUser)
+@receiver(post_delete, sender=app_models.ApplicationRoleHierarchyStageUser)
+def invalidate_user_role_resolution(sender, **kwargs):
+    _invalidate(ROLES)
+
+
+@receiver(m2m_changed, sender=UserRole)
+def invalidate_user_roles_m2m(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        _invalidate(ROLES)
+
+
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_save, sender=StaffProfile)
+def invalidate_profile_resolution(sender, created, **kwargs):
+    # Having a student/staff profile is part of the applicant role signature.
+    if created:
+        _invalidate(ROLES)
+
+
+@receiver(post_delete, sender=StudentProfile)
+@receiver(post_delete, sender=StaffProfile)
+def invalidate_deleted_profile_resolution(sender, **kwargs):
+    _invalidate(ROLES)
+
+
+@receiver(post_save, sender=DepartmentRole)
+@receiver(post_delete, sender=DepartmentRole)
+def invalidate_department_role_resolution(sender, **kwargs):
+    _invalidate(ROLES, AUTHORITY)
+
+
+@receiver(post_save, sender=AcademicYear)
+@receiver(post_delete, sender=AcademicYear)
+def invalidate_academic_year_resolution(sender, **kwargs):
+    _invalidate(AUTHORITY)
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_authority_for_user_active(sender, instance, created, **kwargs):
+    # HOD/AHOD resolution skips inactive staff users.
+    was_active = getattr(instance, '_inbox_was_active', None)
+    if created or was_active is None or bool(was_active) == bool(instance.is_active):
+        return
+    _invalidate(AUTHORITY)
+
+
+@receiver(post_save, sender=app_models.ApplicationField)
+@receiver(post_delete, sender=app_models.ApplicationField)
+@receiver(post_save, sender=app_models.ApplicationFormVersion)
+@receiver(post_delete, sender=app_models.ApplicationFormVersion)
+def invalidate_form_schema(sender, **kwargs):
+    from applications.services import form_schema
+
+    form_schema.clear_compiled()
+    _invalidate(FORMS)
+
+
+# ── SLA deadlines ───────────────────────────────────────────────────────────
+
+@receiver(pre_save, sender=app_models.ApprovalStep)
+def remember_step_sla(sender, instance, **kwargs):
+    instance._previous_sla_hours = (
+        sender.objects.filter(pk=instance.pk).values_list('sla_hours', flat=True).first() if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=app_models.ApprovalStep)
+def refresh_step_due_at(sender, instance, created, **kwargs):
+    # Keep Application.step_due_at consistent when a step's SLA is edited.
+    if created or getattr(instance, '_previous_sla_hours', None) == instance.sla_hours:
+        return
+    from applications.services import sla_engine
+
+    try:
+        sla_engine.refresh_due_for_step(instance)
+    except Exception:
+        logger.exception('SLA deadline refresh failed for step %s', instance.pk)
@@ -1,8 +1,11 @@
+from datetime import datetime, time, timedelta
 from typing import Any
 
 from django.db import transaction
 from django.db.models import Count, Prefetch, Q, ProtectedError
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from rest_framework import status
 from rest_framework.permissions import BasePermission, IsAuthenticated
 from rest_framework.response import Response
@@ -10,7 +13,8 @@ from rest_framework.views import APIView
 
 from accounts.models import Role
 from applications import models as app_models
-from applications.services import application_state
+from applications.services import application_state, list_projection
+from applications.views.application_views import ApplicationListCursorPagination, wants_cursor_page
 
 
 def _is_iqac(user) -> bool:
@@ -1007,36 +1011,75 @@ class ApplicationsAdminUserSearchView(IQACOnlyAPIView):
         return Response(rows)
 
 
+def _submission_payload(entry: app_models.ApplicationListEntry) -> dict[str, Any]:
+    return {
+        'id': entry.application_id,
+        'application_type_id': entry.application_type_id,
+        'application_type_name': entry.application_type_name or None,
+        'applicant_username': entry.applicant_username or None,
+        'applicant_name': entry.applicant_name or None,
+        'applicant_identifier': entry.applicant_identifier or None,
+        'department_id': entry.department_id,
+        'department_name': entry.department_name or None,
+        'current_state': entry.current_state,
+        'status': entry.status,
+        'current_step_role': entry.current_step_label or None,
+        'last_action': entry.last_action or None,
+        'last_action_by': entry.last_action_by_name or None,
+        'last_action_at': entry.last_action_at,
+        'attachments_count': entry.attachments_count,
+        'history_count': entry.history_count,
+        'gatepass_window_start': entry.gatepass_window_start,
+        'gatepass_window_end': entry.gatepass_window_end,
+        'gatepass_scanned_at': entry.gatepass_scanned_at,
+        'gatepass_in_scanned_at': entry.gatepass_in_scanned_at,
+        'submitted_at': entry.submitted_at,
+        'created_at': entry.created_at,
+    }
+
+
 class ApplicationsAdminSubmissionListView(IQACOnlyAPIView):
+    """Submissions from the `ApplicationListEntry` read-model.
+
+    Filters: application_type_id, state, department_id, q (applicant username or
+    reg no/staff id prefix), created_from/created_to (ISO dates). Without a
+    `cursor`/`page_size` parameter the latest 100 rows are returned as a plain
+    list (legacy shape); otherwise a cursor page.
+    """
+
     def get(self, request, *args, **kwargs):
-        qs = app_models.Application.objects.select_related('application_type', 'applicant_user', 'current_step__role', 'current_step__stage').order_by('-created_at')
-        type_id = request.query_params.get('application_type_id')
+        # Applications written before the read-model existed are projected on first view.
+        missing = list_projection.unprojected_application_ids()
+        if missing:
+            list_projection.refresh_applications(missing)
+
+        qs = app_models.ApplicationListEntry.objects.order_by('-created_at', '-application_id')
+        params = request.query_params
+        type_id = params.get('application_type_id')
         if type_id:
             qs = qs.filter(application_type_id=type_id)
-        state = request.query_params.get('state')
+        state = params.get('state')
         if state:
             qs = qs.filter(current_state=state)
-
-        rows = []
-        for app in qs[:100]:
-            rows.append({
-                'id': app.id,
-                'application_type_id': app.application_type_id,
-                'application_type_name': app.application_type.name if app.application_type else None,
-                'applicant_username': getattr(app.applicant_user, 'username', None),
-                'current_state': app.current_state,
-                'status': app.status,
-                'current_step_role': (
-                    getattr(getattr(app.current_step, 'stage', None), 'name', None)
-                    if getattr(app.current_step, 'stage_id', None)
-                    else getattr(getattr(app.current_step, 'role', None), 'name', None)
-                ),
-                'attachments_count': app.attachments.filter(is_deleted=False).count(),
-                'history_count': app.actions.count(),
-                'submitted_at': app.submitted_at,
-                'created_at': app.created_at,
-            })
-        return Response(rows)
+        department_id = params.get('department_id')
+        if department_id:
+            qs = qs.filter(department_id=department_id)
+        q = str(params.get('q') or '').strip()
+        if q:
+            qs = qs.filter(Q(applicant_username__istartswith=q) | Q(applicant_identifier__istartswith=q))
+        # Local-day bounds as datetimes so the created_at indexes stay usable.
+        created_from = parse_date(str(params.get('created_from') or ''))
+        if created_from:
+            qs = qs.filter(created_at__gte=timezone.make_aware(datetime.combine(created_from, time.min)))
+        created_to = parse_date(str(params.get('created_to') or ''))
+        if created_to:
+            qs = qs.filter(created_at__lt=timezone.make_aware(datetime.combine(created_to + timedelta(days=1), time.min)))
+
+        if wants_cursor_page(request):
+            paginator = ApplicationListCursorPagination()
+            page = paginator.paginate_queryset(qs, request, view=self)
+            return paginator.get_paginated_response([_submission_payload(entry) for entry in page])
+        return Response([_submission_payload(entry) for entry in qs[:100]])
 
 
 def _notification_settings_payload(settings: app_models.ApplicationNotificationSettings) -> dict[str, Any]:
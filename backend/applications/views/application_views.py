@@ -7,6 +7,7 @@ from django.db import transaction
 from django.db.models import Q
 from django.utils import timezone
 from rest_framework import status
+from rest_framework.pagination import CursorPagination
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -16,6 +17,7 @@ from applications import models as app_models
 from applications.serializers import (
     ApplicationCreateSerializer,
     ApplicationListSerializer,
+    ApplicationListEntrySerializer,
     ApplicationDetailSerializer,
     ApprovalActionSerializer,
 )
@@ -24,6 +26,7 @@ from applications.services import approval_engine
 from applications.services import approver_resolver
 from applications.services import access_control
 from applications.services import application_state as app_state_svc
+from applications.services import list_projection
 from applications.serializers.approval import ApplicationApprovalHistorySerializer
 
 User = get_user_model()
@@ -193,21 +196,45 @@ class CreateApplicationView(APIView):
         return Response({'id': application.id, 'status': application.status}, status=status.HTTP_201_CREATED)
 
 
+class ApplicationListCursorPagination(CursorPagination):
+    """Keyset pages over `ApplicationListEntry` (newest first)."""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-created_at', '-application_id')
+
+
+def wants_cursor_page(request) -> bool:
+    """List endpoints keep returning a plain array unless a page is requested."""
+    return 'cursor' in request.query_params or 'page_size' in request.query_params
+
+
 class MyApplicationsView(APIView):
     permission_classes = (IsAuthenticated,)
 
     def get(self, request, *args, **kwargs):
-        qs = (
-            app_models.Application.objects
-            .filter(
-                Q(applicant_user=request.user)
-                | Q(student_profile__user=request.user)
-                | Q(staff_profile__user=request.user)
-            )
-            .distinct()
-            .order_by('-created_at')
+        owner = (
+            Q(applicant_user=request.user)
+            | Q(student_profile__user=request.user)
+            | Q(staff_profile__user=request.user)
+        )
+        # Applications written before the read-model existed are projected on first view.
+        missing = list(
+            app_models.Application.objects.filter(owner, list_entry__isnull=True).values_list('id', flat=True).distinct()
         )
-        serializer = ApplicationListSerializer(qs, many=True)
+        if missing:
+            list_projection.refresh_applications(missing)
+
+        qs = app_models.ApplicationListEntry.objects.filter(
+            Q(applicant_user=request.user)
+            | Q(application__student_profile__user=request.user)
+            | Q(application__staff_profile__user=request.user)
+        ).order_by('-created_at', '-application_id')
+        if wants_cursor_page(request):
+            paginator = ApplicationListCursorPagination()
+            page = paginator.paginate_queryset(qs, request, view=self)
+            return paginator.get_paginated_response(ApplicationListEntrySerializer(page, many=True).data)
+        serializer = ApplicationListEntrySerializer(qs, many=True)
         return Response(serializer.data)
 
 
@@ -1,3 +1,5 @@
+import os
+
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -6,8 +8,9 @@ from rest_framework import status
 from django.shortcuts import get_object_or_404
 
 from applications import models as app_models
-from applications.services import attachment_service
+from applications.services import access_control, attachment_service
 from applications.serializers.attachment import ApplicationAttachmentSerializer, ApplicationAttachmentCreateSerializer
+from erp.file_serving import serve_file
 
 
 class ApplicationAttachmentListCreateView(APIView):
@@ -44,3 +47,37 @@ class ApplicationAttachmentDeleteView(APIView):
         attachment.is_deleted = True
         attachment.save(update_fields=['is_deleted'])
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def _download_filename(attachment) -> str:
+    # Content-addressed uploads are stored as <sha256><ext>; name the download after the label.
+    ext = os.path.splitext(attachment.file.name or '')[1]
+    label = (attachment.label or '').strip()
+    if not label:
+        return f'attachment-{attachment.id}{ext}'
+    if ext and not label.lower().endswith(ext.lower()):
+        return f'{label}{ext}'
+    return label
+
+
+class ApplicationAttachmentDownloadView(APIView):
+    """Authorized attachment download; bytes are served by nginx when X-Accel-Redirect is enabled."""
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, id: int, *args, **kwargs):
+        attachment = get_object_or_404(
+            app_models.ApplicationAttachment.objects.select_related('application'), pk=id, is_deleted=False
+        )
+        if not access_control.can_user_view_application(attachment.application, request.user):
+            return Response({'detail': 'Not authorized to view this attachment'}, status=status.HTTP_403_FORBIDDEN)
+        if not attachment.file:
+            return Response({'detail': 'Attachment file is missing.'}, status=status.HTTP_404_NOT_FOUND)
+
+        inline = str(request.query_params.get('inline', '') or '').strip().lower() in {'1', 'true', 'yes'}
+        return serve_file(
+            request,
+            attachment.file,
+            _download_filename(attachment),
+            as_attachment=not inline,
+            digest=attachment.sha256 or None,
+        )
@@ -0,0 +1,180 @@
+"""Shared storage and download helpers for uploaded media.
+
+Uploads
+    `store_content_addressed` hashes an upload while streaming its chunks and
+    stores it under `<prefix>/<sha256[:2]>/<sha256><ext>`. Identical content is
+    stored once; later uploads reuse the existing name. Rows that point at a
+    shared name must be deleted with `delete_if_unreferenced`.
+
+Downloads
+    `serve_file` returns the response for an already-authorized download:
+
+    - with FILE_SERVING_X_ACCEL_REDIRECT enabled, an empty response carrying
+      `X-Accel-Redirect`; nginx streams the bytes from its `internal`
+      /protected-media/ location (deploy/nginx_idcs.conf) and answers Range
+      requests itself, so gunicorn workers never read the file;
+    - otherwise a FileResponse, or a 206 partial response when the request
+      carries a single satisfiable `Range: bytes=...` header.
+"""
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+_CHUNK_SIZE = 64 * 1024
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def sha256_of(upload) -> str:
+    """Hash an uploaded file chunk by chunk and rewind it."""
+    digest = hashlib.sha256()
+    for chunk in upload.chunks(chunk_size=_CHUNK_SIZE):
+        digest.update(chunk)
+    upload.seek(0)
+    return digest.hexdigest()
+
+
+def content_address(prefix: str, digest: str, filename: str) -> str:
+    ext = os.path.splitext(filename or '')[1].lower()[:16]
+    return f"{prefix.strip('/')}/{digest[:2]}/{digest}{ext}"
+
+
+def store_content_addressed(upload, prefix: str, storage=None) -> Tuple[str, str]:
+    """Store `upload` once per content hash; returns (storage name, sha256)."""
+    storage = storage or default_storage
+    digest = sha256_of(upload)
+    name = content_address(prefix, digest, getattr(upload, 'name', ''))
+    if not storage.exists(name):
+        # A concurrent upload of the same bytes makes storage pick a suffixed
+        # name; that copy is simply not shared.
+        name = storage.save(name, upload)
+    return name, digest
+
+
+def delete_if_unreferenced(field_file, model, exclude_pk=None) -> bool:
+    """Delete `field_file` from storage unless another `model` row still uses it."""
+    name = getattr(field_file, 'name', '') or ''
+    if not name:
+        return False
+    field_name = field_file.field.name
+    others = model._default_manager.filter(**{field_name: name})
+    if exclude_pk is not None:
+        others = others.exclude(pk=exclude_pk)
+    if others.exists():
+        return False
+    field_file.storage.delete(name)
+    return True
+
+
+def _x_accel_enabled(storage) -> bool:
+    return bool(getattr(settings, 'FILE_SERVING_X_ACCEL_REDIRECT', False)) and isinstance(storage, FileSystemStorage)
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Return (start, end) inclusive for a single byte range, or None to serve the whole file.
+
+    Raises ValueError when the range cannot be satisfied.
+    """
+    match = _RANGE_RE.match((header or '').strip())
+    if not match or size <= 0:
+        # Multi-range, malformed and empty-file requests get a full response.
+        return None
+    first, last = match.groups()
+    if first == '' and last == '':
+        return None
+    if first == '':
+        length = int(last)
+        if length == 0:
+            raise ValueError('empty suffix range')
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError('range not satisfiable')
+    return start, min(end, size - 1)
+
+
+def _iter_range(handle, start: int, length: int):
+    try:
+        handle.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = handle.read(min(_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        handle.close()
+
+
+def _etag(digest: Optional[str]) -> Optional[str]:
+    return f'"{digest}"' if digest else None
+
+
+def serve_file(request, field_file, filename: str, *, as_attachment: bool = True,
+               content_type: Optional[str] = None, digest: Optional[str] = None):
+    """Return the download response for `field_file`; callers have already authorized it."""
+    if not content_type:
+        guessed, _ = mimetypes.guess_type(filename)
+        content_type = guessed or 'application/octet-stream'
+    disposition = content_disposition_header(as_attachment, filename)
+    etag = _etag(digest)
+    storage = field_file.storage
+
+    if _x_accel_enabled(storage):
+        prefix = getattr(settings, 'FILE_SERVING_X_ACCEL_PREFIX', '/protected-media/')
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(field_file.name)
+        response['Cache-Control'] = 'private'
+        if disposition:
+            response['Content-Disposition'] = disposition
+        if etag:
+            response['ETag'] = etag
+        return response
+
+    size = field_file.size
+    range_header = request.META.get('HTTP_RANGE', '')
+    if_range = request.META.get('HTTP_IF_RANGE', '')
+    if range_header and (not if_range or (etag and if_range == etag)):
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            response['Accept-Ranges'] = 'bytes'
+            return response
+        if byte_range is not None:
+            start, end = byte_range
+            length = end - start + 1
+            response = StreamingHttpResponse(
+                _iter_range(field_file.open('rb'), start, length),
+                status=206,
+                content_type=content_type,
+            )
+            response['Content-Length'] = str(length)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Accept-Ranges'] = 'bytes'
+            if disposition:
+                response['Content-Disposition'] = disposition
+            if etag:
+                response['ETag'] = etag
+            return response
+
+    response = FileResponse(
+        field_file.open('rb'),
+        as_attachment=as_attachment,
+        filename=filename,
+        content_type=content_type,
+    )
+    response['Accept-Ranges'] = 'bytes'
+    if etag:
+        response['ETag'] = etag
+    return response
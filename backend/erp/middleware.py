@@ -32,3 +32,16 @@ class SlowRequestLoggingMiddleware:
                 getattr(getattr(request, 'user', None), 'username', 'anonymous') if getattr(request, 'user', None) and getattr(request.user, 'is_authenticated', False) else 'anonymous',
             )
         return response
+
+
+class ResolutionCacheMiddleware:
+    """Scope the approval resolution memo (`applications.services.resolution_cache`) to one request."""
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest):
+        from applications.services import resolution_cache
+
+        with resolution_cache.request_scope():
+            return self.get_response(request)
@@ -97,6 +97,7 @@ MIDDLEWARE = [
     'erp.middleware.SlowRequestLoggingMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'erp.middleware.ResolutionCacheMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -221,6 +222,18 @@ else:
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Authorized downloads (erp.file_serving). When enabled, Django only checks access
+# and nginx streams the file from its internal /protected-media/ location
+# (deploy/nginx_idcs.conf), including Range requests. Leave off when the app is
+# not behind that nginx config (e.g. runserver).
+FILE_SERVING_X_ACCEL_REDIRECT = os.getenv('FILE_SERVING_X_ACCEL_REDIRECT', '0') == '1'
+FILE_SERVING_X_ACCEL_PREFIX = os.getenv('FILE_SERVING_X_ACCEL_PREFIX', '/protected-media/')
+
+# Study material download audit rows are queued in Redis and written in batches
+# by `manage.py drain_download_logs` (deploy/systemd/download-logs.timer). Set to
+# 0 where that timer does not run; rows are then inserted per download.
+LMS_DOWNLOAD_LOG_QUEUE = os.getenv('LMS_DOWNLOAD_LOG_QUEUE', '1') == '1'
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'accounts.User'
@@ -442,6 +455,59 @@ OBE_WHATSAPP_ALLOW_NON_LOCAL_URL = os.getenv('OBE_WHATSAPP_ALLOW_NON_LOCAL_URL',
 # Enable by setting: APPLICATION_WHATSAPP_NOTIFICATIONS_ENABLED=1
 APPLICATION_WHATSAPP_NOTIFICATIONS_ENABLED = os.getenv('APPLICATION_WHATSAPP_NOTIFICATIONS_ENABLED', '0') == '1'
 
+# Outbound message queue (accounts.OutboundMessage), drained by
+# `python manage.py dispatch_outbound_messages`. Rates are messages/second per channel.
+OUTBOX_WHATSAPP_RATE_PER_SECOND = float(os.getenv('OUTBOX_WHATSAPP_RATE_PER_SECOND', '1'))
+OUTBOX_SMS_RATE_PER_SECOND = float(os.getenv('OUTBOX_SMS_RATE_PER_SECOND', '2'))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '6'))
+OUTBOX_RETRY_BASE_SECONDS = float(os.getenv('OUTBOX_RETRY_BASE_SECONDS', '15'))
+OUTBOX_RETRY_MAX_SECONDS = float(os.getenv('OUTBOX_RETRY_MAX_SECONDS', '1800'))
+
+# Redis TTL for cached approval resolution (flow selection, effective roles, HOD/AHOD).
+# Entries are also invalidated by signals; the TTL only bounds drift from bulk updates.
+APPROVAL_RESOLUTION_CACHE_SECONDS = int(os.getenv('APPROVAL_RESOLUTION_CACHE_SECONDS', '600'))
+
+# Redis TTL for per-user permission snapshots (permission codes, roles, effective and
+# HOD department ids). Role/permission signals retire them through a version counter.
+PERMISSION_SNAPSHOT_CACHE_SECONDS = int(os.getenv('PERMISSION_SNAPSHOT_CACHE_SECONDS', '600'))
+
+# Stored feedback form response metrics (FeedbackFormStats) are recomputed on read once
+# older than this; signals flag them stale earlier when targeting or population changes.
+FEEDBACK_STATS_MAX_AGE_SECONDS = int(os.getenv('FEEDBACK_STATS_MAX_AGE_SECONDS', '3600'))
+
+# Redis TTL for cached per-student enrolment results (elective choices, feedback subject
+# lists). Assignment/curriculum/elective-choice signals retire them through generations;
+# the TTL only bounds staff renames.
+ENROLLED_SUBJECTS_CACHE_SECONDS = int(os.getenv('ENROLLED_SUBJECTS_CACHE_SECONDS', '3600'))
+
+# Feedback response exports run in a background thread and are stored under
+# MEDIA_ROOT/feedback/exports/. A finished file is reused by identical exports until
+# feedback data changes or this many seconds pass; rows are streamed in chunks of
+# FEEDBACK_EXPORT_CHUNK_SIZE. With FEEDBACK_EXPORT_EMAIL_NOTIFY=1 the download link is
+# also e-mailed to the requester.
+FEEDBACK_EXPORT_CACHE_SECONDS = int(os.getenv('FEEDBACK_EXPORT_CACHE_SECONDS', '1800'))
+FEEDBACK_EXPORT_CHUNK_SIZE = int(os.getenv('FEEDBACK_EXPORT_CHUNK_SIZE', '2000'))
+FEEDBACK_EXPORT_EMAIL_NOTIFY = os.getenv('FEEDBACK_EXPORT_EMAIL_NOTIFY', '1') == '1'
+
+# Respondents per page on GET /api/feedback/<id>/responses/ (the client may ask for up
+# to FEEDBACK_RESPONSES_MAX_PAGE_SIZE with ?limit=); later pages are fetched with ?cursor=.
+FEEDBACK_RESPONSES_PAGE_SIZE = int(os.getenv('FEEDBACK_RESPONSES_PAGE_SIZE', '50'))
+FEEDBACK_RESPONSES_MAX_PAGE_SIZE = int(os.getenv('FEEDBACK_RESPONSES_MAX_PAGE_SIZE', '200'))
+
+# Principal analytics slices are cached per window of this many seconds, so new
+# submissions appear within one window; cube rebuilds, population refreshes and form
+# deletions retire cached slices at once.
+FEEDBACK_ANALYTICS_CACHE_SECONDS = int(os.getenv('FEEDBACK_ANALYTICS_CACHE_SECONDS', '120'))
+
+# Roster delta-sync tombstones (deleted Student/Staff profiles) older than this are
+# removed by `manage.py prune_roster_tombstones`; clients whose watermark is older
+# get a full snapshot instead of a delta.
+ROSTER_TOMBSTONE_RETENTION_DAYS = int(os.getenv('ROSTER_TOMBSTONE_RETENTION_DAYS', '90'))
+
+# Redis TTL for per-user announcement unread counts. Publishing/editing resets them
+# and mark-read decrements them; the TTL only bounds drift from role/profile changes.
+ANNOUNCEMENT_UNREAD_CACHE_SECONDS = int(os.getenv('ANNOUNCEMENT_UNREAD_CACHE_SECONDS', '300'))
+
 # WhatsApp gateway conventions vary; these paths control what the IQAC Settings page proxies.
 OBE_WHATSAPP_GATEWAY_STATUS_PATH = os.getenv('OBE_WHATSAPP_GATEWAY_STATUS_PATH', '/status')
 OBE_WHATSAPP_GATEWAY_QR_IMAGE_PATH = os.getenv('OBE_WHATSAPP_GATEWAY_QR_IMAGE_PATH', '/qr.png')
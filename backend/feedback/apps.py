@@ -4,3 +4,10 @@ class FeedbackConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'feedback'
     verbose_name = 'FEEDBACK'
+
+    def ready(self):
+        # import signals to ensure receivers are registered
+        try:
+            from . import signals  # noqa: F401
+        except Exception:
+            pass
@@ -0,0 +1,35 @@
+"""Management command: rebuild_feedback_analytics_cube
+
+Recomputes the principal analytics cube (`FeedbackAnalyticsCell` and
+`FeedbackAnalyticsCohort`) from stored responses. Submissions keep it
+current; run this after deploying, after response clean-ups or imports that
+bypass the submit endpoint, and at the start of an academic year if year of
+study should follow students' current year rather than the year they
+submitted in.
+
+Usage:
+    python manage.py rebuild_feedback_analytics_cube
+    python manage.py rebuild_feedback_analytics_cube --form 12 --form 15
+"""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from feedback.services import analytics_cube
+
+
+class Command(BaseCommand):
+    help = 'Recompute the principal feedback analytics cube'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--form', type=int, action='append', dest='form_ids',
+                            help='Only rebuild this feedback form id (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        written = analytics_cube.rebuild(
+            form_ids=options.get('form_ids'),
+            batch_size=max(1, options['batch_size']),
+        )
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt feedback analytics cube: {written} row(s)'))
@@ -0,0 +1,43 @@
+"""Management command: rebuild_feedback_form_stats
+
+Recomputes the stored response metrics (`FeedbackFormStats`) of feedback
+forms. Rows are also refreshed lazily when flagged stale or older than
+FEEDBACK_STATS_MAX_AGE_SECONDS; run this after bulk data changes that bypass
+model signals (queryset updates, raw SQL imports, response clean-ups).
+
+Usage:
+    python manage.py rebuild_feedback_form_stats
+    python manage.py rebuild_feedback_form_stats --form 12 --form 15
+"""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from feedback.models import FeedbackForm
+from feedback.services import form_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored feedback form response metrics'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--form', type=int, action='append', dest='form_ids',
+                            help='Only refresh this feedback form id (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        form_ids = options.get('form_ids')
+        batch_size = max(1, options['batch_size'])
+        qs = FeedbackForm.objects.order_by('id')
+        if form_ids:
+            qs = qs.filter(id__in=form_ids)
+        written = 0
+        last_id = 0
+        while True:
+            batch = list(qs.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            written += len(form_stats.refresh(batch))
+            last_id = batch[-1].id
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt feedback form stats: {written} form(s)'))
@@ -0,0 +1,34 @@
+"""Management command: rebuild_feedback_subject_aggregates
+
+Recomputes the star totals (`FeedbackSubjectAggregate`) read by the
+subject-wise feedback reports. Submissions keep them current; run this after
+deploying, and after response clean-ups or imports that bypass the submit
+endpoint. Students who later changed section stay in the cohort they
+submitted from until the next rebuild.
+
+Usage:
+    python manage.py rebuild_feedback_subject_aggregates
+    python manage.py rebuild_feedback_subject_aggregates --form 12 --form 15
+"""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from feedback.services import subject_aggregates
+
+
+class Command(BaseCommand):
+    help = 'Recompute subject-wise feedback star aggregates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--form', type=int, action='append', dest='form_ids',
+                            help='Only rebuild this feedback form id (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        written = subject_aggregates.rebuild(
+            form_ids=options.get('form_ids'),
+            batch_size=max(1, options['batch_size']),
+        )
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt feedback subject aggregates: {written} row(s)'))
@@ -0,0 +1,54 @@
+"""Management command: run_feedback_exports
+
+Long-running worker that writes queued feedback Excel exports
+(`feedback.services.response_export`). Run it next to the web workers, e.g.
+under systemd; several instances may run at once.
+
+Usage:
+    python manage.py run_feedback_exports
+    python manage.py run_feedback_exports --once          # drain queued exports and exit
+    python manage.py run_feedback_exports --wait 10
+"""
+
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from feedback.services import response_export
+
+
+class Command(BaseCommand):
+    help = 'Write queued feedback response exports'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Process queued exports until none are left, then exit')
+        parser.add_argument('--wait', type=int, default=5, help='Seconds to block waiting for a job (default: 5)')
+
+    def handle(self, *args, **options):
+        wait = max(1, options['wait'])
+        self.stdout.write(self.style.SUCCESS('Feedback export worker started'))
+        done = 0
+        try:
+            while True:
+                close_old_connections()
+                try:
+                    job = response_export.run_next(wait_seconds=wait)
+                except Exception as e:
+                    # Redis/DB hiccup: back off and try again.
+                    self.stderr.write(f'Export round failed: {e}')
+                    if options['once']:
+                        raise
+                    time.sleep(wait)
+                    continue
+                if job is None:
+                    if options['once']:
+                        break
+                    continue
+                done += 1
+                self.stdout.write(f"export {job['id']} {job['status']} rows={job.get('rows', 0)}")
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f'Stopped. exports={done}')
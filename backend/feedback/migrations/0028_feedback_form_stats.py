@@ -0,0 +1,30 @@
+# Generated by Django 4.2.28 on 2026-10-19 00:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0027_clear_autogen_form_names'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedbackFormStats',
+            fields=[
+                ('feedback_form', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='feedback.feedbackform')),
+                ('responded_users', models.PositiveIntegerField(default=0)),
+                ('expected_count', models.PositiveIntegerField(default=0)),
+                ('is_stale', models.BooleanField(default=False)),
+                ('computed_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Feedback Form Stats',
+                'verbose_name_plural': 'Feedback Form Stats',
+                'db_table': 'feedback_form_stats',
+            },
+        ),
+    ]
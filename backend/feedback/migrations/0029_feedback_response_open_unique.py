@@ -0,0 +1,38 @@
+# Generated by Django 4.2.28 on 2026-10-19 00:26
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def drop_duplicate_open_responses(apps, schema_editor):
+    # Open-feedback answers were only guarded by an exists() check; keep the
+    # earliest row of any (form, question, user) group before adding the constraint.
+    FeedbackResponse = apps.get_model('feedback', 'FeedbackResponse')
+    groups = (
+        FeedbackResponse.objects.filter(teaching_assignment__isnull=True)
+        .values('feedback_form_id', 'question_id', 'user_id')
+        .annotate(keep_id=Min('id'), n=models.Count('id'))
+        .filter(n__gt=1)
+    )
+    for group in groups.iterator():
+        FeedbackResponse.objects.filter(
+            teaching_assignment__isnull=True,
+            feedback_form_id=group['feedback_form_id'],
+            question_id=group['question_id'],
+            user_id=group['user_id'],
+        ).exclude(id=group['keep_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0028_feedback_form_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_open_responses, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='feedbackresponse',
+            constraint=models.UniqueConstraint(condition=models.Q(('teaching_assignment__isnull', True)), fields=('feedback_form', 'question', 'user'), name='unique_open_feedback_response'),
+        ),
+    ]
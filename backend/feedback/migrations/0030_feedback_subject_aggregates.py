@@ -0,0 +1,44 @@
+# Generated by Django 4.2.28 on 2026-10-19 00:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0091_profile_updated_at'),
+        ('feedback', '0029_feedback_response_open_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedbackSubjectAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cohort', models.CharField(max_length=32)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('star_1', models.PositiveIntegerField(default=0)),
+                ('star_2', models.PositiveIntegerField(default=0)),
+                ('star_3', models.PositiveIntegerField(default=0)),
+                ('star_4', models.PositiveIntegerField(default=0)),
+                ('star_5', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('feedback_form', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subject_aggregates', to='feedback.feedbackform')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subject_aggregates', to='feedback.feedbackquestion')),
+                ('student_home_department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='academics.department')),
+                ('student_section', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='academics.section')),
+                ('teaching_assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feedback_aggregates', to='academics.teachingassignment')),
+            ],
+            options={
+                'verbose_name': 'Feedback Subject Aggregate',
+                'verbose_name_plural': 'Feedback Subject Aggregates',
+                'db_table': 'feedback_subject_aggregates',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='feedbacksubjectaggregate',
+            constraint=models.UniqueConstraint(fields=('feedback_form', 'teaching_assignment', 'question', 'cohort'), name='unique_feedback_subject_aggregate'),
+        ),
+    ]
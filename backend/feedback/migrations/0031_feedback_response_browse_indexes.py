@@ -0,0 +1,21 @@
+# Generated by Django 4.2.28 on 2026-10-19 00:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0030_feedback_subject_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='feedbackresponse',
+            index=models.Index(fields=['feedback_form', 'user'], name='fb_resp_form_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedbackresponse',
+            index=models.Index(fields=['feedback_form', 'teaching_assignment'], name='fb_resp_form_ta_idx'),
+        ),
+    ]
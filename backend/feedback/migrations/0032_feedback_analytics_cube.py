@@ -0,0 +1,73 @@
+# Generated by Django 4.2.28 on 2026-10-19 00:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0091_profile_updated_at'),
+        ('feedback', '0031_feedback_response_browse_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedbackAnalyticsCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year_of_study', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('form_type', models.CharField(max_length=20)),
+                ('cohort', models.CharField(max_length=32)),
+                ('answer_count', models.PositiveIntegerField(default=0)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('star_1', models.PositiveIntegerField(default=0)),
+                ('star_2', models.PositiveIntegerField(default=0)),
+                ('star_3', models.PositiveIntegerField(default=0)),
+                ('star_4', models.PositiveIntegerField(default=0)),
+                ('star_5', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='academics.department')),
+                ('feedback_form', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analytics_cells', to='feedback.feedbackform')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analytics_cells', to='feedback.feedbackquestion')),
+            ],
+            options={
+                'verbose_name': 'Feedback Analytics Cell',
+                'verbose_name_plural': 'Feedback Analytics Cells',
+                'db_table': 'feedback_analytics_cells',
+            },
+        ),
+        migrations.CreateModel(
+            name='FeedbackAnalyticsCohort',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year_of_study', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('form_type', models.CharField(max_length=20)),
+                ('cohort', models.CharField(max_length=32)),
+                ('responded_users', models.PositiveIntegerField(default=0)),
+                ('expected_users', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='academics.department')),
+                ('feedback_form', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analytics_cohorts', to='feedback.feedbackform')),
+            ],
+            options={
+                'verbose_name': 'Feedback Analytics Cohort',
+                'verbose_name_plural': 'Feedback Analytics Cohorts',
+                'db_table': 'feedback_analytics_cohorts',
+                'indexes': [models.Index(fields=['department', 'year_of_study', 'form_type'], name='fb_cohort_dept_year_type_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='feedbackanalyticscohort',
+            constraint=models.UniqueConstraint(fields=('feedback_form', 'cohort'), name='unique_feedback_analytics_cohort'),
+        ),
+        migrations.AddIndex(
+            model_name='feedbackanalyticscell',
+            index=models.Index(fields=['department', 'year_of_study', 'form_type'], name='fb_cell_dept_year_type_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='feedbackanalyticscell',
+            constraint=models.UniqueConstraint(fields=('feedback_form', 'question', 'cohort'), name='unique_feedback_analytics_cell'),
+        ),
+    ]
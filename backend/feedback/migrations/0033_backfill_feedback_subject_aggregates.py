@@ -0,0 +1,71 @@
+# Backfill FeedbackSubjectAggregate for responses submitted before 0030
+
+from django.db import migrations
+from django.db.models import Count, F, Q, Sum
+
+STARS = (1, 2, 3, 4, 5)
+
+
+def backfill_subject_aggregates(apps, schema_editor):
+    """Rebuild the subject report totals from existing FeedbackResponse rows.
+
+    Mirrors `feedback.services.subject_aggregates.rebuild` on the historical
+    models; forms that already have rows are left as they are.
+    """
+    FeedbackResponse = apps.get_model('feedback', 'FeedbackResponse')
+    FeedbackSubjectAggregate = apps.get_model('feedback', 'FeedbackSubjectAggregate')
+
+    done = set(FeedbackSubjectAggregate.objects.values_list('feedback_form_id', flat=True).distinct())
+    form_ids = (
+        FeedbackResponse.objects.filter(teaching_assignment__isnull=False)
+        .values_list('feedback_form_id', flat=True)
+        .distinct()
+        .order_by('feedback_form_id')
+    )
+    star_counts = {f'star_{star}': Count('id', filter=Q(answer_star=star)) for star in STARS}
+    for feedback_form_id in list(form_ids):
+        if feedback_form_id in done:
+            continue
+        grouped = (
+            FeedbackResponse.objects.filter(
+                feedback_form_id=feedback_form_id,
+                teaching_assignment__isnull=False,
+                answer_star__isnull=False,
+            )
+            .values(
+                'teaching_assignment_id',
+                'question_id',
+                section_id=F('user__student_profile__section_id'),
+                home_department_id=F('user__student_profile__home_department_id'),
+            )
+            .annotate(rating_count=Count('id'), rating_sum=Sum('answer_star'), **star_counts)
+            .order_by()
+        )
+        FeedbackSubjectAggregate.objects.bulk_create(
+            [
+                FeedbackSubjectAggregate(
+                    feedback_form_id=feedback_form_id,
+                    teaching_assignment_id=g['teaching_assignment_id'],
+                    question_id=g['question_id'],
+                    student_section_id=g['section_id'],
+                    student_home_department_id=g['home_department_id'],
+                    cohort=f"{g['section_id'] or 0}-{g['home_department_id'] or 0}",
+                    rating_count=g['rating_count'],
+                    rating_sum=g['rating_sum'] or 0,
+                    **{f'star_{star}': g[f'star_{star}'] for star in STARS},
+                )
+                for g in grouped
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0032_feedback_analytics_cube'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_subject_aggregates, migrations.RunPython.noop),
+    ]
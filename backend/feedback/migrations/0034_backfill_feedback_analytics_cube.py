@@ -0,0 +1,30 @@
+# Backfill the analytics cube (0032) for forms answered before it existed
+
+from django.db import migrations
+
+
+def backfill_analytics_cube(apps, schema_editor):
+    """Build cube rows for every form that has none yet.
+
+    Cohorts depend on section batches and the active academic year, so the
+    service rebuild (current models) is reused rather than re-derived here.
+    """
+    from feedback.services import analytics_cube
+
+    FeedbackForm = apps.get_model('feedback', 'FeedbackForm')
+    FeedbackAnalyticsCohort = apps.get_model('feedback', 'FeedbackAnalyticsCohort')
+    built = FeedbackAnalyticsCohort.objects.values_list('feedback_form_id', flat=True).distinct()
+    form_ids = list(FeedbackForm.objects.exclude(pk__in=built).values_list('pk', flat=True))
+    if form_ids:
+        analytics_cube.rebuild(form_ids)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0033_backfill_feedback_subject_aggregates'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_analytics_cube, migrations.RunPython.noop),
+    ]
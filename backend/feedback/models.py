@@ -342,8 +342,21 @@ class FeedbackResponse(models.Model):
         verbose_name_plural = 'Feedback Responses'
         ordering = ['-created_at']
         # For subject feedback: unique per form, question, user, AND teaching assignment
-        # For open feedback: unique per form, question, user (teaching_assignment is NULL)
+        # For open feedback: unique per form, question, user (teaching_assignment is NULL).
+        # NULLs are distinct in unique_together, so open feedback needs its own partial constraint.
         unique_together = ('feedback_form', 'question', 'user', 'teaching_assignment')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['feedback_form', 'question', 'user'],
+                condition=models.Q(teaching_assignment__isnull=True),
+                name='unique_open_feedback_response',
+            ),
+        ]
+        indexes = [
+            # Per-respondent grouping/paging of a form's responses and per-subject lookups.
+            models.Index(fields=['feedback_form', 'user'], name='fb_resp_form_user_idx'),
+            models.Index(fields=['feedback_form', 'teaching_assignment'], name='fb_resp_form_ta_idx'),
+        ]
     
     def __str__(self):
         if self.teaching_assignment:
@@ -385,3 +398,206 @@ class FeedbackFormSubmission(models.Model):
 
     def __str__(self):
         return f"Form #{self.feedback_form_id} / {self.user.username} - {self.submission_status}"
+
+
+class FeedbackFormStats(models.Model):
+    """Stored response metrics for a feedback form.
+
+    `responded_users` is incremented on submit; `expected_count` is a snapshot
+    of the target population, recomputed when `is_stale` is set (targeting,
+    section or profile changes) or the snapshot ages out. Maintained by
+    `feedback.services.form_stats`.
+    """
+
+    feedback_form = models.OneToOneField(
+        FeedbackForm,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    responded_users = models.PositiveIntegerField(default=0)
+    expected_count = models.PositiveIntegerField(default=0)
+    is_stale = models.BooleanField(default=False)
+    computed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'feedback_form_stats'
+        verbose_name = 'Feedback Form Stats'
+        verbose_name_plural = 'Feedback Form Stats'
+
+    def __str__(self):
+        return f"Form #{self.feedback_form_id}: {self.responded_users}/{self.expected_count}"
+
+
+class FeedbackSubjectAggregate(models.Model):
+    """Star totals for one question of a subject feedback form.
+
+    One row per (form, teaching assignment, question, student cohort), where
+    the cohort is the respondents' section and home department so reports can
+    keep filtering by the student's department. Incremented on submit and
+    rebuilt by `python manage.py rebuild_feedback_subject_aggregates`;
+    maintained by `feedback.services.subject_aggregates`.
+    """
+
+    feedback_form = models.ForeignKey(
+        FeedbackForm,
+        on_delete=models.CASCADE,
+        related_name='subject_aggregates',
+    )
+    teaching_assignment = models.ForeignKey(
+        'academics.TeachingAssignment',
+        on_delete=models.CASCADE,
+        related_name='feedback_aggregates',
+    )
+    question = models.ForeignKey(
+        FeedbackQuestion,
+        on_delete=models.CASCADE,
+        related_name='subject_aggregates',
+    )
+    student_section = models.ForeignKey(
+        'academics.Section',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+    )
+    student_home_department = models.ForeignKey(
+        Department,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+    )
+    # "<section id>-<home department id>" (0 for none): part of the unique key
+    # because NULL columns never conflict.
+    cohort = models.CharField(max_length=32)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    star_1 = models.PositiveIntegerField(default=0)
+    star_2 = models.PositiveIntegerField(default=0)
+    star_3 = models.PositiveIntegerField(default=0)
+    star_4 = models.PositiveIntegerField(default=0)
+    star_5 = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'feedback_subject_aggregates'
+        verbose_name = 'Feedback Subject Aggregate'
+        verbose_name_plural = 'Feedback Subject Aggregates'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['feedback_form', 'teaching_assignment', 'question', 'cohort'],
+                name='unique_feedback_subject_aggregate',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Form #{self.feedback_form_id} / TA #{self.teaching_assignment_id} / Q{self.question_id}: {self.rating_sum}/{self.rating_count}"
+
+
+class FeedbackAnalyticsCell(models.Model):
+    """Answer totals for one question of a form within a respondent cohort.
+
+    The cohort is the respondent's department and year of study at submission
+    time (staff have no year), so principal analytics can slice forms by
+    department × year × form type × question without reading responses.
+    Incremented on submit and rebuilt by
+    `python manage.py rebuild_feedback_analytics_cube`; maintained by
+    `feedback.services.analytics_cube`.
+    """
+
+    feedback_form = models.ForeignKey(
+        FeedbackForm,
+        on_delete=models.CASCADE,
+        related_name='analytics_cells',
+    )
+    question = models.ForeignKey(
+        FeedbackQuestion,
+        on_delete=models.CASCADE,
+        related_name='analytics_cells',
+    )
+    department = models.ForeignKey(
+        Department,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+    )
+    year_of_study = models.PositiveSmallIntegerField(null=True, blank=True)
+    # Copy of FeedbackForm.type so slices filter without joining forms.
+    form_type = models.CharField(max_length=20)
+    # "<department id>-<year>" (0 for none): part of the unique key
+    # because NULL columns never conflict.
+    cohort = models.CharField(max_length=32)
+    answer_count = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    star_1 = models.PositiveIntegerField(default=0)
+    star_2 = models.PositiveIntegerField(default=0)
+    star_3 = models.PositiveIntegerField(default=0)
+    star_4 = models.PositiveIntegerField(default=0)
+    star_5 = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'feedback_analytics_cells'
+        verbose_name = 'Feedback Analytics Cell'
+        verbose_name_plural = 'Feedback Analytics Cells'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['feedback_form', 'question', 'cohort'],
+                name='unique_feedback_analytics_cell',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['department', 'year_of_study', 'form_type'], name='fb_cell_dept_year_type_idx'),
+        ]
+
+    def __str__(self):
+        return f"Form #{self.feedback_form_id} / Q{self.question_id} / {self.cohort}: {self.answer_count}"
+
+
+class FeedbackAnalyticsCohort(models.Model):
+    """Respondents and target population of a form within a respondent cohort.
+
+    `responded_users` is incremented on a user's first submission to the form;
+    `expected_users` is refreshed together with the form's FeedbackFormStats
+    snapshot. Together they give the response rate of any analytics slice.
+    """
+
+    feedback_form = models.ForeignKey(
+        FeedbackForm,
+        on_delete=models.CASCADE,
+        related_name='analytics_cohorts',
+    )
+    department = models.ForeignKey(
+        Department,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+    )
+    year_of_study = models.PositiveSmallIntegerField(null=True, blank=True)
+    form_type = models.CharField(max_length=20)
+    cohort = models.CharField(max_length=32)
+    responded_users = models.PositiveIntegerField(default=0)
+    expected_users = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'feedback_analytics_cohorts'
+        verbose_name = 'Feedback Analytics Cohort'
+        verbose_name_plural = 'Feedback Analytics Cohorts'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['feedback_form', 'cohort'],
+                name='unique_feedback_analytics_cohort',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['department', 'year_of_study', 'form_type'], name='fb_cohort_dept_year_type_idx'),
+        ]
+
+    def __str__(self):
+        return f"Form #{self.feedback_form_id} / {self.cohort}: {self.responded_users}/{self.expected_users}"
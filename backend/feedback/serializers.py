@@ -9,21 +9,29 @@ from .models import (
     FeedbackFormSubmission,
 )
 from academics.models import Department
+from .services import submission
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
 
-def get_subject_feedback_completion(feedback_form, user):
-    """Return mapped-subject completion counts for a student in a subject feedback form."""
+def get_subject_feedback_eligible_assignment_ids(user) -> set:
+    """Teaching assignment ids a student is expected to give subject feedback for (cached)."""
+    from .services import student_subjects
+
+    return set(student_subjects.eligible_assignment_ids(user))
+
+
+def resolve_subject_feedback_eligible_assignment_ids(user) -> set:
+    """Uncached resolution behind `get_subject_feedback_eligible_assignment_ids`."""
     from academics.models import StudentProfile, TeachingAssignment
-    from curriculum.models import ElectiveChoice
+    from academics.services import enrolled_subjects
 
     try:
         student_profile = StudentProfile.objects.get(user=user)
         section = student_profile.section
         if not section:
-            return {'total_subjects': 0, 'responded_subjects': 0, 'all_completed': False}
+            return set()
 
         batch = section.batch
         batch_regulation = batch.regulation if batch else None
@@ -53,17 +61,13 @@ def get_subject_feedback_completion(feedback_form, user):
 
         all_section_tas = all_section_tas.select_related('elective_subject')
 
-        student_elective_ids = set(
-            ElectiveChoice.objects.filter(
-                student=student_profile,
-                academic_year__is_active=True,
-                is_active=True,
-            ).filter(
-                Q(elective_subject__regulation=regulation_code) if regulation_code else Q()
-            ).filter(
-                Q(elective_subject__semester_id=effective_semester_id) if effective_semester_id else Q()
-            ).values_list('elective_subject_id', flat=True)
-        )
+        student_elective_ids = {
+            choice['elective_subject_id']
+            for choice in enrolled_subjects.elective_choices([student_profile.id]).get(student_profile.id, [])
+            if choice['academic_year_active']
+            and (not regulation_code or choice['regulation'] == regulation_code)
+            and (not effective_semester_id or choice['semester_id'] == effective_semester_id)
+        }
 
         eligible_assignment_ids = set()
         section_elective_ids = set()
@@ -104,24 +108,33 @@ def get_subject_feedback_completion(feedback_form, user):
                 
                 eligible_assignment_ids.update(fallback_tas.values_list('id', flat=True))
 
-        total_subjects = len(eligible_assignment_ids)
-        responded_subjects = 0
-        if total_subjects > 0:
-            responded_subjects = FeedbackResponse.objects.filter(
-                feedback_form=feedback_form,
-                user=user,
-                teaching_assignment_id__in=eligible_assignment_ids,
-            ).values('teaching_assignment_id').distinct().count()
-
-        return {
-            'total_subjects': total_subjects,
-            'responded_subjects': responded_subjects,
-            'all_completed': total_subjects > 0 and responded_subjects >= total_subjects,
-        }
+        return eligible_assignment_ids
     except StudentProfile.DoesNotExist:
-        return {'total_subjects': 0, 'responded_subjects': 0, 'all_completed': False}
+        return set()
     except Exception:
-        return {'total_subjects': 0, 'responded_subjects': 0, 'all_completed': False}
+        return set()
+
+
+def count_responded_subjects(feedback_form_id, user, eligible_assignment_ids) -> int:
+    if not eligible_assignment_ids:
+        return 0
+    return FeedbackResponse.objects.filter(
+        feedback_form_id=feedback_form_id,
+        user=user,
+        teaching_assignment_id__in=eligible_assignment_ids,
+    ).values('teaching_assignment_id').distinct().count()
+
+
+def get_subject_feedback_completion(feedback_form, user):
+    """Return mapped-subject completion counts for a student in a subject feedback form."""
+    eligible_assignment_ids = get_subject_feedback_eligible_assignment_ids(user)
+    total_subjects = len(eligible_assignment_ids)
+    responded_subjects = count_responded_subjects(feedback_form.pk, user, eligible_assignment_ids)
+    return {
+        'total_subjects': total_subjects,
+        'responded_subjects': responded_subjects,
+        'all_completed': total_subjects > 0 and responded_subjects >= total_subjects,
+    }
 
 
 class FeedbackQuestionSerializer(serializers.ModelSerializer):
@@ -902,228 +915,35 @@ class FeedbackSubmissionSerializer(serializers.Serializer):
     
     def validate_feedback_form_id(self, value):
         """Validate that feedback form exists and is active."""
-        try:
-            form = FeedbackForm.objects.get(id=value)
-            if form.status != 'ACTIVE' or not form.active:
-                raise serializers.ValidationError('This feedback form is not active.')
-            return value
-        except FeedbackForm.DoesNotExist:
+        state = submission.form_state(value)
+        if state is None:
+            raise serializers.ValidationError('Feedback form not found.')
+        form_status, active = state
+        if form_status != 'ACTIVE' or not active:
+            raise serializers.ValidationError('This feedback form is not active.')
+        qmap = submission.question_map(value)
+        if qmap is None:
             raise serializers.ValidationError('Feedback form not found.')
+        self.question_map = qmap
+        return value
     
     def validate(self, data):
         """Validate responses match questions and answer types."""
-        feedback_form_id = data.get('feedback_form_id')
-        responses = data.get('responses', [])
-
-        feedback_form = None
-        try:
-            feedback_form = FeedbackForm.objects.get(id=feedback_form_id)
-        except FeedbackForm.DoesNotExist:
-            raise serializers.ValidationError({'feedback_form_id': 'Feedback form not found.'})
-
-        common_comment_enabled = bool(getattr(feedback_form, 'common_comment_enabled', False))
-        common_comment_value = (data.get('common_comment') or '')
-        common_comment_value = str(common_comment_value).strip()
-        if common_comment_enabled:
-            if feedback_form.type == 'SUBJECT_FEEDBACK':
-                if not common_comment_value:
-                    raise serializers.ValidationError({'common_comment': 'Overall comment is mandatory.'})
-        
-        if not responses:
-            raise serializers.ValidationError({
-                'responses': 'At least one response is required.'
-            })
-        
-        # Get all questions for this form
-        questions = FeedbackQuestion.objects.filter(
-            feedback_form_id=feedback_form_id
+        errors = submission.validate_answers(
+            self.question_map,
+            data.get('responses', []),
+            data.get('common_comment'),
         )
-        
-        if not questions.exists():
-            raise serializers.ValidationError({
-                'feedback_form_id': 'This feedback form has no questions.'
-            })
-        
-        # Build question dict with allow_rating and allow_comment info
-        question_ids = list(questions.values_list('id', flat=True))
-        options_by_question = {}
-        if question_ids:
-            for row in FeedbackQuestionOption.objects.filter(question_id__in=question_ids).values('id', 'question_id'):
-                options_by_question.setdefault(row['question_id'], set()).add(row['id'])
-
-        question_dict = {
-            q.id: {
-                'allow_rating': q.allow_rating,
-                'allow_comment': q.allow_comment,
-                'answer_type': q.answer_type,  # For backward compatibility
-                'question_type': getattr(q, 'question_type', 'rating') or 'rating',
-                'option_ids': options_by_question.get(q.id, set()),
-            }
-            for q in questions
-        }
-        
-        # Validate each response
-        errors = []
-        for idx, response in enumerate(responses):
-            question_id = response.get('question')
-            
-            if not question_id:
-                errors.append(f'Response {idx + 1}: Missing question ID')
-                continue
-            
-            if question_id not in question_dict:
-                errors.append(f'Question {question_id} does not belong to this form')
-                continue
-            
-            question_info = question_dict[question_id]
-            allow_rating = question_info['allow_rating']
-            allow_comment = question_info['allow_comment']
-            answer_star = response.get('answer_star')
-            answer_text = response.get('answer_text')
-            selected_option = response.get('selected_option')
-
-            requires_comment = bool(allow_comment) and not common_comment_enabled
-            if requires_comment and (not answer_text or not str(answer_text).strip()):
-                errors.append(f'Question {question_id} requires a comment')
-                continue
-
-            if question_info.get('question_type') == 'rating_radio_comment':
-                # Rating + radio are mandatory. Comment is required only when question-wise comments are enabled.
-                if answer_star is None:
-                    errors.append(f'Question {question_id} requires a star rating (1-5)')
-                    continue
-                if not isinstance(answer_star, int) or answer_star < 1 or answer_star > 5:
-                    errors.append(f'Question {question_id}: Star rating must be between 1 and 5')
-                    continue
-                if selected_option is None:
-                    errors.append(f'Question {question_id} requires selecting one option')
-                    continue
-                try:
-                    selected_option_int = int(selected_option)
-                except Exception:
-                    errors.append(f'Question {question_id}: Invalid selected option')
-                    continue
-                if selected_option_int not in (question_info.get('option_ids') or set()):
-                    errors.append(f'Question {question_id}: Selected option is invalid')
-                continue
-
-            if question_info.get('question_type') == 'radio':
-                # Radio is mandatory; comment is required only when question-wise comments are enabled.
-                if selected_option is None:
-                    errors.append(f'Question {question_id} requires selecting one option')
-                    continue
-                try:
-                    selected_option_int = int(selected_option)
-                except Exception:
-                    errors.append(f'Question {question_id}: Invalid selected option')
-                    continue
-                if selected_option_int not in (question_info.get('option_ids') or set()):
-                    errors.append(f'Question {question_id}: Selected option is invalid')
-                continue
-            
-            # Validate based on what's allowed
-            if allow_rating and not allow_comment:
-                # Only rating allowed
-                if answer_star is None:
-                    errors.append(f'Question {question_id} requires a star rating (1-5)')
-                elif not isinstance(answer_star, int) or answer_star < 1 or answer_star > 5:
-                    errors.append(f'Question {question_id}: Star rating must be between 1 and 5')
-            elif allow_comment and not allow_rating:
-                # Only comment allowed
-                pass
-            elif allow_rating and allow_comment:
-                # Both allowed - rating is required; comment is required only when question-wise comments are enabled.
-                if answer_star is None:
-                    errors.append(f'Question {question_id} requires a star rating (1-5)')
-                elif not isinstance(answer_star, int) or answer_star < 1 or answer_star > 5:
-                    errors.append(f'Question {question_id}: Star rating must be between 1 and 5')
-        
         if errors:
-            raise serializers.ValidationError({
-                'responses': errors
-            })
-        
+            raise serializers.ValidationError(errors)
         return data
     
     def save(self, user):
-        """Save feedback responses for the user."""
-        feedback_form_id = self.validated_data['feedback_form_id']
-        responses = self.validated_data['responses']
-        teaching_assignment_id = self.validated_data.get('teaching_assignment_id')
-        common_comment_value = (self.validated_data.get('common_comment') or '')
-        common_comment_value = str(common_comment_value).strip() or None
-
-        feedback_form = FeedbackForm.objects.get(id=feedback_form_id)
-        common_comment_enabled = bool(getattr(feedback_form, 'common_comment_enabled', False))
-        
-        # Get teaching assignment object if provided (for subject feedback)
-        teaching_assignment = None
-        
-        if teaching_assignment_id:
-            try:
-                from academics.models import TeachingAssignment
-                teaching_assignment = TeachingAssignment.objects.get(id=teaching_assignment_id)
-            except TeachingAssignment.DoesNotExist:
-                pass
-        
-        # Resolve option-id -> option-text in one query (keeps export stable even if IDs change).
-        selected_option_ids = []
-        for response_data in responses:
-            opt = response_data.get('selected_option')
-            if opt is None:
-                continue
-            try:
-                selected_option_ids.append(int(opt))
-            except Exception:
-                continue
-
-        option_text_by_id = {}
-        if selected_option_ids:
-            option_text_by_id = dict(
-                FeedbackQuestionOption.objects.filter(id__in=selected_option_ids)
-                .values_list('id', 'option_text')
-            )
-
-        with transaction.atomic():
-            # Create new responses
-            for response_data in responses:
-                selected_option_id = response_data.get('selected_option')
-                selected_option_text = None
-                if selected_option_id is not None:
-                    try:
-                        selected_option_text = option_text_by_id.get(int(selected_option_id))
-                    except Exception:
-                        selected_option_text = None
-
-                # Extract subject information from teaching_assignment
-                # This ensures PE/OE/EE subjects are queryable in reports
-                subject = None
-                elective_subject = None
-                
-                if teaching_assignment:
-                    # Prefer curriculum_row's subject reference
-                    if teaching_assignment.curriculum_row:
-                        # CurriculumDepartment doesn't have a direct subject FK, 
-                        # so we'll store the teaching_assignment which points to it
-                        pass
-                    # Check for elective_subject
-                    if teaching_assignment.elective_subject:
-                        elective_subject = teaching_assignment.elective_subject
-                    # Fallback to subject
-                    elif teaching_assignment.subject:
-                        subject = teaching_assignment.subject
-
-                FeedbackResponse.objects.create(
-                    feedback_form_id=feedback_form_id,
-                    user=user,
-                    question_id=response_data['question'],
-                    answer_star=response_data.get('answer_star'),
-                    answer_text='' if common_comment_enabled else str(response_data.get('answer_text', '')).strip(),
-                    common_comment=common_comment_value if common_comment_enabled else None,
-                    teaching_assignment=teaching_assignment,
-                    subject=subject,
-                    elective_subject=elective_subject,
-                    selected_option_text=selected_option_text,
-                )
-        
-        return FeedbackForm.objects.get(id=feedback_form_id)
+        """Save feedback responses for the user; raises submission.DuplicateSubmission."""
+        return submission.submit(
+            self.question_map,
+            user,
+            self.validated_data['responses'],
+            teaching_assignment_id=self.validated_data.get('teaching_assignment_id'),
+            common_comment=self.validated_data.get('common_comment'),
+        )
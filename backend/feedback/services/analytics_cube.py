@@ -0,0 +1,578 @@
+"""Pre-aggregated feedback analytics (department × year × form type × question).
+
+`PrincipalAnalyticsDashboardView` and `PrincipalFormAnalyticsView` only
+summarise one form at a time from raw responses. Trends across departments
+are served from two small tables instead:
+
+- `FeedbackAnalyticsCell`: per (form, question, cohort) answer count and the
+  1-5 star histogram, where the cohort is the respondent's department and
+  year of study at submission time;
+- `FeedbackAnalyticsCohort`: per (form, cohort) respondents and target
+  population, i.e. the response rate.
+
+`record_submission` adds a submission inside the submitting transaction (one
+insert of missing rows and one ``UPDATE`` per table). The target population
+per cohort (`expected_by_cohort`) is the single definition of a form's
+population and keeps the rules response percentages have always used (see
+`_expected_students`): `form_stats` stores its sum as the form's expected
+count and passes the cohorts to `refresh_expected` in the same refresh. `rebuild`
+recomputes both tables from responses
+(`python manage.py rebuild_feedback_analytics_cube`).
+
+`slice_rows` groups the cube by any of `DIMENSIONS` under filters. Slices are
+cached per FEEDBACK_ANALYTICS_CACHE_SECONDS window, so new submissions show up
+in the next window; population refreshes, rebuilds and deletions switch the
+cache version once they commit and show up at once.
+"""
+import hashlib
+import json
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+
+from feedback.models import (
+    FeedbackAnalyticsCell,
+    FeedbackAnalyticsCohort,
+    FeedbackForm,
+    FeedbackQuestion,
+    FeedbackResponse,
+)
+from feedback.services.non_responders import current_academic_start_year
+
+logger = logging.getLogger(__name__)
+
+STARS = (1, 2, 3, 4, 5)
+
+# Public dimension name -> cube column.
+DIMENSIONS = {
+    'department': 'department_id',
+    'year': 'year_of_study',
+    'form_type': 'form_type',
+    'form': 'feedback_form_id',
+    'question': 'question_id',
+}
+DEFAULT_GROUP_BY = ('department', 'year')
+
+_VERSION_KEY = 'feedback:analytics:version'
+_SLICE_PREFIX = 'feedback:analytics:slice'
+
+
+def cohort_key(department_id, year_of_study) -> str:
+    return f'{department_id or 0}-{year_of_study or 0}'
+
+
+# --- cache ---------------------------------------------------------------
+
+def _timeout() -> int:
+    return int(getattr(settings, 'FEEDBACK_ANALYTICS_CACHE_SECONDS', 600) or 600)
+
+
+def version() -> int:
+    value = cache.get(_VERSION_KEY)
+    if value is None:
+        cache.add(_VERSION_KEY, 1, timeout=None)
+        value = cache.get(_VERSION_KEY) or 1
+    return int(value)
+
+
+def _time_bucket() -> int:
+    return int(time.time() // _timeout())
+
+
+def bump_version() -> None:
+    """Retire every cached slice once the change commits."""
+
+    def _run():
+        try:
+            cache.incr(_VERSION_KEY)
+        except ValueError:
+            cache.set(_VERSION_KEY, int(cache.get(_VERSION_KEY) or 1) + 1, timeout=None)
+        except Exception:
+            logger.warning('Could not bump feedback analytics version', exc_info=True)
+
+    transaction.on_commit(_run)
+
+
+# --- cohorts -------------------------------------------------------------
+
+def _year_of_study(start_year, acad_start) -> Optional[int]:
+    if not start_year or not acad_start:
+        return None
+    year = int(acad_start) - int(start_year) + 1
+    return year if year > 0 else None
+
+
+def _section_cohorts(section_ids: Iterable[int], acad_start) -> Dict[int, Tuple[Optional[int], Optional[int]]]:
+    """{section_id: (department_id, year_of_study)} from each section's batch."""
+    from academics.models import Section
+
+    section_ids = [sid for sid in set(section_ids) if sid]
+    if not section_ids:
+        return {}
+    rows = Section.objects.filter(pk__in=section_ids).values_list(
+        'id', 'batch__course__department_id', 'batch__department_id', 'batch__start_year',
+    )
+    return {
+        sid: (course_department_id or batch_department_id, _year_of_study(start_year, acad_start))
+        for sid, course_department_id, batch_department_id, start_year in rows
+    }
+
+
+def _resolve(home_department_id, section_id, staff_department_id, sections) -> Tuple[Optional[int], Optional[int]]:
+    if section_id or home_department_id:
+        section_department_id, year = sections.get(section_id, (None, None))
+        return home_department_id or section_department_id, year
+    return staff_department_id, None
+
+
+def respondent_cohort(user) -> Tuple[Optional[int], Optional[int]]:
+    """(department_id, year_of_study) of a respondent; staff have no year."""
+    from academics.models import StaffProfile, StudentProfile
+
+    student = StudentProfile.objects.filter(user=user).values_list('home_department_id', 'section_id').first()
+    if student:
+        home_department_id, section_id = student
+        sections = _section_cohorts([section_id], current_academic_start_year())
+        return _resolve(home_department_id, section_id, None, sections)
+    staff_department_id = StaffProfile.objects.filter(user=user).values_list('department_id', flat=True).first()
+    return staff_department_id, None
+
+
+# --- incremental updates ---------------------------------------------------
+
+def record_submission(responses: Iterable[FeedbackResponse], user, *, form_type: str, first_response: bool) -> None:
+    """Add one submission of `user` to the cube; `responses` share a form."""
+    responses = list(responses)
+    if not responses:
+        return
+    feedback_form_id = responses[0].feedback_form_id
+    department_id, year = respondent_cohort(user)
+    cohort = cohort_key(department_id, year)
+    stars = {r.question_id: int(r.answer_star) for r in responses if r.answer_star in STARS}
+    question_ids = list({r.question_id for r in responses})
+    dims = {
+        'feedback_form_id': feedback_form_id,
+        'department_id': department_id,
+        'year_of_study': year,
+        'form_type': form_type,
+        'cohort': cohort,
+    }
+
+    FeedbackAnalyticsCell.objects.bulk_create(
+        [FeedbackAnalyticsCell(question_id=question_id, **dims) for question_id in question_ids],
+        ignore_conflicts=True,
+    )
+    updates = {'answer_count': F('answer_count') + 1}
+    if stars:
+        updates['rating_count'] = F('rating_count') + Case(
+            When(question_id__in=list(stars), then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        updates['rating_sum'] = F('rating_sum') + Case(
+            *[When(question_id=question_id, then=Value(star)) for question_id, star in stars.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        for star in STARS:
+            rated = [question_id for question_id, value in stars.items() if value == star]
+            if rated:
+                updates[f'star_{star}'] = F(f'star_{star}') + Case(
+                    When(question_id__in=rated, then=Value(1)),
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+    FeedbackAnalyticsCell.objects.filter(
+        feedback_form_id=feedback_form_id,
+        cohort=cohort,
+        question_id__in=question_ids,
+    ).update(**updates)
+
+    if first_response:
+        FeedbackAnalyticsCohort.objects.bulk_create([FeedbackAnalyticsCohort(**dims)], ignore_conflicts=True)
+        FeedbackAnalyticsCohort.objects.filter(feedback_form_id=feedback_form_id, cohort=cohort).update(
+            responded_users=F('responded_users') + 1,
+        )
+    # No version bump: during feedback week that would retire every cached slice
+    # on each submission. Slice keys roll over every FEEDBACK_ANALYTICS_CACHE_SECONDS
+    # instead (`_time_bucket`), which bounds how late a submission shows up.
+
+
+def _expected_students(form: FeedbackForm, acad_start) -> Optional[Q]:
+    """StudentProfile filter for the expected respondents of a student form.
+
+    These are the response-percentage rules, which are deliberately looser than
+    `non_responders.target_filter`: all_classes counts the course department's
+    sections only, there is no status filter, and a form whose targeting
+    matches no section expects nobody (None) instead of the whole department.
+    """
+    from academics.models import Section
+
+    if form.all_classes:
+        return Q(section__batch__course__department_id=form.department_id)
+    if form.sections:
+        sections_to_query = list(form.sections)
+    elif form.section_id:
+        sections_to_query = [form.section_id]
+    else:
+        sections_filter = Q(batch__course__department_id=form.department_id)
+        if form.years:
+            year_filters = Q()
+            for year in form.years:
+                if acad_start:
+                    year_filters |= Q(batch__start_year=str(acad_start - year + 1))
+            sections_filter &= year_filters
+        elif form.year:
+            if acad_start:
+                sections_filter &= Q(batch__start_year=str(acad_start - form.year + 1))
+        if form.semesters:
+            sections_filter &= Q(semester_id__in=form.semesters)
+        elif form.semester_id:
+            sections_filter &= Q(semester_id=form.semester_id)
+        sections_to_query = list(Section.objects.filter(sections_filter).values_list('id', flat=True))
+    if not sections_to_query:
+        return None
+    return Q(section_id__in=sections_to_query)
+
+
+def expected_by_cohort(form: FeedbackForm, acad_start) -> Dict[Tuple[Optional[int], Optional[int]], int]:
+    """Target population of `form` per (department_id, year_of_study); `form_stats` sums it."""
+    from academics.models import AcademicYear, DepartmentRole, StaffProfile, StudentProfile
+
+    expected: Dict[Tuple[Optional[int], Optional[int]], int] = {}
+    students = _expected_students(form, acad_start) if form.target_type == 'STUDENT' else None
+    if students is not None:
+        grouped = list(
+            StudentProfile.objects.filter(students)
+            .values('home_department_id', 'section_id')
+            .annotate(users=Count('id'))
+            .order_by()
+        )
+        sections = _section_cohorts([g['section_id'] for g in grouped], acad_start)
+        for g in grouped:
+            key = _resolve(g['home_department_id'], g['section_id'], None, sections)
+            expected[key] = expected.get(key, 0) + g['users']
+    elif form.target_type == 'STAFF':
+        count = StaffProfile.objects.filter(department_id=form.department_id).count()
+        if count:
+            expected[(form.department_id, None)] = count
+    elif form.target_type == 'HOD':
+        active_ay = AcademicYear.objects.filter(is_active=True).first()
+        if active_ay:
+            grouped = (
+                DepartmentRole.objects.filter(
+                    role='HOD',
+                    is_active=True,
+                    academic_year=active_ay,
+                    department_id=form.department_id,
+                )
+                .values('staff__department_id')
+                .annotate(users=Count('staff_id', distinct=True))
+                .order_by()
+            )
+            for g in grouped:
+                expected[(g['staff__department_id'], None)] = g['users']
+    return expected
+
+
+def _write_expected(form: FeedbackForm, expected) -> None:
+    rows = [
+        FeedbackAnalyticsCohort(
+            feedback_form_id=form.pk,
+            department_id=department_id,
+            year_of_study=year,
+            form_type=form.type,
+            cohort=cohort_key(department_id, year),
+            expected_users=users,
+        )
+        for (department_id, year), users in expected.items()
+    ]
+    if rows:
+        FeedbackAnalyticsCohort.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['feedback_form', 'cohort'],
+            update_fields=['expected_users', 'form_type', 'updated_at'],
+        )
+    FeedbackAnalyticsCohort.objects.filter(feedback_form_id=form.pk).exclude(
+        cohort__in=[row.cohort for row in rows],
+    ).exclude(expected_users=0).update(expected_users=0)
+
+
+def refresh_expected(forms: Iterable[FeedbackForm], populations: Optional[Dict[int, dict]] = None) -> None:
+    """Store the target population per cohort of `forms`.
+
+    `populations` ({form_id: expected_by_cohort(...)}) reuses counts the caller
+    already has; missing forms are computed here.
+    """
+    acad_start = current_academic_start_year()
+    populations = populations or {}
+    changed = False
+    for form in forms:
+        try:
+            expected = populations.get(form.pk)
+            if expected is None:
+                expected = expected_by_cohort(form, acad_start)
+            with transaction.atomic():
+                _write_expected(form, expected)
+            changed = True
+        except Exception:
+            logger.exception('Feedback analytics population refresh failed for form %s', form.pk)
+    if changed:
+        bump_version()
+
+
+def sync_form_type(form: FeedbackForm) -> None:
+    """Carry a changed FeedbackForm.type over to the form's cube rows."""
+    updated = FeedbackAnalyticsCell.objects.filter(feedback_form_id=form.pk).exclude(form_type=form.type).update(form_type=form.type)
+    updated += FeedbackAnalyticsCohort.objects.filter(feedback_form_id=form.pk).exclude(form_type=form.type).update(form_type=form.type)
+    if updated:
+        bump_version()
+
+
+# --- rebuild -------------------------------------------------------------
+
+def _rebuild_form(form: FeedbackForm, acad_start, batch_size: int) -> int:
+    profile_columns = {
+        'home_department_id': F('user__student_profile__home_department_id'),
+        'section_id': F('user__student_profile__section_id'),
+        'staff_department_id': F('user__staff_profile__department_id'),
+    }
+    star_counts = {f'star_{star}': Count('id', filter=Q(answer_star=star)) for star in STARS}
+    responses = FeedbackResponse.objects.filter(feedback_form_id=form.pk).order_by()
+    answers = list(
+        responses.values('question_id', **profile_columns)
+        .annotate(
+            answer_count=Count('id'),
+            rating_count=Count('id', filter=Q(answer_star__in=STARS)),
+            rating_sum=Sum('answer_star', filter=Q(answer_star__in=STARS)),
+            **star_counts,
+        )
+    )
+    respondents = list(
+        responses.values(**profile_columns).annotate(users=Count('user_id', distinct=True))
+    )
+    sections = _section_cohorts(
+        [g['section_id'] for g in answers] + [g['section_id'] for g in respondents], acad_start,
+    )
+
+    def _cohort_of(g):
+        return _resolve(g['home_department_id'], g['section_id'], g['staff_department_id'], sections)
+
+    counters = ['answer_count', 'rating_count', 'rating_sum'] + [f'star_{star}' for star in STARS]
+    cells: Dict[tuple, dict] = {}
+    for g in answers:
+        department_id, year = _cohort_of(g)
+        totals = cells.setdefault((g['question_id'], department_id, year), dict.fromkeys(counters, 0))
+        for counter in counters:
+            totals[counter] += g[counter] or 0
+    responded: Dict[tuple, int] = {}
+    for g in respondents:
+        key = _cohort_of(g)
+        responded[key] = responded.get(key, 0) + g['users']
+    expected = expected_by_cohort(form, acad_start)
+
+    cell_rows = [
+        FeedbackAnalyticsCell(
+            feedback_form_id=form.pk,
+            question_id=question_id,
+            department_id=department_id,
+            year_of_study=year,
+            form_type=form.type,
+            cohort=cohort_key(department_id, year),
+            **totals,
+        )
+        for (question_id, department_id, year), totals in cells.items()
+    ]
+    cohort_rows = [
+        FeedbackAnalyticsCohort(
+            feedback_form_id=form.pk,
+            department_id=department_id,
+            year_of_study=year,
+            form_type=form.type,
+            cohort=cohort_key(department_id, year),
+            responded_users=responded.get((department_id, year), 0),
+            expected_users=expected.get((department_id, year), 0),
+        )
+        for department_id, year in set(responded) | set(expected)
+    ]
+    with transaction.atomic():
+        FeedbackAnalyticsCell.objects.filter(feedback_form_id=form.pk).delete()
+        FeedbackAnalyticsCohort.objects.filter(feedback_form_id=form.pk).delete()
+        FeedbackAnalyticsCell.objects.bulk_create(cell_rows, batch_size=batch_size)
+        FeedbackAnalyticsCohort.objects.bulk_create(cohort_rows, batch_size=batch_size)
+    return len(cell_rows) + len(cohort_rows)
+
+
+def rebuild(form_ids: Optional[Iterable[int]] = None, batch_size: int = 1000) -> int:
+    """Recompute the cube rows of `form_ids` (default: every form)."""
+    forms = FeedbackForm.objects.order_by('pk')
+    if form_ids is not None:
+        forms = forms.filter(pk__in=list(form_ids))
+    acad_start = current_academic_start_year()
+    total = 0
+    for form in forms.iterator(chunk_size=200):
+        total += _rebuild_form(form, acad_start, batch_size)
+    bump_version()
+    return total
+
+
+# --- slices --------------------------------------------------------------
+
+def _filters(*, form_ids=None, department_ids=None, years=None, form_types=None, created_by=None) -> Q:
+    q = Q()
+    if form_ids:
+        q &= Q(feedback_form_id__in=form_ids)
+    if department_ids:
+        q &= Q(department_id__in=department_ids)
+    if years:
+        q &= Q(year_of_study__in=years)
+    if form_types:
+        q &= Q(form_type__in=form_types)
+    if created_by is not None:
+        q &= Q(feedback_form__created_by=created_by)
+    return q
+
+
+def _rate(responded: int, expected: int) -> float:
+    # Respondents who left the target population since still count as responded.
+    return min(round((responded / expected * 100) if expected > 0 else 0, 1), 100)
+
+
+def _build_slice(group_by: List[str], filters: dict) -> dict:
+    from academics.models import Department
+
+    from feedback.services import form_stats
+
+    condition = _filters(**filters)
+    columns = [DIMENSIONS[name] for name in group_by]
+    if 'question_id' in columns and 'feedback_form_id' not in columns:
+        # A question belongs to one form; its response rate is that form's.
+        columns.append('feedback_form_id')
+    cohort_columns = [c for c in columns if c != 'question_id']
+
+    form_ids = set(
+        FeedbackAnalyticsCohort.objects.filter(condition).values_list('feedback_form_id', flat=True).distinct()
+    ) | set(
+        FeedbackAnalyticsCell.objects.filter(condition).values_list('feedback_form_id', flat=True).distinct()
+    )
+    if form_ids:
+        # Refreshes stale population snapshots (and with them `expected_users`).
+        form_stats.metrics_for(FeedbackForm.objects.filter(pk__in=form_ids).select_related('stats'))
+
+    counters = ['answer_count', 'rating_count', 'rating_sum'] + [f'star_{star}' for star in STARS]
+    cells = (
+        FeedbackAnalyticsCell.objects.filter(condition)
+        .values(*columns)
+        .annotate(**{counter: Sum(counter) for counter in counters})
+        .order_by()
+    )
+    cohorts = {
+        tuple(g[c] for c in cohort_columns): g
+        for g in FeedbackAnalyticsCohort.objects.filter(condition)
+        .values(*cohort_columns)
+        .annotate(responded_users=Sum('responded_users'), expected_users=Sum('expected_users'))
+        .order_by()
+    }
+
+    groups: Dict[tuple, dict] = {}
+    for g in cells:
+        groups[tuple(g[c] for c in columns)] = g
+    if 'question_id' not in columns:
+        for key, g in cohorts.items():
+            groups.setdefault(key, {c: g[c] for c in columns})
+
+    departments = {
+        d['id']: d for d in Department.objects.filter(
+            pk__in={key[columns.index('department_id')] for key in groups} - {None}
+        ).values('id', 'code', 'short_name', 'name')
+    } if 'department_id' in columns else {}
+    questions = dict(
+        FeedbackQuestion.objects.filter(pk__in={key[columns.index('question_id')] for key in groups})
+        .values_list('id', 'question')
+    ) if 'question_id' in columns else {}
+    forms = dict(
+        FeedbackForm.objects.filter(pk__in={key[columns.index('feedback_form_id')] for key in groups})
+        .values_list('id', 'form_name')
+    ) if 'feedback_form_id' in columns else {}
+
+    rows = []
+    totals = dict.fromkeys(counters + ['responded_users', 'expected_users'], 0)
+    for key, g in groups.items():
+        cohort = cohorts.get(tuple(g[c] for c in cohort_columns), {})
+        row = {}
+        if 'department_id' in columns:
+            department = departments.get(g['department_id']) or {}
+            row['department_id'] = g['department_id']
+            row['department'] = department.get('short_name') or department.get('code') or department.get('name') or 'N/A'
+        if 'year_of_study' in columns:
+            row['year'] = g['year_of_study']
+        if 'form_type' in columns:
+            row['form_type'] = g['form_type']
+        if 'feedback_form_id' in columns:
+            row['form_id'] = g['feedback_form_id']
+            row['form_name'] = forms.get(g['feedback_form_id']) or ''
+        if 'question_id' in columns:
+            row['question_id'] = g['question_id']
+            row['question_text'] = questions.get(g['question_id'], '')
+
+        values = {counter: int(g.get(counter) or 0) for counter in counters}
+        responded = int(cohort.get('responded_users') or 0)
+        expected = int(cohort.get('expected_users') or 0)
+        row.update({
+            'answer_count': values['answer_count'],
+            'rating_count': values['rating_count'],
+            'average_rating': round(values['rating_sum'] / values['rating_count'], 2) if values['rating_count'] else None,
+            'distribution': {str(star): values[f'star_{star}'] for star in STARS},
+            'responded_users': responded,
+            'expected_users': expected,
+            'response_rate': _rate(responded, expected),
+        })
+        rows.append(row)
+        for counter in counters:
+            totals[counter] += values[counter]
+
+    for g in cohorts.values():
+        totals['responded_users'] += int(g['responded_users'] or 0)
+        totals['expected_users'] += int(g['expected_users'] or 0)
+
+    rows.sort(key=lambda r: tuple(
+        (r.get(name) is None, r.get(name) if r.get(name) is not None else 0)
+        for name in ('department', 'year', 'form_type', 'form_name', 'question_id') if name in r
+    ))
+    return {
+        'group_by': group_by,
+        'rows': rows,
+        'totals': {
+            'answer_count': totals['answer_count'],
+            'rating_count': totals['rating_count'],
+            'average_rating': round(totals['rating_sum'] / totals['rating_count'], 2) if totals['rating_count'] else None,
+            'distribution': {str(star): totals[f'star_{star}'] for star in STARS},
+            'responded_users': totals['responded_users'],
+            'expected_users': totals['expected_users'],
+            'response_rate': _rate(totals['responded_users'], totals['expected_users']),
+        },
+    }
+
+
+def slice_rows(group_by: Iterable[str] = DEFAULT_GROUP_BY, **filters) -> dict:
+    """Cube rows grouped by `group_by` (names from DIMENSIONS) under `filters`, cached per version.
+
+    Filters: form_ids, department_ids, years, form_types, created_by (a user id).
+    """
+    group_by = [name for name in dict.fromkeys(group_by) if name in DIMENSIONS] or list(DEFAULT_GROUP_BY)
+    normalized = {key: sorted(value) if isinstance(value, (list, set, tuple)) else value for key, value in filters.items()}
+    digest = hashlib.sha1(
+        json.dumps([group_by, normalized], sort_keys=True, default=str).encode('utf-8')
+    ).hexdigest()[:20]
+    key = f'{_SLICE_PREFIX}:{version()}:{_time_bucket()}:{digest}'
+    data = cache.get(key)
+    if data is None:
+        data = _build_slice(group_by, filters)
+        cache.set(key, data, timeout=_timeout())
+    return data
@@ -0,0 +1,44 @@
+"""How respondents are shown in feedback views and exports (anonymous forms are masked)."""
+
+
+def get_student_display_data(response_or_user, feedback_form, student_profile=None, staff_profile=None):
+    """
+    CENTRALIZED MASKING HELPER
+    
+    Returns masked student data if feedback_form.anonymous=True
+    Otherwise returns actual name and register number.
+    
+    This is the ONLY place where student names should be retrieved for display/export.
+    """
+    # Check if form is anonymous
+    is_anonymous = feedback_form and getattr(feedback_form, 'anonymous', False)
+    
+    if is_anonymous:
+        # Anonymous feedback - mask all data
+        return {
+            'student_name': 'Anonymous',
+            'register_number': ''
+        }
+    
+    # Return real data
+    if hasattr(response_or_user, 'user'):
+        # It's a response object
+        user = response_or_user.user
+    else:
+        # It's a user object directly
+        user = response_or_user
+    
+    student_name = user.get_full_name() or user.username
+    
+    # Get register number
+    if student_profile:
+        register_number = getattr(student_profile, 'reg_no', '') or user.username
+    elif staff_profile:
+        register_number = getattr(staff_profile, 'staff_id', '') or user.username
+    else:
+        register_number = user.username
+    
+    return {
+        'student_name': student_name,
+        'register_number': register_number
+    }
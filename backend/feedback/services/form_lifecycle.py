@@ -0,0 +1,122 @@
+"""Bulk feedback form lifecycle changes (publish, activate, deactivate, delete).
+
+The bulk lifecycle views select forms by department scope, departments and
+years and then change them all at once. State changes are one ``UPDATE``
+each (`publish`, `set_active`). ``update()`` sends no signals, so cached
+response exports are retired here; question maps and stored metrics do not
+depend on status/active and are left alone.
+
+`delete_forms` used to be a single ``queryset.delete()``: one transaction
+that cascaded through every response of every selected form, holding row
+locks on the response table until the end. It now works through the forms
+DELETE_FORM_BATCH at a time; within a batch the responses, subject
+aggregates and submissions go first in committed chunks of
+DELETE_ROW_BATCH rows (FeedbackResponse has no receivers, so each chunk is a
+single ``DELETE``), then the forms themselves, whose remaining cascade
+(questions, options, stats) is small. Every chunk re-applies the caller's
+filter, so a form that no longer matches it (say, reactivated during a long
+delete) is skipped from then on instead of losing its responses.
+
+Every operation takes ``dry_run=True`` to report what it would change
+without writing.
+"""
+import logging
+from typing import Dict, Iterable
+
+from django.db import transaction
+from django.db.models import Q
+
+from feedback.models import (
+    FeedbackForm,
+    FeedbackFormSubmission,
+    FeedbackResponse,
+    FeedbackSubjectAggregate,
+)
+from feedback.services import response_export
+
+logger = logging.getLogger(__name__)
+
+DELETE_FORM_BATCH = 100
+DELETE_ROW_BATCH = 5000
+
+
+def filter_forms(qs, *, department_ids: Iterable = (), years: Iterable = ()):
+    """Narrow `qs` to the given departments and years of study; ValueError on bad department ids."""
+    department_ids = list(department_ids or [])
+    if department_ids:
+        qs = qs.filter(department_id__in=[int(d) for d in department_ids])
+
+    year_filter = Q()
+    for year in years or []:
+        try:
+            y = int(year)
+        except Exception:
+            continue
+        year_filter |= Q(year=y)
+        year_filter |= Q(years__contains=[y])
+    if year_filter:
+        qs = qs.filter(year_filter)
+    return qs
+
+
+def _update(qs, dry_run: bool, **changes) -> int:
+    if dry_run:
+        return qs.count()
+    with transaction.atomic():
+        updated = qs.update(**changes)
+        if updated:
+            response_export.bump_data_version()
+    return updated
+
+
+def publish(qs, *, dry_run: bool = False) -> int:
+    """Move the DRAFT forms of `qs` to ACTIVE; returns the number of forms."""
+    return _update(qs.filter(status='DRAFT'), dry_run, status='ACTIVE')
+
+
+def set_active(qs, active: bool, *, dry_run: bool = False) -> int:
+    """Switch the published forms of `qs` to `active`; returns the number of forms changed."""
+    return _update(qs.filter(status='ACTIVE').exclude(active=active), dry_run, active=active)
+
+
+def _delete_in_chunks(model, forms, batch_size: int) -> int:
+    # `forms` is a queryset, re-evaluated by every chunk: a form that stops
+    # matching the selection part-way (e.g. reactivated) keeps its remaining rows.
+    deleted = 0
+    while True:
+        ids = list(
+            model.objects.filter(feedback_form_id__in=forms.values('pk'))
+            .order_by()
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            count, _ = model.objects.filter(pk__in=ids).delete()
+        deleted += count
+
+
+def delete_forms(qs, *, dry_run: bool = False, batch_size: int = DELETE_ROW_BATCH) -> Dict[str, int]:
+    """Delete the forms of `qs` with their responses; returns per-table counts."""
+    form_ids = list(qs.order_by('pk').values_list('pk', flat=True))
+    counts = {'forms': len(form_ids), 'responses': 0, 'submissions': 0}
+    if dry_run:
+        if form_ids:
+            counts['responses'] = FeedbackResponse.objects.filter(feedback_form_id__in=form_ids).count()
+            counts['submissions'] = FeedbackFormSubmission.objects.filter(feedback_form_id__in=form_ids).count()
+        return counts
+
+    deleted_forms = 0
+    for start in range(0, len(form_ids), DELETE_FORM_BATCH):
+        # The original selection filter, not just the ids: it is checked again
+        # for every chunk of rows and for the forms themselves.
+        forms = qs.filter(pk__in=form_ids[start:start + DELETE_FORM_BATCH]).order_by()
+        counts['responses'] += _delete_in_chunks(FeedbackResponse, forms, batch_size)
+        _delete_in_chunks(FeedbackSubjectAggregate, forms, batch_size)
+        counts['submissions'] += _delete_in_chunks(FeedbackFormSubmission, forms, batch_size)
+        with transaction.atomic():
+            _, per_model = forms.delete()
+        deleted_forms += per_model.get(FeedbackForm._meta.label, 0)
+        logger.info('Deleted %s/%s feedback forms', deleted_forms, len(form_ids))
+    counts['forms'] = deleted_forms
+    return counts
@@ -0,0 +1,145 @@
+"""Stored response metrics for feedback forms (`FeedbackFormStats`).
+
+Response percentages used to cost a DISTINCT count over FeedbackResponse plus a
+population count through Section/StudentProfile joins per form. Both are now
+kept in one `FeedbackFormStats` row per form:
+
+- `responded_users` is incremented after commit when a user submits to a form
+  for the first time (`record_respondent`);
+- `expected_count` is the target population snapshot: the targeted students
+  (same rules as the original per-request percentage), the department's staff
+  or its HODs, counted per cohort by `analytics_cube.expected_by_cohort`. Receivers in
+  `feedback.signals` set `is_stale` when a form's targeting, sections or the
+  staff/student/HOD population change; stale rows, missing rows and rows older
+  than FEEDBACK_STATS_MAX_AGE_SECONDS are recomputed on the next read, along
+  with the form's per-cohort population in the analytics cube.
+
+`metrics_for(forms)` reads every form's row in one query (or none when the
+rows were select_related). `python manage.py rebuild_feedback_form_stats`
+recomputes all rows.
+"""
+import logging
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from feedback.models import FeedbackForm, FeedbackFormStats, FeedbackResponse
+from feedback.services import analytics_cube
+from feedback.services.non_responders import current_academic_start_year
+
+logger = logging.getLogger(__name__)
+
+Metrics = Tuple[int, int, float]
+
+
+def _max_age() -> timedelta:
+    return timedelta(seconds=int(getattr(settings, 'FEEDBACK_STATS_MAX_AGE_SECONDS', 3600) or 3600))
+
+
+def _percentage(response_count: int, expected_count: int) -> float:
+    return round((response_count / expected_count * 100) if expected_count > 0 else 0, 1)
+
+
+def compute_expected_count(feedback_form: FeedbackForm) -> int:
+    """Size of the population `feedback_form` targets (the sum over its analytics cohorts)."""
+    return sum(analytics_cube.expected_by_cohort(feedback_form, current_academic_start_year()).values())
+
+
+def count_responded_users(feedback_form_id: int) -> int:
+    return FeedbackResponse.objects.filter(feedback_form_id=feedback_form_id).values('user_id').distinct().count()
+
+
+def refresh(forms: Iterable[FeedbackForm]) -> Dict[int, FeedbackFormStats]:
+    """Recompute and upsert the stats rows of `forms` (and their analytics population)."""
+    forms = list(forms)
+    now = timezone.now()
+    acad_start = current_academic_start_year()
+    rows: List[FeedbackFormStats] = []
+    populations: Dict[int, dict] = {}
+    for form in forms:
+        try:
+            expected = analytics_cube.expected_by_cohort(form, acad_start)
+            rows.append(FeedbackFormStats(
+                feedback_form_id=form.pk,
+                responded_users=count_responded_users(form.pk),
+                expected_count=sum(expected.values()),
+                is_stale=False,
+                computed_at=now,
+            ))
+            populations[form.pk] = expected
+        except Exception:
+            logger.exception('Feedback stats computation failed for form %s', form.pk)
+    if rows:
+        FeedbackFormStats.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['feedback_form'],
+            update_fields=['responded_users', 'expected_count', 'is_stale', 'computed_at', 'updated_at'],
+        )
+    # The cube stores the same population split by cohort, so expected_count is
+    # always the sum of the form's cohort rows.
+    analytics_cube.refresh_expected([form for form in forms if form.pk in populations], populations)
+    return {row.feedback_form_id: row for row in rows}
+
+
+def _needs_refresh(stats: Optional[FeedbackFormStats], cutoff) -> bool:
+    return stats is None or stats.is_stale or stats.computed_at is None or stats.computed_at < cutoff
+
+
+def metrics_for(forms: Iterable[FeedbackForm]) -> Dict[int, Metrics]:
+    """{form_id: (response_count, expected_count, percentage)} for `forms`."""
+    forms = list(forms)
+    if not forms:
+        return {}
+    stats: Dict[int, Optional[FeedbackFormStats]] = {}
+    unloaded = []
+    descriptor = FeedbackForm.stats
+    for form in forms:
+        if descriptor.is_cached(form):
+            # select_related('stats'); None when the form has no row yet.
+            stats[form.pk] = descriptor.related.get_cached_value(form)
+        else:
+            unloaded.append(form.pk)
+    if unloaded:
+        stats.update({s.feedback_form_id: s for s in FeedbackFormStats.objects.filter(feedback_form_id__in=unloaded)})
+
+    cutoff = timezone.now() - _max_age()
+    stale = [form for form in forms if _needs_refresh(stats.get(form.pk), cutoff)]
+    if stale:
+        stats.update(refresh(stale))
+
+    result = {}
+    for form in forms:
+        row = stats.get(form.pk)
+        response_count = row.responded_users if row else 0
+        expected_count = row.expected_count if row else 0
+        result[form.pk] = (response_count, expected_count, _percentage(response_count, expected_count))
+    return result
+
+
+def metrics(feedback_form: FeedbackForm) -> Metrics:
+    return metrics_for([feedback_form])[feedback_form.pk]
+
+
+def record_respondent(feedback_form_id: int) -> None:
+    """Count a first-time respondent once the submitting transaction commits."""
+
+    def _increment():
+        # No row yet: the first read computes the count from scratch.
+        FeedbackFormStats.objects.filter(feedback_form_id=feedback_form_id).update(
+            responded_users=F('responded_users') + 1,
+        )
+
+    transaction.on_commit(_increment)
+
+
+def mark_stale(**form_filters) -> int:
+    """Flag stats rows for recomputation; `form_filters` filter FeedbackForm (e.g. target_type='STUDENT')."""
+    qs = FeedbackFormStats.objects.filter(is_stale=False)
+    if form_filters:
+        qs = qs.filter(**{f'feedback_form__{key}': value for key, value in form_filters.items()})
+    return qs.update(is_stale=True)
@@ -0,0 +1,212 @@
+"""Students who have not responded to active student feedback forms.
+
+`NonRespondersExportView` used to build each form's expected students,
+load them one by one and drop responders in Python, form after form. The
+difference is now computed in the database: for a batch of forms, one
+``UNION ALL`` statement returns, per form, the targeted student profiles
+that have no matching FeedbackFormSubmission (``NOT EXISTS`` on the
+(feedback_form, user) unique index). Forms without any SUBMITTED tracker
+rows (open feedback, legacy data) anti-join FeedbackResponse instead, as
+before.
+
+`iter_non_responders(forms)` yields plain row dicts in the order the forms
+were given, one batch (NON_RESPONDERS_FORM_BATCH forms) at a time.
+"""
+import logging
+from typing import Iterable, Iterator, List, Optional
+
+from django.db.models import Exists, IntegerField, OuterRef, Q, Value
+
+from feedback.models import FeedbackForm, FeedbackFormSubmission, FeedbackResponse
+
+logger = logging.getLogger(__name__)
+
+NON_RESPONDERS_FORM_BATCH = 20
+
+_ROW_FIELDS = (
+    'user_id',
+    'reg_no',
+    'section_id',
+    'user__username',
+    'user__first_name',
+    'user__last_name',
+    'section__name',
+    'section__batch__start_year',
+    'section__batch__name',
+)
+
+
+def current_academic_start_year() -> Optional[int]:
+    from academics.models import AcademicYear
+
+    current_ay = AcademicYear.objects.filter(is_active=True).first()
+    if not current_ay:
+        return None
+    try:
+        return int(str(current_ay.name).split('-')[0])
+    except Exception:
+        return None
+
+
+def _department_students(department_id) -> Q:
+    # Robust department-scope fallback for legacy/student records where
+    # home_department may be missing or sections are linked via either
+    # batch.course.department or batch.department.
+    return (
+        Q(home_department_id=department_id)
+        | Q(section__batch__course__department_id=department_id)
+        | Q(section__batch__department_id=department_id)
+    )
+
+
+def _batch_start_year_filter(year, current_acad_year) -> Q:
+    batch_start_year = int(current_acad_year) - int(year) + 1
+    return Q(batch__start_year=batch_start_year) | Q(batch__name__startswith=str(batch_start_year))
+
+
+def target_filter(form: FeedbackForm, current_acad_year: Optional[int]) -> Q:
+    """StudentProfile filter for the students `form` targets."""
+    from academics.models import Section
+
+    if form.all_classes:
+        return _department_students(form.department_id)
+
+    if form.sections:
+        sections_to_query = [int(s) for s in form.sections if str(s).strip()]
+    elif form.section_id:
+        sections_to_query = [int(form.section_id)]
+    else:
+        sections_filter = Q(batch__course__department_id=form.department_id) | Q(batch__department_id=form.department_id)
+        if form.years:
+            year_filters = Q()
+            for year in form.years:
+                if current_acad_year:
+                    try:
+                        year_filters |= _batch_start_year_filter(year, current_acad_year)
+                    except Exception:
+                        continue
+            if year_filters:
+                sections_filter &= year_filters
+        elif form.year and current_acad_year:
+            try:
+                sections_filter &= _batch_start_year_filter(form.year, current_acad_year)
+            except Exception:
+                pass
+
+        if form.semesters:
+            sections_filter &= Q(semester_id__in=form.semesters)
+        elif form.semester_id:
+            sections_filter &= Q(semester_id=form.semester_id)
+
+        sections_to_query = list(Section.objects.filter(sections_filter).values_list('id', flat=True))
+
+    if sections_to_query:
+        return Q(section_id__in=sections_to_query)
+    # If a form has incomplete targeting metadata, fall back to department
+    # students so 0-response forms are still represented.
+    return _department_students(form.department_id)
+
+
+def _pending_students(form: FeedbackForm, current_acad_year, tracked: bool):
+    from academics.models import StudentProfile
+
+    if tracked:
+        # Submission tracker first: partial subject feedback is not a response.
+        responded = FeedbackFormSubmission.objects.filter(
+            feedback_form_id=form.id,
+            user_id=OuterRef('user_id'),
+            submission_status='SUBMITTED',
+        )
+    else:
+        responded = FeedbackResponse.objects.filter(feedback_form_id=form.id, user_id=OuterRef('user_id'))
+    return (
+        StudentProfile.objects.filter(
+            target_filter(form, current_acad_year),
+            status='ACTIVE',
+            user__is_active=True,
+        )
+        .filter(~Exists(responded))
+        .annotate(form_id=Value(form.id, output_field=IntegerField()))
+        .values(*_ROW_FIELDS, 'form_id')
+        .order_by()
+    )
+
+
+def _student_year(row, current_acad_year) -> Optional[int]:
+    if not current_acad_year or not row['section_id']:
+        return None
+    start_year = row['section__batch__start_year']
+    if not start_year and row['section__batch__name']:
+        try:
+            start_year = int(str(row['section__batch__name']).split('-')[0])
+        except Exception:
+            start_year = None
+    if not start_year:
+        return None
+    try:
+        return int(current_acad_year) - int(start_year) + 1
+    except Exception:
+        return None
+
+
+def _form_meta(form: FeedbackForm) -> dict:
+    department = form.department
+    dept_short_name = 'Unknown'
+    if department:
+        dept_short_name = department.short_name or department.code or department.name or 'Unknown'
+    return {
+        'department_id': form.department_id,
+        'department': dept_short_name,
+        'form_id': form.id,
+        # Only the user-entered form_name, no ID fallback.
+        'form_name': form.form_name or '',
+        'form_type': form.get_type_display(),
+        'created_on': form.created_at.strftime('%Y-%m-%d'),
+    }
+
+
+def iter_non_responders(forms: Iterable[FeedbackForm], years: Optional[List[int]] = None,
+                        batch_size: int = NON_RESPONDERS_FORM_BATCH) -> Iterator[dict]:
+    """Yield one row per (form, student who has not responded); `years` filters by student year."""
+    forms = list(forms)
+    if not forms:
+        return
+    current_acad_year = current_academic_start_year()
+    years = set(years or [])
+
+    for start in range(0, len(forms), batch_size):
+        batch = forms[start:start + batch_size]
+        tracked_form_ids = set(
+            FeedbackFormSubmission.objects.filter(
+                feedback_form_id__in=[f.id for f in batch],
+                submission_status='SUBMITTED',
+            ).values_list('feedback_form_id', flat=True).distinct()
+        )
+        meta = {form.id: _form_meta(form) for form in batch}
+        anonymous = {form.id for form in batch if form.anonymous}
+
+        queries = [_pending_students(form, current_acad_year, form.id in tracked_form_ids) for form in batch]
+        combined = queries[0].union(*queries[1:], all=True) if len(queries) > 1 else queries[0]
+
+        rows_by_form = {form.id: [] for form in batch}
+        for row in combined:
+            student_year = _student_year(row, current_acad_year)
+            if years and (student_year is None or student_year not in years):
+                continue
+            form_id = row['form_id']
+            if form_id in anonymous:
+                student_name = 'Anonymous'
+                register_number = ''
+            else:
+                full_name = f"{row['user__first_name'] or ''} {row['user__last_name'] or ''}".strip()
+                student_name = full_name or row['user__username']
+                register_number = row['reg_no'] or row['user__username']
+            rows_by_form[form_id].append({
+                **meta[form_id],
+                'year': student_year,
+                'student_name': student_name,
+                'register_number': register_number,
+                'section': row['section__name'] or '',
+            })
+        for form in batch:
+            yield from rows_by_form[form.id]
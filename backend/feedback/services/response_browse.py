@@ -0,0 +1,209 @@
+"""Page-by-page browsing of a form's responses, grouped per respondent.
+
+`GetResponseListView` used to load every response of a form, group the rows
+by user in Python and look up each respondent's profile one at a time. The
+grouping now happens in SQL: one ``GROUP BY user_id`` query returns a page of
+respondents with their latest ``created_at`` and an ``array_agg`` of their
+response ids (newest first), ordered by (latest response, user id). Pages are
+addressed with an opaque keyset cursor on that pair, so a page costs the same
+however deep into a large form it is.
+
+For a page, the answers are read in one query (`select_related` up to the
+subject and staff) and respondent names / register numbers in one query per
+table (`display_names`), which is also used for the non-responder list.
+"""
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.core import signing
+from django.db.models import Max, Q
+from django.utils.dateparse import parse_datetime
+
+from feedback.models import FeedbackForm, FeedbackResponse
+
+logger = logging.getLogger(__name__)
+
+CURSOR_SALT = 'feedback-responses-cursor'
+
+ANSWER_RELATED = (
+    'question',
+    'teaching_assignment',
+    'teaching_assignment__staff',
+    'teaching_assignment__staff__user',
+    'teaching_assignment__curriculum_row',
+    'teaching_assignment__subject',
+    'teaching_assignment__elective_subject',
+)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def page_size(requested=None) -> int:
+    default = int(getattr(settings, 'FEEDBACK_RESPONSES_PAGE_SIZE', 50) or 50)
+    maximum = int(getattr(settings, 'FEEDBACK_RESPONSES_MAX_PAGE_SIZE', 200) or 200)
+    try:
+        size = int(requested) if requested not in (None, '') else default
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, maximum))
+
+
+def encode_cursor(submitted_at, user_id: int) -> str:
+    return signing.dumps([submitted_at.isoformat(), user_id], salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(token: str):
+    try:
+        submitted_at, user_id = signing.loads(token, salt=CURSOR_SALT)
+        parsed = parse_datetime(submitted_at)
+        if parsed is None:
+            raise ValueError(submitted_at)
+        return parsed, int(user_id)
+    except (signing.BadSignature, TypeError, ValueError) as exc:
+        raise InvalidCursor(str(exc)) from exc
+
+
+def respondent_groups(responses, *, cursor: Optional[str] = None, limit: int) -> Tuple[List[dict], Optional[str]]:
+    """One page of {user_id, submitted_at, response_ids} groups of `responses`, newest first."""
+    groups = (
+        responses.order_by()
+        .values('user_id')
+        .annotate(
+            submitted_at=Max('created_at'),
+            response_ids=ArrayAgg('id', ordering=('-created_at', '-id')),
+        )
+    )
+    if cursor:
+        after_at, after_user = decode_cursor(cursor)
+        groups = groups.filter(
+            Q(submitted_at__lt=after_at) | Q(submitted_at=after_at, user_id__lt=after_user)
+        )
+    page = list(groups.order_by('-submitted_at', '-user_id')[:limit + 1])
+
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        last = page[-1]
+        next_cursor = encode_cursor(last['submitted_at'], last['user_id'])
+    return page, next_cursor
+
+
+def display_names(feedback_form: FeedbackForm, user_ids: Iterable[int]) -> Dict[int, Tuple[str, Optional[str]]]:
+    """(user_name, register_number) per user id, masked for anonymous forms."""
+    from academics.models import StaffProfile, StudentProfile
+
+    user_ids = list(dict.fromkeys(user_ids))
+    if not user_ids:
+        return {}
+
+    User = get_user_model()
+    users = User.objects.filter(id__in=user_ids).values_list('id', 'username', 'first_name', 'last_name')
+
+    profile_numbers = {}
+    if feedback_form.target_type == 'STUDENT':
+        profile_numbers = dict(
+            StudentProfile.objects.filter(user_id__in=user_ids).values_list('user_id', 'reg_no')
+        )
+    elif feedback_form.target_type == 'STAFF':
+        profile_numbers = dict(
+            StaffProfile.objects.filter(user_id__in=user_ids).values_list('user_id', 'staff_id')
+        )
+
+    names = {}
+    for user_id, username, first_name, last_name in users:
+        if feedback_form.anonymous:
+            names[user_id] = ('Anonymous', '')
+            continue
+        user_name = f'{first_name} {last_name}'.strip() or username
+        register_number = None
+        if feedback_form.target_type in ('STUDENT', 'STAFF'):
+            register_number = profile_numbers.get(user_id) or username
+        names[user_id] = (user_name, register_number)
+    return names
+
+
+def _teaching_assignment_data(ta) -> dict:
+    subject_name = None
+    subject_code = None
+    if ta.curriculum_row:
+        subject_name = ta.curriculum_row.course_name
+        subject_code = ta.curriculum_row.course_code
+    elif ta.subject:
+        subject_name = ta.subject.name
+        subject_code = ta.subject.code
+    elif ta.elective_subject:
+        subject_name = ta.elective_subject.course_name
+        subject_code = ta.elective_subject.course_code
+    elif ta.custom_subject:
+        subject_name = ta.get_custom_subject_display()
+        subject_code = ta.custom_subject
+
+    staff_name = ta.staff.user.get_full_name() or ta.staff.user.username if ta.staff else None
+
+    return {
+        'teaching_assignment_id': ta.id,
+        'subject_name': subject_name,
+        'subject_code': subject_code,
+        'staff_name': staff_name,
+    }
+
+
+def _answer(response: FeedbackResponse, ta_data: Optional[dict]) -> dict:
+    return {
+        'question_id': response.question.id,
+        'question_text': response.question.question,
+        'answer_type': response.question.answer_type,
+        'answer_star': response.answer_star,
+        # Keep both key styles for frontend compatibility.
+        'question_comment': response.answer_text,
+        'answer_text': response.answer_text,
+        'common_comment': response.common_comment,
+        'selected_option': response.selected_option_text,
+        'selected_option_text': response.selected_option_text,
+        'teaching_assignment': ta_data,
+    }
+
+
+def responded_page(feedback_form: FeedbackForm, responses, *, cursor: Optional[str] = None,
+                   limit: int) -> Tuple[List[dict], Optional[str]]:
+    """Respondent entries (name, register number, answers) for one page, and the next cursor."""
+    groups, next_cursor = respondent_groups(responses, cursor=cursor, limit=limit)
+    if not groups:
+        return [], None
+
+    response_ids = [response_id for group in groups for response_id in group['response_ids']]
+    rows = FeedbackResponse.objects.select_related(*ANSWER_RELATED).in_bulk(response_ids)
+    names = display_names(feedback_form, [group['user_id'] for group in groups])
+
+    ta_cache: Dict[int, dict] = {}
+    responded = []
+    for group in groups:
+        user_id = group['user_id']
+        user_name, register_number = names.get(user_id, ('', None))
+        answers = []
+        for response_id in group['response_ids']:
+            response = rows.get(response_id)
+            if response is None:
+                # Deleted between the two queries.
+                continue
+            ta_data = None
+            if response.teaching_assignment_id and response.teaching_assignment:
+                ta_data = ta_cache.get(response.teaching_assignment_id)
+                if ta_data is None:
+                    ta_data = ta_cache[response.teaching_assignment_id] = _teaching_assignment_data(
+                        response.teaching_assignment
+                    )
+            answers.append(_answer(response, ta_data))
+        responded.append({
+            'user_id': user_id,
+            'user_name': user_name,
+            'register_number': register_number,
+            'submitted_at': group['submitted_at'].isoformat(),
+            'answers': answers,
+        })
+    return responded, next_cursor
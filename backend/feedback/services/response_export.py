@@ -0,0 +1,520 @@
+"""Background Excel exports of feedback responses.
+
+`IQACCommonExportView` and `FormExportExcelView` used to load every matching
+FeedbackResponse into a list of dicts and build the workbook in memory inside
+the request. Exports now run as jobs:
+
+- `start_export` keys the file by (export kind, filters, feedback data
+  version). A finished file still in the cache is returned at once and
+  identical concurrent requests share the running job. Otherwise the job and
+  its pickled query are stored in the cache and its id is pushed onto a Redis
+  list; `python manage.py run_feedback_exports`
+  (deploy/systemd/feedback-exports.service) pops jobs and writes each file
+  with an openpyxl write-only worksheet fed from
+  ``queryset.iterator(chunk_size=FEEDBACK_EXPORT_CHUNK_SIZE)`` into
+  default_storage. Without django-redis (local settings) the export runs in
+  the request instead.
+- Job state lives in the cache (`get_job`); the owner polls the status
+  endpoint and downloads the file through `erp.file_serving`. A queued job
+  has QUEUED_SECONDS to be picked up and a running one refreshes its
+  heartbeat every chunk; a PENDING job whose heartbeat lapsed (worker down,
+  killed or redeployed) is reported FAILED and never reused, so the next
+  request starts a fresh export. With FEEDBACK_EXPORT_EMAIL_NOTIFY enabled the
+  download link is also e-mailed.
+- `bump_data_version(form_id)` retires cached files; it is called after a
+  submission commits and by `feedback.signals` on form/question changes.
+  Responses edited outside the submit endpoint and profile renames are only
+  picked up once FEEDBACK_EXPORT_CACHE_SECONDS expire.
+"""
+import hashlib
+import json
+import logging
+import uuid
+from datetime import timedelta
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from feedback.models import FeedbackResponse
+from feedback.services.display import get_student_display_data
+from feedback.services.non_responders import current_academic_start_year
+
+logger = logging.getLogger(__name__)
+
+EXPORT_PREFIX = 'feedback/exports'
+CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+STATUS_PENDING = 'PENDING'
+STATUS_READY = 'READY'
+STATUS_FAILED = 'FAILED'
+
+_VERSION_KEY = 'feedback:export:version'
+
+# A running export refreshes its heartbeat at least once per chunk.
+HEARTBEAT_SECONDS = 120
+# A queued export not picked up by a worker within this is reported FAILED.
+QUEUED_SECONDS = 900
+
+QUEUE_KEY = 'feedback:export:queue'
+
+BASE_HEADERS = [
+    "Form Name",
+    "Student Name",
+    "Register Number",
+    "Department",
+    "Year / Section",
+    "Subject Code",
+    "Subject Name",
+    "Staff Name",
+    "Question Text",
+    "Rating Value",
+]
+
+RESPONSE_RELATED = (
+    'feedback_form',
+    'question',
+    'user',
+    'user__student_profile',
+    'user__student_profile__section',
+    'user__student_profile__section__batch',
+    'teaching_assignment',
+    'teaching_assignment__subject',
+    'teaching_assignment__curriculum_row',
+    'teaching_assignment__elective_subject',
+    'teaching_assignment__staff',
+    'teaching_assignment__staff__user',
+    'teaching_assignment__staff__department',
+    'teaching_assignment__section',
+    'teaching_assignment__section__batch',
+)
+
+
+def _cache_seconds() -> int:
+    return int(getattr(settings, 'FEEDBACK_EXPORT_CACHE_SECONDS', 1800) or 1800)
+
+
+def _chunk_size() -> int:
+    return max(1, int(getattr(settings, 'FEEDBACK_EXPORT_CHUNK_SIZE', 2000) or 2000))
+
+
+# --- data version --------------------------------------------------------
+
+def _version_key(form_id=None) -> str:
+    return f'{_VERSION_KEY}:{form_id}' if form_id else _VERSION_KEY
+
+
+def data_version(form_id=None) -> int:
+    key = _version_key(form_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key) or 1
+    return int(version)
+
+
+def _bump(key: str) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(cache.get(key) or 1) + 1, timeout=None)
+    except Exception:
+        logger.warning('Could not bump feedback export version %s', key, exc_info=True)
+
+
+def bump_data_version(form_id=None) -> None:
+    """Retire cached exports covering `form_id` (and every common export) once the change commits."""
+
+    def _run():
+        _bump(_VERSION_KEY)
+        if form_id:
+            _bump(_version_key(form_id))
+
+    transaction.on_commit(_run)
+
+
+# --- rows ----------------------------------------------------------------
+
+def response_queryset():
+    return FeedbackResponse.objects.select_related(*RESPONSE_RELATED)
+
+
+def _year_section(section, current_acad_year) -> str:
+    section_name = section.name or ""
+    year_text = ""
+    batch = getattr(section, 'batch', None)
+    if batch and getattr(batch, 'start_year', None) and current_acad_year:
+        try:
+            year_text = str(current_acad_year - int(batch.start_year) + 1)
+        except Exception:
+            year_text = ""
+    return f"{year_text} / {section_name}" if (year_text or section_name) else ""
+
+
+def export_row(response, current_acad_year) -> dict:
+    """One export row for a FeedbackResponse loaded with `response_queryset()`."""
+    from academics.models import StudentProfile
+
+    feedback_form = response.feedback_form
+    year_section = ""
+    subject_code = ""
+    subject_name = ""
+    staff_name = ""
+
+    student_profile = None
+    try:
+        student_profile = response.user.student_profile
+    except (AttributeError, StudentProfile.DoesNotExist):
+        student_profile = None
+    if student_profile and student_profile.section and current_acad_year:
+        section_name = student_profile.section.name or ""
+        batch = student_profile.section.batch
+        if batch and batch.start_year:
+            try:
+                year_section = f"{current_acad_year - int(batch.start_year) + 1} / {section_name}"
+            except Exception:
+                year_section = f"/ {section_name}"
+
+    # Staff's department is the only department source.
+    ta = response.teaching_assignment
+    if ta and getattr(ta, 'staff', None) and getattr(ta.staff, 'department', None):
+        department_name = ta.staff.department.name or "N/A"
+    else:
+        department_name = "N/A"
+
+    display_data = get_student_display_data(response, feedback_form, student_profile)
+    student_name = display_data['student_name']
+    register_number = display_data['register_number']
+
+    if ta:
+        if ta.curriculum_row:
+            subject_code = ta.curriculum_row.course_code or ""
+            subject_name = ta.curriculum_row.course_name or ""
+        elif ta.elective_subject:
+            subject_code = ta.elective_subject.course_code or ""
+            subject_name = ta.elective_subject.course_name or ""
+        elif ta.subject:
+            subject_code = ta.subject.code or ""
+            subject_name = ta.subject.name or ""
+        elif ta.custom_subject:
+            subject_code = ta.custom_subject
+            subject_name = dict(ta._meta.get_field('custom_subject').choices).get(ta.custom_subject, ta.custom_subject)
+
+        if ta.staff and ta.staff.user:
+            staff_name = ta.staff.user.get_full_name() or ta.staff.user.username or ""
+
+        # Fallback year/section from the teaching assignment section.
+        if not year_section and ta.section:
+            year_section = _year_section(ta.section, current_acad_year)
+
+    # Electives assigned department-wide have no section: use the student's.
+    if not year_section and student_profile and student_profile.section:
+        year_section = _year_section(student_profile.section, current_acad_year)
+
+    # Show either the question-wise comment or the overall comment, never both.
+    question_comment = (response.answer_text or "").strip()
+    common_comment = (response.common_comment or "").strip()
+    comment_value = question_comment
+    overall_comment_value = "" if question_comment else common_comment
+
+    return {
+        # Only the user-entered form_name (no system-generated defaults).
+        'form_name': feedback_form.form_name or "",
+        'student_name': student_name,
+        'register_number': register_number,
+        'department': department_name,
+        'year_section': year_section,
+        'subject_code': subject_code,
+        'subject_name': subject_name,
+        'staff_name': staff_name,
+        'question_text': response.question.question if response.question else "",
+        'rating_value': response.answer_star or "",
+        'comment': comment_value,
+        'overall_comment': overall_comment_value,
+        'selected_option': (response.selected_option_text or "").strip(),
+    }
+
+
+def _optional_columns(qs):
+    """Which optional columns have any value, decided up front so rows can be streamed."""
+    has_text = Q(answer_text__regex=r'\S')
+    return (
+        qs.filter(has_text).exists(),
+        qs.filter(~has_text | Q(answer_text__isnull=True), common_comment__regex=r'\S').exists(),
+        qs.filter(selected_option_text__regex=r'\S').exists(),
+    )
+
+
+def write_workbook(qs, fileobj, progress: Optional[Callable[[], None]] = None) -> int:
+    """Write the responses of `qs` to `fileobj` as a single-sheet workbook; returns the row count.
+
+    `progress` is called once per chunk of rows and before the file is saved.
+    """
+    import openpyxl
+
+    has_question_comment, has_overall_comment, has_selected_option = _optional_columns(qs)
+    headers = list(BASE_HEADERS)
+    if has_question_comment:
+        headers.append("Comment")
+    if has_overall_comment:
+        headers.append("Overall Comment")
+    if has_selected_option:
+        headers.append("Selected Option")
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(title='Feedback Responses')
+    ws.append(headers)
+
+    current_acad_year = current_academic_start_year()
+    chunk_size = _chunk_size()
+    written = 0
+    for response in qs.iterator(chunk_size=chunk_size):
+        row_data = export_row(response, current_acad_year)
+        row = [
+            row_data['form_name'],
+            row_data['student_name'],
+            row_data['register_number'],
+            row_data['department'],
+            row_data['year_section'],
+            row_data['subject_code'],
+            row_data['subject_name'],
+            row_data['staff_name'],
+            row_data['question_text'],
+            row_data['rating_value'],
+        ]
+        if has_question_comment:
+            row.append(row_data['comment'])
+        if has_overall_comment:
+            row.append(row_data['overall_comment'])
+        if has_selected_option:
+            row.append(row_data['selected_option'])
+        ws.append(row)
+        written += 1
+        if progress and written % chunk_size == 0:
+            progress()
+    if progress:
+        progress()
+    wb.save(fileobj)
+    return written
+
+
+# --- jobs ----------------------------------------------------------------
+
+def _job_key(job_id: str) -> str:
+    return f'feedback:export:job:{job_id}'
+
+
+def _file_key(export_key: str) -> str:
+    return f'feedback:export:file:{export_key}'
+
+
+def _running_key(export_key: str) -> str:
+    return f'feedback:export:running:{export_key}'
+
+
+def export_key(kind: str, params: dict, version: int) -> str:
+    raw = json.dumps({'kind': kind, 'params': params, 'version': version}, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _heartbeat_key(job_id: str) -> str:
+    return f'feedback:export:heartbeat:{job_id}'
+
+
+def _query_key(job_id: str) -> str:
+    return f'feedback:export:query:{job_id}'
+
+
+def _beat(job_id: str, timeout: int = HEARTBEAT_SECONDS) -> None:
+    cache.set(_heartbeat_key(job_id), timezone.now().isoformat(), timeout=timeout)
+
+
+def _queue():
+    """Raw Redis connection for the job queue, or None without django-redis."""
+    from django_redis import get_redis_connection
+
+    try:
+        return get_redis_connection('default')
+    except NotImplementedError:
+        return None
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    """The job, with a PENDING job whose thread stopped beating turned into FAILED."""
+    job = cache.get(_job_key(str(job_id)))
+    if job and job.get('status') == STATUS_PENDING and cache.get(_heartbeat_key(job['id'])) is None:
+        job.update(status=STATUS_FAILED, error='The export was interrupted. Please start it again.')
+        _save_job(job)
+    return job
+
+
+def _save_job(job: dict) -> None:
+    cache.set(_job_key(job['id']), job, timeout=_cache_seconds())
+
+
+def cached_file(key: str) -> Optional[str]:
+    name = cache.get(_file_key(key))
+    if name and default_storage.exists(name):
+        return name
+    return None
+
+
+def _notify(job: dict, user) -> None:
+    if not getattr(settings, 'FEEDBACK_EXPORT_EMAIL_NOTIFY', False):
+        return
+    email = str(getattr(user, 'email', '') or '').strip()
+    if not email or not job.get('download_url'):
+        return
+    from django.core.mail import send_mail
+
+    try:
+        send_mail(
+            'Feedback export ready',
+            f"Your feedback export {job['filename']} is ready:\n{job['download_url']}\n\n"
+            f"The link stays valid for {_cache_seconds() // 60} minutes.",
+            getattr(settings, 'DEFAULT_FROM_EMAIL', None),
+            [email],
+            fail_silently=False,
+        )
+    except Exception:
+        logger.warning('Could not e-mail feedback export link to user %s', user.pk, exc_info=True)
+
+
+def _purge_expired() -> None:
+    """Delete export files older than the cache lifetime."""
+    try:
+        _, files = default_storage.listdir(EXPORT_PREFIX)
+    except Exception:
+        return
+    cutoff = timezone.now() - timedelta(seconds=_cache_seconds())
+    for name in files:
+        path = f'{EXPORT_PREFIX}/{name}'
+        try:
+            if default_storage.get_modified_time(path) < cutoff:
+                default_storage.delete(path)
+        except Exception:
+            continue
+
+
+def _run(job: dict, key: str, qs, user) -> None:
+    import tempfile
+
+    try:
+        job['started_at'] = timezone.now().isoformat()
+        _beat(job['id'])
+        _save_job(job)
+        with tempfile.TemporaryFile() as tmp:
+            rows = write_workbook(qs, tmp, progress=lambda: _beat(job['id']))
+            tmp.seek(0)
+            name = f'{EXPORT_PREFIX}/{key}.xlsx'
+            if default_storage.exists(name):
+                default_storage.delete(name)
+            name = default_storage.save(name, File(tmp))
+        cache.set(_file_key(key), name, timeout=_cache_seconds())
+        job.update(status=STATUS_READY, rows=rows, finished_at=timezone.now().isoformat())
+        _save_job(job)
+        _notify(job, user)
+        _purge_expired()
+    except Exception as exc:
+        logger.exception('Feedback export %s failed', job['id'])
+        job.update(status=STATUS_FAILED, error=str(exc))
+        _save_job(job)
+    finally:
+        cache.delete(_running_key(key))
+        cache.delete(_query_key(job['id']))
+
+
+def start_export(*, kind: str, params: dict, version: int, user, filename: str,
+                 build_queryset: Callable, download_url: Callable[[str], str]) -> dict:
+    """Return a READY job for a cached file, the running job for the same export, or a new job."""
+    key = export_key(kind, params, version)
+    job = {
+        'id': uuid.uuid4().hex,
+        'owner_id': user.pk,
+        'kind': kind,
+        'filename': filename,
+        'export_key': key,
+        'status': STATUS_PENDING,
+        'error': '',
+        'created_at': timezone.now().isoformat(),
+    }
+    job['download_url'] = download_url(job['id'])
+
+    if cached_file(key):
+        job['status'] = STATUS_READY
+        _save_job(job)
+        return job
+
+    running_id = cache.get(_running_key(key))
+    running = get_job(running_id) if running_id else None
+    if running and running.get('owner_id') == user.pk and running.get('status') == STATUS_PENDING:
+        return running
+
+    qs = build_queryset()
+    queue = _queue()
+    if queue is None:
+        _run(job, key, qs, user)
+        return job
+
+    _beat(job['id'], timeout=QUEUED_SECONDS)
+    _save_job(job)
+    cache.set(_query_key(job['id']), qs.query, timeout=QUEUED_SECONDS)
+    cache.set(_running_key(key), job['id'], timeout=_cache_seconds())
+    try:
+        queue.rpush(QUEUE_KEY, job['id'])
+    except Exception as exc:
+        logger.exception('Could not queue feedback export %s', job['id'])
+        cache.delete(_running_key(key))
+        job.update(status=STATUS_FAILED, error=f'The export could not be queued: {exc}')
+        _save_job(job)
+    return job
+
+
+def run_next(wait_seconds: int = 5) -> Optional[dict]:
+    """Pop one queued job (waiting up to `wait_seconds`) and write its file; None when idle."""
+    from django.contrib.auth import get_user_model
+
+    queue = _queue()
+    if queue is None:
+        return None
+    popped = queue.blpop([QUEUE_KEY], timeout=wait_seconds)
+    if not popped:
+        return None
+    job_id = popped[1].decode() if isinstance(popped[1], bytes) else str(popped[1])
+    job = get_job(job_id)
+    query = cache.get(_query_key(job_id))
+    if not job or job.get('status') != STATUS_PENDING or query is None:
+        # Expired while queued (already reported FAILED to the poller).
+        logger.warning('Skipping feedback export %s: job or query expired', job_id)
+        return job
+    qs = response_queryset()
+    qs.query = query
+    user = get_user_model().objects.filter(pk=job.get('owner_id')).first()
+    _run(job, job['export_key'], qs, user)
+    return job
+
+
+class StoredExport:
+    """The storage-backed file `erp.file_serving.serve_file` expects from a FieldFile."""
+
+    def __init__(self, name: str, storage=None):
+        self.name = name
+        self.storage = storage or default_storage
+
+    @property
+    def size(self) -> int:
+        return self.storage.size(self.name)
+
+    def open(self, mode='rb'):
+        return self.storage.open(self.name, mode)
+
+
+def open_file(job: dict) -> Optional[StoredExport]:
+    """The finished workbook of a READY job, or None once it expired."""
+    name = cached_file(job.get('export_key', ''))
+    return StoredExport(name) if name else None
@@ -0,0 +1,352 @@
+"""Subjects a student rates in a subject feedback form.
+
+`GetStudentSubjectsView` used to resolve the student's core curriculum
+subjects, chosen electives and their teaching assignments (several queries
+per subject) every time a student opened a form. The resolution now lives in
+`enrolled_subjects(student_profile, target_semesters)` and its result is
+cached per (student, section, semesters) through
+`academics.services.enrolled_subjects`, whose generations are switched when
+teaching assignments, elective choices, subject batches or curriculum rows
+change. Per-form completion is not cached; the view reads it with one query.
+
+`eligible_assignment_ids(user)` caches the teaching assignment ids used to
+track subject completion on submit
+(`feedback.serializers.get_subject_feedback_eligible_assignment_ids`).
+
+Subjects without a teaching assignment get a pseudo entry with a negative id
+(minus the curriculum row / elective subject id) so the form can still list
+them.
+"""
+import logging
+from typing import List, Optional, Set
+
+from django.db.models import Q
+
+from academics.services import enrolled_subjects as enrolment_cache
+
+logger = logging.getLogger(__name__)
+
+STAFF_NOT_ASSIGNED = 'Staff Not Assigned'
+
+
+class _PseudoAssignment:
+    """Stand-in teaching assignment for a subject that has none."""
+
+    def __init__(self, subject_obj, subject_type='elective'):
+        self.id = -subject_obj.id
+        if subject_type == 'elective':
+            self.elective_subject = subject_obj
+            self.curriculum_row = None
+        else:
+            self.elective_subject = None
+            self.curriculum_row = subject_obj
+        self.subject = None
+        self.custom_subject = None
+        self.staff = None
+        self.is_pseudo = True
+
+
+def _staff_display(ta) -> str:
+    if ta.staff and ta.staff.user:
+        return ta.staff.user.get_full_name() or ta.staff.user.username or 'Unknown'
+    return 'Unknown'
+
+
+def _ta_code(ta) -> Optional[str]:
+    if ta.curriculum_row:
+        return ta.curriculum_row.course_code
+    if ta.elective_subject:
+        return ta.elective_subject.course_code
+    if ta.subject:
+        return ta.subject.code
+    return None
+
+
+def _core_assignments(section, student_department, student_regulation, target_semesters, current_ay):
+    from academics.models import TeachingAssignment
+    from curriculum.models import CurriculumDepartment
+
+    curriculum_filter = {
+        'department': student_department,
+        'is_elective': False,
+    }
+    # Regulation must match (R2020 vs R2023 for final years) when it is known.
+    if student_regulation:
+        curriculum_filter['regulation'] = student_regulation
+    if target_semesters:
+        curriculum_filter['semester__number__in'] = target_semesters
+    curriculum_subjects = list(
+        CurriculumDepartment.objects.filter(**curriculum_filter)
+        .select_related('semester', 'department')
+        .order_by('course_code')
+    )
+
+    tas = TeachingAssignment.objects.filter(
+        curriculum_row__in=curriculum_subjects,
+        academic_year=current_ay,
+        is_active=True,
+    ).select_related('staff', 'staff__user', 'curriculum_row', 'curriculum_row__semester').order_by('pk')
+    if student_regulation:
+        tas = tas.filter(curriculum_row__regulation=student_regulation)
+    # Prefer the student's section, then any assignment of the subject.
+    by_section, by_row = {}, {}
+    for ta in tas:
+        by_row.setdefault(ta.curriculum_row_id, ta)
+        if ta.section_id == section.id:
+            by_section.setdefault(ta.curriculum_row_id, ta)
+
+    assignments, without_ta = [], []
+    for curr_subj in curriculum_subjects:
+        ta = by_section.get(curr_subj.id) or by_row.get(curr_subj.id)
+        if ta:
+            assignments.append(ta)
+        else:
+            without_ta.append(curr_subj)
+    return assignments, without_ta
+
+
+def _elective_staff(code, dept_id, student_regulation, batch_filter, current_ay) -> List[str]:
+    """Staff names teaching elective `code`, preferring the department the student chose it from."""
+    from academics.models import TeachingAssignment
+
+    def names(tas):
+        found = []
+        for ta in tas:
+            staff_name = _staff_display(ta)
+            if staff_name and staff_name.strip() and staff_name not in found:
+                found.append(staff_name)
+        return found
+
+    base = {'elective_subject__course_code': code, 'academic_year': current_ay, 'is_active': True}
+    if student_regulation:
+        base['elective_subject__regulation'] = student_regulation
+    if dept_id:
+        found = names(
+            TeachingAssignment.objects.filter(**base, elective_subject__department_id=dept_id)
+            .filter(batch_filter).select_related('staff', 'staff__user')
+        )
+        if found:
+            return found
+    found = names(TeachingAssignment.objects.filter(**base).filter(batch_filter).select_related('staff', 'staff__user'))
+    if found:
+        return found
+
+    # Elective placeholders that only exist as curriculum rows.
+    row_filter = {
+        'curriculum_row__course_code': code,
+        'curriculum_row__is_elective': True,
+        'academic_year': current_ay,
+        'is_active': True,
+    }
+    if student_regulation:
+        row_filter['curriculum_row__regulation'] = student_regulation
+    row_tas = TeachingAssignment.objects.filter(**row_filter).filter(batch_filter)
+    tas = row_tas.filter(curriculum_row__department_id=dept_id) if dept_id else row_tas
+    if dept_id and not tas.exists():
+        tas = row_tas
+    found = names(tas.select_related('staff', 'staff__user'))
+    if found:
+        return found
+
+    # Legacy subject table as a last resort.
+    return names(
+        TeachingAssignment.objects.filter(subject__code=code, academic_year=current_ay, is_active=True)
+        .filter(batch_filter).select_related('staff', 'staff__user')
+    )
+
+
+def _elective_assignment(code, dept_id, student_regulation, batch_filter, current_ay):
+    """The teaching assignment feedback for elective `code` is recorded against."""
+    from academics.models import TeachingAssignment
+
+    related = ('staff', 'staff__user', 'elective_subject', 'elective_subject__semester',
+               'curriculum_row', 'curriculum_row__semester', 'subject')
+    base = {'elective_subject__course_code': code, 'academic_year': current_ay, 'is_active': True}
+    if student_regulation:
+        base['elective_subject__regulation'] = student_regulation
+    ta = None
+    if dept_id:
+        ta = TeachingAssignment.objects.filter(**base, elective_subject__department_id=dept_id).filter(batch_filter).select_related(*related).first()
+    if not ta:
+        ta = TeachingAssignment.objects.filter(**base).filter(batch_filter).select_related(*related).first()
+    if ta:
+        return ta
+
+    row_base = {
+        'curriculum_row__course_code': code,
+        'curriculum_row__is_elective': True,
+        'academic_year': current_ay,
+        'is_active': True,
+    }
+    if student_regulation:
+        row_base['curriculum_row__regulation'] = student_regulation
+    if dept_id:
+        ta = TeachingAssignment.objects.filter(**row_base, curriculum_row__department_id=dept_id).filter(batch_filter).select_related(*related).first()
+    if not ta:
+        ta = TeachingAssignment.objects.filter(**row_base).filter(batch_filter).select_related(*related).first()
+    if ta:
+        return ta
+
+    return TeachingAssignment.objects.filter(
+        subject__code=code, academic_year=current_ay, is_active=True,
+    ).filter(batch_filter).select_related(*related).first()
+
+
+def _elective_subject(code, dept_id, student_regulation):
+    from curriculum.models import ElectiveSubject
+
+    elec_filter = {'course_code': code}
+    if student_regulation:
+        elec_filter['regulation'] = student_regulation
+    elec_subj = None
+    if dept_id:
+        elec_subj = ElectiveSubject.objects.filter(**elec_filter, department_id=dept_id).select_related('semester').first()
+    if not elec_subj:
+        elec_subj = ElectiveSubject.objects.filter(**elec_filter).select_related('semester').first()
+    return elec_subj
+
+
+def _resolve(student_profile, target_semesters) -> List[dict]:
+    from academics.models import AcademicYear
+
+    section = student_profile.section
+    batch = section.batch
+    current_ay = AcademicYear.objects.filter(is_active=True).first()
+    student_department = batch.course.department if batch and batch.course else None
+    student_regulation = batch.regulation.code if batch and batch.regulation else None
+
+    core_assignments, subjects_without_ta = _core_assignments(
+        section, student_department, student_regulation, target_semesters, current_ay,
+    )
+
+    # Every active choice, regardless of academic year: a 2nd year student's
+    # Sem 3 and Sem 4 electives must both be listed. The first choice of a
+    # course code decides the department its staff is preferred from.
+    chosen_elective_codes = []
+    elective_dept_map = {}
+    for choice in enrolment_cache.elective_choices([student_profile.id]).get(student_profile.id, []):
+        code = choice['course_code']
+        if code and code not in elective_dept_map:
+            chosen_elective_codes.append(code)
+            elective_dept_map[code] = choice['department_id']
+
+    # Section-specific assignments of the student's batch, or sectionless (PE/EE/OE) ones.
+    batch_filter = (Q(section__batch=batch) | Q(section__isnull=True)) if batch else Q()
+
+    elective_assignments = []
+    staff_map = {}
+    for code in chosen_elective_codes:
+        dept_id = elective_dept_map.get(code)
+        staff_map[code] = _elective_staff(code, dept_id, student_regulation, batch_filter, current_ay)
+        ta = _elective_assignment(code, dept_id, student_regulation, batch_filter, current_ay)
+        if ta:
+            elective_assignments.append(ta)
+
+    for curr_subj in subjects_without_ta:
+        core_assignments.append(_PseudoAssignment(curr_subj, subject_type='core'))
+
+    for code in chosen_elective_codes:
+        elec_subj = _elective_subject(code, elective_dept_map.get(code), student_regulation)
+        if not elec_subj:
+            logger.warning('Elective %s chosen by student %s has no ElectiveSubject row', code, student_profile.id)
+            continue
+        has_ta = any(_ta_code_matches(ta, code) for ta in elective_assignments)
+        if not has_ta:
+            elective_assignments.append(_PseudoAssignment(elec_subj, subject_type='elective'))
+            staff_map[code] = [STAFF_NOT_ASSIGNED]
+        elif not staff_map.get(code):
+            staff_map[code] = [STAFF_NOT_ASSIGNED]
+
+    all_assignments = list(core_assignments) + elective_assignments
+
+    # Year filtering uses the semester of the first assignment with the subject's code.
+    semester_by_code = {}
+    for ta in all_assignments:
+        code = _ta_code(ta)
+        if code in semester_by_code:
+            continue
+        semester_num = None
+        if ta.curriculum_row and ta.curriculum_row.semester:
+            semester_num = ta.curriculum_row.semester.number
+        elif ta.elective_subject and ta.elective_subject.semester:
+            semester_num = ta.elective_subject.semester.number
+        semester_by_code[code] = semester_num
+
+    subjects = []
+    for assignment in all_assignments:
+        subject_name = None
+        subject_code = None
+        is_elective = False
+        if assignment.curriculum_row:
+            subject_name = assignment.curriculum_row.course_name
+            subject_code = assignment.curriculum_row.course_code
+            is_elective = assignment.curriculum_row.is_elective
+        elif assignment.elective_subject:
+            subject_name = assignment.elective_subject.course_name
+            subject_code = assignment.elective_subject.course_code
+            is_elective = True
+        elif assignment.subject:
+            subject_name = assignment.subject.name
+            subject_code = assignment.subject.code
+        elif assignment.custom_subject:
+            subject_name = assignment.get_custom_subject_display()
+            subject_code = assignment.custom_subject
+        if not subject_name:
+            continue
+
+        staff_id = None
+        if is_elective and subject_code and staff_map.get(subject_code):
+            # Electives may be taught by several staff members.
+            staff_list = [s for s in staff_map[subject_code] if s and s.strip()]
+            staff_name = ', '.join(staff_list) if staff_list else STAFF_NOT_ASSIGNED
+        elif assignment.staff:
+            staff_name = assignment.staff.user.get_full_name() or assignment.staff.user.username
+            staff_id = assignment.staff.id
+        else:
+            staff_name = STAFF_NOT_ASSIGNED
+
+        subjects.append({
+            'teaching_assignment_id': assignment.id,
+            'subject_name': subject_name,
+            'subject_code': subject_code,
+            'staff_name': staff_name,
+            'staff_id': staff_id,
+            'type': 'ELECTIVE' if is_elective else 'CORE',
+            'is_pseudo': bool(getattr(assignment, 'is_pseudo', False)),
+            'semester_number': semester_by_code.get(subject_code),
+        })
+    return subjects
+
+
+def _ta_code_matches(ta, code) -> bool:
+    return bool(
+        (ta.elective_subject and ta.elective_subject.course_code == code)
+        or (ta.curriculum_row and ta.curriculum_row.course_code == code)
+        or (ta.subject and ta.subject.code == code)
+    )
+
+
+def enrolled_subjects(student_profile, target_semesters) -> List[dict]:
+    """Subjects (with staff, type and semester number) `student_profile` is taking in `target_semesters`."""
+    semesters = sorted(int(s) for s in target_semesters or [])
+    return enrolment_cache.cached(
+        student_profile.id,
+        ('feedback_subjects', student_profile.section_id, semesters),
+        lambda: _resolve(student_profile, semesters),
+    )
+
+
+def eligible_assignment_ids(user) -> Set[int]:
+    """Cached `get_subject_feedback_eligible_assignment_ids` for the student behind `user`."""
+    from academics.models import StudentProfile
+    from feedback.serializers import resolve_subject_feedback_eligible_assignment_ids
+
+    row = StudentProfile.objects.filter(user=user).values_list('id', 'section_id').first()
+    if not row:
+        return set()
+    student_id, section_id = row
+    return enrolment_cache.cached(
+        student_id,
+        ('feedback_eligible_assignments', section_id),
+        lambda: resolve_subject_feedback_eligible_assignment_ids(user),
+    )
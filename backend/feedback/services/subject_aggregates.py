@@ -0,0 +1,308 @@
+"""Precomputed star totals for the subject-wise feedback reports.
+
+`SubjectWiseReportView` and `BulkSubjectWiseReportView` used to scan every
+rated FeedbackResponse joined to teaching assignments, electives and student
+profiles, then issue several queries per teaching assignment. Totals are now
+kept in `FeedbackSubjectAggregate`, one row per (form, teaching assignment,
+question, student cohort) with the rating count, sum and 1-5 star histogram:
+
+- `record_submission` adds a submission's stars inside the submitting
+  transaction (one insert of missing rows, one ``UPDATE``);
+- `rebuild` recomputes rows from FeedbackResponse
+  (`python manage.py rebuild_feedback_subject_aggregates`);
+- `report_rows` builds the report rows both views export.
+
+Respondents of a (form, teaching assignment, cohort) are the highest rating
+count over its questions; rating questions are mandatory on submit, so every
+respondent rates each of them.
+"""
+import logging
+from collections import Counter
+from typing import Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Max, Q, Sum, Value, When
+
+from feedback.models import FeedbackForm, FeedbackResponse, FeedbackSubjectAggregate
+
+logger = logging.getLogger(__name__)
+
+STARS = (1, 2, 3, 4, 5)
+
+
+def cohort_key(section_id, home_department_id) -> str:
+    return f'{section_id or 0}-{home_department_id or 0}'
+
+
+def _cohort_of(user):
+    from academics.models import StudentProfile
+
+    row = StudentProfile.objects.filter(user=user).values_list('section_id', 'home_department_id').first()
+    return row or (None, None)
+
+
+def record_submission(responses: Iterable[FeedbackResponse], user) -> None:
+    """Add one submission's stars; `responses` share a form and teaching assignment."""
+    rated = [r for r in responses if r.teaching_assignment_id and r.answer_star]
+    if not rated:
+        return
+    first = rated[0]
+    section_id, home_department_id = _cohort_of(user)
+    cohort = cohort_key(section_id, home_department_id)
+    stars = {r.question_id: int(r.answer_star) for r in rated}
+
+    FeedbackSubjectAggregate.objects.bulk_create(
+        [
+            FeedbackSubjectAggregate(
+                feedback_form_id=first.feedback_form_id,
+                teaching_assignment_id=first.teaching_assignment_id,
+                question_id=question_id,
+                student_section_id=section_id,
+                student_home_department_id=home_department_id,
+                cohort=cohort,
+            )
+            for question_id in stars
+        ],
+        ignore_conflicts=True,
+    )
+
+    updates = {
+        'rating_count': F('rating_count') + 1,
+        'rating_sum': F('rating_sum') + Case(
+            *[When(question_id=question_id, then=Value(star)) for question_id, star in stars.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        ),
+    }
+    for star in STARS:
+        question_ids = [question_id for question_id, value in stars.items() if value == star]
+        if question_ids:
+            updates[f'star_{star}'] = F(f'star_{star}') + Case(
+                When(question_id__in=question_ids, then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+    FeedbackSubjectAggregate.objects.filter(
+        feedback_form_id=first.feedback_form_id,
+        teaching_assignment_id=first.teaching_assignment_id,
+        cohort=cohort,
+        question_id__in=list(stars),
+    ).update(**updates)
+
+
+def _rebuild_form(feedback_form_id: int, batch_size: int) -> int:
+    star_counts = {f'star_{star}': Count('id', filter=Q(answer_star=star)) for star in STARS}
+    grouped = (
+        FeedbackResponse.objects.filter(
+            feedback_form_id=feedback_form_id,
+            teaching_assignment__isnull=False,
+            answer_star__isnull=False,
+        )
+        .values(
+            'teaching_assignment_id',
+            'question_id',
+            section_id=F('user__student_profile__section_id'),
+            home_department_id=F('user__student_profile__home_department_id'),
+        )
+        .annotate(rating_count=Count('id'), rating_sum=Sum('answer_star'), **star_counts)
+        .order_by()
+    )
+    rows = [
+        FeedbackSubjectAggregate(
+            feedback_form_id=feedback_form_id,
+            teaching_assignment_id=g['teaching_assignment_id'],
+            question_id=g['question_id'],
+            student_section_id=g['section_id'],
+            student_home_department_id=g['home_department_id'],
+            cohort=cohort_key(g['section_id'], g['home_department_id']),
+            rating_count=g['rating_count'],
+            rating_sum=g['rating_sum'] or 0,
+            **{f'star_{star}': g[f'star_{star}'] for star in STARS},
+        )
+        for g in grouped
+    ]
+    with transaction.atomic():
+        FeedbackSubjectAggregate.objects.filter(feedback_form_id=feedback_form_id).delete()
+        FeedbackSubjectAggregate.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def rebuild(form_ids: Optional[Iterable[int]] = None, batch_size: int = 1000) -> int:
+    """Recompute the aggregate rows of `form_ids` (default: every form with subject responses)."""
+    if form_ids is None:
+        form_ids = (
+            FeedbackResponse.objects.filter(teaching_assignment__isnull=False)
+            .values_list('feedback_form_id', flat=True)
+            .distinct()
+            .order_by('feedback_form_id')
+        )
+    total = 0
+    for feedback_form_id in list(form_ids):
+        total += _rebuild_form(feedback_form_id, batch_size)
+    return total
+
+
+def _department_filter(department_ids) -> Q:
+    # Student's department (home or section) AND the subject/staff belongs to it.
+    return (
+        (Q(student_home_department_id__in=department_ids)
+         | Q(student_section__batch__course__department_id__in=department_ids))
+        & (Q(teaching_assignment__curriculum_row__department_id__in=department_ids)
+           | Q(teaching_assignment__elective_subject__department_id__in=department_ids)
+           | Q(teaching_assignment__staff__department_id__in=department_ids))
+    )
+
+
+def _current_academic_start_year() -> Optional[int]:
+    from academics.models import AcademicYear
+
+    current_ay = AcademicYear.objects.filter(is_active=True).first()
+    if not current_ay:
+        return None
+    try:
+        return int(str(current_ay.name).split('-')[0])
+    except (ValueError, TypeError):
+        return None
+
+
+def _subject_of(ta):
+    if ta.curriculum_row:
+        return ta.curriculum_row.course_code, ta.curriculum_row.course_name
+    if ta.elective_subject:
+        return ta.elective_subject.course_code, ta.elective_subject.course_name
+    if ta.subject:
+        return ta.subject.code, ta.subject.name
+    return None, None
+
+
+def report_rows(user, scope, *, all_departments: bool, department_ids, years, form_id=None,
+                subject_codes=None, student_section_fallback: bool = False) -> List[dict]:
+    """Subject-wise report rows (one per teaching assignment) for the given filters."""
+    from academics.models import Section, TeachingAssignment
+
+    qs = FeedbackSubjectAggregate.objects.filter(
+        feedback_form__status='ACTIVE',
+        feedback_form__active=True,
+        rating_count__gt=0,
+    )
+    if not scope.get('all_departments'):
+        student_dept_ids = scope.get('department_ids', [])
+        if student_dept_ids:
+            qs = qs.filter(_department_filter(student_dept_ids))
+        qs = qs.filter(Q(feedback_form__created_by=user) | Q(feedback_form__allow_hod_view=True))
+    if not all_departments and department_ids:
+        qs = qs.filter(_department_filter(department_ids))
+    if years:
+        year_filter = Q()
+        for year in years:
+            year_filter |= Q(feedback_form__years__contains=[year])
+        qs = qs.filter(year_filter)
+    if form_id:
+        try:
+            qs = qs.filter(feedback_form_id=int(form_id))
+        except (ValueError, TypeError):
+            pass
+    if subject_codes:
+        qs = qs.filter(
+            Q(teaching_assignment__curriculum_row__course_code__in=subject_codes)
+            | Q(teaching_assignment__elective_subject__course_code__in=subject_codes)
+        )
+
+    groups = (
+        qs.values('teaching_assignment_id', 'feedback_form_id', 'student_section_id', 'cohort')
+        .annotate(respondents=Max('rating_count'), stars=Sum('rating_sum'))
+        .order_by()
+    )
+    totals = {}
+    for g in groups:
+        entry = totals.setdefault(g['teaching_assignment_id'], {
+            'responded_students': 0, 'total_stars': 0, 'form_id': 0, 'sections': Counter(),
+        })
+        entry['responded_students'] += g['respondents'] or 0
+        entry['total_stars'] += g['stars'] or 0
+        entry['form_id'] = max(entry['form_id'], g['feedback_form_id'])
+        if g['student_section_id']:
+            entry['sections'][g['student_section_id']] += g['respondents'] or 0
+    if not totals:
+        return []
+
+    assignments = TeachingAssignment.objects.select_related(
+        'staff__user',
+        'staff__department',
+        'section',
+        'curriculum_row',
+        'elective_subject',
+        'subject',
+    ).in_bulk(list(totals))
+    forms = {
+        f['id']: f
+        for f in FeedbackForm.objects.filter(pk__in={e['form_id'] for e in totals.values()})
+        .annotate(question_count=Count('questions'))
+        .values('id', 'form_name', 'question_count')
+    }
+    section_ids = {sid for e in totals.values() for sid in e['sections']}
+    sections = Section.objects.select_related('batch').in_bulk(list(section_ids)) if section_ids else {}
+    acad_start = _current_academic_start_year()
+
+    report_data = []
+    for ta_id, entry in totals.items():
+        ta = assignments.get(ta_id)
+        if not ta:
+            continue
+        subject_code, subject_name = _subject_of(ta)
+        if not subject_code or not subject_name:
+            continue
+
+        if ta.staff and ta.staff.user:
+            staff_name = ta.staff.user.get_full_name() or ta.staff.user.username or 'Unknown Staff'
+        else:
+            staff_name = 'Unknown Staff'
+
+        # Staff's department is the single source of truth for the subject's department.
+        dept_name = 'N/A'
+        dept_id = None
+        if getattr(ta, 'staff', None) and getattr(ta.staff, 'department', None):
+            dept = ta.staff.department
+            dept_name = dept.short_name or dept.code or dept.name
+            dept_id = dept.id
+
+        # Year (and the section of sectionless electives) come from the
+        # assignment's largest student cohort.
+        student_section = None
+        if entry['sections']:
+            student_section = sections.get(entry['sections'].most_common(1)[0][0])
+        year = 'N/A'
+        if student_section and student_section.batch and acad_start:
+            try:
+                year = acad_start - int(student_section.batch.start_year) + 1
+            except (ValueError, TypeError):
+                pass
+
+        section_name = ta.section.name if ta.section else 'NO SECTION'
+        if section_name == 'NO SECTION' and student_section_fallback and student_section:
+            section_name = student_section.name
+
+        form = forms.get(entry['form_id']) or {}
+        total_questions = form.get('question_count') or 0
+        responded_students = entry['responded_students']
+        total_stars = entry['total_stars']
+        rating_percentage = 0
+        if responded_students > 0 and total_questions > 0:
+            max_possible_stars = responded_students * total_questions * 5
+            rating_percentage = min(round((total_stars / max_possible_stars) * 100, 2), 100)
+
+        report_data.append({
+            'form_name': form.get('form_name') or '',
+            'department_id': dept_id,
+            'department': dept_name,
+            'section': section_name,
+            'year': year,
+            'staff_name': staff_name,
+            'subject_code': subject_code,
+            'subject_name': subject_name,
+            'responded_students': responded_students,
+            'total_stars': total_stars,
+            'total_questions': total_questions,
+            'rating_percentage': rating_percentage,
+        })
+    return report_data
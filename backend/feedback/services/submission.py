@@ -0,0 +1,325 @@
+"""Feedback submission pipeline.
+
+`SubmitFeedbackView` used to check for duplicates with ``exists()``, validate
+against freshly queried questions/options, insert one FeedbackResponse per
+answer and then recompute subject completion from scratch. During feedback
+week thousands of students submit within the hour, so a submission now costs:
+
+- one primary-key read of the form's lifecycle flags (status/active are
+  flipped by bulk ``update()`` calls that send no signals, so they are not
+  cached); the form type, comment mode, questions and options are cached as a
+  plain *question map* (`question_map`), dropped by `feedback.signals` when
+  the form, a question or an option is saved or deleted;
+- one ``bulk_create`` for every answer, after one ``exists()`` for an earlier
+  submission of the same (form, user, teaching assignment) taken under a
+  per-user lock (the subject tracker row, or the user row for open
+  feedback); the unique constraints on FeedbackResponse remain a backstop;
+- for subject feedback, one locked read/update of the user's
+  FeedbackFormSubmission row: the responded count is incremented rather than
+  recounted, and only recounted when the row is new or the student's
+  eligible subject set changed;
+- the report star totals (`subject_aggregates.record_submission`) and the
+  principal analytics cube (`analytics_cube.record_submission`) are updated
+  in the same transaction, and cached response exports of the form are
+  retired once it commits (`response_export.bump_data_version`).
+"""
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from feedback.models import (
+    FeedbackForm,
+    FeedbackFormSubmission,
+    FeedbackQuestion,
+    FeedbackQuestionOption,
+    FeedbackResponse,
+)
+from feedback.services import analytics_cube, form_stats, response_export, subject_aggregates
+
+logger = logging.getLogger(__name__)
+
+_QMAP_TIMEOUT = 6 * 60 * 60
+
+
+class DuplicateSubmission(Exception):
+    """The user already answered this form (or this subject of it)."""
+
+
+@dataclass(frozen=True)
+class SubmissionResult:
+    submission_status: Optional[str] = None
+    total_subjects: int = 0
+    responded_subjects: int = 0
+
+
+def _qmap_key(feedback_form_id: int) -> str:
+    return f'feedback:qmap:{feedback_form_id}'
+
+
+def _load_question_map(feedback_form_id: int) -> Optional[dict]:
+    form = (
+        FeedbackForm.objects.filter(pk=feedback_form_id)
+        .values('id', 'type', 'common_comment_enabled')
+        .first()
+    )
+    if form is None:
+        return None
+    questions = {
+        q['id']: {
+            'allow_rating': q['allow_rating'],
+            'allow_comment': q['allow_comment'],
+            'answer_type': q['answer_type'],
+            'question_type': q['question_type'] or 'rating',
+            'option_ids': set(),
+        }
+        for q in FeedbackQuestion.objects.filter(feedback_form_id=feedback_form_id).values(
+            'id', 'allow_rating', 'allow_comment', 'answer_type', 'question_type',
+        )
+    }
+    option_text = {}
+    for option_id, question_id, text in FeedbackQuestionOption.objects.filter(
+        question__feedback_form_id=feedback_form_id,
+    ).values_list('id', 'question_id', 'option_text'):
+        questions[question_id]['option_ids'].add(option_id)
+        option_text[option_id] = text
+    return {'form': form, 'questions': questions, 'option_text': option_text}
+
+
+def question_map(feedback_form_id: int) -> Optional[dict]:
+    """Cached form flags, questions and options of a form; None if the form does not exist."""
+    key = _qmap_key(feedback_form_id)
+    qmap = cache.get(key)
+    if qmap is None:
+        qmap = _load_question_map(feedback_form_id)
+        if qmap is not None:
+            cache.set(key, qmap, timeout=_QMAP_TIMEOUT)
+    return qmap
+
+
+def form_state(feedback_form_id: int) -> Optional[Tuple[str, bool]]:
+    """(status, active) of a form, read uncached; None if the form does not exist."""
+    return FeedbackForm.objects.filter(pk=feedback_form_id).values_list('status', 'active').first()
+
+
+def invalidate_question_map(feedback_form_id: int) -> None:
+    key = _qmap_key(feedback_form_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def _validate_option(question_id, selected_option, option_ids) -> Optional[str]:
+    if selected_option is None:
+        return f'Question {question_id} requires selecting one option'
+    try:
+        selected_option_int = int(selected_option)
+    except Exception:
+        return f'Question {question_id}: Invalid selected option'
+    if selected_option_int not in option_ids:
+        return f'Question {question_id}: Selected option is invalid'
+    return None
+
+
+def _validate_star(question_id, answer_star) -> Optional[str]:
+    if answer_star is None:
+        return f'Question {question_id} requires a star rating (1-5)'
+    if not isinstance(answer_star, int) or answer_star < 1 or answer_star > 5:
+        return f'Question {question_id}: Star rating must be between 1 and 5'
+    return None
+
+
+def validate_answers(qmap: dict, responses: List[dict], common_comment: Any) -> Dict[str, Any]:
+    """Return serializer-style errors ({field: message(s)}) for a submission; empty when valid."""
+    form = qmap['form']
+    questions = qmap['questions']
+    common_comment_enabled = bool(form['common_comment_enabled'])
+    if common_comment_enabled and form['type'] == 'SUBJECT_FEEDBACK':
+        if not str(common_comment or '').strip():
+            return {'common_comment': 'Overall comment is mandatory.'}
+    if not responses:
+        return {'responses': 'At least one response is required.'}
+    if not questions:
+        return {'feedback_form_id': 'This feedback form has no questions.'}
+
+    errors = []
+    for idx, response in enumerate(responses):
+        question_id = response.get('question')
+        if not question_id:
+            errors.append(f'Response {idx + 1}: Missing question ID')
+            continue
+        question_info = questions.get(question_id)
+        if question_info is None:
+            errors.append(f'Question {question_id} does not belong to this form')
+            continue
+
+        allow_rating = question_info['allow_rating']
+        allow_comment = question_info['allow_comment']
+        answer_star = response.get('answer_star')
+        answer_text = response.get('answer_text')
+        selected_option = response.get('selected_option')
+
+        requires_comment = bool(allow_comment) and not common_comment_enabled
+        if requires_comment and (not answer_text or not str(answer_text).strip()):
+            errors.append(f'Question {question_id} requires a comment')
+            continue
+
+        question_type = question_info['question_type']
+        if question_type == 'rating_radio_comment':
+            # Rating + radio are mandatory. Comment is required only when question-wise comments are enabled.
+            error = _validate_star(question_id, answer_star) or _validate_option(
+                question_id, selected_option, question_info['option_ids'],
+            )
+        elif question_type == 'radio':
+            # Radio is mandatory; comment is required only when question-wise comments are enabled.
+            error = _validate_option(question_id, selected_option, question_info['option_ids'])
+        elif allow_rating:
+            # Rating only, or rating + comment: the rating is always required.
+            error = _validate_star(question_id, answer_star)
+        else:
+            error = None
+        if error:
+            errors.append(error)
+
+    return {'responses': errors} if errors else {}
+
+
+def _teaching_assignment(teaching_assignment_id):
+    if not teaching_assignment_id:
+        return None
+    from academics.models import TeachingAssignment
+
+    return (
+        TeachingAssignment.objects.select_related('elective_subject', 'subject')
+        .filter(id=teaching_assignment_id)
+        .first()
+    )
+
+
+def _build_rows(qmap, user, responses, teaching_assignment, common_comment) -> List[FeedbackResponse]:
+    form = qmap['form']
+    common_comment_enabled = bool(form['common_comment_enabled'])
+    common_comment_value = str(common_comment or '').strip() or None
+    option_text = qmap['option_text']
+
+    # Store the subject directly so PE/OE/EE subjects are queryable in reports.
+    subject = None
+    elective_subject = None
+    if teaching_assignment is not None:
+        if teaching_assignment.elective_subject_id:
+            elective_subject = teaching_assignment.elective_subject
+        elif teaching_assignment.subject_id:
+            subject = teaching_assignment.subject
+
+    rows = []
+    for response_data in responses:
+        selected_option_text = None
+        selected_option_id = response_data.get('selected_option')
+        if selected_option_id is not None:
+            try:
+                selected_option_text = option_text.get(int(selected_option_id))
+            except Exception:
+                selected_option_text = None
+        rows.append(FeedbackResponse(
+            feedback_form_id=form['id'],
+            user=user,
+            question_id=response_data['question'],
+            answer_star=response_data.get('answer_star'),
+            answer_text='' if common_comment_enabled else str(response_data.get('answer_text', '')).strip(),
+            common_comment=common_comment_value if common_comment_enabled else None,
+            teaching_assignment=teaching_assignment,
+            subject=subject,
+            elective_subject=elective_subject,
+            selected_option_text=selected_option_text,
+        ))
+    return rows
+
+
+def _lock_submitter(feedback_form_id, user, is_subject):
+    """Serialise a user's submissions to a form; returns the locked tracker row for subject forms."""
+    if is_subject:
+        return FeedbackFormSubmission.objects.select_for_update().get_or_create(
+            feedback_form_id=feedback_form_id,
+            user=user,
+        )
+    # Open feedback keeps no tracker row; the user row is the lock.
+    type(user).objects.select_for_update().filter(pk=user.pk).exists()
+    return None, False
+
+
+def _already_answered(feedback_form_id, user, teaching_assignment) -> bool:
+    return FeedbackResponse.objects.filter(
+        feedback_form_id=feedback_form_id,
+        user=user,
+        teaching_assignment=teaching_assignment,
+    ).exists()
+
+
+def _advance_subject_submission(submission, created, user, teaching_assignment_id, eligible_ids) -> SubmissionResult:
+    from feedback.serializers import count_responded_subjects
+
+    feedback_form_id = submission.feedback_form_id
+    total_subjects = len(eligible_ids)
+    if created or submission.total_subjects != total_subjects:
+        responded_subjects = count_responded_subjects(feedback_form_id, user, eligible_ids)
+    elif teaching_assignment_id in eligible_ids:
+        responded_subjects = submission.responded_subjects + 1
+    else:
+        responded_subjects = submission.responded_subjects
+
+    all_completed = total_subjects > 0 and responded_subjects >= total_subjects
+    submission.total_subjects = total_subjects
+    submission.responded_subjects = responded_subjects
+    submission.submission_status = 'SUBMITTED' if all_completed else 'PENDING'
+    submission.submitted_at = (submission.submitted_at or timezone.now()) if all_completed else None
+    submission.save(update_fields=[
+        'total_subjects', 'responded_subjects', 'submission_status', 'submitted_at', 'updated_at',
+    ])
+    if created:
+        form_stats.record_respondent(feedback_form_id)
+    return SubmissionResult(submission.submission_status, total_subjects, responded_subjects)
+
+
+def submit(qmap: dict, user, responses: List[dict], teaching_assignment_id=None, common_comment=None) -> SubmissionResult:
+    """Insert a validated submission; raises DuplicateSubmission if it was already recorded.
+
+    A submission is one (form, user, teaching assignment) -- open feedback has
+    none -- whatever questions it answers: under a per-user lock, any stored
+    response for that triple rejects it before anything is inserted or counted.
+    """
+    form = qmap['form']
+    is_subject = form['type'] == 'SUBJECT_FEEDBACK'
+    teaching_assignment = _teaching_assignment(teaching_assignment_id)
+    rows = _build_rows(qmap, user, responses, teaching_assignment, common_comment)
+
+    eligible_ids = set()
+    if is_subject:
+        from feedback.serializers import get_subject_feedback_eligible_assignment_ids
+
+        eligible_ids = get_subject_feedback_eligible_assignment_ids(user)
+
+    try:
+        with transaction.atomic():
+            tracker, tracker_created = _lock_submitter(form['id'], user, is_subject)
+            if _already_answered(form['id'], user, teaching_assignment):
+                raise DuplicateSubmission()
+            FeedbackResponse.objects.bulk_create(rows)
+            subject_aggregates.record_submission(rows, user)
+            response_export.bump_data_version(form['id'])
+            if is_subject:
+                result = _advance_subject_submission(
+                    tracker, tracker_created, user, getattr(teaching_assignment, 'id', None), eligible_ids,
+                )
+                analytics_cube.record_submission(rows, user, form_type=form['type'], first_response=tracker_created)
+                return result
+            # Checked above under the lock: this is the user's first response to the form.
+            form_stats.record_respondent(form['id'])
+            analytics_cube.record_submission(rows, user, form_type=form['type'], first_response=True)
+            return SubmissionResult()
+    except IntegrityError:
+        # A racing request that slipped past the lock (e.g. a new tracker row).
+        if _already_answered(form['id'], user, teaching_assignment):
+            raise DuplicateSubmission()
+        raise
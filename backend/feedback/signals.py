@@ -0,0 +1,129 @@
+"""Keep derived feedback data in step with its sources.
+
+- Stored form metrics (`feedback.services.form_stats`): population changes
+  only set `FeedbackFormStats.is_stale`; the next read of an affected form
+  recomputes its expected count. Repeated changes (e.g. a student import)
+  touch no rows once the affected forms are already flagged.
+- Cached question maps (`feedback.services.submission`) are dropped when the
+  form, one of its questions or an option is saved or deleted; the same
+  changes retire cached Excel exports (`feedback.services.response_export`).
+  FeedbackResponse has no receivers so form deletes keep cascading in bulk.
+- Cached analytics slices (`feedback.services.analytics_cube`) are retired
+  when a form or question is deleted, and the cube's copy of the form type
+  follows the form.
+"""
+import logging
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from academics.models import AcademicYear, DepartmentRole, Section, StaffProfile, StudentProfile
+from feedback.models import FeedbackForm, FeedbackQuestion, FeedbackQuestionOption
+from feedback.services import analytics_cube, form_stats, response_export, submission
+
+logger = logging.getLogger(__name__)
+
+_TARGETING_FIELDS = {
+    'target_type', 'department', 'department_id', 'all_classes',
+    'year', 'years', 'semester', 'semester_id', 'semesters', 'section', 'section_id', 'sections',
+}
+
+
+def _mark_stale(**form_filters):
+    try:
+        form_stats.mark_stale(**form_filters)
+    except Exception:
+        logger.exception('Could not flag feedback form stats as stale (%s)', form_filters)
+
+
+def _invalidate_question_map(feedback_form_id):
+    if not feedback_form_id:
+        return
+    try:
+        submission.invalidate_question_map(feedback_form_id)
+    except Exception:
+        logger.exception('Could not drop cached question map of feedback form %s', feedback_form_id)
+    _retire_exports(feedback_form_id)
+
+
+def _retire_analytics():
+    try:
+        analytics_cube.bump_version()
+    except Exception:
+        logger.exception('Could not retire cached feedback analytics slices')
+
+
+def _retire_exports(feedback_form_id):
+    try:
+        response_export.bump_data_version(feedback_form_id)
+    except Exception:
+        logger.exception('Could not retire cached exports of feedback form %s', feedback_form_id)
+
+
+@receiver(post_save, sender=FeedbackForm)
+def feedback_form_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        return
+    _invalidate_question_map(instance.pk)
+    if update_fields is None or _TARGETING_FIELDS.intersection(update_fields):
+        _mark_stale(pk=instance.pk)
+    if update_fields is None or 'type' in update_fields:
+        try:
+            analytics_cube.sync_form_type(instance)
+        except Exception:
+            logger.exception('Could not update analytics form type of feedback form %s', instance.pk)
+
+
+@receiver(post_delete, sender=FeedbackForm)
+def feedback_form_deleted(sender, instance, **kwargs):
+    _invalidate_question_map(instance.pk)
+    _retire_analytics()
+
+
+@receiver(post_save, sender=FeedbackQuestion)
+@receiver(post_delete, sender=FeedbackQuestion)
+def feedback_question_changed(sender, instance, **kwargs):
+    _invalidate_question_map(instance.feedback_form_id)
+
+
+@receiver(post_delete, sender=FeedbackQuestion)
+def feedback_question_deleted(sender, instance, **kwargs):
+    _retire_analytics()
+
+
+@receiver(post_save, sender=FeedbackQuestionOption)
+@receiver(post_delete, sender=FeedbackQuestionOption)
+def feedback_question_option_changed(sender, instance, **kwargs):
+    # During a cascade the question may already be gone; its own receiver covered the form.
+    feedback_form_id = (
+        FeedbackQuestion.objects.filter(pk=instance.question_id)
+        .values_list('feedback_form_id', flat=True)
+        .first()
+    )
+    _invalidate_question_map(feedback_form_id)
+
+
+@receiver(post_save, sender=Section)
+@receiver(post_delete, sender=Section)
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_delete, sender=StudentProfile)
+def student_population_changed(sender, **kwargs):
+    _mark_stale(target_type='STUDENT')
+
+
+@receiver(post_save, sender=StaffProfile)
+@receiver(post_delete, sender=StaffProfile)
+def staff_population_changed(sender, **kwargs):
+    _mark_stale(target_type='STAFF')
+
+
+@receiver(post_save, sender=DepartmentRole)
+@receiver(post_delete, sender=DepartmentRole)
+def hod_population_changed(sender, **kwargs):
+    _mark_stale(target_type='HOD')
+
+
+@receiver(post_save, sender=AcademicYear)
+def academic_year_saved(sender, **kwargs):
+    # Year-of-study targeting and HOD assignments follow the active academic year.
+    _mark_stale()
@@ -25,12 +25,15 @@ from .views import (
     IQACCommonExportView,
     NonRespondersExportView,
     FormExportExcelView,
+    FeedbackExportJobStatusView,
+    FeedbackExportJobDownloadView,
     SubjectWiseReportView,
     BulkSubjectWiseReportView,
     SubjectsFilterView,
     PrincipalCreateFeedbackView,
     PrincipalAnalyticsDashboardView,
     PrincipalFormAnalyticsView,
+    PrincipalAnalyticsCubeView,
 )
 
 urlpatterns = [
@@ -102,6 +105,8 @@ urlpatterns = [
     path('export-years/', IQACExportYearsView.as_view(), name='export-years'),
     path('common-export/', IQACCommonExportView.as_view(), name='common-export'),
     path('non-responders-export/', NonRespondersExportView.as_view(), name='non-responders-export'),
+    path('exports/<str:job_id>/', FeedbackExportJobStatusView.as_view(), name='feedback-export-job'),
+    path('exports/file/<str:token>/', FeedbackExportJobDownloadView.as_view(), name='feedback-export-job-download'),
 
     # Subject Wise Report API
     path('subject-wise-report/', SubjectWiseReportView.as_view(), name='subject-wise-report'),
@@ -116,4 +121,5 @@ urlpatterns = [
     path('principal/create/', PrincipalCreateFeedbackView.as_view(), name='principal-create'),
     path('principal/analytics-dashboard/', PrincipalAnalyticsDashboardView.as_view(), name='principal-analytics-dashboard'),
     path('principal/<int:form_id>/analytics/', PrincipalFormAnalyticsView.as_view(), name='principal-form-analytics'),
+    path('principal/analytics-cube/', PrincipalAnalyticsCubeView.as_view(), name='principal-analytics-cube'),
 ]
@@ -2,68 +2,28 @@ import logging
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 
 logger = logging.getLogger(__name__)
+from django.conf import settings
 from django.db import transaction
 from django.db.models import Q, Case, When, Value, IntegerField, Count
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
 from .models import FeedbackForm, FeedbackQuestion, FeedbackQuestionOption, FeedbackResponse, FeedbackFormSubmission
+from .services import analytics_cube, form_lifecycle, form_stats, non_responders, response_browse, response_export, student_subjects, subject_aggregates, submission
+from .services.display import get_student_display_data  # noqa: F401
 from .serializers import (
     FeedbackFormCreateSerializer,
     FeedbackFormSerializer,
     FeedbackSubmissionSerializer,
-    get_subject_feedback_completion,
 )
 from accounts.utils import get_user_permissions
+from erp.file_serving import serve_file
 from academics.models import StaffProfile
 
 
-def get_student_display_data(response_or_user, feedback_form, student_profile=None, staff_profile=None):
-    """
-    CENTRALIZED MASKING HELPER
-    
-    Returns masked student data if feedback_form.anonymous=True
-    Otherwise returns actual name and register number.
-    
-    This is the ONLY place where student names should be retrieved for display/export.
-    """
-    # Check if form is anonymous
-    is_anonymous = feedback_form and getattr(feedback_form, 'anonymous', False)
-    
-    if is_anonymous:
-        # Anonymous feedback - mask all data
-        return {
-            'student_name': 'Anonymous',
-            'register_number': ''
-        }
-    
-    # Return real data
-    if hasattr(response_or_user, 'user'):
-        # It's a response object
-        user = response_or_user.user
-    else:
-        # It's a user object directly
-        user = response_or_user
-    
-    student_name = user.get_full_name() or user.username
-    
-    # Get register number
-    if student_profile:
-        register_number = getattr(student_profile, 'reg_no', '') or user.username
-    elif staff_profile:
-        register_number = getattr(staff_profile, 'staff_id', '') or user.username
-    else:
-        register_number = user.username
-    
-    return {
-        'student_name': student_name,
-        'register_number': register_number
-    }
-
-
 def get_normalized_permissions(user):
     if not user or not getattr(user, 'is_authenticated', False):
         return set()
@@ -138,6 +98,14 @@ def get_feedback_department_scope(user):
     }
 
 
+def is_dry_run(request) -> bool:
+    """Bulk lifecycle endpoints only report counts when asked with dry_run=true."""
+    value = request.data.get('dry_run') if hasattr(request.data, 'get') else None
+    if value is None:
+        value = request.query_params.get('dry_run')
+    return str(value or '').lower() in ('1', 'true', 'yes')
+
+
 def apply_department_scope_filter(queryset, scope, field_name='department_id'):
     if scope.get('all_departments'):
         return queryset
@@ -151,79 +119,7 @@ def apply_department_scope_filter(queryset, scope, field_name='department_id'):
 
 def calculate_feedback_response_metrics(feedback_form):
     """Return response_count, expected_count, and percentage for a feedback form."""
-    from academics.models import StudentProfile, Section, AcademicYear, DepartmentRole
-
-    response_count = FeedbackResponse.objects.filter(
-        feedback_form=feedback_form
-    ).values('user_id').distinct().count()
-
-    expected_count = 0
-
-    if feedback_form.target_type in {'STAFF', 'HOD'}:
-        if feedback_form.target_type == 'HOD':
-            active_ay = AcademicYear.objects.filter(is_active=True).first()
-            if active_ay:
-                expected_count = DepartmentRole.objects.filter(
-                    role='HOD',
-                    is_active=True,
-                    academic_year=active_ay,
-                    department_id=feedback_form.department_id,
-                ).values('staff_id').distinct().count()
-        else:
-            expected_count = StaffProfile.objects.filter(
-                department_id=feedback_form.department_id
-            ).count()
-    elif feedback_form.target_type == 'STUDENT':
-        if feedback_form.all_classes:
-            expected_count = StudentProfile.objects.filter(
-                section__batch__course__department_id=feedback_form.department_id
-            ).count()
-        else:
-            sections_to_query = []
-
-            current_ay = AcademicYear.objects.filter(is_active=True).first()
-            current_acad_year = None
-            if current_ay:
-                try:
-                    current_acad_year = int(str(current_ay.name).split('-')[0])
-                except Exception:
-                    current_acad_year = None
-
-            if feedback_form.sections:
-                sections_to_query = list(feedback_form.sections)
-            elif feedback_form.section_id:
-                sections_to_query = [feedback_form.section_id]
-            else:
-                sections_filter = Q(batch__course__department_id=feedback_form.department_id)
-
-                if feedback_form.years:
-                    year_filters = Q()
-                    for year in feedback_form.years:
-                        if current_acad_year:
-                            batch_start_year = current_acad_year - year + 1
-                            year_filters |= Q(batch__start_year=str(batch_start_year))
-                    sections_filter &= year_filters
-                elif feedback_form.year:
-                    if current_acad_year:
-                        batch_start_year = current_acad_year - feedback_form.year + 1
-                        sections_filter &= Q(batch__start_year=str(batch_start_year))
-
-                if feedback_form.semesters:
-                    sections_filter &= Q(semester_id__in=feedback_form.semesters)
-                elif feedback_form.semester_id:
-                    sections_filter &= Q(semester_id=feedback_form.semester_id)
-
-                sections_to_query = list(
-                    Section.objects.filter(sections_filter).values_list('id', flat=True)
-                )
-
-            if sections_to_query:
-                expected_count = StudentProfile.objects.filter(
-                    section_id__in=sections_to_query
-                ).count()
-
-    percentage = round((response_count / expected_count * 100) if expected_count > 0 else 0, 1)
-    return response_count, expected_count, percentage
+    return form_stats.metrics(feedback_form)
 
 
 def has_principal_scope_permissions(user):
@@ -490,7 +386,7 @@ class GetFeedbackFormsView(APIView):
                         default=Value(4),
                         output_field=IntegerField()
                     )
-                ).order_by('status_priority', '-created_at').distinct()
+                ).select_related('stats').order_by('status_priority', '-created_at').distinct()
             except StaffProfile.DoesNotExist:
                 # HOD without staff profile - no forms
                 forms = FeedbackForm.objects.none()
@@ -611,7 +507,22 @@ class GetFeedbackFormsView(APIView):
             context.update(student_context)
         
         serializer = FeedbackFormSerializer(forms, many=True, context=context)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        data = serializer.data
+        if is_hod:
+            # Stored metrics of the HOD's own forms in one query (was one /statistics call per form).
+            own_forms = [form for form in forms if form.created_by_id == user.id]
+            metrics = form_stats.metrics_for(own_forms)
+            for item in data:
+                if item['id'] not in metrics:
+                    continue
+                response_count, expected_count, percentage = metrics[item['id']]
+                item['response_stats'] = {
+                    'feedback_form_id': item['id'],
+                    'response_count': response_count,
+                    'expected_count': expected_count,
+                    'percentage': percentage,
+                }
+        return Response(data, status=status.HTTP_200_OK)
 
 
 class SubmitFeedbackView(APIView):
@@ -633,15 +544,10 @@ class SubmitFeedbackView(APIView):
         
         serializer = FeedbackSubmissionSerializer(data=request.data)
         if serializer.is_valid():
-            feedback_form_id = serializer.validated_data['feedback_form_id']
             teaching_assignment_id = serializer.validated_data.get('teaching_assignment_id')
-            
-            # Get the feedback form to check type
-            feedback_form = get_object_or_404(FeedbackForm, id=feedback_form_id)
-            
-            # Check for duplicate submission
-            if feedback_form.type == 'SUBJECT_FEEDBACK':
-                # For subject feedback: check if user has already submitted for this subject
+            is_subject_feedback = serializer.question_map['form']['type'] == 'SUBJECT_FEEDBACK'
+
+            if is_subject_feedback:
                 if not teaching_assignment_id:
                     return Response({
                         'detail': 'Teaching assignment ID is required for subject feedback.'
@@ -652,72 +558,36 @@ class SubmitFeedbackView(APIView):
                     return Response({
                         'detail': 'Subject mapping not found. Please contact your HOD to map this subject before submitting feedback.'
                     }, status=status.HTTP_400_BAD_REQUEST)
-
-                existing_response = FeedbackResponse.objects.filter(
-                    feedback_form_id=feedback_form_id,
-                    user=request.user,
-                    teaching_assignment_id=teaching_assignment_id
-                ).exists()
-
-                if existing_response:
-                    return Response({
-                        'detail': 'Feedback already submitted'
-                    }, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                # For open feedback: check if user has submitted for this form
-                existing_response = FeedbackResponse.objects.filter(
-                    feedback_form_id=feedback_form_id,
-                    user=request.user,
-                    teaching_assignment__isnull=True
-                ).exists()
-                
-                if existing_response:
-                    return Response({
-                        'detail': 'You have already submitted feedback for this form.'
-                    }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Save responses
+            # Save responses; submission.submit locks the user's tracker (or user) row and
+            # rejects a repeat for this form/teaching assignment before inserting.
             try:
-                feedback_form = serializer.save(user=request.user)
-
-                if feedback_form.type == 'SUBJECT_FEEDBACK':
-                    completion = get_subject_feedback_completion(feedback_form, request.user)
-                    total_subjects = completion['total_subjects']
-                    responded_subjects = completion['responded_subjects']
-                    all_completed = completion['all_completed']
-
-                    status_value = 'SUBMITTED' if all_completed else 'PENDING'
-                    submitted_at = timezone.now() if all_completed else None
-
-                    FeedbackFormSubmission.objects.update_or_create(
-                        feedback_form=feedback_form,
-                        user=request.user,
-                        defaults={
-                            'submission_status': status_value,
-                            'total_subjects': total_subjects,
-                            'responded_subjects': responded_subjects,
-                            'submitted_at': submitted_at,
-                        }
-                    )
+                result = serializer.save(user=request.user)
 
-                    if all_completed:
+                if is_subject_feedback:
+                    if result.submission_status == 'SUBMITTED':
                         return Response({
                             'message': 'Feedback Submitted Successfully',
                             'submission_status': 'SUBMITTED',
-                            'total_subjects': total_subjects,
-                            'responded_subjects': responded_subjects,
+                            'total_subjects': result.total_subjects,
+                            'responded_subjects': result.responded_subjects,
                         }, status=status.HTTP_200_OK)
 
                     return Response({
                         'message': 'Pending – Complete all subjects',
                         'submission_status': 'PENDING',
-                        'total_subjects': total_subjects,
-                        'responded_subjects': responded_subjects,
+                        'total_subjects': result.total_subjects,
+                        'responded_subjects': result.responded_subjects,
                     }, status=status.HTTP_200_OK)
                 
                 return Response({
                     'message': 'Feedback submitted successfully'
                 }, status=status.HTTP_200_OK)
+            except submission.DuplicateSubmission:
+                return Response({
+                    'detail': 'Feedback already submitted' if is_subject_feedback
+                    else 'You have already submitted feedback for this form.'
+                }, status=status.HTTP_400_BAD_REQUEST)
             except Exception as e:
                 error_msg = str(e)
                 logger.exception(f'[FEEDBACK SUBMIT] Error saving responses: {error_msg}')
@@ -1201,19 +1071,19 @@ class DeactivateAllFeedbackFormsView(APIView):
                 'detail': 'You do not have permission to deactivate all feedback forms.'
             }, status=status.HTTP_403_FORBIDDEN)
 
-        with transaction.atomic():
-            qs = FeedbackForm.objects.filter(status='ACTIVE', active=True)
-            qs = apply_department_scope_filter(qs, scope, field_name='department_id')
-            
-            # For HOD users: only deactivate forms they created
-            if not scope.get('all_departments'):
-                qs = qs.filter(created_by=request.user)
-            
-            updated = qs.update(active=False)
+        dry_run = is_dry_run(request)
+        qs = apply_department_scope_filter(FeedbackForm.objects.all(), scope, field_name='department_id')
+        
+        # For HOD users: only deactivate forms they created
+        if not scope.get('all_departments'):
+            qs = qs.filter(created_by=request.user)
+        
+        updated = form_lifecycle.set_active(qs, False, dry_run=dry_run)
 
         return Response({
             'message': 'All active feedback forms deactivated',
             'count': updated,
+            'dry_run': dry_run,
         }, status=status.HTTP_200_OK)
 
 
@@ -1238,9 +1108,9 @@ class DeactivateFilteredFeedbackFormsView(APIView):
         department_ids = request.data.get('department_ids', []) or []
         all_years = bool(request.data.get('all_years', False))
         years = request.data.get('years', []) or []
+        dry_run = is_dry_run(request)
 
-        qs = FeedbackForm.objects.filter(status='ACTIVE', active=True)
-        qs = apply_department_scope_filter(qs, scope, field_name='department_id')
+        qs = apply_department_scope_filter(FeedbackForm.objects.all(), scope, field_name='department_id')
 
         # For HOD users: only deactivate forms they created
         if not scope.get('all_departments'):
@@ -1248,34 +1118,23 @@ class DeactivateFilteredFeedbackFormsView(APIView):
             # Own-department users are always scoped by server-side department filter.
             all_departments = True
 
-        if not all_departments and department_ids:
-            try:
-                normalized_department_ids = [int(d) for d in department_ids]
-                qs = qs.filter(department_id__in=normalized_department_ids)
-            except Exception:
-                return Response({
-                    'detail': 'Invalid department_ids payload.'
-                }, status=status.HTTP_400_BAD_REQUEST)
-
-        if not all_years and years:
-            year_filter = Q()
-            for year in years:
-                try:
-                    y = int(year)
-                except Exception:
-                    continue
-                year_filter |= Q(year=y)
-                year_filter |= Q(years__contains=[y])
-
-            if year_filter:
-                qs = qs.filter(year_filter)
+        try:
+            qs = form_lifecycle.filter_forms(
+                qs,
+                department_ids=[] if all_departments else department_ids,
+                years=[] if all_years else years,
+            )
+        except (TypeError, ValueError):
+            return Response({
+                'detail': 'Invalid department_ids payload.'
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-        with transaction.atomic():
-            updated = qs.update(active=False)
+        updated = form_lifecycle.set_active(qs, False, dry_run=dry_run)
 
         return Response({
             'message': 'Filtered active feedback forms deactivated',
             'count': updated,
+            'dry_run': dry_run,
         }, status=status.HTTP_200_OK)
 
 
@@ -1295,19 +1154,19 @@ class ActivateAllFeedbackFormsView(APIView):
                 'detail': 'You do not have permission to activate all feedback forms.'
             }, status=status.HTTP_403_FORBIDDEN)
 
-        with transaction.atomic():
-            qs = FeedbackForm.objects.filter(status='ACTIVE', active=False)
-            qs = apply_department_scope_filter(qs, scope, field_name='department_id')
-            
-            # For HOD users: only activate forms they created
-            if not scope.get('all_departments'):
-                qs = qs.filter(created_by=request.user)
-            
-            updated = qs.update(active=True)
+        dry_run = is_dry_run(request)
+        qs = apply_department_scope_filter(FeedbackForm.objects.all(), scope, field_name='department_id')
+        
+        # For HOD users: only activate forms they created
+        if not scope.get('all_departments'):
+            qs = qs.filter(created_by=request.user)
+        
+        updated = form_lifecycle.set_active(qs, True, dry_run=dry_run)
 
         return Response({
             'message': 'All forms activated',
             'count': updated,
+            'dry_run': dry_run,
         }, status=status.HTTP_200_OK)
 
 
@@ -1332,9 +1191,9 @@ class ActivateFilteredFeedbackFormsView(APIView):
         department_ids = request.data.get('department_ids', []) or []
         all_years = bool(request.data.get('all_years', False))
         years = request.data.get('years', []) or []
+        dry_run = is_dry_run(request)
 
-        qs = FeedbackForm.objects.filter(status='ACTIVE', active=False)
-        qs = apply_department_scope_filter(qs, scope, field_name='department_id')
+        qs = apply_department_scope_filter(FeedbackForm.objects.all(), scope, field_name='department_id')
 
         # For HOD users: only activate forms they created
         if not scope.get('all_departments'):
@@ -1342,34 +1201,23 @@ class ActivateFilteredFeedbackFormsView(APIView):
             # Own-department users are always scoped by server-side department filter.
             all_departments = True
 
-        if not all_departments and department_ids:
-            try:
-                normalized_department_ids = [int(d) for d in department_ids]
-                qs = qs.filter(department_id__in=normalized_department_ids)
-            except Exception:
-                return Response({
-                    'detail': 'Invalid department_ids payload.'
-                }, status=status.HTTP_400_BAD_REQUEST)
-
-        if not all_years and years:
-            year_filter = Q()
-            for year in years:
-                try:
-                    y = int(year)
-                except Exception:
-                    continue
-                year_filter |= Q(year=y)
-                year_filter |= Q(years__contains=[y])
-
-            if year_filter:
-                qs = qs.filter(year_filter)
+        try:
+            qs = form_lifecycle.filter_forms(
+                qs,
+                department_ids=[] if all_departments else department_ids,
+                years=[] if all_years else years,
+            )
+        except (TypeError, ValueError):
+            return Response({
+                'detail': 'Invalid department_ids payload.'
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-        with transaction.atomic():
-            updated = qs.update(active=True)
+        updated = form_lifecycle.set_active(qs, True, dry_run=dry_run)
 
         return Response({
             'message': 'Forms activated successfully',
             'count': updated,
+            'dry_run': dry_run,
         }, status=status.HTTP_200_OK)
 
 
@@ -1477,14 +1325,14 @@ class PublishAllFeedbackFormsView(APIView):
                 'detail': 'You do not have permission to publish all feedback forms.'
             }, status=status.HTTP_403_FORBIDDEN)
         
-        with transaction.atomic():
-            qs = FeedbackForm.objects.filter(status='DRAFT')
-            qs = apply_department_scope_filter(qs, scope, field_name='department_id')
-            updated = qs.update(status='ACTIVE')
+        dry_run = is_dry_run(request)
+        qs = apply_department_scope_filter(FeedbackForm.objects.all(), scope, field_name='department_id')
+        updated = form_lifecycle.publish(qs, dry_run=dry_run)
         
         return Response({
             'message': 'All draft feedback forms published',
             'count': updated,
+            'dry_run': dry_run,
         }, status=status.HTTP_200_OK)
 
 
@@ -1494,7 +1342,9 @@ class DeleteAllDeactivatedFeedbackFormsView(APIView):
     POST /api/feedback/delete-all-deactivated/
     
     IQAC/Admin can delete all deactivated feedback forms in one action.
-    Deletes forms where status='ACTIVE' and active=False.
+    Deletes forms where status='ACTIVE' and active=False, with their responses
+    removed in batches (see feedback.services.form_lifecycle). dry_run=true
+    only reports the counts.
     """
     permission_classes = [IsAuthenticated]
     
@@ -1505,14 +1355,17 @@ class DeleteAllDeactivatedFeedbackFormsView(APIView):
                 'detail': 'You do not have permission to delete feedback forms.'
             }, status=status.HTTP_403_FORBIDDEN)
         
-        with transaction.atomic():
-            qs = FeedbackForm.objects.filter(status='ACTIVE', active=False)
-            qs = apply_department_scope_filter(qs, scope, field_name='department_id')
-            deleted_count, _ = qs.delete()
+        dry_run = is_dry_run(request)
+        qs = FeedbackForm.objects.filter(status='ACTIVE', active=False)
+        qs = apply_department_scope_filter(qs, scope, field_name='department_id')
+        counts = form_lifecycle.delete_forms(qs, dry_run=dry_run)
         
         return Response({
             'message': 'All deactivated feedback forms deleted',
-            'count': deleted_count,
+            'count': counts['forms'],
+            'responses': counts['responses'],
+            'submissions': counts['submissions'],
+            'dry_run': dry_run,
         }, status=status.HTTP_200_OK)
 
 
@@ -1543,84 +1396,13 @@ class GetResponseStatisticsView(APIView):
                 'detail': 'You can only view statistics for forms you created.'
             }, status=status.HTTP_403_FORBIDDEN)
         
-        # Get unique users who responded
-        responded_users = FeedbackResponse.objects.filter(
-            feedback_form=feedback_form
-        ).values_list('user', flat=True).distinct()
-        
-        response_count = len(set(responded_users))
-        
-        # Calculate expected responses based on target type and class info
-        expected_count = 0
-        
-        if feedback_form.target_type == 'STAFF':
-            # Count staff in department
-            expected_count = StaffProfile.objects.filter(
-                department=feedback_form.department
-            ).count()
-        elif feedback_form.target_type == 'STUDENT':
-            from academics.models import StudentProfile, Section, AcademicYear
-            
-            if feedback_form.all_classes:
-                # All students in department
-                expected_count = StudentProfile.objects.filter(
-                    section__batch__course__department=feedback_form.department
-                ).count()
-            else:
-                # Students matching year/semester/section criteria
-                sections_to_query = []
-                
-                # Get current academic year for year calculation
-                current_ay = AcademicYear.objects.filter(is_active=True).first()
-                current_acad_year = None
-                if current_ay:
-                    try:
-                        current_acad_year = int(str(current_ay.name).split('-')[0])
-                    except:
-                        pass
-                
-                # Build list of matching sections
-                if feedback_form.sections:  # Multi-class: use sections list
-                    sections_to_query = list(feedback_form.sections)
-                elif feedback_form.section_id:  # Legacy: single section
-                    sections_to_query = [feedback_form.section_id]
-                else:
-                    # No specific sections: query by year and semester
-                    sections_filter = Q(batch__course__department=feedback_form.department)
-                    
-                    # Filter by years
-                    if feedback_form.years:
-                        year_filters = Q()
-                        for year in feedback_form.years:
-                            if current_acad_year:
-                                batch_start_year = current_acad_year - year + 1
-                                year_filters |= Q(batch__start_year=str(batch_start_year))
-                        sections_filter &= year_filters
-                    elif feedback_form.year:
-                        if current_acad_year:
-                            batch_start_year = current_acad_year - feedback_form.year + 1
-                            sections_filter &= Q(batch__start_year=str(batch_start_year))
-                    
-                    # Filter by semesters
-                    if feedback_form.semesters:
-                        sections_filter &= Q(semester_id__in=feedback_form.semesters)
-                    elif feedback_form.semester_id:
-                        sections_filter &= Q(semester=feedback_form.semester)
-                    
-                    matching_sections = Section.objects.filter(sections_filter)
-                    sections_to_query = [s.id for s in matching_sections]
-                
-                # Count students in matching sections
-                if sections_to_query:
-                    expected_count = StudentProfile.objects.filter(
-                        section_id__in=sections_to_query
-                    ).count()
-        
+        response_count, expected_count, percentage = form_stats.metrics(feedback_form)
+
         return Response({
             'feedback_form_id': form_id,
             'response_count': response_count,
             'expected_count': expected_count,
-            'percentage': round((response_count / expected_count * 100) if expected_count > 0 else 0, 1)
+            'percentage': percentage,
         }, status=status.HTTP_200_OK)
 
 
@@ -1784,14 +1566,17 @@ class PrincipalAnalyticsDashboardView(APIView):
                 'detail': 'You do not have permission to view principal analytics dashboard.'
             }, status=status.HTTP_403_FORBIDDEN)
 
-        forms = FeedbackForm.objects.filter(
-            created_by=request.user,
-            is_subject_based=False,
-        ).prefetch_related('questions')
+        forms = list(
+            FeedbackForm.objects.filter(
+                created_by=request.user,
+                is_subject_based=False,
+            ).select_related('stats').prefetch_related('questions').order_by('-created_at')
+        )
+        metrics = form_stats.metrics_for(forms)
 
         items = []
-        for form in forms.order_by('-created_at'):
-            response_count, expected_count, percentage = calculate_feedback_response_metrics(form)
+        for form in forms:
+            response_count, expected_count, percentage = metrics[form.id]
             items.append({
                 'id': form.id,
                 'feedback_type': 'PRINCIPAL',
@@ -1802,7 +1587,7 @@ class PrincipalAnalyticsDashboardView(APIView):
                 'response_count': response_count,
                 'expected_count': expected_count,
                 'percentage': percentage,
-                'questions_count': form.questions.count(),
+                'questions_count': len(form.questions.all()),
             })
 
         return Response({'items': items}, status=status.HTTP_200_OK)
@@ -1877,6 +1662,68 @@ class PrincipalFormAnalyticsView(APIView):
         }, status=status.HTTP_200_OK)
 
 
+class PrincipalAnalyticsCubeView(APIView):
+    """
+    Principal feedback analytics across forms, served from the analytics cube.
+    GET /api/feedback/principal/analytics-cube/
+
+    Query params (lists may be comma separated or repeated):
+    - group_by: department, year, form_type, form, question (default department,year)
+    - department_ids, years, form_types, form_ids: filters
+    - mine=true: only forms created by the requesting principal
+    Each row carries the rating distribution, average rating and response rate.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @staticmethod
+    def _list_param(request, name, cast=str):
+        values = []
+        for raw in request.query_params.getlist(name):
+            for part in str(raw).split(','):
+                part = part.strip()
+                if part:
+                    values.append(cast(part))
+        return values
+
+    def get(self, request):
+        user_permissions = get_normalized_permissions(request.user)
+        required = {
+            'feedback.principal_feedback_page',
+            'feedback.principal_analytics',
+            'feedback.principal_all_departments_access',
+        }
+        if not required.issubset(user_permissions):
+            return Response({
+                'detail': 'You do not have permission to view principal analytics.'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            filters = {
+                'department_ids': self._list_param(request, 'department_ids', int),
+                'years': self._list_param(request, 'years', int),
+                'form_ids': self._list_param(request, 'form_ids', int),
+                'form_types': [t.upper() for t in self._list_param(request, 'form_types')],
+            }
+        except ValueError:
+            return Response({
+                'detail': 'department_ids, years and form_ids must be integers.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        group_by = self._list_param(request, 'group_by') or list(analytics_cube.DEFAULT_GROUP_BY)
+        unknown = [name for name in group_by if name not in analytics_cube.DIMENSIONS]
+        if unknown:
+            return Response({
+                'detail': f'Unknown group_by dimension(s): {", ".join(unknown)}.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if str(request.query_params.get('mine') or '').lower() in ('1', 'true', 'yes'):
+            filters['created_by'] = request.user.id
+
+        data = analytics_cube.slice_rows(group_by, **filters)
+        return Response(data, status=status.HTTP_200_OK)
+
+
 class GetResponseListView(APIView):
     """
     API 8: Get Response List
@@ -1884,6 +1731,10 @@ class GetResponseListView(APIView):
     
     HOD can view detailed response list for a feedback form.
     Shows: responded users with answers, and non-responded users.
+    
+    Respondents are paged (?limit=, default FEEDBACK_RESPONSES_PAGE_SIZE); pass the
+    returned next_cursor as ?cursor= for the next page. Only the first page includes
+    non_responders and the totals.
     """
     permission_classes = [IsAuthenticated]
     
@@ -1967,32 +1818,19 @@ class GetResponseListView(APIView):
             }, status=status.HTTP_403_FORBIDDEN)
         
         
-        # Get all responses for this form, grouped by user
+        # Responses are grouped per respondent in SQL and served a page at a time
+        # (?limit=, ?cursor=); the first page also carries non-responders and totals.
+        cursor = request.query_params.get('cursor') or None
+        limit = response_browse.page_size(request.query_params.get('limit'))
         try:
             from django.contrib.auth import get_user_model
-            from django.db.models import Q
-            from academics.models import StudentProfile, Section, AcademicYear
+            from academics.models import Section, AcademicYear
             
             User = get_user_model()
             
             logger.info(f"[GetResponseListView] Processing responses for form {form_id}")
             
-            responses_by_user = {}
-            all_responses = FeedbackResponse.objects.filter(
-                feedback_form=feedback_form
-            ).select_related(
-                'user', 
-                'question',
-                'teaching_assignment',
-                'teaching_assignment__staff',
-                'teaching_assignment__staff__user',
-                'teaching_assignment__curriculum_row',
-                'teaching_assignment__curriculum_row__department',
-                'teaching_assignment__subject',
-                'teaching_assignment__elective_subject',
-                'teaching_assignment__elective_subject__department',
-                'feedback_form__department'
-            )
+            all_responses = FeedbackResponse.objects.filter(feedback_form=feedback_form)
             
             # Filter responses by HOD's managed departments if this is a HOD viewer
             # MULTI-DEPARTMENT SUPPORT: If HOD manages multiple departments, show responses from ALL of them
@@ -2006,90 +1844,26 @@ class GetResponseListView(APIView):
                     Q(teaching_assignment__elective_subject__department_id__in=hod_department_ids) |
                     Q(feedback_form__department_id__in=hod_department_ids)
                 )
-                logger.info(f"[GetResponseListView] Filtered {all_responses.count()} responses for HOD departments {hod_department_ids}")
             
-            logger.info(f"[GetResponseListView] Found {all_responses.count()} total responses")
+            try:
+                responded, next_cursor = response_browse.responded_page(
+                    feedback_form, all_responses, cursor=cursor, limit=limit
+                )
+            except response_browse.InvalidCursor:
+                return Response({
+                    'detail': 'Invalid cursor.'
+                }, status=status.HTTP_400_BAD_REQUEST)
             
-            for response in all_responses:
-                user_id = response.user.id
-                if user_id not in responses_by_user:
-                    # Get user details
-                    user = response.user
-                    user_name = user.get_full_name() or user.username
-                    register_number = None
-                    
-                    # Get register number from profile
-                    if feedback_form.target_type == 'STUDENT':
-                        try:
-                            student_profile = StudentProfile.objects.get(user=user)
-                            register_number = getattr(student_profile, 'reg_no', None) or user.username
-                        except StudentProfile.DoesNotExist:
-                            register_number = user.username
-                    elif feedback_form.target_type == 'STAFF':
-                        try:
-                            staff_profile = StaffProfile.objects.get(user=user)
-                            register_number = getattr(staff_profile, 'staff_id', None) or user.username
-                        except StaffProfile.DoesNotExist:
-                            register_number = user.username
-                    
-                    # Apply anonymous masking if feedback form is anonymous
-                    if feedback_form.anonymous:
-                        user_name = "Anonymous"
-                        register_number = ""
-                    
-                    responses_by_user[user_id] = {
-                        'user_id': user_id,
-                        'user_name': user_name,
-                        'register_number': register_number,
-                        'submitted_at': response.created_at.isoformat(),
-                        'answers': []
-                    }
-                
-                # Get teaching assignment details if present (for subject feedback)
-                teaching_assignment_data = None
-                if response.teaching_assignment:
-                    ta = response.teaching_assignment
-                    
-                    # Get subject name
-                    subject_name = None
-                    subject_code = None
-                    if ta.curriculum_row:
-                        subject_name = ta.curriculum_row.course_name
-                        subject_code = ta.curriculum_row.course_code
-                    elif ta.subject:
-                        subject_name = ta.subject.name
-                        subject_code = ta.subject.code
-                    elif ta.elective_subject:
-                        subject_name = ta.elective_subject.course_name
-                        subject_code = ta.elective_subject.course_code
-                    elif ta.custom_subject:
-                        subject_name = ta.get_custom_subject_display()
-                        subject_code = ta.custom_subject
-                    
-                    # Get staff name
-                    staff_name = ta.staff.user.get_full_name() or ta.staff.user.username if ta.staff else None
-                    
-                    teaching_assignment_data = {
-                        'teaching_assignment_id': ta.id,
-                        'subject_name': subject_name,
-                        'subject_code': subject_code,
-                        'staff_name': staff_name
-                    }
-                
-                # Add answer (runs for every response)
-                responses_by_user[user_id]['answers'].append({
-                    'question_id': response.question.id,
-                    'question_text': response.question.question,
-                    'answer_type': response.question.answer_type,
-                    'answer_star': response.answer_star,
-                    # Keep both key styles for frontend compatibility.
-                    'question_comment': response.answer_text,
-                    'answer_text': response.answer_text,
-                    'common_comment': response.common_comment,
-                    'selected_option': response.selected_option_text,
-                    'selected_option_text': response.selected_option_text,
-                    'teaching_assignment': teaching_assignment_data
-                })
+            page = {
+                'feedback_form_id': form_id,
+                'form_name': feedback_form.form_name or "",
+                'target_type': feedback_form.target_type,
+                'responded': responded,
+                'next_cursor': next_cursor,
+                'has_more': next_cursor is not None,
+            }
+            if cursor:
+                return Response(page, status=status.HTTP_200_OK)
             
             # Get list of users who should have responded but didn't
             non_responders = []
@@ -2161,50 +1935,28 @@ class GetResponseListView(APIView):
             # Find non-responders
             # NOTE: For HOD viewers, responses are already filtered by HOD's department above
             # This correctly calculates non-responders within the HOD's visible response set
-            responded_user_ids = set(responses_by_user.keys())
+            responded_user_ids = set(all_responses.order_by().values_list('user_id', flat=True).distinct())
             
-            for user_id in expected_users:
-                if user_id not in responded_user_ids:
-                    user = User.objects.get(id=user_id)
-                    user_name = user.get_full_name() or user.username
-                    register_number = None
-                    
-                    if feedback_form.target_type == 'STUDENT':
-                        try:
-                            student_profile = StudentProfile.objects.get(user=user)
-                            register_number = getattr(student_profile, 'reg_no', None) or user.username
-                        except StudentProfile.DoesNotExist:
-                            register_number = user.username
-                    elif feedback_form.target_type == 'STAFF':
-                        try:
-                            staff_profile = StaffProfile.objects.get(user=user)
-                            register_number = getattr(staff_profile, 'staff_id', None) or user.username
-                        except StaffProfile.DoesNotExist:
-                            register_number = user.username
-                    
-                    # Apply anonymous masking if feedback form is anonymous
-                    if feedback_form.anonymous:
-                        user_name = "Anonymous"
-                        register_number = ""
-                    
-                    non_responders.append({
-                        'user_id': user_id,
-                        'user_name': user_name,
-                        'register_number': register_number
-                    })
+            non_responder_ids = [user_id for user_id in expected_users if user_id not in responded_user_ids]
+            names = response_browse.display_names(feedback_form, non_responder_ids)
+            non_responders = []
+            for user_id in non_responder_ids:
+                user_name, register_number = names.get(user_id, ('', None))
+                non_responders.append({
+                    'user_id': user_id,
+                    'user_name': user_name,
+                    'register_number': register_number
+                })
             
-            logger.info(f"[GetResponseListView] Successfully processed: {len(responses_by_user)} responded, {len(non_responders)} non-responders, {len(expected_users)} total students")
+            logger.info(f"[GetResponseListView] Successfully processed: {len(responded_user_ids)} responded, {len(non_responders)} non-responders, {len(expected_users)} total students")
             
-            return Response({
-                'feedback_form_id': form_id,
-                'form_name': feedback_form.form_name or "",
-                'target_type': feedback_form.target_type,
-                'responded': list(responses_by_user.values()),
+            page.update({
                 'non_responders': non_responders,
                 'total_students': len(expected_users),
-                'total_responded': len(responses_by_user),
+                'total_responded': len(responded_user_ids),
                 'total_non_responded': len(non_responders)
-            }, status=status.HTTP_200_OK)
+            })
+            return Response(page, status=status.HTTP_200_OK)
             
         except Exception as e:
             logger.error(f"[GetResponseListView] Unexpected error: {str(e)}", exc_info=True)
@@ -2270,16 +2022,6 @@ class GetStudentSubjectsView(APIView):
                 print(f"[GetStudentSubjectsView] StudentProfile ID: {student_profile.id}")
                 print(f"[GetStudentSubjectsView] Section: {student_profile.section}")
                 
-                # Quick check for ElectiveChoice records
-                from curriculum.models import ElectiveChoice
-                total_choices = ElectiveChoice.objects.filter(student=student_profile).count()
-                active_choices = ElectiveChoice.objects.filter(student=student_profile, is_active=True).count()
-                print(f"[GetStudentSubjectsView] ElectiveChoice records: {total_choices} total, {active_choices} active")
-                
-                if total_choices == 0:
-                    print(f"[GetStudentSubjectsView] ⚠⚠⚠ NO ElectiveChoice records found for this student!")
-                    print(f"[GetStudentSubjectsView] ⚠⚠⚠ Student has not chosen any electives yet!")
-                
             except StudentProfile.DoesNotExist:
                 return Response({
                     'detail': 'Student profile not found.'
@@ -2363,15 +2105,12 @@ class GetStudentSubjectsView(APIView):
                     'all_completed': False
                 }, status=status.HTTP_200_OK)
             
-            # ========== STEP 1: Load CORE subjects from curriculum ==========
-            # Fetch core subjects directly from CurriculumDepartment to avoid missing subjects
-            # due to strict section filtering or missing TeachingAssignment records
-            print(f"[GetStudentSubjectsView] STEP 1: Loading CORE subjects from curriculum")
-            
+            # ========== Subjects the student is enrolled in ==========
+            # Core curriculum subjects + chosen electives with their teaching
+            # assignments, cached per (student, section, semesters); see
+            # feedback.services.student_subjects.
             current_ay = AcademicYear.objects.filter(is_active=True).first()
             
-            from curriculum.models import CurriculumDepartment
-            
             # Get semesters from feedback form (if specified)
             target_semesters = []
             if hasattr(feedback_form, 'semesters') and feedback_form.semesters:
@@ -2398,785 +2137,54 @@ class GetStudentSubjectsView(APIView):
                 except Exception as e:
                     print(f"[GetStudentSubjectsView] Error calculating semesters: {e}")
             
-            # Fallback: if still no semesters, fetch all for department
-            if not target_semesters:
-                print(f"[GetStudentSubjectsView] No semesters determined, will fetch all core subjects for department")
-            
-            # Get student's regulation from their batch (CRITICAL for 4th year filtering)
-            student_regulation = None
-            if section and section.batch and section.batch.regulation:
-                student_regulation = section.batch.regulation.code  # e.g., 'R2020' or 'R2023' (use .code not .name)
-                print(f"[GetStudentSubjectsView] Student regulation: {student_regulation}")
-            else:
-                print(f"[GetStudentSubjectsView] ⚠️ WARNING: Could not determine student regulation (section={section}, batch={section.batch if section else None})")
-                print(f"[GetStudentSubjectsView] ⚠️ Will show subjects from ALL regulations if no filter applied")
-            
-            # Fetch core curriculum subjects
-            curriculum_filter = {
-                'department': student_department,
-                'is_elective': False,  # Core subjects only
-            }
-            
-            # ADD REGULATION FILTER (CRITICAL for 4th year - must match R2020 vs R2023)
-            # NOTE: Only filter if we have a valid regulation code
-            if student_regulation:
-                curriculum_filter['regulation'] = student_regulation
-                print(f"[GetStudentSubjectsView] Filtering curriculum by regulation: {student_regulation}")
-            else:
-                print(f"[GetStudentSubjectsView] ⚠️ NO regulation filter applied - showing subjects from ALL regulations")
-            
-            if target_semesters:
-                curriculum_filter['semester__number__in'] = target_semesters
+            enrolled = student_subjects.enrolled_subjects(student_profile, target_semesters)
             
-            curriculum_subjects = CurriculumDepartment.objects.filter(
-                **curriculum_filter
-            ).select_related(
-                'semester',
-                'department'
-            ).order_by('course_code')
-            
-            print(f"[GetStudentSubjectsView] Found {curriculum_subjects.count()} core curriculum subjects")
-            
-            # Now try to match each curriculum subject with a TeachingAssignment
-            core_teaching_assignments = []
-            subjects_without_ta = []
+            # Check if student has already submitted feedback for each subject.
+            # Pseudo-assignments (subjects without TAs) use negative IDs and are
+            # stored with a NULL teaching_assignment, so they never show as completed.
+            completed_ids = set(
+                FeedbackResponse.objects.filter(
+                    feedback_form=feedback_form,
+                    user=request.user,
+                    teaching_assignment_id__in=[s['teaching_assignment_id'] for s in enrolled if not s['is_pseudo']],
+                ).values_list('teaching_assignment_id', flat=True)
+            )
             
-            for curr_subj in curriculum_subjects:
-                # Try to find TeachingAssignment for this subject
-                # CRITICAL: Filter by regulation through curriculum_row to ensure regulation correctness
-                # First try: Match by section (preferred)
-                ta_query = TeachingAssignment.objects.filter(
-                    curriculum_row=curr_subj,  # curriculum_row has regulation field
-                    section=section,
-                    academic_year=current_ay,
-                    is_active=True
-                ).select_related('staff', 'staff__user', 'curriculum_row')
-                
-                # Ensure curriculum_row matches student's regulation
-                if student_regulation:
-                    ta_query = ta_query.filter(curriculum_row__regulation=student_regulation)
-                
-                ta = ta_query.first()
-                
-                # Second try: Match by department (if section-specific TA not found)
-                if not ta:
-                    ta_query = TeachingAssignment.objects.filter(
-                        curriculum_row=curr_subj,  # curriculum_row has regulation field
-                        academic_year=current_ay,
-                        is_active=True
-                    ).select_related('staff', 'staff__user', 'curriculum_row')
-                    
-                    # Ensure curriculum_row matches student's regulation
-                    if student_regulation:
-                        ta_query = ta_query.filter(curriculum_row__regulation=student_regulation)
-                    ta = ta_query.first()
+            # ========== FINAL FILTER: Year-based filtering at the LAST step ==========
+            # Remove subjects whose semester belongs to another year; subjects
+            # with an unknown semester are kept (safer to include than exclude).
+            subjects = []
+            removed_count = 0
+            for subj in enrolled:
+                semester_num = subj['semester_number']
+                subject_year = student_year
+                if semester_num:
+                    if semester_num in [1, 2]:
+                        subject_year = 1
+                    elif semester_num in [3, 4]:
+                        subject_year = 2
+                    elif semester_num in [5, 6]:
+                        subject_year = 3
+                    elif semester_num in [7, 8]:
+                        subject_year = 4
                 
-                if ta:
-                    core_teaching_assignments.append(ta)
-                    staff_name = ta.staff.user.get_full_name() if ta.staff and ta.staff.user else "No staff"
-                    print(f"[GetStudentSubjectsView]   ✓ {curr_subj.course_code}: {curr_subj.course_name} (Staff: {staff_name})")
-                else:
-                    # No TA found - will create pseudo-assignment
-                    subjects_without_ta.append(curr_subj)
-                    print(f"[GetStudentSubjectsView]   ⚠ {curr_subj.course_code}: {curr_subj.course_name} (No TA - will create pseudo)")
-            
-            print(f"[GetStudentSubjectsView] Matched {len(core_teaching_assignments)} subjects with TAs, {len(subjects_without_ta)} without TAs")
-            
-            # ========== STEP 2: Load Student's Elective Choices ==========
-            print(f"[GetStudentSubjectsView] STEP 2: Loading student's elective choices")
+                if subject_year != student_year:
+                    removed_count += 1
+                    continue
+                subjects.append({
+                    'teaching_assignment_id': subj['teaching_assignment_id'],
+                    'subject_name': subj['subject_name'],
+                    'subject_code': subj['subject_code'],
+                    'staff_name': subj['staff_name'],
+                    'staff_id': subj['staff_id'],
+                    'is_completed': not subj['is_pseudo'] and subj['teaching_assignment_id'] in completed_ids,
+                    'type': subj['type'],
+                })
             
-            from curriculum.models import ElectiveChoice, ElectiveSubject
+            print(f"[GetStudentSubjectsView] FINAL FILTER RESULT: {len(subjects)} subjects kept, {removed_count} removed from other years")
             
-            # Get student's chosen electives (SIMPLE - no strict semester filter here
-            # We'll filter by semester at response level for safety)
-            elective_choices = ElectiveChoice.objects.filter(
-                student=student_profile,
-                is_active=True
-            ).select_related(
-                'elective_subject', 
-                'elective_subject__parent', 
-                'elective_subject__department',
-                'elective_subject__semester'
-            )
-            
-            print(f"[GetStudentSubjectsView] Total elective choices (all AYs, is_active=True): {elective_choices.count()}")
-            
-            if elective_choices.count() == 0:
-                print(f"[GetStudentSubjectsView] ⚠⚠⚠ NO active ElectiveChoice records found for this student!")
-                print(f"[GetStudentSubjectsView] ⚠⚠⚠ Student will see NO electives in feedback form!")
-            
-            for i, choice in enumerate(elective_choices, 1):
-                subj_code = choice.elective_subject.course_code if choice.elective_subject else 'N/A'
-                subj_name = choice.elective_subject.course_name if choice.elective_subject else 'N/A'
-                ay_name = choice.academic_year.name if choice.academic_year else 'No AY'
-                sem_num = choice.elective_subject.semester.number if (choice.elective_subject and choice.elective_subject.semester) else 'N/A'
-                print(f"[GetStudentSubjectsView]   Choice {i}: {subj_code} - {subj_name} (AY: {ay_name}, Sem: {sem_num}, Active: {choice.is_active})")
-            
-            # Check if filtering by current AY would reduce the count
-            ay_filtered_choices = elective_choices.filter(academic_year=current_ay)
-            ay_filtered_count = ay_filtered_choices.count()
-            total_count = elective_choices.count()
-            
-            print(f"[GetStudentSubjectsView] AY filtering analysis: Total={total_count}, Current AY={ay_filtered_count}")
-            
-            # DECISION: Use ALL active choices without AY filtering
-            # This ensures electives from different semesters within the year are all included
-            # Students should only have is_active=True for their current selections
-            if ay_filtered_count > 0 and ay_filtered_count < total_count:
-                print(f"[GetStudentSubjectsView] ⚠️ WARNING: AY filter would exclude {total_count - ay_filtered_count} choices")
-                print(f"[GetStudentSubjectsView] DECISION: Using ALL {total_count} active choices (no AY filter)")
-            elif ay_filtered_count == total_count:
-                print(f"[GetStudentSubjectsView] INFO: All choices belong to current AY")
-            else:
-                print(f"[GetStudentSubjectsView] INFO: Using all {total_count} active choices")
-            
-            # Do NOT filter by academic_year - use all active choices
-            # This ensures 2nd year electives from both Sem 3 and Sem 4 are included
-            
-            # Build list of chosen course codes AND department mapping
-            # CRITICAL: Map course_code -> department_id to filter staff by chosen department
-            chosen_elective_codes = []
-            elective_dept_map = {}  # Map course_code -> department_id from student's choice
-            seen_codes_for_building = set()  # Track to avoid duplicates in chosen_elective_codes
-            
-            for choice in elective_choices:
-                if choice.elective_subject and choice.elective_subject.course_code:
-                    code = choice.elective_subject.course_code
-                    dept = choice.elective_subject.department
-                    
-                    # Only add if not already added (avoid duplicate codes)
-                    if code not in seen_codes_for_building:
-                        chosen_elective_codes.append(code)
-                        elective_dept_map[code] = dept.id if dept else None
-                        seen_codes_for_building.add(code)
-                        
-                        dept_name = dept.code if dept else "No Dept"
-                        print(f"[GetStudentSubjectsView]   - Student chose: {code} - {choice.elective_subject.course_name} (from {dept_name} dept)")
-                    else:
-                        print(f"[GetStudentSubjectsView]   - Skipping duplicate code: {code}")
-            
-            print(f"[GetStudentSubjectsView] Student's chosen elective codes ({len(chosen_elective_codes)} total): {chosen_elective_codes}")
-            print(f"[GetStudentSubjectsView] Elective department mapping: {elective_dept_map}")
-            
-            if not chosen_elective_codes:
-                print(f"[GetStudentSubjectsView] ⚠️ WARNING: No elective codes extracted from {elective_choices.count()} choices!")
-            
-            # ========== STEP 3: Load Elective Teaching Assignments WITH department preference ==========
-            # CRITICAL: Show ALL student-chosen electives, prefer staff from chosen department
-            # Student should see staff from the department they chose the elective from when available
-            # But if not available, still show the elective with any available staff or "Staff Not Assigned"
-            print(f"[GetStudentSubjectsView] STEP 3: Loading elective teaching assignments (prefer chosen department)")
-            
-            elective_teaching_assignments = []
-            staff_map = {}  # Map course_code -> list of staff names
-            
-            # Prepare semester filter for elective queries (OPTIONAL - use only for strict validation)
-            # IMPORTANT: Removed strict semester filtering that was breaking queries
-            # ElectiveChoice already represents student's legitimate choices for their year/semester
-            # So we trust the student's chosen electives are already correct semester-wise
-            semester_filter = {}  # Keep empty - don't filter to avoid breaking queries
-            
-            if target_semesters:
-                print(f"[GetStudentSubjectsView] STEP 3: Note - Skipping semester filter on electives (use ElectiveChoice trust)")
-            else:
-                print(f"[GetStudentSubjectsView] STEP 3: No semester restriction on electives")
-            
-            if chosen_elective_codes:
-                # Query each elective individually to apply correct department preference + STRICT semester filter
-                # IMPORTANT: Filter by student's batch to ensure year-correct assignments
-                # FIX: Use Q objects to match EITHER section__batch=X OR section=NULL (for PE/EE/OE)
-                if section.batch:
-                    batch_filter = Q(section__batch=section.batch) | Q(section__isnull=True)
-                else:
-                    batch_filter = Q()  # No filtering if no batch
-                
-                for code in chosen_elective_codes:
-                    dept_id = elective_dept_map.get(code)
-                    print(f"[GetStudentSubjectsView]   Processing {code} (preferred department: {dept_id}, semester filter: {semester_filter})")
-                    
-                    found_staff = False
-                    
-                    # ATTEMPT 1: Try with department filter (preferred) + STRICT semester + BATCH FILTER
-                    if dept_id:
-                        ta_filter_dict = {
-                            'elective_subject__course_code': code,
-                            'elective_subject__department_id': dept_id,
-                            'academic_year': current_ay,
-                            'is_active': True,
-                        }
-                        # Only add regulation filter if it exists (defensive against NULL regulation in batch)
-                        if student_regulation:
-                            ta_filter_dict['elective_subject__regulation'] = student_regulation
-                        
-                        ta_query = TeachingAssignment.objects.filter(
-                            **ta_filter_dict,
-                            **semester_filter,  # STRICT semester filter
-                        ).filter(batch_filter  # FILTER BY BATCH YEAR - Q object
-                        ).select_related('staff', 'staff__user', 'elective_subject', 'elective_subject__department')
-                        
-                        for ta in ta_query:
-                            if ta.staff and ta.staff.user:
-                                staff_name = ta.staff.user.get_full_name() or ta.staff.user.username or "Unknown"
-                            else:
-                                staff_name = "Unknown"
-                            
-                            if code not in staff_map:
-                                staff_map[code] = []
-                            if staff_name and staff_name.strip() and staff_name not in staff_map[code]:
-                                staff_map[code].append(staff_name)
-                                dept_code = ta.elective_subject.department.code if ta.elective_subject.department else "N/A"
-                                print(f"[GetStudentSubjectsView]     ✓ Found TA (preferred dept): {code} - {staff_name} (dept: {dept_code})")
-                                found_staff = True
-                    
-                    # ATTEMPT 2: Try WITHOUT department filter (fallback) + STRICT semester + BATCH FILTER
-                    if not found_staff:
-                        ta_filter_dict = {
-                            'elective_subject__course_code': code,
-                            'academic_year': current_ay,
-                            'is_active': True,
-                        }
-                        # Only add regulation filter if it exists (defensive against NULL regulation in batch)
-                        if student_regulation:
-                            ta_filter_dict['elective_subject__regulation'] = student_regulation
-                        
-                        ta_query = TeachingAssignment.objects.filter(
-                            **ta_filter_dict,
-                            **semester_filter,  # STRICT semester filter
-                        ).filter(batch_filter  # FILTER BY BATCH YEAR - Q object
-                        ).select_related('staff', 'staff__user', 'elective_subject', 'elective_subject__department')
-                        
-                        for ta in ta_query:
-                            if ta.staff and ta.staff.user:
-                                staff_name = ta.staff.user.get_full_name() or ta.staff.user.username or "Unknown"
-                            else:
-                                staff_name = "Unknown"
-                            
-                            if code not in staff_map:
-                                staff_map[code] = []
-                            if staff_name and staff_name.strip() and staff_name not in staff_map[code]:
-                                staff_map[code].append(staff_name)
-                                dept_code = ta.elective_subject.department.code if ta.elective_subject.department else "N/A"
-                                print(f"[GetStudentSubjectsView]     ✓ Found TA (any dept): {code} - {staff_name} (dept: {dept_code})")
-                                found_staff = True
-                    
-                    # ATTEMPT 3: Try curriculum_row method (for elective placeholders) + STRICT semester + BATCH FILTER
-                    if not found_staff:
-                        ta_query_filter = {
-                            'curriculum_row__course_code': code,
-                            'curriculum_row__is_elective': True,
-                            'academic_year': current_ay,
-                            'is_active': True,
-                        }
-                        # Only add regulation filter if it exists (defensive against NULL regulation in batch)
-                        if student_regulation:
-                            ta_query_filter['curriculum_row__regulation'] = student_regulation
-                        
-                        ta_query_base = TeachingAssignment.objects.filter(
-                            **ta_query_filter,
-                            **semester_filter,  # STRICT semester filter
-                        ).filter(batch_filter  # FILTER BY BATCH YEAR - Q object
-                        )
-                        
-                        # First try with dept filter if available
-                        if dept_id:
-                            ta_query = ta_query_base.filter(curriculum_row__department_id=dept_id)
-                            tas = ta_query.select_related('staff', 'staff__user', 'curriculum_row', 'curriculum_row__department')
-                        else:
-                            tas = ta_query_base.select_related('staff', 'staff__user', 'curriculum_row', 'curriculum_row__department')
-                        
-                        # If nothing found with dept filter, try without
-                        if not tas.exists() and dept_id:
-                            tas = ta_query_base.select_related('staff', 'staff__user', 'curriculum_row', 'curriculum_row__department')
-                        
-                        for ta in tas:
-                            if ta.staff and ta.staff.user:
-                                staff_name = ta.staff.user.get_full_name() or ta.staff.user.username or "Unknown"
-                            else:
-                                staff_name = "Unknown"
-                            if code not in staff_map:
-                                staff_map[code] = []
-                            if staff_name and staff_name.strip() and staff_name not in staff_map[code]:
-                                staff_map[code].append(staff_name)
-                                dept_code = ta.curriculum_row.department.code if ta.curriculum_row.department else "N/A"
-                                print(f"[GetStudentSubjectsView]     ✓ Found TA (curriculum_row): {code} - {staff_name} (dept: {dept_code})")
-                                found_staff = True
-                    
-                    # ATTEMPT 4: Try legacy subject table (last resort) + BATCH FILTER
-                    if not found_staff:
-                        from academics.models import Subject
-                        tas_by_subject = TeachingAssignment.objects.filter(
-                            subject__code=code,
-                            academic_year=current_ay,
-                            is_active=True,
-                        ).filter(batch_filter  # FILTER BY BATCH YEAR - Q object
-                        ).select_related('staff', 'staff__user', 'subject')
-                        
-                        for ta in tas_by_subject:
-                            if ta.staff and ta.staff.user:
-                                staff_name = ta.staff.user.get_full_name() or ta.staff.user.username or "Unknown"
-                            else:
-                                staff_name = "Unknown"
-                            if code not in staff_map:
-                                staff_map[code] = []
-                            if staff_name and staff_name.strip() and staff_name not in staff_map[code]:
-                                staff_map[code].append(staff_name)
-                                print(f"[GetStudentSubjectsView]     ✓ Found TA (subject): {code} - {staff_name}")
-                                found_staff = True
-                    
-                    # If still no staff found, mark for later pseudo-assignment creation
-                    if not found_staff:
-                        print(f"[GetStudentSubjectsView]     ⚠ No TA found for {code}, will create pseudo-assignment")
-                
-                # Collect unique TAs for electives (store first TA for each course_code for feedback submission)
-                # Query again to get actual TA objects for each code
-                # IMPORTANT: Filter by batch to ensure year-correct assignments + REGULATION FILTER
-                seen_codes = set()
-                for code in chosen_elective_codes:
-                    if code in seen_codes:
-                        continue
-                    
-                    dept_id = elective_dept_map.get(code)
-                    ta = None
-                    
-                    # Try to find a TA for this code (prefer department filter, fallback to any) + STRICT semester + BATCH
-                    if dept_id:
-                        ta_filter_dict = {
-                            'elective_subject__course_code': code,
-                            'elective_subject__department_id': dept_id,
-                            'academic_year': current_ay,
-                            'is_active': True,
-                        }
-                        # Only add regulation filter if it exists
-                        if student_regulation:
-                            ta_filter_dict['elective_subject__regulation'] = student_regulation
-                        
-                        ta = TeachingAssignment.objects.filter(
-                            **ta_filter_dict,
-                            **semester_filter,  # STRICT semester filter
-                        ).filter(batch_filter  # FILTER BY BATCH YEAR - Q object
-                        ).select_related('staff', 'staff__user', 'elective_subject', 'elective_subject__department').first()
-                    
-                    # Fallback: try without department filter + STRICT semester + BATCH
-                    if not ta:
-                        ta_filter_dict = {
-                            'elective_subject__course_code': code,
-                            'academic_year': current_ay,
-                            'is_active': True,
-                        }
-                        # Only add regulation filter if it exists
-                        if student_regulation:
-                            ta_filter_dict['elective_subject__regulation'] = student_regulation
-                        
-                        ta = TeachingAssignment.objects.filter(
-                            **ta_filter_dict,
-                            **semester_filter,  # STRICT semester filter
-                        ).filter(batch_filter  # FILTER BY BATCH YEAR - Q object
-                        ).select_related('staff', 'staff__user', 'elective_subject', 'elective_subject__department').first()
-                    
-                    if ta:
-                        elective_teaching_assignments.append(ta)
-                        seen_codes.add(code)
-                    else:
-                        # Try curriculum_row method (prefer dept, fallback to any) + STRICT semester + BATCH
-                        ta = None
-                        if dept_id:
-                            ta_filter_dict = {
-                                'curriculum_row__course_code': code,
-                                'curriculum_row__is_elective': True,
-                                'curriculum_row__department_id': dept_id,
-                                'academic_year': current_ay,
-                                'is_active': True,
-                            }
-                            # Only add regulation filter if it exists
-                            if student_regulation:
-                                ta_filter_dict['curriculum_row__regulation'] = student_regulation
-                            
-                            ta = TeachingAssignment.objects.filter(
-                                **ta_filter_dict,
-                                **semester_filter,  # STRICT semester filter
-                            ).filter(batch_filter  # FILTER BY BATCH YEAR - Q object
-                            ).select_related('staff', 'staff__user', 'curriculum_row').first()
-                        
-                        # Fallback: try without department filter + STRICT semester + BATCH
-                        if not ta:
-                            ta_filter_dict = {
-                                'curriculum_row__course_code': code,
-                                'curriculum_row__is_elective': True,
-                                'academic_year': current_ay,
-                                'is_active': True,
-                            }
-                            # Only add regulation filter if it exists
-                            if student_regulation:
-                                ta_filter_dict['curriculum_row__regulation'] = student_regulation
-                            
-                            ta = TeachingAssignment.objects.filter(
-                                **ta_filter_dict,
-                                **semester_filter,  # STRICT semester filter
-                            ).filter(batch_filter  # FILTER BY BATCH YEAR - Q object
-                            ).select_related('staff', 'staff__user', 'curriculum_row').first()
-                        
-                        if ta:
-                            elective_teaching_assignments.append(ta)
-                            seen_codes.add(code)
-                        else:
-                            # Try subject method as last resort + BATCH
-                            from academics.models import Subject
-                            ta = TeachingAssignment.objects.filter(
-                                subject__code=code,
-                                academic_year=current_ay,
-                                is_active=True,
-                            ).filter(batch_filter  # FILTER BY BATCH YEAR - Q object
-                            ).select_related('staff', 'staff__user', 'subject').first()
-                            
-                            if ta:
-                                elective_teaching_assignments.append(ta)
-                                seen_codes.add(code)
-            
-            print(f"[GetStudentSubjectsView] Found {len(elective_teaching_assignments)} elective teaching assignments")
-            print(f"[GetStudentSubjectsView] Expected {len(chosen_elective_codes)} electives, got {len(elective_teaching_assignments)} TAs")
-            print(f"[GetStudentSubjectsView] Staff mapping for {len(staff_map)} elective codes:")
-            for code, staff_list in staff_map.items():
-                print(f"[GetStudentSubjectsView]   {code}: {staff_list}")
-            
-            # Check for missing electives
-            ta_codes = set()
-            for ta in elective_teaching_assignments:
-                if ta.elective_subject:
-                    ta_codes.add(ta.elective_subject.course_code)
-                elif ta.curriculum_row:
-                    ta_codes.add(ta.curriculum_row.course_code)
-                elif ta.subject:
-                    ta_codes.add(ta.subject.code)
-                elif hasattr(ta, 'id') and isinstance(ta.id, str) and ta.id.startswith('pseudo_'):
-                    if ta.elective_subject:
-                        ta_codes.add(ta.elective_subject.course_code)
-            
-            missing_codes = set(chosen_elective_codes) - ta_codes
-            if missing_codes:
-                print(f"[GetStudentSubjectsView] ⚠️ WARNING: Missing TAs for codes: {missing_codes}")
-            
-            # ========== STEP 4: Load Elective Subject Details ==========
-            print(f"[GetStudentSubjectsView] STEP 4: Loading elective subject details")
-            
-            elective_subjects_map = {}  # Map course_code -> ElectiveSubject
-            
-            if chosen_elective_codes:
-                # Load each elective subject (prefer department filter, fallback to any)
-                # NOTE: Removed strict semester filtering - ElectiveChoice already validates semester correctness
-                for code in chosen_elective_codes:
-                    dept_id = elective_dept_map.get(code)
-                    elec_subj = None
-                    
-                    # Try with department filter first (preferred) + REGULATION FILTER (CRITICAL)
-                    if dept_id:
-                        elec_filter = {
-                            'course_code': code,
-                            'department_id': dept_id,
-                        }
-                        if student_regulation:
-                            elec_filter['regulation'] = student_regulation  # CRITICAL: Filter by student's regulation
-                        elec_subj = ElectiveSubject.objects.filter(
-                            **elec_filter
-                        ).select_related('parent', 'department', 'semester').first()
-                    
-                    # Fallback: try without department filter + REGULATION FILTER (still critical)
-                    if not elec_subj:
-                        elec_filter = {'course_code': code}
-                        if student_regulation:
-                            elec_filter['regulation'] = student_regulation  # CRITICAL: Filter by student's regulation
-                        elec_subj = ElectiveSubject.objects.filter(
-                            **elec_filter
-                        ).select_related('parent', 'department', 'semester').first()
-                    
-                    if elec_subj:
-                        elective_subjects_map[code] = elec_subj
-                        dept_name = elec_subj.department.code if elec_subj.department else "No Dept"
-                        sem_num = elec_subj.semester.number if elec_subj.semester else "?"
-                        print(f"[GetStudentSubjectsView]   - Elective subject: {elec_subj.course_code} - {elec_subj.course_name} (dept: {dept_name}, sem: {sem_num})")
-                    else:
-                        print(f"[GetStudentSubjectsView]   ⚠ WARNING: Elective subject not found in database for code: {code}")
-
-            
-            print(f"[GetStudentSubjectsView] Loaded {len(elective_subjects_map)} elective subjects from {len(chosen_elective_codes)} chosen codes")
-            if len(elective_subjects_map) < len(chosen_elective_codes):
-                missing_codes = set(chosen_elective_codes) - set(elective_subjects_map.keys())
-                print(f"[GetStudentSubjectsView] ⚠⚠⚠ MISSING {len(missing_codes)} elective records: {missing_codes}")
-            
-            # ========== STEP 5: Build pseudo-assignments for subjects without TAs ==========
-            # CRITICAL: Show ALL subjects (core + elective) even if no TeachingAssignment exists
-            print(f"[GetStudentSubjectsView] STEP 5: Creating pseudo-assignments for subjects without TAs")
-            
-            class PseudoAssignment:
-                def __init__(self, subject_obj, subject_type='elective'):
-                    """
-                    Create a pseudo teaching assignment for subjects without real TAs.
-                    
-                    Args:
-                        subject_obj: Either ElectiveSubject or CurriculumDepartment instance
-                        subject_type: 'elective' or 'core'
-                    """
-                    # Use negative ID to avoid collision with real TeachingAssignment IDs
-                    # This ensures teaching_assignment_id is an integer for frontend compatibility
-                    self.id = -subject_obj.id
-                    
-                    if subject_type == 'elective':
-                        self.elective_subject = subject_obj
-                        self.curriculum_row = None
-                    else:  # core
-                        self.elective_subject = None
-                        self.curriculum_row = subject_obj
-                    
-                    self.subject = None
-                    self.custom_subject = None
-                    self.staff = None
-                    self.is_pseudo = True  # Flag to identify pseudo-assignments
-            
-            # Create pseudo-assignments for CORE subjects without TAs
-            for curr_subj in subjects_without_ta:
-                pseudo = PseudoAssignment(curr_subj, subject_type='core')
-                core_teaching_assignments.append(pseudo)
-                print(f"[GetStudentSubjectsView]   ⚠ Created pseudo for core subject: {curr_subj.course_code} - {curr_subj.course_name}")
-            
-            print(f"[GetStudentSubjectsView] Total core assignments (including pseudo): {len(core_teaching_assignments)}")
-            
-            # Iterate over ALL chosen elective codes (not just those in elective_subjects_map)
-            for code in chosen_elective_codes:
-                # Get the ElectiveSubject if it exists
-                elec_subj = elective_subjects_map.get(code)
-                
-                if not elec_subj:
-                    # ElectiveSubject record missing - can't create pseudo-assignment
-                    print(f"[GetStudentSubjectsView]   ⚠⚠⚠ CRITICAL: Cannot create assignment for {code} - ElectiveSubject record missing!")
-                    print(f"[GetStudentSubjectsView]   ⚠⚠⚠ This elective will NOT appear in feedback form!")
-                    print(f"[GetStudentSubjectsView]   ⚠⚠⚠ Action needed: Verify ElectiveSubject exists for course_code='{code}'")
-                    continue
-                
-                # Check if we have a teaching assignment for this code
-                has_ta = any(
-                    ta for ta in elective_teaching_assignments 
-                    if (ta.elective_subject and ta.elective_subject.course_code == code) or
-                       (ta.curriculum_row and ta.curriculum_row.course_code == code) or
-                       (ta.subject and ta.subject.code == code)
-                )
-                
-                if not has_ta:
-                    # No teaching assignment found - create pseudo for elective
-                    pseudo = PseudoAssignment(elec_subj, subject_type='elective')
-                    elective_teaching_assignments.append(pseudo)
-                    staff_map[code] = ["Staff Not Assigned"]
-                    print(f"[GetStudentSubjectsView]   ⚠ No TA for elective {code}, created pseudo-assignment")
-                elif code in staff_map and not staff_map[code]:
-                    # TA exists but no valid staff names found - set fallback
-                    staff_map[code] = ["Staff Not Assigned"]
-                    print(f"[GetStudentSubjectsView]   ⚠ TA found for {code} but no valid staff names, using fallback")
-                elif code not in staff_map:
-                    # TA exists but not in staff_map (shouldn't happen, but handle it)
-                    staff_map[code] = ["Staff Not Assigned"]
-                    print(f"[GetStudentSubjectsView]   ⚠ TA found for {code} but not in staff_map, using fallback")
-            
-            # ========== STEP 6: Combine Core + Elective Lists ==========
-            print(f"[GetStudentSubjectsView] STEP 6: Combining core and elective subjects")
-            
-            all_teaching_assignments = list(core_teaching_assignments) + elective_teaching_assignments
-            
-            print(f"[GetStudentSubjectsView] Total: {len(all_teaching_assignments)} subjects ({len(core_teaching_assignments)} core + {len(elective_teaching_assignments)} electives)")
-            print(f"[GetStudentSubjectsView] Elective breakdown:")
-            for i, ta in enumerate(elective_teaching_assignments, 1):
-                if hasattr(ta, 'is_pseudo') and ta.is_pseudo:
-                    code = ta.elective_subject.course_code if ta.elective_subject else 'N/A'
-                    name = ta.elective_subject.course_name if ta.elective_subject else 'N/A'
-                    print(f"[GetStudentSubjectsView]   {i}. {code} - {name} [PSEUDO]")
-                elif ta.elective_subject:
-                    print(f"[GetStudentSubjectsView]   {i}. {ta.elective_subject.course_code} - {ta.elective_subject.course_name} [TA]")
-                elif ta.curriculum_row:
-                    print(f"[GetStudentSubjectsView]   {i}. {ta.curriculum_row.course_code} - {ta.curriculum_row.course_name} [CURRICULUM]")
-                elif ta.subject:
-                    print(f"[GetStudentSubjectsView]   {i}. {ta.subject.code} - {ta.subject.name} [SUBJECT]")
-            
-            # ========== STEP 7: Build subject response list ==========
-            print(f"[GetStudentSubjectsView] STEP 7: Building subject response list")
-            
-            subjects = []
-            for assignment in all_teaching_assignments:
-                # Get subject name and code from different possible sources
-                subject_name = None
-                subject_code = None
-                is_elective = False
-                
-                # Priority 1: curriculum_row (most common for regular subjects)
-                if assignment.curriculum_row:
-                    subject_name = assignment.curriculum_row.course_name
-                    subject_code = assignment.curriculum_row.course_code
-                    is_elective = assignment.curriculum_row.is_elective
-                # Priority 2: elective_subject (elective courses)
-                elif assignment.elective_subject:
-                    subject_name = assignment.elective_subject.course_name
-                    subject_code = assignment.elective_subject.course_code
-                    is_elective = True
-                # Priority 3: subject (legacy subjects)
-                elif assignment.subject:
-                    subject_name = assignment.subject.name
-                    subject_code = assignment.subject.code
-                # Priority 4: custom_subject (special subjects like Sports, Yoga)
-                elif assignment.custom_subject:
-                    subject_name = assignment.get_custom_subject_display()
-                    subject_code = assignment.custom_subject
-                
-                if not subject_name:
-                    print(f"[GetStudentSubjectsView] Skipping assignment {assignment.id} - no subject name found")
-                    continue
-                
-                # Get staff name
-                staff_id = None
-                
-                if is_elective and subject_code and subject_code in staff_map and staff_map[subject_code]:
-                    # For ELECTIVES: Use staff_map which may have multiple staff members
-                    staff_list = [s for s in staff_map[subject_code] if s and s.strip()]  # Filter empty names
-                    if staff_list:
-                        staff_name = ", ".join(staff_list)
-                        print(f"[GetStudentSubjectsView] Elective {subject_code}: {len(staff_list)} staff - {staff_name}")
-                    else:
-                        staff_name = "Staff Not Assigned"
-                        print(f"[GetStudentSubjectsView] Elective {subject_code}: Empty staff list, showing 'Staff Not Assigned'")
-                elif assignment.staff:
-                    # For CORE subjects: Use the staff from teaching assignment
-                    staff_name = assignment.staff.user.get_full_name() or assignment.staff.user.username
-                    staff_id = assignment.staff.id
-                    print(f"[GetStudentSubjectsView] Core subject {subject_code}: {staff_name}")
-                else:
-                    # No staff assigned
-                    staff_name = "Staff Not Assigned"
-                    print(f"[GetStudentSubjectsView] No staff for {subject_code}")
-                
-                # Check if student has already submitted feedback for this subject
-                # For pseudo-assignments (electives without TAs), check using negative ID
-                if hasattr(assignment, 'is_pseudo') and assignment.is_pseudo:
-                    # Pseudo-assignments use negative IDs - feedback submissions for these
-                    # will have NULL teaching_assignment, so we can't check completion reliably.
-                    # For now, always show as not completed for pseudo-assignments
-                    existing_responses = False
-                else:
-                    existing_responses = FeedbackResponse.objects.filter(
-                        feedback_form=feedback_form,
-                        user=request.user,
-                        teaching_assignment=assignment
-                    ).exists()
-                
-                subjects.append({
-                    'teaching_assignment_id': assignment.id,
-                    'subject_name': subject_name,
-                    'subject_code': subject_code,
-                    'staff_name': staff_name,
-                    'staff_id': staff_id,
-                    'is_completed': existing_responses,
-                    'type': 'ELECTIVE' if is_elective else 'CORE'
-                })
-            
-            # Calculate completion status
-            total_subjects = len(subjects)
-            completed_subjects = sum(1 for s in subjects if s['is_completed'])
-            
-            # Count by type for debugging
-            core_count = sum(1 for s in subjects if s['type'] == 'CORE')
-            elective_count = sum(1 for s in subjects if s['type'] == 'ELECTIVE')
-            
-            print(f"[GetStudentSubjectsView] ========== FINAL SUMMARY ==========")
-            print(f"[GetStudentSubjectsView] Returning {total_subjects} total subjects:")
-            print(f"[GetStudentSubjectsView]   - CORE: {core_count}")
-            print(f"[GetStudentSubjectsView]   - ELECTIVE: {elective_count}")
-            print(f"[GetStudentSubjectsView]   - Completed: {completed_subjects}")
-            print(f"[GetStudentSubjectsView] Elective subjects returned:")
-            for s in subjects:
-                if s['type'] == 'ELECTIVE':
-                    print(f"[GetStudentSubjectsView]   → {s['subject_code']}: {s['subject_name']} - {s['staff_name']}")
-            
-            if elective_count == 0:
-                print(f"[GetStudentSubjectsView] ⚠⚠⚠ NO ELECTIVES IN RESPONSE!")
-                print(f"[GetStudentSubjectsView] ⚠⚠⚠ Possible reasons:")
-                print(f"[GetStudentSubjectsView] ⚠⚠⚠ 1. Student has no ElectiveChoice records (check earlier log)")
-                print(f"[GetStudentSubjectsView] ⚠⚠⚠ 2. ElectiveChoice records exist but elective_subject is NULL")
-                print(f"[GetStudentSubjectsView] ⚠⚠⚠ 3. ElectiveSubject records missing for chosen course codes")
-                print(f"[GetStudentSubjectsView] ⚠⚠⚠ 4. All chosen electives were skipped in final loop")
-                print(f"[GetStudentSubjectsView] ⚠⚠⚠ Run: python manage.py shell < check_elective_data.py")
-            
-            print(f"[GetStudentSubjectsView] ===================================")
-            
-            if total_subjects == 0:
-                print(f"[GetStudentSubjectsView] WARNING: No subjects found!")
-                print(f"  - Student section: {section.name} (ID: {section.id})")
-                print(f"  - Student year: {student_year}")
-                print(f"  - Student department: {student_department.code if student_department else 'None'}")
-                print(f"  - Feedback form years: {feedback_form.years}")
-                print(f"  - Feedback form sections: {feedback_form.sections}")
-                print(f"  - Feedback form department: {feedback_form.department.code}")
-            
-            # ========== FINAL FILTER: Year-based filtering at the LAST step ==========
-            # CRITICAL: Apply this filter AFTER all subject collection to remove subjects from other years
-            print(f"[GetStudentSubjectsView] FINAL FILTER: Filtering subjects by student year ({student_year})")
-            
-            filtered_subjects = []
-            removed_count = 0
-            
-            for subj in subjects:
-                # Determine the year of this subject from its semester
-                subject_year = None
-                
-                # Get semester from the assignment
-                semester_num = None
-                
-                # Try to get semester from assignment in all_teaching_assignments
-                assignment = None
-                for ta in all_teaching_assignments:
-                    ta_code = None
-                    if ta.curriculum_row:
-                        ta_code = ta.curriculum_row.course_code
-                    elif ta.elective_subject:
-                        ta_code = ta.elective_subject.course_code
-                    elif ta.subject:
-                        ta_code = ta.subject.code
-                    
-                    if ta_code == subj['subject_code']:
-                        assignment = ta
-                        break
-                
-                if assignment:
-                    # Get semester from assignment
-                    if assignment.curriculum_row and assignment.curriculum_row.semester:
-                        semester_num = assignment.curriculum_row.semester.number
-                    elif assignment.elective_subject and assignment.elective_subject.semester:
-                        semester_num = assignment.elective_subject.semester.number
-                
-                # Calculate year from semester
-                if semester_num:
-                    if semester_num in [1, 2]:
-                        subject_year = 1
-                    elif semester_num in [3, 4]:
-                        subject_year = 2
-                    elif semester_num in [5, 6]:
-                        subject_year = 3
-                    elif semester_num in [7, 8]:
-                        subject_year = 4
-                    else:
-                        # Unknown semester, skip filtering for safety
-                        subject_year = student_year
-                else:
-                    # No semester found, include by default (safer to include than exclude)
-                    subject_year = student_year
-                
-                # Include subject ONLY if year matches student's year
-                if subject_year == student_year:
-                    filtered_subjects.append(subj)
-                    print(f"[GetStudentSubjectsView] ✓ KEEP: {subj['subject_code']} (Year {subject_year})")
-                else:
-                    removed_count += 1
-                    print(f"[GetStudentSubjectsView] ✗ REMOVE: {subj['subject_code']} (Year {subject_year}, Student Year {student_year})")
-            
-            print(f"[GetStudentSubjectsView] FINAL FILTER RESULT: {len(filtered_subjects)} subjects kept, {removed_count} removed from other years")
-            
-            # Update totals after filtering
-            subjects = filtered_subjects
-            total_subjects = len(subjects)
-            completed_subjects = sum(1 for s in subjects if s['is_completed'])
+            total_subjects = len(subjects)
+            completed_subjects = sum(1 for s in subjects if s['is_completed'])
             
             return Response({
                 'feedback_form_id': form_id,
@@ -4209,6 +3217,51 @@ class IQACExportYearsView(APIView):
             }, status=status.HTTP_200_OK)
 
 
+FEEDBACK_EXPORT_TOKEN_SALT = 'feedback-export-download'
+
+
+def start_feedback_export(request, *, kind, params, version, filename, queryset):
+    """Serve a cached export at once, otherwise queue it and answer 202 with the job to poll."""
+    from django.core import signing
+    from django.urls import reverse
+
+    def download_url(job_id):
+        # Signed so the e-mailed link works in a browser without the API bearer token.
+        token = signing.dumps({'job_id': job_id, 'owner': int(request.user.id)}, salt=FEEDBACK_EXPORT_TOKEN_SALT)
+        return request.build_absolute_uri(reverse('feedback-export-job-download', kwargs={'token': token}))
+
+    job = response_export.start_export(
+        kind=kind,
+        params=params,
+        version=version,
+        user=request.user,
+        filename=filename,
+        build_queryset=lambda: queryset,
+        download_url=download_url,
+    )
+    if job['status'] == response_export.STATUS_READY:
+        stored = response_export.open_file(job)
+        if stored is not None:
+            return serve_file(request, stored, filename, content_type=response_export.CONTENT_TYPE)
+    return Response(
+        feedback_export_job_payload(request, job),
+        status=status.HTTP_202_ACCEPTED,
+    )
+
+
+def feedback_export_job_payload(request, job):
+    from django.urls import reverse
+
+    return {
+        'job_id': job['id'],
+        'status': job['status'],
+        'filename': job['filename'],
+        'error': job.get('error') or '',
+        'status_url': request.build_absolute_uri(reverse('feedback-export-job', args=[job['id']])),
+        'download_url': job['download_url'] if job['status'] == response_export.STATUS_READY else None,
+    }
+
+
 class IQACCommonExportView(APIView):
     """
     API: IQAC Common Export (Download Feedback Responses)
@@ -4232,44 +3285,15 @@ class IQACCommonExportView(APIView):
             department_ids = request.data.get('department_ids', [])
             years = request.data.get('years', [])
             
-            # Build query
-            from academics.models import AcademicYear, StudentProfile
-            
-            # Start with all responses with COMPLETE select_related (CRITICAL: All relations must be loaded)
-            qs = FeedbackResponse.objects.filter(
+            qs = response_export.response_queryset().filter(
                 feedback_form__status='ACTIVE',
                 feedback_form__active=True
-            ).select_related(
-                'feedback_form',
-                'feedback_form__department',
-                'question',
-                'user',
-                'user__student_profile',
-                'user__student_profile__home_department',
-                'user__student_profile__section',
-                'user__student_profile__section__batch',
-                'user__student_profile__section__batch__course',
-                'user__student_profile__section__batch__course__department',
-                'teaching_assignment',
-                'teaching_assignment__subject',
-                'teaching_assignment__curriculum_row',
-                'teaching_assignment__curriculum_row__department',
-                'teaching_assignment__elective_subject',
-                'teaching_assignment__elective_subject__department',
-                'teaching_assignment__staff',
-                'teaching_assignment__staff__user',
-                'teaching_assignment__staff__department',
-                'teaching_assignment__section',
-                'teaching_assignment__section__batch',
-                'teaching_assignment__section__batch__course',
-                'teaching_assignment__section__batch__course__department'
             )
 
             qs = apply_department_scope_filter(qs, scope, field_name='feedback_form__department_id')
 
             # For HOD users: filter to only forms they created or forms with allow_hod_view=True
             if not scope.get('all_departments'):
-                from django.db.models import Q
                 qs = qs.filter(
                     Q(feedback_form__created_by=request.user) | 
                     Q(feedback_form__allow_hod_view=True)
@@ -4290,227 +3314,23 @@ class IQACCommonExportView(APIView):
                     year_filter |= Q(feedback_form__years__contains=[year])
                     year_filter |= Q(feedback_form__year=year)
                 qs = qs.filter(year_filter)
-            
-            # Get data for Excel with strict column structure
-            responses_data = []
-            current_ay = AcademicYear.objects.filter(is_active=True).first()
-            current_acad_year = None
-            if current_ay:
-                try:
-                    current_acad_year = int(str(current_ay.name).split('-')[0])
-                except Exception:
-                    pass
-            
-            for response in qs:
-                student_name = ""
-                register_number = ""
-                department_name = ""
-                year_section = ""
-                subject_code = ""
-                subject_name = ""
-                staff_name = ""
-                comment_value = ""
-                overall_comment_value = ""
-                
-                # Get student info
-                student_profile = None
-                if response.user:
-                    try:
-                        student_profile = response.user.student_profile
-                        
-                        # Get department with fallback chain
-                        if student_profile.home_department:
-                            department_name = student_profile.home_department.name or ""
-                        elif student_profile.section and student_profile.section.batch and student_profile.section.batch.course and student_profile.section.batch.course.department:
-                            department_name = student_profile.section.batch.course.department.name or ""
-                        
-                        # Calculate year and get section
-                        if student_profile.section and current_acad_year:
-                            section_name = student_profile.section.name or ""
-                            batch = student_profile.section.batch
-                            if batch and batch.start_year:
-                                try:
-                                    calculated_year = current_acad_year - int(batch.start_year) + 1
-                                    year_section = f"{calculated_year} / {section_name}"
-                                except:
-                                    year_section = f"/ {section_name}"
-                    except (AttributeError, StudentProfile.DoesNotExist):
-                        pass
-                
-                # DEBUG: Check if relations loaded (TEMPORARY)
-                # Uncomment to debug: print(f"DEBUG: response.id={response.id}, user={response.user}, student_profile={student_profile}, ta={response.teaching_assignment}")
-                
-                # Fallback department from teaching assignment
-                # SIMPLIFIED: Use staff's department as the primary and only source
-                # If staff.department is not available, use "N/A"
-                if response.teaching_assignment and getattr(response.teaching_assignment, 'staff', None) and getattr(response.teaching_assignment.staff, 'department', None):
-                    department_name = response.teaching_assignment.staff.department.name or "N/A"
-                else:
-                    department_name = "N/A"
-                
-                # DEBUG: Print department being used
-                # print(f"[IQACCommonExportView] Response {response.id}: dept={department_name}, ta={response.teaching_assignment}, staff={response.teaching_assignment.staff if response.teaching_assignment else None}")
-                
-                # Use centralized masking helper to get student data
-                display_data = get_student_display_data(response, response.feedback_form, student_profile)
-                student_name = display_data['student_name']
-                register_number = display_data['register_number']
-                
-                # Get subject and staff from teaching assignment with multi-source fallback
-                if response.teaching_assignment:
-                    ta = response.teaching_assignment
-                    
-                    # Extract subject code and name from multiple sources
-                    if ta.curriculum_row:
-                        subject_code = ta.curriculum_row.course_code or ""
-                        subject_name = ta.curriculum_row.course_name or ""
-                    elif ta.elective_subject:
-                        subject_code = ta.elective_subject.course_code or ""
-                        subject_name = ta.elective_subject.course_name or ""
-                    elif ta.subject:
-                        subject_code = ta.subject.code or ""
-                        subject_name = ta.subject.name or ""
-                    elif ta.custom_subject:
-                        subject_code = ta.custom_subject
-                        subject_name = dict(ta._meta.get_field('custom_subject').choices).get(ta.custom_subject, ta.custom_subject)
-                    
-                    # Extract staff name
-                    if ta.staff and ta.staff.user:
-                        staff_name = ta.staff.user.get_full_name() or ta.staff.user.username or ""
-
-                    # Fallback year/section from teaching assignment section.
-                    if not year_section and ta.section:
-                        ta_section_name = ta.section.name or ""
-                        ta_batch = getattr(ta.section, 'batch', None)
-                        ta_year_text = ""
-                        if ta_batch and getattr(ta_batch, 'start_year', None) and current_acad_year:
-                            try:
-                                ta_year_text = str(current_acad_year - int(ta_batch.start_year) + 1)
-                            except Exception:
-                                ta_year_text = ""
-                        year_section = f"{ta_year_text} / {ta_section_name}" if (ta_year_text or ta_section_name) else ""
-                
-                # CRITICAL: Add fallback to student data when teaching_assignment is incomplete
-                # This handles electives assigned department-wide with no specific section
-                if not year_section and student_profile and student_profile.section:
-                    # Fallback to student's section and year
-                    student_section_name = student_profile.section.name or ""
-                    student_year_text = ""
-                    if current_acad_year and student_profile.section.batch:
-                        try:
-                            student_year_text = str(current_acad_year - int(student_profile.section.batch.start_year) + 1)
-                        except Exception:
-                            pass
-                    year_section = f"{student_year_text} / {student_section_name}" if (student_year_text or student_section_name) else ""
-                
-                # Get question text
-                question_text = response.question.question if response.question else ""
-                
-                # Apply conditional display logic: show either question-wise comment
-                # or overall comment, never both.
-                question_comment = (response.answer_text or "").strip()
-                common_comment = (response.common_comment or "").strip()
-                if question_comment:
-                    comment_value = question_comment
-                    overall_comment_value = ""
-                elif common_comment:
-                    comment_value = ""
-                    overall_comment_value = common_comment
-                else:
-                    comment_value = ""
-                    overall_comment_value = ""
-
-                # Show selected option only when real value is available
-                selected_option_value = (response.selected_option_text or "").strip()
-                
-                # Get ONLY user-entered form_name (no system-generated defaults)
-                form_name_value = response.feedback_form.form_name or ""
-                
-                # Collect data row - include form_name
-                responses_data.append({
-                    'form_name': form_name_value,
-                    'student_name': student_name,
-                    'register_number': register_number,
-                    'department': department_name,
-                    'year_section': year_section,
-                    'subject_code': subject_code,
-                    'subject_name': subject_name,
-                    'staff_name': staff_name,
-                    'question_text': question_text,
-                    'rating_value': response.answer_star or "",
-                    'comment': comment_value,
-                    'overall_comment': overall_comment_value,
-                    'selected_option': selected_option_value,
-                })
-            
-            # Generate Excel file
-            import openpyxl
-            from io import BytesIO
-            
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = 'Feedback Responses'
-            
-            # Build optional columns dynamically based on actual feedback content.
-            has_question_comment = any((row.get('comment') or '').strip() for row in responses_data)
-            has_overall_comment = any((row.get('overall_comment') or '').strip() for row in responses_data)
-            has_selected_option = any((row.get('selected_option') or '').strip() for row in responses_data)
 
-            headers = [
-                "Form Name",
-                "Student Name",
-                "Register Number",
-                "Department",
-                "Year / Section",
-                "Subject Code",
-                "Subject Name",
-                "Staff Name",
-                "Question Text",
-                "Rating Value",
-            ]
-            if has_question_comment:
-                headers.append("Comment")
-            if has_overall_comment:
-                headers.append("Overall Comment")
-            if has_selected_option:
-                headers.append("Selected Option")
-            ws.append(headers)
-            
-            # Data rows - align with dynamic headers.
-            for row_data in responses_data:
-                row = [
-                    row_data['form_name'],
-                    row_data['student_name'],
-                    row_data['register_number'],
-                    row_data['department'],
-                    row_data['year_section'],
-                    row_data['subject_code'],
-                    row_data['subject_name'],
-                    row_data['staff_name'],
-                    row_data['question_text'],
-                    row_data['rating_value'],
-                ]
-                if has_question_comment:
-                    row.append(row_data['comment'])
-                if has_overall_comment:
-                    row.append(row_data['overall_comment'])
-                if has_selected_option:
-                    row.append(row_data['selected_option'])
-                ws.append(row)
-            
-            # Save to bytes
-            output = BytesIO()
-            wb.save(output)
-            output.seek(0)
-            
-            # Return as file download
-            from django.http import FileResponse
-            response = FileResponse(
-                output,
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            params = {
+                'scope': 'all' if scope.get('all_departments') else {
+                    'user': request.user.id,
+                    'department_ids': sorted(str(d) for d in scope.get('department_ids') or []),
+                },
+                'department_ids': [] if all_departments else sorted(str(d) for d in department_ids or []),
+                'years': sorted(str(y) for y in years or []),
+            }
+            return start_feedback_export(
+                request,
+                kind='common',
+                params=params,
+                version=response_export.data_version(),
+                filename='Feedback_Export.xlsx',
+                queryset=qs,
             )
-            response['Content-Disposition'] = 'attachment; filename="Feedback_Export.xlsx"'
-            return response
             
         except Exception as e:
             return Response({
@@ -4575,9 +3395,7 @@ class NonRespondersExportView(APIView):
             # applying year at this stage can hide valid non-responders.
             # Year filtering is applied later per-student (derived from section/batch).
 
-            from django.contrib.auth import get_user_model
-            from academics.models import Section, AcademicYear, Department
-            User = get_user_model()
+            from academics.models import Department
 
             # Resolve target departments for sheet creation (include zero-row departments).
             target_department_ids = []
@@ -4601,188 +3419,11 @@ class NonRespondersExportView(APIView):
             )
             target_department_map = {int(d['id']): (d.get('short_name') or d.get('code') or d.get('name') or f"Department {d['id']}") for d in target_departments}
 
-            current_ay = AcademicYear.objects.filter(is_active=True).first()
-            current_acad_year = None
-            if current_ay:
-                try:
-                    current_acad_year = int(str(current_ay.name).split('-')[0])
-                except Exception:
-                    current_acad_year = None
-
-            def _student_year_from_section(section):
-                if not section or not current_acad_year:
-                    return None
-                try:
-                    batch = getattr(section, 'batch', None)
-                    start_year = getattr(batch, 'start_year', None) if batch else None
-                    if not start_year and batch:
-                        try:
-                            start_year = int(str(batch.name).split('-')[0])
-                        except Exception:
-                            start_year = None
-                    if not start_year:
-                        return None
-                    return int(current_acad_year) - int(start_year) + 1
-                except Exception:
-                    return None
-
-            non_responder_rows = []
-
-            for form in forms_qs.order_by('department__name', '-created_at', 'id'):
-                # Determine responded users per form using submission tracker first.
-                # This avoids counting partial/incomplete responses as submitted.
-                responded_user_ids = set(
-                    FeedbackFormSubmission.objects.filter(
-                        feedback_form=form,
-                        submission_status='SUBMITTED',
-                    ).values_list('user_id', flat=True)
-                )
-                if not responded_user_ids:
-                    # Backward-compatible fallback for legacy data without submission rows.
-                    responded_user_ids = set(
-                        FeedbackResponse.objects.filter(
-                            feedback_form=form,
-                            feedback_form__status='ACTIVE',
-                            feedback_form__active=True
-                        ).values_list('user_id', flat=True)
-                        .distinct()
-                    )
-
-                expected_qs = User.objects.none()
-
-                # Robust department-scope fallback for legacy/student records where
-                # home_department may be missing or sections are linked via either
-                # batch.course.department or batch.department.
-                dept_students_qs = User.objects.filter(
-                    is_active=True,
-                    student_profile__status='ACTIVE',
-                ).filter(
-                    Q(student_profile__home_department_id=form.department_id)
-                    | Q(student_profile__section__batch__course__department_id=form.department_id)
-                    | Q(student_profile__section__batch__department_id=form.department_id)
-                )
-
-                if form.all_classes:
-                    expected_qs = dept_students_qs
-                else:
-                    sections_to_query = []
-
-                    if form.sections:
-                        sections_to_query = [int(s) for s in form.sections if str(s).strip()]
-                    elif form.section_id:
-                        sections_to_query = [int(form.section_id)]
-                    else:
-                        sections_filter = Q(
-                            Q(batch__course__department_id=form.department_id) |
-                            Q(batch__department_id=form.department_id)
-                        )
-
-                        if form.years:
-                            year_filters = Q()
-                            for year in form.years:
-                                if current_acad_year:
-                                    try:
-                                        batch_start_year = int(current_acad_year) - int(year) + 1
-                                        year_filters |= Q(batch__start_year=batch_start_year)
-                                        year_filters |= Q(batch__name__startswith=str(batch_start_year))
-                                    except Exception:
-                                        continue
-                            if year_filters:
-                                sections_filter &= year_filters
-                        elif form.year and current_acad_year:
-                            try:
-                                batch_start_year = int(current_acad_year) - int(form.year) + 1
-                                sections_filter &= (Q(batch__start_year=batch_start_year) | Q(batch__name__startswith=str(batch_start_year)))
-                            except Exception:
-                                pass
-
-                        if form.semesters:
-                            sections_filter &= Q(semester_id__in=form.semesters)
-                        elif form.semester_id:
-                            sections_filter &= Q(semester_id=form.semester_id)
-
-                        sections_to_query = list(
-                            Section.objects.filter(sections_filter).values_list('id', flat=True)
-                        )
-
-                    if sections_to_query:
-                        expected_qs = User.objects.filter(
-                            is_active=True,
-                            student_profile__status='ACTIVE',
-                            student_profile__section_id__in=sections_to_query,
-                        )
-                    else:
-                        # If a form has incomplete targeting metadata, fallback to
-                        # department students so 0-response forms are still represented.
-                        expected_qs = dept_students_qs
-
-                expected_qs = expected_qs.select_related(
-                    'student_profile',
-                    'student_profile__section',
-                    'student_profile__section__batch',
-                ).distinct()
-
-                if responded_user_ids:
-                    expected_qs = expected_qs.exclude(id__in=responded_user_ids)
-
-                for user in expected_qs:
-                    student_profile = getattr(user, 'student_profile', None)
-                    if not student_profile:
-                        continue
-
-                    student_year = _student_year_from_section(getattr(student_profile, 'section', None))
-                    if years and (student_year is None or int(student_year) not in years):
-                        continue
-
-                    section_name = ''
-                    if getattr(student_profile, 'section', None):
-                        section_name = student_profile.section.name or ''
-
-                    # Get department short name or code
-                    dept_short_name = 'Unknown'
-                    if form.department:
-                        dept_short_name = form.department.short_name or form.department.code or form.department.name or 'Unknown'
-
-                    # Apply anonymous masking if feedback form is anonymous
-                    student_name = user.get_full_name() or user.username
-                    register_number = getattr(student_profile, 'reg_no', '') or user.username
-                    if form.anonymous:
-                        student_name = "Anonymous"
-                        register_number = ""
-
-                    # Use only the user-entered form_name, no ID fallback
-                    form_name_display = form.form_name or ""
-
-                    non_responder_rows.append({
-                        'department_id': form.department_id,
-                        'department': dept_short_name,
-                        'year': student_year,
-                        'form_id': form.id,
-                        'form_name': form_name_display,
-                        'form_type': form.get_type_display(),
-                        'created_on': form.created_at.strftime('%Y-%m-%d'),
-                        'student_name': student_name,
-                        'register_number': register_number,
-                        'section': section_name,
-                    })
-
-            non_responder_rows.sort(
-                key=lambda r: (
-                    r['department_id'] or 0,
-                    (r['year'] if isinstance(r['year'], int) else 99),
-                    r['form_id'],
-                    r['register_number'] or '',
-                )
-            )
-
             import openpyxl
             from io import BytesIO
             from django.http import FileResponse
             from collections import defaultdict
 
-            wb = openpyxl.Workbook()
-            default_ws = wb.active
-
             headers = [
                 'Department',
                 'Year',
@@ -4794,10 +3435,7 @@ class NonRespondersExportView(APIView):
                 'Register Number',
                 'Section',
             ]
-
-            department_rows = defaultdict(list)
-            for row in non_responder_rows:
-                department_rows[row.get('department_id')].append(row)
+            column_widths = {'A': 22, 'B': 10, 'C': 10, 'D': 20, 'E': 14, 'F': 26, 'G': 18, 'H': 12, 'I': 15}
 
             def _safe_sheet_title(name, used_titles):
                 base = (str(name or 'Unknown').strip() or 'Unknown')[:31]
@@ -4810,60 +3448,60 @@ class NonRespondersExportView(APIView):
                 used_titles.add(title)
                 return title
 
+            # Rows are written department by department into a write-only
+            # workbook, so only one department's non-responders are in memory.
+            wb = openpyxl.Workbook(write_only=True)
             used_titles = set()
 
-            if target_department_map or department_rows:
-                is_first = True
-                ordered_department_ids = [d['id'] for d in target_departments]
-                extra_department_ids = [dept_id for dept_id in sorted(department_rows.keys(), key=lambda x: (x is None, x)) if dept_id not in target_department_map]
-                ordered_department_ids.extend(extra_department_ids)
+            def _new_sheet(name):
+                ws = wb.create_sheet(title=_safe_sheet_title(name, used_titles))
+                for column, width in column_widths.items():
+                    ws.column_dimensions[column].width = width
+                ws.append(headers)
+                return ws
 
-                for dept_id in ordered_department_ids:
-                    dept_name = target_department_map.get(dept_id)
-                    if not dept_name:
-                        dept_name = 'Unknown Department'
-                        if dept_id is not None:
-                            dept_name = f"Department {dept_id}"
+            forms_by_department = defaultdict(list)
+            for form in forms_qs.order_by('department__name', '-created_at', 'id'):
+                forms_by_department[form.department_id].append(form)
 
-                    ws = default_ws if is_first else wb.create_sheet()
-                    ws.title = _safe_sheet_title(dept_name, used_titles)
-                    is_first = False
+            ordered_department_ids = [d['id'] for d in target_departments]
+            ordered_department_ids.extend(sorted(
+                (dept_id for dept_id in forms_by_department if dept_id not in target_department_map),
+                key=lambda x: (x is None, x),
+            ))
 
-                    ws.append(headers)
-                    for row in department_rows.get(dept_id, []):
-                        ws.append([
-                            row['department'],
-                            f"Year {row['year']}" if isinstance(row['year'], int) else '',
-                            row['form_id'],
-                            row['form_name'],
-                            row['form_type'],
-                            row['created_on'],
-                            row['student_name'],
-                            row['register_number'],
-                            row['section'],
-                        ])
-
-                    ws.column_dimensions['A'].width = 22
-                    ws.column_dimensions['B'].width = 10
-                    ws.column_dimensions['C'].width = 10
-                    ws.column_dimensions['D'].width = 20
-                    ws.column_dimensions['E'].width = 14
-                    ws.column_dimensions['F'].width = 26
-                    ws.column_dimensions['G'].width = 18
-                    ws.column_dimensions['H'].width = 12
-                    ws.column_dimensions['I'].width = 15
-            else:
-                default_ws.title = 'Non Responders'
-                default_ws.append(headers)
-                default_ws.column_dimensions['A'].width = 22
-                default_ws.column_dimensions['B'].width = 10
-                default_ws.column_dimensions['C'].width = 10
-                default_ws.column_dimensions['D'].width = 20
-                default_ws.column_dimensions['E'].width = 14
-                default_ws.column_dimensions['F'].width = 26
-                default_ws.column_dimensions['G'].width = 18
-                default_ws.column_dimensions['H'].width = 12
-                default_ws.column_dimensions['I'].width = 15
+            for dept_id in ordered_department_ids:
+                rows = list(non_responders.iter_non_responders(forms_by_department.get(dept_id, []), years=years))
+                if dept_id not in target_department_map and not rows:
+                    continue
+                rows.sort(key=lambda r: (
+                    (r['year'] if isinstance(r['year'], int) else 99),
+                    r['form_id'],
+                    r['register_number'] or '',
+                ))
+
+                dept_name = target_department_map.get(dept_id)
+                if not dept_name:
+                    dept_name = 'Unknown Department'
+                    if dept_id is not None:
+                        dept_name = f"Department {dept_id}"
+
+                ws = _new_sheet(dept_name)
+                for row in rows:
+                    ws.append([
+                        row['department'],
+                        f"Year {row['year']}" if isinstance(row['year'], int) else '',
+                        row['form_id'],
+                        row['form_name'],
+                        row['form_type'],
+                        row['created_on'],
+                        row['student_name'],
+                        row['register_number'],
+                        row['section'],
+                    ])
+
+            if not wb.worksheets:
+                _new_sheet('Non Responders')
 
             output = BytesIO()
             wb.save(output)
@@ -4976,271 +3614,28 @@ class FormExportExcelView(APIView):
                     'error': 'You do not have permission to export this feedback form.'
                 }, status=status.HTTP_403_FORBIDDEN)
             
-            # Build query with proper joins
-            from academics.models import AcademicYear, StudentProfile
-            
-            qs = FeedbackResponse.objects.filter(
-                feedback_form=feedback_form
-            ).select_related(
-                'feedback_form',
-                'feedback_form__department',
-                'question',
-                'user',
-                'user__student_profile',
-                'user__student_profile__home_department',
-                'user__student_profile__section',
-                'user__student_profile__section__batch',
-                'user__student_profile__section__batch__course',
-                'user__student_profile__section__batch__course__department',
-                'teaching_assignment',
-                'teaching_assignment__subject',
-                'teaching_assignment__curriculum_row',
-                'teaching_assignment__curriculum_row__department',
-                'teaching_assignment__elective_subject',
-                'teaching_assignment__elective_subject__department',
-                'teaching_assignment__staff',
-                'teaching_assignment__staff__user',
-                'teaching_assignment__staff__department',
-                'teaching_assignment__section',
-                'teaching_assignment__section__batch',
-                'teaching_assignment__section__batch__course',
-                'teaching_assignment__section__batch__course__department'
-            ).prefetch_related(
-                'user__student_profile'
-            )
+            qs = response_export.response_queryset().filter(feedback_form=feedback_form)
             
             # Apply department filter for HOD users
+            department_filter = None
             if is_hod and not is_iqac and hod_department_id:
                 # Filter responses by HOD's department
                 # Try multiple paths: curriculum_row, elective_subject, or form's department
-                from django.db.models import Q
+                department_filter = hod_department_id
                 qs = qs.filter(
                     Q(teaching_assignment__curriculum_row__department_id=hod_department_id) |
                     Q(teaching_assignment__elective_subject__department_id=hod_department_id) |
                     Q(feedback_form__department_id=hod_department_id)
                 )
-            
-            # Get data for Excel with strict column structure
-            responses_data = []
-            current_ay = AcademicYear.objects.filter(is_active=True).first()
-            current_acad_year = None
-            if current_ay:
-                try:
-                    current_acad_year = int(str(current_ay.name).split('-')[0])
-                except Exception:
-                    pass
-            
-            for response in qs:
-                student_name = ""
-                register_number = ""
-                department_name = ""
-                year_section = ""
-                subject_code = ""
-                subject_name = ""
-                staff_name = ""
-                comment_value = ""
-                overall_comment_value = ""
-                
-                # Get student info
-                student_profile = None
-                if response.user:
-                    try:
-                        student_profile = response.user.student_profile
-                        
-                        # Get department with fallback chain
-                        if student_profile.home_department:
-                            department_name = student_profile.home_department.name or ""
-                        elif student_profile.section and student_profile.section.batch and student_profile.section.batch.course and student_profile.section.batch.course.department:
-                            department_name = student_profile.section.batch.course.department.name or ""
-                        
-                        # Calculate year and get section
-                        if student_profile.section and current_acad_year:
-                            section_name = student_profile.section.name or ""
-                            batch = student_profile.section.batch
-                            if batch and batch.start_year:
-                                try:
-                                    calculated_year = current_acad_year - int(batch.start_year) + 1
-                                    year_section = f"{calculated_year} / {section_name}"
-                                except:
-                                    year_section = f"/ {section_name}"
-                    except (AttributeError, StudentProfile.DoesNotExist):
-                        pass
-                
-                # DEBUG: Check if relations loaded (TEMPORARY)
-                # Uncomment to debug: print(f"DEBUG: response.id={response.id}, user={response.user}, student_profile={student_profile}, ta={response.teaching_assignment}")
-                
-                # Fallback department from teaching assignment  
-                # SIMPLIFIED: Use staff's department as the primary and only source
-                # If staff.department is not available, use "N/A"
-                if response.teaching_assignment and getattr(response.teaching_assignment, 'staff', None) and getattr(response.teaching_assignment.staff, 'department', None):
-                    department_name = response.teaching_assignment.staff.department.name or "N/A"
-                else:
-                    department_name = "N/A"
-
-                # DEBUG: Print department being used
-                # print(f"[FormExportExcelView] Response {response.id}: dept={department_name}, ta={response.teaching_assignment}, staff={response.teaching_assignment.staff if response.teaching_assignment else None}")
-
-                # Use centralized masking helper to get student data
-                display_data = get_student_display_data(response, feedback_form, student_profile)
-                student_name = display_data['student_name']
-                register_number = display_data['register_number']
-                
-                # Get subject and staff from teaching assignment with multi-source fallback
-                if response.teaching_assignment:
-                    ta = response.teaching_assignment
-                    
-                    # Extract subject code and name from multiple sources
-                    if ta.curriculum_row:
-                        subject_code = ta.curriculum_row.course_code or ""
-                        subject_name = ta.curriculum_row.course_name or ""
-                    elif ta.elective_subject:
-                        subject_code = ta.elective_subject.course_code or ""
-                        subject_name = ta.elective_subject.course_name or ""
-                    elif ta.subject:
-                        subject_code = ta.subject.code or ""
-                        subject_name = ta.subject.name or ""
-                    elif ta.custom_subject:
-                        subject_code = ta.custom_subject
-                        subject_name = dict(ta._meta.get_field('custom_subject').choices).get(ta.custom_subject, ta.custom_subject)
-                    
-                    # Extract staff name
-                    if ta.staff and ta.staff.user:
-                        staff_name = ta.staff.user.get_full_name() or ta.staff.user.username or ""
-
-                    # Fallback year/section from teaching assignment section.
-                    if not year_section and ta.section:
-                        ta_section_name = ta.section.name or ""
-                        ta_batch = getattr(ta.section, 'batch', None)
-                        ta_year_text = ""
-                        if ta_batch and getattr(ta_batch, 'start_year', None) and current_acad_year:
-                            try:
-                                ta_year_text = str(current_acad_year - int(ta_batch.start_year) + 1)
-                            except Exception:
-                                ta_year_text = ""
-                        year_section = f"{ta_year_text} / {ta_section_name}" if (ta_year_text or ta_section_name) else ""
-                
-                # CRITICAL: Add fallback to student data when teaching_assignment is incomplete
-                # This handles electives assigned department-wide with no specific section
-                if not year_section and student_profile and student_profile.section:
-                    # Fallback to student's section and year
-                    student_section_name = student_profile.section.name or ""
-                    student_year_text = ""
-                    if current_acad_year and student_profile.section.batch:
-                        try:
-                            student_year_text = str(current_acad_year - int(student_profile.section.batch.start_year) + 1)
-                        except Exception:
-                            pass
-                    year_section = f"{student_year_text} / {student_section_name}" if (student_year_text or student_section_name) else ""
-                
-                # Get question text
-                question_text = response.question.question if response.question else ""
-                
-                # Apply conditional display logic: show either question-wise comment
-                # or overall comment, never both.
-                question_comment = (response.answer_text or "").strip()
-                common_comment = (response.common_comment or "").strip()
-                if question_comment:
-                    comment_value = question_comment
-                    overall_comment_value = ""
-                elif common_comment:
-                    comment_value = ""
-                    overall_comment_value = common_comment
-                else:
-                    comment_value = ""
-                    overall_comment_value = ""
-
-                # Show selected option only when real value is available.
-                selected_option_value = (response.selected_option_text or "").strip()
-                
-                # Get ONLY user-entered form_name (no system-generated defaults)
-                form_name_value = feedback_form.form_name or ""
-                
-                # Collect data row - include form_name
-                responses_data.append({
-                    'form_name': form_name_value,
-                    'student_name': student_name,
-                    'register_number': register_number,
-                    'department': department_name,
-                    'year_section': year_section,
-                    'subject_code': subject_code,
-                    'subject_name': subject_name,
-                    'staff_name': staff_name,
-                    'question_text': question_text,
-                    'rating_value': response.answer_star or "",
-                    'comment': comment_value,
-                    'overall_comment': overall_comment_value,
-                    'selected_option': selected_option_value,
-                })
-            
-            # Generate Excel file
-            import openpyxl
-            from io import BytesIO
-            
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = 'Feedback Responses'
-            
-            # Build optional columns dynamically based on actual feedback content.
-            has_question_comment = any((row.get('comment') or '').strip() for row in responses_data)
-            has_overall_comment = any((row.get('overall_comment') or '').strip() for row in responses_data)
-            has_selected_option = any((row.get('selected_option') or '').strip() for row in responses_data)
 
-            headers = [
-                "Form Name",
-                "Student Name",
-                "Register Number",
-                "Department",
-                "Year / Section",
-                "Subject Code",
-                "Subject Name",
-                "Staff Name",
-                "Question Text",
-                "Rating Value",
-            ]
-            if has_question_comment:
-                headers.append("Comment")
-            if has_overall_comment:
-                headers.append("Overall Comment")
-            if has_selected_option:
-                headers.append("Selected Option")
-            ws.append(headers)
-            
-            # Data rows - align with dynamic headers.
-            for row_data in responses_data:
-                row = [
-                    row_data['form_name'],
-                    row_data['student_name'],
-                    row_data['register_number'],
-                    row_data['department'],
-                    row_data['year_section'],
-                    row_data['subject_code'],
-                    row_data['subject_name'],
-                    row_data['staff_name'],
-                    row_data['question_text'],
-                    row_data['rating_value'],
-                ]
-                if has_question_comment:
-                    row.append(row_data['comment'])
-                if has_overall_comment:
-                    row.append(row_data['overall_comment'])
-                if has_selected_option:
-                    row.append(row_data['selected_option'])
-                ws.append(row)
-            
-            # Save to bytes
-            output = BytesIO()
-            wb.save(output)
-            output.seek(0)
-            
-            # Return as file download
-            from django.http import FileResponse
-            filename = f"Feedback_{feedback_form.id}_{feedback_form.get_type_display()}.xlsx"
-            response = FileResponse(
-                output,
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            return start_feedback_export(
+                request,
+                kind='form',
+                params={'form_id': feedback_form.id, 'hod_department_id': department_filter},
+                version=response_export.data_version(feedback_form.id),
+                filename=f"Feedback_{feedback_form.id}_{feedback_form.get_type_display()}.xlsx",
+                queryset=qs,
             )
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            return response
             
         except Exception as e:
             return Response({
@@ -5248,6 +3643,56 @@ class FormExportExcelView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class FeedbackExportJobStatusView(APIView):
+    """
+    API: Feedback Export Job Status
+    GET /api/feedback/exports/<job_id>/
+
+    Polled by the requester after an export answered 202.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        job = response_export.get_job(job_id)
+        if not job or job.get('owner_id') != request.user.id:
+            return Response({'detail': 'Export not found or expired.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(feedback_export_job_payload(request, job))
+
+
+class FeedbackExportJobDownloadView(APIView):
+    """
+    API: Download a Finished Feedback Export
+    GET /api/feedback/exports/file/<token>/
+
+    The signed token (issued with the job, see `start_feedback_export`) names
+    the job and its owner, so the link also works from the notification e-mail.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, token):
+        from django.core import signing
+
+        try:
+            payload = signing.loads(
+                token,
+                salt=FEEDBACK_EXPORT_TOKEN_SALT,
+                max_age=getattr(settings, 'FEEDBACK_EXPORT_CACHE_SECONDS', 1800),
+            )
+            job_id = str(payload.get('job_id'))
+            owner_id = int(payload.get('owner'))
+        except Exception:
+            return Response({'detail': 'Invalid or expired download link.'}, status=status.HTTP_403_FORBIDDEN)
+
+        job = response_export.get_job(job_id)
+        if not job or job.get('owner_id') != owner_id:
+            return Response({'detail': 'Export not found or expired.'}, status=status.HTTP_404_NOT_FOUND)
+        if job['status'] != response_export.STATUS_READY:
+            return Response(feedback_export_job_payload(request, job), status=status.HTTP_409_CONFLICT)
+        stored = response_export.open_file(job)
+        if stored is None:
+            return Response({'detail': 'Export not found or expired.'}, status=status.HTTP_404_NOT_FOUND)
+        return serve_file(request, stored, job['filename'], content_type=response_export.CONTENT_TYPE)
+
 class SubjectWiseReportView(APIView):
     """
     API: Subject Wise Report
@@ -5297,279 +3742,20 @@ class SubjectWiseReportView(APIView):
             years = [int(y) for y in years_str.split(',') if y.strip()] if years_str else []
             
             form_id = request.GET.get('form_id')
-            
-            # Start with responses that have ratings
-            qs = FeedbackResponse.objects.filter(
-                answer_star__isnull=False,
-                feedback_form__status='ACTIVE',
-                feedback_form__active=True
-            ).select_related(
-                'feedback_form',
-                'feedback_form__department',
-                'user',
-                'teaching_assignment',
-                'teaching_assignment__subject',
-                'teaching_assignment__curriculum_row',
-                'teaching_assignment__curriculum_row__department',
-                'teaching_assignment__elective_subject',
-                'teaching_assignment__elective_subject__department',
-                'teaching_assignment__staff',
-                'teaching_assignment__staff__user',
-                'teaching_assignment__staff__department',
-                'teaching_assignment__section',
-                'teaching_assignment__section__batch'
-            ).prefetch_related(
-                'user__student_profile'
-            )
-            
-            # Apply department scope filter
-            qs = apply_department_scope_filter(qs, scope, field_name='feedback_form__department_id')
-            
-            # For HOD users: filter to only forms they created or forms with allow_hod_view=True
+
+            # Own-department users are already scoped
             if not scope.get('all_departments'):
-                qs = qs.filter(
-                    Q(feedback_form__created_by=request.user) | 
-                    Q(feedback_form__allow_hod_view=True)
-                )
-                # Own-department users are already scoped
                 all_departments = True
-            
-            # Filter by specific departments if requested
-            if not all_departments and department_ids:
-                qs = qs.filter(feedback_form__department_id__in=department_ids)
-            
-            # Filter by years if specified
-            if years:
-                year_filter = Q()
-                for year in years:
-                    year_filter |= Q(feedback_form__years__contains=[year])
-                    year_filter |= Q(feedback_form__year=year)
-                qs = qs.filter(year_filter)
-            
-            # Filter by form_id if specified
-            if form_id:
-                try:
-                    form_id = int(form_id)
-                    qs = qs.filter(feedback_form_id=form_id)
-                except (ValueError, TypeError):
-                    pass
-            
-            # Build subject-wise report using ORM aggregation (DIRECT AGGREGATION - NO ASSIGNMENT LOOP)
-            # Start with FeedbackResponse only - don't depend on TeachingAssignment fields
-            from django.db.models import Sum, Count, Value, F
-            from django.db.models.functions import Coalesce
-            
-            # Base query: responses with valid star ratings and active forms
-            # CRITICAL: Load ALL relations to prevent None values
-            report_qs = FeedbackResponse.objects.filter(
-                answer_star__isnull=False,
-                feedback_form__status='ACTIVE',
-                feedback_form__active=True
-            ).select_related(
-                'user',
-                'user__student_profile',
-                'user__student_profile__home_department',
-                'user__student_profile__section',
-                'user__student_profile__section__batch',
-                'user__student_profile__section__batch__course',
-                'user__student_profile__section__batch__course__department',
-                'teaching_assignment',
-                'teaching_assignment__staff',
-                'teaching_assignment__staff__user',
-                'teaching_assignment__staff__department',
-                'teaching_assignment__section',
-                'teaching_assignment__section__batch',
-                'teaching_assignment__section__batch__course',
-                'teaching_assignment__section__batch__course__department',
-                'teaching_assignment__curriculum_row',
-                'teaching_assignment__curriculum_row__department',
-                'teaching_assignment__elective_subject',
-                'teaching_assignment__elective_subject__department',
-                'teaching_assignment__subject',
-                'feedback_form'
-            )
-            
-            # Prefetch questions to avoid N+1 queries when counting questions
-            from django.db.models import Prefetch
-            report_qs = report_qs.prefetch_related(
-                Prefetch('feedback_form__questions')
-            )
-            
-            # Apply scope filter (filter by student's department, not teaching assignment)
-            # FOR HOD: Show ONLY their own department - no cross-department data
-            if not scope.get('all_departments'):
-                student_dept_ids = scope.get('department_ids', [])
-                if student_dept_ids:
-                    # Filter by STUDENT'S home department (strict - only that department)
-                    # Also ensure the subject/staff belongs to the HOD's department
-                    report_qs = report_qs.filter(
-                        (Q(user__student_profile__home_department_id__in=student_dept_ids) |
-                         Q(user__student_profile__section__batch__course__department_id__in=student_dept_ids)),
-                        # AND ensure teaching assignment's subject is in the HOD's department
-                        (Q(teaching_assignment__curriculum_row__department_id__in=student_dept_ids) |
-                         Q(teaching_assignment__elective_subject__department_id__in=student_dept_ids) |
-                         Q(teaching_assignment__staff__department_id__in=student_dept_ids))
-                    )
-                
-                # Additional: also filter to forms they created or with allow_hod_view
-                report_qs = report_qs.filter(
-                    Q(feedback_form__created_by=request.user) | 
-                    Q(feedback_form__allow_hod_view=True)
-                )
-            
-            # Filter by specific departments if requested
-            if not all_departments and department_ids:
-                # Filter by STUDENT'S department AND subject belongs to that department
-                report_qs = report_qs.filter(
-                    (Q(user__student_profile__home_department_id__in=department_ids) |
-                     Q(user__student_profile__section__batch__course__department_id__in=department_ids)),
-                    # AND ensure teaching assignment's subject is in the requested departments
-                    (Q(teaching_assignment__curriculum_row__department_id__in=department_ids) |
-                     Q(teaching_assignment__elective_subject__department_id__in=department_ids) |
-                     Q(teaching_assignment__staff__department_id__in=department_ids))
-                )
-            
-            # Filter by years if specified
-            if years:
-                year_filter = Q()
-                for year in years:
-                    year_filter |= Q(feedback_form__years__contains=[year])
-                report_qs = report_qs.filter(year_filter)
-            
-            # Filter by form_id if specified
-            if form_id:
-                try:
-                    form_id = int(form_id)
-                    report_qs = report_qs.filter(feedback_form_id=form_id)
-                except (ValueError, TypeError):
-                    pass
-            
-            # Aggregate directly from FeedbackResponse (no TeachingAssignment loop)
-            # Use Coalesce to handle NULL values in PE/OE/EE subjects
-            report_data = []
-            
-            # Group by teaching_assignment and aggregate student responses
-            aggregated = report_qs.values('teaching_assignment_id').annotate(
-                responded_students=Count('user__id', distinct=True),
-                total_stars=Sum('answer_star')
-            )
-            
-            # Process aggregation results - get assignment data and extract subject/dept/staff info
-            from academics.models import TeachingAssignment as TA
-            
-            for agg_row in aggregated:
-                ta_id = agg_row['teaching_assignment_id']
-                responded_students = agg_row['responded_students'] or 0
-                total_stars = agg_row['total_stars'] or 0
-                
-                # Get the teaching assignment for this group
-                try:
-                    ta = TA.objects.select_related(
-                        'staff__user',
-                        'staff__department',
-                        'section__batch__course__department',
-                        'curriculum_row__department',
-                        'elective_subject',
-                        'elective_subject__department',
-                        'subject',
-                        'academic_year'
-                    ).get(id=ta_id) if ta_id else None
-                except TA.DoesNotExist:
-                    ta = None
-                
-                if not ta:
-                    continue
-                
-                # Extract staff name (with fallback)
-                if ta.staff and ta.staff.user:
-                    staff_name = ta.staff.user.get_full_name() or ta.staff.user.username or 'Unknown Staff'
-                else:
-                    staff_name = 'Unknown Staff'
-                
-                # Extract subject information (handles Core, PE, OE, EE)
-                subject_code = None
-                subject_name = None
-                
-                if ta.curriculum_row:
-                    subject_code = ta.curriculum_row.course_code
-                    subject_name = ta.curriculum_row.course_name
-                elif ta.elective_subject:
-                    subject_code = ta.elective_subject.course_code
-                    subject_name = ta.elective_subject.course_name
-                elif ta.subject:
-                    subject_code = ta.subject.code
-                    subject_name = ta.subject.name
-                
-                # Skip if no subject found
-                if not subject_code or not subject_name:
-                    continue
-                
-                # Extract section (may be NULL for PE/OE/EE)
-                section_name = getattr(ta.section, 'name', 'NO SECTION') if getattr(ta, 'section', None) else 'NO SECTION'
-                
-                # SIMPLIFIED: Get department from staff only (staff's department is the single source of truth)
-                # Staff must always have a department assigned
-                dept_name = 'N/A'
-                dept_id = None
-                
-                if getattr(ta, 'staff', None) and getattr(ta.staff, 'department', None):
-                    dept = ta.staff.department
-                    dept_name = dept.short_name or dept.code or dept.name
-                    dept_id = dept.id
 
-                
-                # Get total questions from feedback form
-                first_response = report_qs.filter(teaching_assignment_id=ta_id).first()
-                total_questions = 0
-                form_name = ""
-                if first_response:
-                    total_questions = first_response.feedback_form.questions.count()
-                    # Get ONLY user-entered form_name (no fallback)
-                    form_name = first_response.feedback_form.form_name or ""
-                
-                # Calculate year from STUDENT DATA (primary source)
-                # Do not use assignment data for year
-                year = 'N/A'
-                if first_response and first_response.user:
-                    try:
-                        student = first_response.user.student_profile
-                        if student and student.section and student.section.batch:
-                            from academics.models import AcademicYear
-                            current_ay = AcademicYear.objects.filter(is_active=True).first()
-                            if current_ay:
-                                try:
-                                    acad_start = int(str(current_ay.name).split('-')[0])
-                                    batch_start = int(student.section.batch.start_year)
-                                    year = acad_start - batch_start + 1
-                                except (ValueError, TypeError):
-                                    pass
-                        
-                        # Fallback section if assignment section is missing
-                        if section_name == 'NO SECTION' and student.section:
-                            section_name = student.section.name
-                    except (AttributeError, Exception):
-                        pass
-                
-                # Calculate rating percentage
-                rating_percentage = 0
-                if responded_students > 0 and total_questions > 0:
-                    max_possible_stars = responded_students * total_questions * 5
-                    rating_percentage = (total_stars / max_possible_stars) * 100
-                    rating_percentage = min(round(rating_percentage, 2), 100)  # Cap at 100%
-                
-                report_data.append({
-                    'form_name': form_name,
-                    'department': dept_name,
-                    'section': section_name,
-                    'year': year,
-                    'staff_name': staff_name,
-                    'subject_code': subject_code,
-                    'subject_name': subject_name,
-                    'responded_students': responded_students,
-                    'total_questions': total_questions,
-                    'total_stars': total_stars,
-                    'rating_percentage': rating_percentage
-                })
+            report_data = subject_aggregates.report_rows(
+                request.user,
+                scope,
+                all_departments=all_departments,
+                department_ids=department_ids,
+                years=years,
+                form_id=form_id,
+                student_section_fallback=True,
+            )
             
             # Final sort by department, year, section, then staff name
             report_data.sort(key=lambda x: (
@@ -5767,7 +3953,6 @@ class BulkSubjectWiseReportView(APIView):
     
     def get(self, request):
         try:
-            from django.db.models import Sum, Count, Avg
             from academics.models import Department
             
             scope = get_feedback_department_scope(request.user)
@@ -5818,211 +4003,15 @@ class BulkSubjectWiseReportView(APIView):
             )
             target_department_map = {int(d['id']): (d.get('short_name') or d.get('code') or d.get('name') or f"Department {d['id']}") for d in target_departments}
             
-            # Start with responses that have ratings (DIRECT AGGREGATION - NO ASSIGNMENT LOOP DEPENDENCY)
-            # Base query: don't require teaching_assignment to be non-NULL (supports PE/OE/EE)
-            qs = FeedbackResponse.objects.filter(
-                answer_star__isnull=False,
-                feedback_form__status='ACTIVE',
-                feedback_form__active=True
-            ).select_related(
-                'feedback_form',
-                'feedback_form__department',
-                'user',
-                'user__student_profile',
-                'user__student_profile__home_department',
-                'user__student_profile__section',
-                'user__student_profile__section__batch',
-                'user__student_profile__section__batch__course',
-                'user__student_profile__section__batch__course__department',
-                'teaching_assignment',
-                'teaching_assignment__subject',
-                'teaching_assignment__curriculum_row',
-                'teaching_assignment__curriculum_row__department',
-                'teaching_assignment__elective_subject',
-                'teaching_assignment__staff',
-                'teaching_assignment__staff__user',
-                'teaching_assignment__staff__department',
-                'teaching_assignment__section',
-                'teaching_assignment__section__batch',
-                'teaching_assignment__section__batch__course',
-                'teaching_assignment__section__batch__course__department'
-            )
-            
-            # Prefetch questions to avoid N+1 queries when counting questions
-            from django.db.models import Prefetch
-            qs = qs.prefetch_related(
-                Prefetch('feedback_form__questions')
+            report_data = subject_aggregates.report_rows(
+                request.user,
+                scope,
+                all_departments=all_departments,
+                department_ids=department_ids,
+                years=years,
+                subject_codes=subject_codes,
             )
             
-            # Apply department scope filter (filter by student's department, not teaching assignment)
-            # FOR HOD: Show ONLY their own department - no cross-department data
-            if not scope.get('all_departments'):
-                student_dept_ids = scope.get('department_ids', [])
-                if student_dept_ids:
-                    # Filter by STUDENT'S home department (strict - only that department)
-                    # Also ensure the subject/staff belongs to the HOD's department
-                    qs = qs.filter(
-                        (Q(user__student_profile__home_department_id__in=student_dept_ids) |
-                         Q(user__student_profile__section__batch__course__department_id__in=student_dept_ids)),
-                        # AND ensure teaching assignment's subject is in the HOD's department
-                        (Q(teaching_assignment__curriculum_row__department_id__in=student_dept_ids) |
-                         Q(teaching_assignment__elective_subject__department_id__in=student_dept_ids) |
-                         Q(teaching_assignment__staff__department_id__in=student_dept_ids))
-                    )
-                
-                # Additional: also filter to forms they created or with allow_hod_view
-                qs = qs.filter(
-                    Q(feedback_form__created_by=request.user) | 
-                    Q(feedback_form__allow_hod_view=True)
-                )
-            
-            # Filter by specific departments if requested
-            if not all_departments and department_ids:
-                # Filter by STUDENT'S department AND subject belongs to that department
-                qs = qs.filter(
-                    (Q(user__student_profile__home_department_id__in=department_ids) |
-                     Q(user__student_profile__section__batch__course__department_id__in=department_ids)),
-                    # AND ensure teaching assignment's subject is in the requested departments
-                    (Q(teaching_assignment__curriculum_row__department_id__in=department_ids) |
-                     Q(teaching_assignment__elective_subject__department_id__in=department_ids) |
-                     Q(teaching_assignment__staff__department_id__in=department_ids))
-                )
-            
-            # Filter by years if specified
-            if years:
-                year_filter = Q()
-                for year in years:
-                    year_filter |= Q(feedback_form__years__contains=[year])
-                qs = qs.filter(year_filter)
-            
-            # Build subject filter based on curriculum_row and elective_subject codes
-            if subject_codes:
-                subject_filter = Q()
-                subject_filter |= Q(teaching_assignment__curriculum_row__course_code__in=subject_codes)
-                subject_filter |= Q(teaching_assignment__elective_subject__course_code__in=subject_codes)
-                qs = qs.filter(subject_filter)
-            
-            # Aggregate directly from FeedbackResponse (no TeachingAssignment loop)
-            report_data = []
-            
-            # Group by teaching_assignment and aggregate student responses
-            aggregated = qs.values('teaching_assignment_id').annotate(
-                responded_students=Count('user__id', distinct=True),
-                total_stars=Sum('answer_star')
-            )
-            
-            # Process aggregation results
-            from academics.models import TeachingAssignment as TA
-            
-            for agg_row in aggregated:
-                ta_id = agg_row['teaching_assignment_id']
-                responded_students = agg_row['responded_students'] or 0
-                total_stars = agg_row['total_stars'] or 0
-                
-                # Get the teaching assignment for this group
-                try:
-                    ta = TA.objects.select_related(
-                        'staff__user',
-                        'staff__department',
-                        'section__batch__course__department',
-                        'curriculum_row__department',
-                        'elective_subject',
-                        'subject',
-                        'academic_year'
-                    ).get(id=ta_id) if ta_id else None
-                except TA.DoesNotExist:
-                    ta = None
-                
-                if not ta:
-                    continue
-                
-                # Extract staff name (with fallback)
-                if ta.staff and ta.staff.user:
-                    staff_name = ta.staff.user.get_full_name() or ta.staff.user.username or 'Unknown Staff'
-                else:
-                    staff_name = 'Unknown Staff'
-                
-                # Extract subject information (handles Core, PE, OE, EE)
-                subject_code = None
-                subject_name = None
-                
-                if ta.curriculum_row:
-                    subject_code = ta.curriculum_row.course_code
-                    subject_name = ta.curriculum_row.course_name
-                elif ta.elective_subject:
-                    subject_code = ta.elective_subject.course_code
-                    subject_name = ta.elective_subject.course_name
-                elif ta.subject:
-                    subject_code = ta.subject.code
-                    subject_name = ta.subject.name
-                
-                # Skip if no subject found
-                if not subject_code or not subject_name:
-                    continue
-                
-                # Extract section (may be NULL for PE/OE/EE)
-                section_name = ta.section.name if ta.section else 'NO SECTION'
-                
-                # Extract department - Use staff's department as the single source of truth
-                # Staff must always have a department assigned
-                dept_name = 'N/A'
-                dept_id = None
-                
-                if getattr(ta, 'staff', None) and getattr(ta.staff, 'department', None):
-                    dept = ta.staff.department
-                    dept_name = dept.short_name or dept.code or dept.name
-                    dept_id = dept.id
-                
-                # Get total questions from feedback form
-                first_response = qs.filter(teaching_assignment_id=ta_id).first()
-                total_questions = 0
-                form_name = ""
-                if first_response:
-                    total_questions = first_response.feedback_form.questions.count()
-                    # Get ONLY user-entered form_name (no fallback)
-                    form_name = first_response.feedback_form.form_name or ""
-                
-                # Calculate year from STUDENT DATA (primary source)
-                # Do not use assignment data for year
-                year = 'N/A'
-                if first_response and first_response.user:
-                    try:
-                        student = first_response.user.student_profile
-                        if student and student.section and student.section.batch:
-                            from academics.models import AcademicYear
-                            current_ay = AcademicYear.objects.filter(is_active=True).first()
-                            if current_ay:
-                                try:
-                                    acad_start = int(str(current_ay.name).split('-')[0])
-                                    batch_start = int(student.section.batch.start_year)
-                                    year = acad_start - batch_start + 1
-                                except (ValueError, TypeError):
-                                    pass
-                    except (AttributeError, Exception):
-                        pass
-                
-                # Calculate rating percentage
-                rating_percentage = 0
-                if responded_students > 0 and total_questions > 0:
-                    max_possible_stars = responded_students * total_questions * 5
-                    rating_percentage = (total_stars / max_possible_stars) * 100
-                    rating_percentage = min(round(rating_percentage, 2), 100)  # Cap at 100%
-                
-                report_data.append({
-                    'form_name': form_name,
-                    'department_id': dept_id,
-                    'department': dept_name,
-                    'section': section_name,
-                    'year': year,
-                    'staff_name': staff_name,
-                    'subject_code': subject_code,
-                    'subject_name': subject_name,
-                    'responded_students': responded_students,
-                    'total_stars': total_stars,
-                    'total_questions': total_questions,
-                    'rating_percentage': rating_percentage
-                })
-            
             # Sort the data
             report_data.sort(key=lambda x: (
                 x['department'],
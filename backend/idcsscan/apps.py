@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+
+
+class IdcsscanConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'idcsscan'
+    verbose_name = 'IDCS Scan'
+
+    def ready(self):
+        # import signals to ensure receivers are registered
+        try:
+            from . import signals  # noqa: F401
+        except Exception:
+            pass
@@ -0,0 +1,265 @@
+"""Maintenance of the `GatepassLogEntry` projection.
+
+Rows are (re)built from a single Application or pulled GatepassOfflineScan:
+
+- `sync_application_log(app_id)` after any Application save (scan, approval,
+  cancellation) or ApplicationData change (gate window, reason) via the
+  receivers in `idcsscan.signals`;
+- `sync_offline_scan_log(scan_id)` when an offline scan is pulled;
+- `rebuild()` (migration 0006, `python manage.py rebuild_gatepass_logs`) for
+  a full backfill.
+
+The row content mirrors what `GatepassLogsView` computes per request.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from django.db.models import Q
+from django.utils import timezone
+
+from academics.models import StaffProfile, StudentProfile
+from applications import models as app_models
+
+from idcsscan.models import GatepassLogEntry, GatepassOfflineScan
+
+GATE_FIELD_TYPES = ("DATE IN OUT", "DATE OUT IN")
+
+
+def _display_name(user: Any) -> str:
+    if not user:
+        return ""
+    name = f"{getattr(user, 'first_name', '') or ''} {getattr(user, 'last_name', '') or ''}".strip()
+    return name or (getattr(user, "username", "") or "")
+
+
+def _image_url(profile: Any) -> str:
+    try:
+        image = getattr(profile, "profile_image", None)
+        return image.url if image else ""
+    except Exception:
+        return ""
+
+
+def _student_department(sp: StudentProfile):
+    try:
+        sec = sp.section
+        if sec and sec.batch and sec.batch.course and sec.batch.course.department:
+            return sec.batch.course.department
+    except Exception:
+        pass
+    return getattr(sp, "home_department", None)
+
+
+def _profile_values(student_profile: Optional[StudentProfile], staff_profile: Optional[StaffProfile]) -> dict:
+    if student_profile is not None:
+        dept = _student_department(student_profile)
+        return {
+            "user_role": "STUDENT",
+            "uid": student_profile.rfid_uid or "",
+            "reg_no": student_profile.reg_no or "",
+            "staff_id": "",
+            "department": dept,
+            "department_name": getattr(dept, "name", "") or "",
+            "home_department": getattr(student_profile, "home_department", None),
+            "profile_image_url": _image_url(student_profile),
+        }
+    if staff_profile is not None:
+        dept = getattr(staff_profile, "department", None)
+        return {
+            "user_role": "STAFF",
+            "uid": staff_profile.rfid_uid or "",
+            "reg_no": "",
+            "staff_id": staff_profile.staff_id or "",
+            "department": dept,
+            "department_name": getattr(dept, "name", "") or "",
+            "home_department": None,
+            "profile_image_url": _image_url(staff_profile),
+        }
+    return {
+        "user_role": "",
+        "uid": "",
+        "reg_no": "",
+        "staff_id": "",
+        "department": None,
+        "department_name": "",
+        "home_department": None,
+        "profile_image_url": "",
+    }
+
+
+def _search_text(values: dict) -> str:
+    parts = [
+        values.get("user_username"),
+        values.get("user_name"),
+        values.get("reg_no"),
+        values.get("staff_id"),
+        values.get("uid"),
+    ]
+    return " ".join(str(p).strip().lower() for p in parts if p)
+
+
+def _application_values(app: app_models.Application) -> Optional[dict]:
+    # Reuse the exact per-request extraction used by GatepassLogsView.
+    from idcsscan.views import _extract_gate_window, _extract_reason
+
+    gate_window = _extract_gate_window(app)
+    if not gate_window and not (app.gatepass_scanned_at or app.gatepass_in_scanned_at):
+        return None
+
+    out_status = "EXITED" if app.gatepass_scanned_at else "NOT_EXITED"
+    if app.gatepass_in_scanned_at:
+        end_dt = gate_window.get("end") if isinstance(gate_window, dict) else None
+        in_status = "LATE" if (end_dt and app.gatepass_in_scanned_at > end_dt) else "ON_TIME"
+    else:
+        in_status = "NOT_RETURNED"
+
+    offline = "OFFLINE" in (
+        str(app.gatepass_scanned_mode or "").upper(),
+        str(app.gatepass_in_scanned_mode or "").upper(),
+    )
+    gate_user = app.gatepass_in_scanned_by or app.gatepass_scanned_by
+
+    values = {
+        "source": GatepassLogEntry.Source.APPLICATION,
+        "applicant_user": app.applicant_user,
+        "user_username": getattr(app.applicant_user, "username", "") or "",
+        "user_name": _display_name(app.applicant_user),
+        "application_type_name": getattr(app.application_type, "name", "") or "",
+        # Offline rows appear in logs with minimal info (same as GatepassLogsView).
+        "status": "" if offline else (app.current_state or ""),
+        "reason": "" if offline else (_extract_reason(app) or ""),
+        "mode": "OFFLINE" if offline else "ONLINE",
+        "gate_username": getattr(gate_user, "username", "") if gate_user else "",
+        "gate_window_start": gate_window.get("start") if gate_window else None,
+        "gate_window_end": gate_window.get("end") if gate_window else None,
+        "out_at": app.gatepass_scanned_at,
+        "in_at": app.gatepass_in_scanned_at,
+        "out_status": out_status,
+        "in_status": in_status,
+        "log_at": app.gatepass_in_scanned_at or app.gatepass_scanned_at or app.created_at,
+    }
+    values.update(_profile_values(app.student_profile, app.staff_profile))
+    values["search_text"] = _search_text(values)
+    return values
+
+
+def sync_application_log(application_id: int) -> Optional[GatepassLogEntry]:
+    app = (
+        app_models.Application.objects.select_related(
+            "application_type",
+            "applicant_user",
+            "student_profile__section__batch__course__department",
+            "student_profile__home_department",
+            "staff_profile__department",
+            "gatepass_scanned_by",
+            "gatepass_in_scanned_by",
+        )
+        .filter(pk=application_id)
+        .first()
+    )
+    if app is None:
+        return None
+
+    values = _application_values(app)
+    if values is None:
+        GatepassLogEntry.objects.filter(application_id=application_id).delete()
+        return None
+
+    entry, _ = GatepassLogEntry.objects.update_or_create(application_id=application_id, defaults=values)
+    return entry
+
+
+def _offline_scan_values(scan: GatepassOfflineScan) -> dict:
+    from idcsscan.views import _normalize_uid
+
+    uid = _normalize_uid(scan.uid)
+    student = (
+        StudentProfile.objects.select_related("user", "section__batch__course__department", "home_department")
+        .filter(rfid_uid__iexact=uid)
+        .first()
+    )
+    staff = None
+    if student is None:
+        staff = StaffProfile.objects.select_related("user", "department").filter(rfid_uid__iexact=uid).first()
+    profile = student or staff
+    user = getattr(profile, "user", None)
+
+    values = {
+        "source": GatepassLogEntry.Source.OFFLINE_SCAN,
+        "applicant_user": user,
+        "user_username": getattr(user, "username", "") or "",
+        "user_name": _display_name(user) if user else uid,
+        "application_type_name": "",
+        "status": "",
+        "reason": "",
+        "mode": "OFFLINE",
+        "gate_username": getattr(scan.pulled_security_user, "username", "") if scan.pulled_security_user else "",
+        "gate_window_start": None,
+        "gate_window_end": None,
+        "out_at": scan.recorded_at if scan.direction == GatepassOfflineScan.Direction.OUT else None,
+        "in_at": scan.recorded_at if scan.direction == GatepassOfflineScan.Direction.IN else None,
+        "out_status": "EXITED" if scan.direction == GatepassOfflineScan.Direction.OUT else "NOT_EXITED",
+        "in_status": "ON_TIME" if scan.direction == GatepassOfflineScan.Direction.IN else "NOT_RETURNED",
+        "log_at": scan.recorded_at,
+    }
+    values.update(_profile_values(student, staff))
+    values["uid"] = uid
+    values["search_text"] = _search_text(values)
+    return values
+
+
+def sync_offline_scan_log(scan_id: int) -> Optional[GatepassLogEntry]:
+    scan = GatepassOfflineScan.objects.select_related("pulled_security_user").filter(pk=scan_id).first()
+    if scan is None or scan.status != GatepassOfflineScan.Status.PULLED:
+        GatepassLogEntry.objects.filter(offline_scan_id=scan_id).delete()
+        return None
+
+    entry, _ = GatepassLogEntry.objects.update_or_create(offline_scan_id=scan_id, defaults=_offline_scan_values(scan))
+    return entry
+
+
+def gatepass_application_ids():
+    """Applications that can appear in gate logs: scanned, or carrying a gate window field."""
+    return (
+        app_models.Application.objects.filter(
+            Q(gatepass_scanned_at__isnull=False)
+            | Q(gatepass_in_scanned_at__isnull=False)
+            | Q(data__field__field_type__in=GATE_FIELD_TYPES)
+        )
+        .order_by("id")
+        .values_list("id", flat=True)
+        .distinct()
+    )
+
+
+def rebuild() -> int:
+    """Rebuild every application and pulled offline scan row; returns the rows written."""
+    import logging
+
+    logger = logging.getLogger(__name__)
+    written = 0
+    for app_id in list(gatepass_application_ids()):
+        try:
+            if sync_application_log(app_id) is not None:
+                written += 1
+        except Exception:
+            logger.exception("Gate log rebuild failed for application %s", app_id)
+    scan_ids = GatepassOfflineScan.objects.filter(status=GatepassOfflineScan.Status.PULLED).values_list("id", flat=True)
+    for scan_id in list(scan_ids):
+        try:
+            if sync_offline_scan_log(scan_id) is not None:
+                written += 1
+        except Exception:
+            logger.exception("Gate log rebuild failed for offline scan %s", scan_id)
+    return written
+
+
+def local_iso(dt) -> Optional[str]:
+    if not dt:
+        return None
+    try:
+        return timezone.localtime(dt).isoformat()
+    except Exception:
+        return dt.isoformat()
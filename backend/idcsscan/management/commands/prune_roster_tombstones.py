@@ -0,0 +1,28 @@
+"""Delete roster delta-sync tombstones older than ROSTER_TOMBSTONE_RETENTION_DAYS.
+
+Usage:
+    python manage.py prune_roster_tombstones
+    python manage.py prune_roster_tombstones --dry-run
+"""
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from idcsscan import roster
+from idcsscan.models import RosterTombstone
+
+
+class Command(BaseCommand):
+    help = 'Delete RosterTombstone rows older than ROSTER_TOMBSTONE_RETENTION_DAYS.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows would be deleted')
+
+    def handle(self, *args, **options):
+        cutoff = roster.tombstone_cutoff()
+        if options['dry_run']:
+            count = RosterTombstone.objects.filter(deleted_at__lt=cutoff).count()
+            self.stdout.write(f'{count} tombstones older than {cutoff.isoformat()} would be deleted.')
+            return
+        deleted = roster.prune_tombstones()
+        self.stdout.write(f'Deleted {deleted} tombstones older than {cutoff.isoformat()}.')
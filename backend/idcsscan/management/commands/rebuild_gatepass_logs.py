@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from idcsscan.gate_log import gatepass_application_ids, sync_application_log, sync_offline_scan_log
+from idcsscan.models import GatepassOfflineScan
+
+
+class Command(BaseCommand):
+    help = 'Backfill/rebuild the GatepassLogEntry projection from Applications and pulled offline scans.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since-id', type=int, default=0, help='Only rebuild applications with id greater than this')
+        parser.add_argument('--skip-offline', action='store_true', help='Do not rebuild rows for pulled offline scans')
+
+    def handle(self, *args, **options):
+        app_ids = list(gatepass_application_ids().filter(id__gt=options['since_id']))
+        self.stdout.write(f'Rebuilding gate log rows for {len(app_ids)} applications...')
+        written = 0
+        for idx, app_id in enumerate(app_ids, start=1):
+            try:
+                if sync_application_log(app_id) is not None:
+                    written += 1
+            except Exception as exc:
+                self.stderr.write(f'Error processing application {app_id}: {exc}')
+            if idx % 1000 == 0:
+                self.stdout.write(f'  {idx}/{len(app_ids)}')
+
+        if not options['skip_offline']:
+            scan_ids = list(
+                GatepassOfflineScan.objects.filter(status=GatepassOfflineScan.Status.PULLED).values_list('id', flat=True)
+            )
+            self.stdout.write(f'Rebuilding gate log rows for {len(scan_ids)} pulled offline scans...')
+            for scan_id in scan_ids:
+                try:
+                    if sync_offline_scan_log(scan_id) is not None:
+                        written += 1
+                except Exception as exc:
+                    self.stderr.write(f'Error processing offline scan {scan_id}: {exc}')
+
+        self.stdout.write(f'Done. Gate log rows written: {written}')
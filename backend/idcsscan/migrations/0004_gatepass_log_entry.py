@@ -0,0 +1,58 @@
+# Generated by Django 4.2.28 on 2026-10-18 23:46
+
+from django.conf import settings
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0018_cancel_notification_settings'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('academics', '0090_systemtransitionlog'),
+        ('idcsscan', '0003_fingerprint_enrollment'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.CreateModel(
+            name='GatepassLogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('APPLICATION', 'Application'), ('OFFLINE_SCAN', 'Offline scan')], default='APPLICATION', max_length=16)),
+                ('uid', models.CharField(blank=True, default='', max_length=64)),
+                ('user_username', models.CharField(blank=True, default='', max_length=150)),
+                ('user_name', models.CharField(blank=True, default='', max_length=255)),
+                ('user_role', models.CharField(blank=True, default='', max_length=10)),
+                ('department_name', models.CharField(blank=True, default='', max_length=255)),
+                ('reg_no', models.CharField(blank=True, default='', max_length=64)),
+                ('staff_id', models.CharField(blank=True, default='', max_length=64)),
+                ('profile_image_url', models.CharField(blank=True, default='', max_length=500)),
+                ('application_type_name', models.CharField(blank=True, default='', max_length=150)),
+                ('status', models.CharField(blank=True, default='', max_length=20)),
+                ('reason', models.TextField(blank=True, default='')),
+                ('mode', models.CharField(default='ONLINE', max_length=10)),
+                ('gate_username', models.CharField(blank=True, default='', max_length=150)),
+                ('gate_window_start', models.DateTimeField(blank=True, null=True)),
+                ('gate_window_end', models.DateTimeField(blank=True, null=True)),
+                ('out_at', models.DateTimeField(blank=True, null=True)),
+                ('in_at', models.DateTimeField(blank=True, null=True)),
+                ('out_status', models.CharField(default='NOT_EXITED', max_length=12)),
+                ('in_status', models.CharField(default='NOT_RETURNED', max_length=12)),
+                ('log_at', models.DateTimeField()),
+                ('search_text', models.TextField(blank=True, default='')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('applicant_user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('application', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='gate_log_entry', to='applications.application')),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='academics.department')),
+                ('offline_scan', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='gate_log_entry', to='idcsscan.gatepassofflinescan')),
+            ],
+            options={
+                'ordering': ('-log_at', '-id'),
+                'indexes': [models.Index(fields=['-log_at', '-id'], name='idcsscan_gatelog_log_at_idx'), models.Index(fields=['user_role', '-log_at'], name='idcsscan_gatelog_role_idx'), models.Index(fields=['department', '-log_at'], name='idcsscan_gatelog_dept_idx'), models.Index(fields=['status', '-log_at'], name='idcsscan_gatelog_status_idx'), models.Index(fields=['out_status', 'in_status', '-log_at'], name='idcsscan_gatelog_scan_idx'), django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='idcsscan_gatelog_search_trgm', opclasses=['gin_trgm_ops'])],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.28 on 2026-10-18 23:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('idcsscan', '0004_gatepass_log_entry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RosterTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('STUDENT', 'Student'), ('STAFF', 'Staff')], max_length=8)),
+                ('profile_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'ordering': ('deleted_at', 'id'),
+                'indexes': [models.Index(fields=['role', 'deleted_at'], name='idcsscan_roster_tomb_role_idx')],
+            },
+        ),
+    ]
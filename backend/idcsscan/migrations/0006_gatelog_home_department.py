@@ -0,0 +1,37 @@
+# Generated by Django 4.2.28 on 2026-10-19 01:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_gate_logs(apps, schema_editor):
+    """Fill the projection (and home_department) for activity before 0004/0006.
+
+    Rows are derived from ApplicationData and the gate window parsing in
+    idcsscan.views, so the service rebuild (current models) is reused.
+    """
+    from idcsscan import gate_log
+
+    gate_log.rebuild()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0091_profile_updated_at'),
+        ('applications', '0024_backfill_step_due_and_gatepass_expiry'),
+        ('idcsscan', '0005_roster_tombstone'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gatepasslogentry',
+            name='home_department',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='academics.department'),
+        ),
+        migrations.AddIndex(
+            model_name='gatepasslogentry',
+            index=models.Index(fields=['home_department', '-log_at'], name='idcsscan_gatelog_home_dept_idx'),
+        ),
+        migrations.RunPython(backfill_gate_logs, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 
 
@@ -131,3 +132,119 @@ class GatepassOfflineScan(models.Model):
 
     def __str__(self) -> str:
         return f"{self.uid} {self.direction} {self.status}"
+
+
+class GatepassLogEntry(models.Model):
+    """Denormalized gate-log row, written whenever a gatepass is scanned.
+
+    One row per gatepass-like Application (has a gate window or scans) and one
+    per pulled GatepassOfflineScan. `GatepassLogSearchView` / the CSV export
+    read only this table, so searching months of logs never touches
+    Application/ApplicationData joins.
+    """
+
+    class Source(models.TextChoices):
+        APPLICATION = "APPLICATION", "Application"
+        OFFLINE_SCAN = "OFFLINE_SCAN", "Offline scan"
+
+    source = models.CharField(max_length=16, choices=Source.choices, default=Source.APPLICATION)
+    application = models.OneToOneField(
+        "applications.Application",
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="gate_log_entry",
+    )
+    offline_scan = models.OneToOneField(
+        GatepassOfflineScan,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="gate_log_entry",
+    )
+
+    applicant_user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+    uid = models.CharField(max_length=64, blank=True, default="")
+    user_username = models.CharField(max_length=150, blank=True, default="")
+    user_name = models.CharField(max_length=255, blank=True, default="")
+    user_role = models.CharField(max_length=10, blank=True, default="")
+    department = models.ForeignKey(
+        "academics.Department",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+    department_name = models.CharField(max_length=255, blank=True, default="")
+    # Students also match a department filter on their home department.
+    home_department = models.ForeignKey(
+        "academics.Department",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+    reg_no = models.CharField(max_length=64, blank=True, default="")
+    staff_id = models.CharField(max_length=64, blank=True, default="")
+    profile_image_url = models.CharField(max_length=500, blank=True, default="")
+
+    application_type_name = models.CharField(max_length=150, blank=True, default="")
+    status = models.CharField(max_length=20, blank=True, default="")
+    reason = models.TextField(blank=True, default="")
+    mode = models.CharField(max_length=10, default="ONLINE")
+    gate_username = models.CharField(max_length=150, blank=True, default="")
+
+    gate_window_start = models.DateTimeField(null=True, blank=True)
+    gate_window_end = models.DateTimeField(null=True, blank=True)
+    out_at = models.DateTimeField(null=True, blank=True)
+    in_at = models.DateTimeField(null=True, blank=True)
+    out_status = models.CharField(max_length=12, default="NOT_EXITED")
+    in_status = models.CharField(max_length=12, default="NOT_RETURNED")
+    # Latest activity (IN, else OUT, else application created_at); keyset sort key.
+    log_at = models.DateTimeField()
+
+    # Lower-cased name/username/reg_no/staff_id/uid, searched with a trigram index.
+    search_text = models.TextField(blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("-log_at", "-id")
+        indexes = [
+            models.Index(fields=["-log_at", "-id"], name="idcsscan_gatelog_log_at_idx"),
+            models.Index(fields=["user_role", "-log_at"], name="idcsscan_gatelog_role_idx"),
+            models.Index(fields=["department", "-log_at"], name="idcsscan_gatelog_dept_idx"),
+            models.Index(fields=["home_department", "-log_at"], name="idcsscan_gatelog_home_dept_idx"),
+            models.Index(fields=["status", "-log_at"], name="idcsscan_gatelog_status_idx"),
+            models.Index(fields=["out_status", "in_status", "-log_at"], name="idcsscan_gatelog_scan_idx"),
+            GinIndex(fields=["search_text"], opclasses=["gin_trgm_ops"], name="idcsscan_gatelog_search_trgm"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_name or self.uid} {self.out_status}/{self.in_status} @ {self.log_at}"
+
+
+class RosterTombstone(models.Model):
+    """Deleted Student/Staff profile, so roster delta-sync clients can drop it locally."""
+
+    class Role(models.TextChoices):
+        STUDENT = "STUDENT", "Student"
+        STAFF = "STAFF", "Staff"
+
+    role = models.CharField(max_length=8, choices=Role.choices)
+    profile_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ("deleted_at", "id")
+        indexes = [
+            models.Index(fields=["role", "deleted_at"], name="idcsscan_roster_tomb_role_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.role} #{self.profile_id} deleted @ {self.deleted_at}"
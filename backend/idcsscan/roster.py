@@ -0,0 +1,249 @@
+"""Versioned Student/Staff roster for delta sync (`GET /api/idscan/roster/sync/`).
+
+`CardsDataView` / `BulkEntryPeopleView` rebuild the whole roster on every call.
+Clients that keep a local copy (KR-GATE desktop app, card management screen)
+instead call the sync endpoint with the watermark from their previous response
+and receive only:
+
+- profiles whose `updated_at` moved past the watermark (profile saves, plus
+  user/section/batch/department changes bumped by `idcsscan.signals`);
+- ids of profiles deleted since then (`RosterTombstone`).
+
+Tombstones are kept for ROSTER_TOMBSTONE_RETENTION_DAYS (`prune_tombstones`);
+a watermark older than that could miss deletions, so it gets a full snapshot.
+
+The watermark also carries the academic-year "epoch" used to derive student
+semesters; when the active year changes every student row changes, so the
+client is sent a full snapshot instead of a delta.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from academics.models import AcademicYear, StaffProfile, StudentProfile
+from idcsscan.models import RosterTombstone
+
+ROSTER_COLUMNS = (
+    "id",
+    "role",
+    "identifier",
+    "username",
+    "name",
+    "department",
+    "department_id",
+    "section_id",
+    "section",
+    "batch",
+    "semester",
+    "rfid_uid",
+    "profile_status",
+    "profile_image_url",
+)
+
+ROLES = ("STUDENT", "STAFF")
+
+# Rows committed by a transaction that started before the previous sync can carry
+# an updated_at slightly older than the watermark; re-send that window (upserts
+# are idempotent on the client).
+SYNC_OVERLAP = timedelta(minutes=2)
+
+CHUNK_SIZE = 2000
+
+
+class InvalidWatermark(ValueError):
+    pass
+
+
+def semester_context() -> tuple[Optional[int], int]:
+    """(academic start year, semester offset) exactly as CardsDataView derives them."""
+    try:
+        ay = AcademicYear.objects.filter(is_active=True).first() or AcademicYear.objects.order_by("-id").first()
+        if ay and ay.name:
+            return int(str(ay.name).split("-")[0]), 1 if (ay.parity or "").upper() == "ODD" else 2
+    except Exception:
+        pass
+    return None, 2
+
+
+def roster_epoch(ctx: tuple[Optional[int], int]) -> str:
+    acad_start, sem_offset = ctx
+    return f"{acad_start or 0}.{sem_offset}"
+
+
+def encode_watermark(at: datetime, epoch: str) -> str:
+    raw = f"{at.isoformat()}|{epoch}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_watermark(token: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(str(token).encode("ascii")).decode("utf-8")
+        at_raw, epoch = raw.split("|", 1)
+        at = parse_datetime(at_raw)
+    except Exception:
+        at = None
+    if at is None:
+        raise InvalidWatermark("Invalid watermark")
+    if timezone.is_naive(at):
+        at = timezone.make_aware(at)
+    return at, epoch
+
+
+def _image_url(profile: Any) -> Optional[str]:
+    try:
+        return profile.profile_image.url if getattr(profile, "profile_image", None) else None
+    except Exception:
+        return None
+
+
+def _full_name(user: Any) -> str:
+    return f"{user.first_name} {user.last_name}".strip() if user else ""
+
+
+def _student_semester(s: StudentProfile, ctx: tuple[Optional[int], int]) -> Optional[int]:
+    acad_start, sem_offset = ctx
+    try:
+        if s.section and s.section.semester:
+            return s.section.semester.number
+        if acad_start is not None and s.section and s.section.batch:
+            batch = s.section.batch
+            start_year = batch.start_year
+            if start_year is None:
+                try:
+                    start_year = int(str(batch.name or "").split("-")[0])
+                except Exception:
+                    start_year = None
+            if start_year is not None:
+                computed = (int(acad_start) - int(start_year)) * 2 + int(sem_offset)
+                if computed > 0:
+                    return computed
+    except Exception:
+        pass
+    return None
+
+
+def student_row(s: StudentProfile, ctx: tuple[Optional[int], int]) -> tuple:
+    dept = None
+    if s.section and s.section.batch and s.section.batch.course and s.section.batch.course.department:
+        dept = s.section.batch.course.department
+    elif s.home_department:
+        dept = s.home_department
+    return (
+        s.id,
+        "STUDENT",
+        s.reg_no,
+        s.user.username if s.user else "",
+        _full_name(s.user),
+        (dept.short_name or dept.code) if dept else "",
+        dept.id if dept else None,
+        s.section_id,
+        s.section.name if s.section else None,
+        str(s.section.batch) if s.section and s.section.batch else None,
+        _student_semester(s, ctx),
+        s.rfid_uid,
+        s.status,
+        _image_url(s),
+    )
+
+
+def staff_row(s: StaffProfile) -> tuple:
+    return (
+        s.id,
+        "STAFF",
+        s.staff_id,
+        s.user.username if s.user else "",
+        _full_name(s.user),
+        (s.department.short_name or s.department.code) if s.department else "",
+        s.department_id,
+        None,
+        None,
+        None,
+        None,
+        s.rfid_uid,
+        s.status,
+        _image_url(s),
+    )
+
+
+def _student_queryset():
+    return StudentProfile.objects.select_related(
+        "user",
+        "section__semester",
+        "section__batch__course__department",
+        "section__batch__department",
+        "home_department",
+    )
+
+
+def _staff_queryset():
+    return StaffProfile.objects.select_related("user", "department")
+
+
+def _iter_chunks(qs, size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """Keyset over id: bounded memory without server-side cursors (PgBouncer)."""
+    last_id = 0
+    while True:
+        chunk = list(qs.filter(id__gt=last_id).order_by("id")[:size])
+        if not chunk:
+            return
+        yield from chunk
+        last_id = chunk[-1].id
+
+
+def _roles(role: Optional[str]) -> Iterable[str]:
+    return (role,) if role in ROLES else ROLES
+
+
+def iter_rows(ctx: tuple[Optional[int], int], role: Optional[str] = None,
+              since: Optional[datetime] = None) -> Iterator[tuple]:
+    for r in _roles(role):
+        qs = _student_queryset() if r == "STUDENT" else _staff_queryset()
+        if since is not None:
+            qs = qs.filter(updated_at__gt=since - SYNC_OVERLAP)
+        for profile in _iter_chunks(qs):
+            yield student_row(profile, ctx) if r == "STUDENT" else staff_row(profile)
+
+
+def tombstone_cutoff(now: Optional[datetime] = None) -> datetime:
+    days = int(getattr(settings, "ROSTER_TOMBSTONE_RETENTION_DAYS", 90) or 90)
+    return (now or timezone.now()) - timedelta(days=days)
+
+
+def watermark_expired(since: datetime) -> bool:
+    """True when tombstones newer than `since` may already have been pruned."""
+    return since - SYNC_OVERLAP < tombstone_cutoff()
+
+
+def prune_tombstones(now: Optional[datetime] = None) -> int:
+    deleted, _ = RosterTombstone.objects.filter(deleted_at__lt=tombstone_cutoff(now)).delete()
+    return deleted
+
+
+def deleted_ids(role: Optional[str], since: datetime) -> dict[str, list[int]]:
+    deleted: dict[str, list[int]] = {r: [] for r in _roles(role)}
+    rows = RosterTombstone.objects.filter(
+        role__in=list(deleted), deleted_at__gt=since - SYNC_OVERLAP
+    ).values_list("role", "profile_id")
+    for r, profile_id in rows:
+        deleted[r].append(profile_id)
+    return deleted
+
+
+def snapshot_etag(ctx: tuple[Optional[int], int], role: Optional[str], fmt: str) -> str:
+    """Cheap fingerprint of the full snapshot: counts, newest updated_at and newest tombstone."""
+    parts = [fmt, str(role or ""), roster_epoch(ctx)]
+    for r in _roles(role):
+        model = StudentProfile if r == "STUDENT" else StaffProfile
+        agg = model.objects.aggregate(n=Count("id"), latest=Max("updated_at"))
+        parts.append(f"{r}:{agg['n']}:{agg['latest'].isoformat() if agg['latest'] else ''}")
+    parts.append(str(RosterTombstone.objects.aggregate(m=Max("id"))["m"] or 0))
+    return '"%s"' % hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
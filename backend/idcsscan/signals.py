@@ -0,0 +1,98 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from academics.models import Batch, Department, Section, StaffProfile, StudentProfile
+from applications.models import Application, ApplicationData
+from idcsscan.models import GatepassOfflineScan, RosterTombstone
+
+
+def _run_after_commit(func, pk):
+    def _sync():
+        try:
+            func(pk)
+        except Exception:
+            # The projection is rebuildable (rebuild_gatepass_logs); never fail the scan.
+            import logging
+
+            logging.getLogger(__name__).exception('Gate log projection sync failed for %s(%s)', func.__name__, pk)
+
+    transaction.on_commit(_sync)
+
+
+@receiver(post_save, sender=Application)
+def sync_gate_log_for_application(sender, instance: Application, created, **kwargs):
+    """Refresh the gate-log row after the scan/state change is committed (ApplicationData is written by then)."""
+    from idcsscan.gate_log import sync_application_log
+
+    _run_after_commit(sync_application_log, instance.pk)
+
+
+@receiver(post_save, sender=ApplicationData)
+@receiver(post_delete, sender=ApplicationData)
+def sync_gate_log_for_application_data(sender, instance: ApplicationData, **kwargs):
+    """Gate window and reason come from ApplicationData, which can change without an Application save."""
+    from idcsscan.gate_log import sync_application_log
+
+    _run_after_commit(sync_application_log, instance.application_id)
+
+
+@receiver(post_save, sender=GatepassOfflineScan)
+def sync_gate_log_for_offline_scan(sender, instance: GatepassOfflineScan, created, **kwargs):
+    from idcsscan.gate_log import sync_offline_scan_log
+
+    _run_after_commit(sync_offline_scan_log, instance.pk)
+
+
+# ── Roster delta-sync (idcsscan.roster) ──────────────────────────────────────
+# Roster rows embed user names and section/batch/department labels, so changes
+# there bump `updated_at` on the affected profiles. QuerySet.update() skips
+# auto_now, hence the explicit value.
+
+ROSTER_USER_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+@receiver(post_delete, sender=StudentProfile)
+def tombstone_student_profile(sender, instance: StudentProfile, **kwargs):
+    RosterTombstone.objects.create(role=RosterTombstone.Role.STUDENT, profile_id=instance.pk)
+
+
+@receiver(post_delete, sender=StaffProfile)
+def tombstone_staff_profile(sender, instance: StaffProfile, **kwargs):
+    RosterTombstone.objects.create(role=RosterTombstone.Role.STAFF, profile_id=instance.pk)
+
+
+@receiver(post_save, sender=get_user_model())
+def touch_roster_for_user(sender, instance, created, update_fields=None, **kwargs):
+    # Logins save last_login only; skip anything that cannot change a roster row.
+    if created or (update_fields is not None and not ROSTER_USER_FIELDS.intersection(update_fields)):
+        return
+    now = timezone.now()
+    StudentProfile.objects.filter(user_id=instance.pk).update(updated_at=now)
+    StaffProfile.objects.filter(user_id=instance.pk).update(updated_at=now)
+
+
+@receiver(post_save, sender=Section)
+def touch_roster_for_section(sender, instance: Section, created, **kwargs):
+    if not created:
+        StudentProfile.objects.filter(section_id=instance.pk).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Batch)
+def touch_roster_for_batch(sender, instance: Batch, created, **kwargs):
+    if not created:
+        StudentProfile.objects.filter(section__batch_id=instance.pk).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Department)
+def touch_roster_for_department(sender, instance: Department, created, **kwargs):
+    if created:
+        return
+    now = timezone.now()
+    StudentProfile.objects.filter(
+        Q(section__batch__course__department_id=instance.pk) | Q(home_department_id=instance.pk)
+    ).update(updated_at=now)
+    StaffProfile.objects.filter(department_id=instance.pk).update(updated_at=now)
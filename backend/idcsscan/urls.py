@@ -9,6 +9,8 @@ from idcsscan.views import (
     ManageSecurityUserDetailView,
     RFReaderScanExportCsvView,
     GatepassLogsView,
+    GatepassLogSearchView,
+    GatepassLogExportCsvView,
     GatepassOfflineSecurityUsersView,
     GatepassOfflineRecordsView,
     GatepassOfflineUploadView,
@@ -17,6 +19,7 @@ from idcsscan.views import (
     GatepassOfflinePullAllView,
     GatepassOfflineIgnoreAllView,
     BulkEntryPeopleView,
+    RosterSyncView,
     FingerprintEnrollView,
     FingerprintListView,
     FingerprintDeactivateView,
@@ -44,6 +47,8 @@ urlpatterns = [
     path('manage-security-users/', ManageSecurityUsersView.as_view(), name='idscan-manage-security-users'),
     path('manage-security-users/<int:pk>/', ManageSecurityUserDetailView.as_view(), name='idscan-manage-security-users-detail'),
     path('gatepass-logs/', GatepassLogsView.as_view(), name='idscan-gatepass-logs'),
+    path('gatepass-logs/search/', GatepassLogSearchView.as_view(), name='idscan-gatepass-logs-search'),
+    path('gatepass-logs/export.csv', GatepassLogExportCsvView.as_view(), name='idscan-gatepass-logs-export-csv'),
 
     # HR: Offline gatepass records reconciliation
     path('gatepass-offline/security-users/', GatepassOfflineSecurityUsersView.as_view(), name='idscan-gatepass-offline-security-users'),
@@ -55,6 +60,7 @@ urlpatterns = [
     path('gatepass-offline/ignore-all/', GatepassOfflineIgnoreAllView.as_view(), name='idscan-gatepass-offline-ignore-all'),
     path('rfreader/scans/export.csv', RFReaderScanExportCsvView.as_view(), name='idscan-rfreader-scans-export-csv'),
     path('bulk-entry/people/', BulkEntryPeopleView.as_view(), name='idscan-bulk-entry-people'),
+    path('roster/sync/', RosterSyncView.as_view(), name='idscan-roster-sync'),
 
     # Fingerprint enrollment
     path('fingerprint/enroll/',     FingerprintEnrollView.as_view(),     name='idscan-fingerprint-enroll'),
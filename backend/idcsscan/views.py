@@ -1037,6 +1037,213 @@ class GatepassLogsView(APIView):
         return Response({"results": results[:limit]}, status=status.HTTP_200_OK)
 
 
+def _gate_log_filtered_queryset(params) -> Any:
+    """Filter `GatepassLogEntry` with the same query params as `GatepassLogsView`.
+
+    Date range applies to `log_at` (latest IN/OUT scan, else application created_at).
+    """
+    from idcsscan.models import GatepassLogEntry
+
+    qs = GatepassLogEntry.objects.all()
+
+    role = str(params.get("role") or "").strip().upper()
+    if role in ("STUDENT", "STAFF"):
+        qs = qs.filter(user_role=role)
+
+    status_filter = str(params.get("status") or "").strip().upper()
+    if status_filter:
+        qs = qs.filter(status=status_filter)
+
+    out_filter = str(params.get("out") or "").strip().upper()
+    if out_filter in ("EXITED", "NOT_EXITED"):
+        qs = qs.filter(out_status=out_filter)
+
+    in_filter = str(params.get("in") or "").strip().upper()
+    if in_filter in ("ON_TIME", "LATE", "NOT_RETURNED"):
+        qs = qs.filter(in_status=in_filter)
+
+    mode = str(params.get("mode") or "").strip().upper()
+    if mode in ("ONLINE", "OFFLINE"):
+        qs = qs.filter(mode=mode)
+
+    dept_raw = str(params.get("department_id") or "").strip()
+    if dept_raw:
+        try:
+            dept_id = int(dept_raw)
+            # Same predicate as GatepassLogsView: staff or section department, or home department.
+            qs = qs.filter(Q(department_id=dept_id) | Q(home_department_id=dept_id))
+        except Exception:
+            pass
+
+    tz = timezone.get_current_timezone()
+    d_from = _parse_any_date(params.get("from"))
+    d_to = _parse_any_date(params.get("to"))
+    if d_from:
+        qs = qs.filter(log_at__gte=timezone.make_aware(datetime.combine(d_from, time.min), tz))
+    if d_to:
+        qs = qs.filter(log_at__lte=timezone.make_aware(datetime.combine(d_to, time.max), tz))
+
+    q = str(params.get("q") or "").strip().lower()
+    if q:
+        # search_text is stored lower-cased so a plain LIKE can use the trigram index.
+        qs = qs.filter(search_text__contains=q)
+
+    return qs
+
+
+def _encode_gate_log_cursor(entry: Any) -> str:
+    import base64
+
+    raw = f"{entry.log_at.isoformat()}|{entry.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_gate_log_cursor(cursor: str) -> Optional[tuple[datetime, int]]:
+    import base64
+
+    try:
+        raw = base64.urlsafe_b64decode(str(cursor).encode("ascii")).decode("utf-8")
+        ts_raw, id_raw = raw.rsplit("|", 1)
+        return datetime.fromisoformat(ts_raw), int(id_raw)
+    except Exception:
+        return None
+
+
+def _apply_gate_log_cursor(qs: Any, log_at: datetime, entry_id: int) -> Any:
+    return qs.filter(Q(log_at__lt=log_at) | Q(log_at=log_at, id__lt=entry_id))
+
+
+def _gate_log_row(entry: Any, base_url: str) -> dict:
+    from idcsscan.gate_log import local_iso
+
+    profile_image_url = entry.profile_image_url or None
+    if profile_image_url and profile_image_url.startswith("/") and base_url:
+        profile_image_url = f"{base_url}{profile_image_url}"
+
+    return {
+        "id": entry.id,
+        "application_id": entry.application_id if entry.application_id else -(entry.offline_scan_id or 0),
+        "uid": entry.uid or None,
+        "user_username": entry.user_username or None,
+        "user_name": entry.user_name or None,
+        "user_role": entry.user_role or None,
+        "department_name": entry.department_name or None,
+        "reg_no": entry.reg_no or None,
+        "staff_id": entry.staff_id or None,
+        "profile_image_url": profile_image_url,
+        "gate_username": entry.gate_username or None,
+        "mode": entry.mode,
+        "status": entry.status,
+        "reason": entry.reason,
+        "out_status": entry.out_status,
+        "in_status": entry.in_status,
+        "out_at": local_iso(entry.out_at),
+        "in_at": local_iso(entry.in_at),
+        "log_at": local_iso(entry.log_at),
+    }
+
+
+class GatepassLogSearchView(APIView):
+    """GET /api/idscan/gatepass-logs/search/
+
+    Indexed, keyset-paginated gate logs served from the `GatepassLogEntry`
+    projection. Accepts the same filters as `GatepassLogsView` (role,
+    department_id, status, out, in, from, to, q) plus:
+      - mode: ONLINE|OFFLINE
+      - cursor: opaque `next_cursor` from the previous page
+      - limit: page size (default 100, max 500)
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        if not _has_gate_management_permission(request.user):
+            return Response({"detail": "Permission denied."}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            limit = max(1, min(int(str(request.query_params.get("limit") or "100").strip()), 500))
+        except Exception:
+            limit = 100
+
+        qs = _gate_log_filtered_queryset(request.query_params).order_by("-log_at", "-id")
+
+        cursor_raw = str(request.query_params.get("cursor") or "").strip()
+        if cursor_raw:
+            cursor = _decode_gate_log_cursor(cursor_raw)
+            if cursor is None:
+                return Response({"detail": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST)
+            qs = _apply_gate_log_cursor(qs, *cursor)
+
+        try:
+            base_url = str(request.build_absolute_uri("/") or "").rstrip("/")
+        except Exception:
+            base_url = ""
+
+        entries = list(qs[: limit + 1])
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+
+        return Response(
+            {
+                "results": [_gate_log_row(e, base_url) for e in entries],
+                "next_cursor": _encode_gate_log_cursor(entries[-1]) if has_more and entries else None,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class GatepassLogExportCsvView(APIView):
+    """GET /api/idscan/gatepass-logs/export.csv
+
+    Streams every matching `GatepassLogEntry` as CSV (same filters as
+    `GatepassLogSearchView`). Rows are fetched in keyset batches so memory
+    stays flat for months of logs.
+    """
+
+    permission_classes = [IsAuthenticated]
+    batch_size = 2000
+
+    def get(self, request, *args, **kwargs):
+        if not _has_gate_management_permission(request.user):
+            return Response({"detail": "Permission denied."}, status=status.HTTP_403_FORBIDDEN)
+
+        import csv
+        from django.http import StreamingHttpResponse
+
+        base_qs = _gate_log_filtered_queryset(request.query_params).order_by("-log_at", "-id")
+        columns = [
+            "log_at", "user_name", "user_username", "user_role", "reg_no", "staff_id", "uid",
+            "department_name", "status", "reason", "mode", "out_status", "in_status", "out_at", "in_at",
+            "gate_username", "application_id",
+        ]
+
+        class _Echo:
+            def write(self, value):
+                return value
+
+        writer = csv.writer(_Echo())
+        batch_size = self.batch_size
+
+        def _rows():
+            yield writer.writerow(columns)
+            qs = base_qs
+            while True:
+                batch = list(qs[:batch_size])
+                if not batch:
+                    return
+                for entry in batch:
+                    row = _gate_log_row(entry, "")
+                    yield writer.writerow(["" if row.get(c) is None else row.get(c) for c in columns])
+                if len(batch) < batch_size:
+                    return
+                last = batch[-1]
+                qs = _apply_gate_log_cursor(base_qs, last.log_at, last.id)
+
+        resp = StreamingHttpResponse(_rows(), content_type="text/csv")
+        resp["Content-Disposition"] = 'attachment; filename="gatepass_logs.csv"'
+        return resp
+
+
 class GatepassOfflineSecurityUsersView(APIView):
     """GET /api/idscan/gatepass-offline/security-users/"""
 
@@ -2913,6 +3120,95 @@ class BulkEntryPeopleView(APIView):
         return Response({"results": data}, status=status.HTTP_200_OK)
 
 
+def _roster_json_response(request, payload: dict, etag: Optional[str] = None):
+    """Compact JSON, gzipped when the client accepts it (no GZipMiddleware in this project)."""
+    from django.core.serializers.json import DjangoJSONEncoder
+    from django.http import HttpResponse
+    from django.utils.text import compress_string
+
+    body = json.dumps(payload, cls=DjangoJSONEncoder, separators=(",", ":")).encode("utf-8")
+    response = HttpResponse(content_type="application/json")
+    if "gzip" in (request.META.get("HTTP_ACCEPT_ENCODING") or "").lower() and len(body) > 200:
+        body = compress_string(body)
+        response["Content-Encoding"] = "gzip"
+    response["Vary"] = "Accept-Encoding"
+    response.content = body
+    if etag:
+        response["ETag"] = etag
+    return response
+
+
+class RosterSyncView(APIView):
+    """GET /api/idscan/roster/sync/
+
+    Delta sync of the CardsDataView / BulkEntryPeopleView roster.
+
+    Query params:
+      since  - watermark from the previous response (omit for a full snapshot)
+      role   - "STUDENT" or "STAFF" (optional)
+      shape  - "rows" (default, list of objects) or "columnar" (columns + row arrays)
+
+    Response: {full, watermark, count, deleted: {ROLE: [profile ids]}, results | columns+rows}.
+    Full snapshots carry an ETag; send it back as If-None-Match to get 304 when unchanged.
+    """
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request):
+        from django.http import HttpResponseNotModified
+
+        from idcsscan import roster
+
+        if not _has_card_management_permission(request.user):
+            return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
+
+        role = (request.query_params.get("role") or "").upper() or None
+        if role and role not in roster.ROLES:
+            return Response({"error": "role must be STUDENT or STAFF"}, status=status.HTTP_400_BAD_REQUEST)
+        shape = (request.query_params.get("shape") or "rows").lower()
+        if shape not in ("rows", "columnar"):
+            return Response({"error": "shape must be rows or columnar"}, status=status.HTTP_400_BAD_REQUEST)
+
+        ctx = roster.semester_context()
+        epoch = roster.roster_epoch(ctx)
+        started_at = timezone.now()
+
+        since = None
+        since_raw = request.query_params.get("since")
+        if since_raw:
+            try:
+                since, since_epoch = roster.decode_watermark(since_raw)
+            except roster.InvalidWatermark:
+                return Response({"error": "Invalid since watermark"}, status=status.HTTP_400_BAD_REQUEST)
+            if since_epoch != epoch:
+                # Academic year changed: every derived semester may differ.
+                since = None
+            elif roster.watermark_expired(since):
+                # Deletions that old may have been pruned from the tombstones.
+                since = None
+
+        etag = None
+        if since is None:
+            etag = roster.snapshot_etag(ctx, role, shape)
+            if etag in [t.strip() for t in (request.META.get("HTTP_IF_NONE_MATCH") or "").split(",")]:
+                response = HttpResponseNotModified()
+                response["ETag"] = etag
+                return response
+
+        rows = list(roster.iter_rows(ctx, role=role, since=since))
+        payload: dict[str, Any] = {
+            "full": since is None,
+            "watermark": roster.encode_watermark(started_at, epoch),
+            "count": len(rows),
+            "deleted": roster.deleted_ids(role, since) if since is not None else {},
+        }
+        if shape == "columnar":
+            payload["columns"] = list(roster.ROSTER_COLUMNS)
+            payload["rows"] = rows
+        else:
+            payload["results"] = [dict(zip(roster.ROSTER_COLUMNS, row)) for row in rows]
+        return _roster_json_response(request, payload, etag=etag)
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # Fingerprint Enrollment API Views
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -0,0 +1,125 @@
+"""Batched writes of `StudyMaterialDownloadLog` rows.
+
+An authorized download appends its audit row to a Redis list (one ``RPUSH``,
+no database write in the request). `python manage.py drain_download_logs`,
+run every minute by deploy/systemd/download-logs.timer, moves the list into
+the table with `bulk_create`, so the audit list lags downloads by up to a
+minute. The list lives in Redis rather than in worker memory, so rows survive
+worker restarts and recycling. When the queue cannot be reached (Redis down,
+LMS_DOWNLOAD_LOG_QUEUE=0, non-Redis cache) the row is inserted directly, in a
+savepoint, so a failed insert is logged without failing the download.
+`downloaded_at` is the time of the download either way.
+
+Entries are read with ``LRANGE`` and trimmed only after their rows commit; a
+drain killed in between writes that batch again on the next run. Only one
+drain runs at a time (a oneshot systemd unit never overlaps itself).
+"""
+import json
+import logging
+from typing import List, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from lms.models import StudyMaterial, StudyMaterialDownloadLog
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = 'lms:download_logs:queue'
+
+
+def _queue():
+    """Raw Redis connection for the queue, or None when queueing is off."""
+    if not getattr(settings, 'LMS_DOWNLOAD_LOG_QUEUE', True):
+        return None
+    from django_redis import get_redis_connection
+
+    try:
+        return get_redis_connection('default')
+    except NotImplementedError:
+        # The default cache is not django-redis (local settings).
+        return None
+
+
+def _profile_id(user, attr: str) -> Optional[int]:
+    profile = getattr(user, attr, None)
+    return getattr(profile, 'pk', None)
+
+
+def record_download(material, user, client_ip=None, user_agent: str = '') -> None:
+    entry = {
+        'material_id': material.pk,
+        'user_id': getattr(user, 'pk', None),
+        'staff_id': _profile_id(user, 'staff_profile'),
+        'student_id': _profile_id(user, 'student_profile'),
+        'client_ip': client_ip,
+        'user_agent': str(user_agent or '')[:1000],
+        'downloaded_at': timezone.now().isoformat(),
+    }
+    try:
+        queue = _queue()
+        if queue is not None:
+            queue.rpush(QUEUE_KEY, json.dumps(entry))
+            return
+    except Exception:
+        logger.warning('Download log queue unavailable; writing the row directly', exc_info=True)
+    try:
+        with transaction.atomic():
+            StudyMaterialDownloadLog.objects.bulk_create(_build_rows([entry]))
+    except Exception:
+        logger.exception('Failed to write study material download log (material=%s)', material.pk)
+
+
+def _existing(model, ids) -> set:
+    ids = {pk for pk in ids if pk}
+    return set(model.objects.filter(pk__in=ids).values_list('pk', flat=True)) if ids else set()
+
+
+def _build_rows(entries: List[dict]) -> List[StudyMaterialDownloadLog]:
+    """Rows for `entries`; as with the FKs, a deleted material drops its rows and deleted users are nulled."""
+    from academics.models import StaffProfile, StudentProfile
+
+    materials = _existing(StudyMaterial, (e.get('material_id') for e in entries))
+    users = _existing(get_user_model(), (e.get('user_id') for e in entries))
+    staff = _existing(StaffProfile, (e.get('staff_id') for e in entries))
+    students = _existing(StudentProfile, (e.get('student_id') for e in entries))
+    rows = []
+    for e in entries:
+        if e.get('material_id') not in materials:
+            continue
+        rows.append(StudyMaterialDownloadLog(
+            material_id=e['material_id'],
+            downloaded_by_id=e.get('user_id') if e.get('user_id') in users else None,
+            downloaded_by_staff_id=e.get('staff_id') if e.get('staff_id') in staff else None,
+            downloaded_by_student_id=e.get('student_id') if e.get('student_id') in students else None,
+            client_ip=e.get('client_ip') or None,
+            user_agent=e.get('user_agent') or '',
+            downloaded_at=parse_datetime(e.get('downloaded_at') or '') or timezone.now(),
+        ))
+    return rows
+
+
+def drain(batch_size: int = 500) -> int:
+    """Write every queued entry to the table; returns the number of rows written."""
+    queue = _queue()
+    if queue is None:
+        return 0
+    written = 0
+    while True:
+        raw = queue.lrange(QUEUE_KEY, 0, batch_size - 1)
+        if not raw:
+            return written
+        entries = []
+        for item in raw:
+            try:
+                entries.append(json.loads(item))
+            except (TypeError, ValueError):
+                logger.error('Dropping malformed download log entry: %r', item)
+        rows = _build_rows(entries)
+        with transaction.atomic():
+            StudyMaterialDownloadLog.objects.bulk_create(rows, batch_size=batch_size)
+        queue.ltrim(QUEUE_KEY, len(raw), -1)
+        written += len(rows)
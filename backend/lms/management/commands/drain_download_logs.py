@@ -0,0 +1,28 @@
+"""Management command: drain_download_logs
+
+Writes queued study material download audit rows (`lms.download_logs`) to
+`StudyMaterialDownloadLog` with bulk inserts. Run every minute by
+deploy/systemd/download-logs.timer; do not run several at once.
+
+Usage:
+    python manage.py drain_download_logs
+    python manage.py drain_download_logs --batch-size 1000
+"""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from lms import download_logs
+
+
+class Command(BaseCommand):
+    help = 'Write queued study material download logs to the database in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per insert (default: 500)')
+
+    def handle(self, *args, **options):
+        written = download_logs.drain(batch_size=max(1, options['batch_size']))
+        if written:
+            self.stdout.write(f'Wrote {written} download log row(s)')
@@ -5,6 +5,9 @@ from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.db.models import Sum
+from django.utils import timezone
+
+from erp.file_serving import delete_if_unreferenced
 
 
 def _material_upload_path(instance, filename: str) -> str:
@@ -95,6 +98,8 @@ class StudyMaterial(models.Model):
     file = models.FileField(upload_to=_material_upload_path, null=True, blank=True)
     original_file_name = models.CharField(max_length=255, blank=True, default='')
     file_size_bytes = models.BigIntegerField(default=0)
+    # Identical uploads share one stored file; see erp.file_serving.
+    sha256 = models.CharField(max_length=64, blank=True, default='', db_index=True)
     external_url = models.URLField(blank=True)
     shared_courses = models.ManyToManyField(
         'academics.Course',
@@ -153,7 +158,7 @@ class StudyMaterial(models.Model):
         result = super().delete(*args, **kwargs)
         try:
             if stored_file:
-                stored_file.delete(save=False)
+                delete_if_unreferenced(stored_file, StudyMaterial)
         except Exception:
             pass
         return result
@@ -188,7 +193,8 @@ class StudyMaterialDownloadLog(models.Model):
     )
     client_ip = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
-    downloaded_at = models.DateTimeField(auto_now_add=True)
+    # Set by the caller (lms.download_logs) at the time of the download.
+    downloaded_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ('-downloaded_at',)
@@ -1,10 +1,15 @@
+import os
+
 from django.db.models import Sum
 from rest_framework import serializers
 
 from academics.models import TeachingAssignment
 from academics.utils import get_user_staff_profile
+from erp.file_serving import delete_if_unreferenced, store_content_addressed
 from lms.models import StaffStorageQuota, StudyMaterial, StudyMaterialDownloadLog
 
+MATERIAL_CONTENT_PREFIX = 'lms/study_materials/sha256'
+
 
 class StudyMaterialSerializer(serializers.ModelSerializer):
     uploaded_by_name = serializers.SerializerMethodField()
@@ -198,10 +203,20 @@ class StudyMaterialCreateSerializer(serializers.ModelSerializer):
         if not validated_data.get('co_title'):
             validated_data['co_title'] = str(validated_data.get('title') or '').strip()[:255]
 
+        upload = validated_data.get('file')
+        if validated_data.get('material_type') == StudyMaterial.TYPE_FILE and upload is not None:
+            validated_data['original_file_name'] = os.path.basename(str(upload.name or '')).strip()[:255]
+            validated_data['file'], validated_data['sha256'] = store_content_addressed(upload, MATERIAL_CONTENT_PREFIX)
+
         shared_ta_ids = request.data.get('shared_ta_ids')
         shared_course_ids = request.data.get('shared_course_ids')
         
-        obj = super().create(validated_data)
+        try:
+            obj = super().create(validated_data)
+        except Exception:
+            if validated_data.get('sha256'):
+                delete_if_unreferenced(StudyMaterial(file=validated_data['file']).file, StudyMaterial)
+            raise
         
         if shared_course_ids:
             c_ids = [int(x.strip()) for x in str(shared_course_ids).split(',') if x.strip().isdigit()]
@@ -1,10 +1,8 @@
 from collections import OrderedDict
 import os
-import mimetypes
 import re
 from urllib.parse import quote
 
-from django.http import FileResponse
 from django.core import signing
 from django.urls import reverse
 from django.db.models import Sum, Q
@@ -15,6 +13,8 @@ from rest_framework.views import APIView
 
 from academics.models import StudentCourseEnrollment
 from academics.utils import get_user_staff_profile
+from erp.file_serving import serve_file
+from lms import download_logs
 from lms.models import StaffStorageQuota, StudyMaterial, StudyMaterialDownloadLog
 from lms.permissions import get_hod_department_ids, is_hod_or_ahod_user, is_iqac_user
 from lms.serializers import (
@@ -906,13 +906,11 @@ class StudyMaterialDownloadView(APIView):
         if not _can_access_material(request.user, material):
             raise PermissionDenied('You do not have access to this material.')
 
-        StudyMaterialDownloadLog.objects.create(
-            material=material,
-            downloaded_by=request.user,
-            downloaded_by_staff=getattr(request.user, 'staff_profile', None),
-            downloaded_by_student=getattr(request.user, 'student_profile', None),
+        download_logs.record_download(
+            material,
+            request.user,
             client_ip=_get_client_ip(request),
-            user_agent=str(request.META.get('HTTP_USER_AGENT', '') or '')[:1000],
+            user_agent=request.META.get('HTTP_USER_AGENT', ''),
         )
 
         if material.material_type == StudyMaterial.TYPE_LINK:
@@ -927,14 +925,12 @@ class StudyMaterialDownloadView(APIView):
             return Response({'detail': 'Material file is missing.'}, status=status.HTTP_404_NOT_FOUND)
 
         inline = str(request.query_params.get('inline', '') or '').strip().lower() in {'1', 'true', 'yes'}
-        safe_name = _resolve_material_filename(material)
-        guessed_type, _ = mimetypes.guess_type(safe_name)
-        content_type = guessed_type or 'application/octet-stream'
-        return FileResponse(
-            material.file.open('rb'),
+        return serve_file(
+            request,
+            material.file,
+            _resolve_material_filename(material),
             as_attachment=not inline,
-            filename=safe_name,
-            content_type=content_type,
+            digest=material.sha256 or None,
         )
 
 
@@ -1011,25 +1007,21 @@ class StudyMaterialOfficePreviewFileView(APIView):
 
             user = get_user_model().objects.filter(pk=requested_by).first()
             if user:
-                StudyMaterialDownloadLog.objects.create(
-                    material=material,
-                    downloaded_by=user,
-                    downloaded_by_staff=getattr(user, 'staff_profile', None),
-                    downloaded_by_student=getattr(user, 'student_profile', None),
+                download_logs.record_download(
+                    material,
+                    user,
                     client_ip=_get_client_ip(request),
-                    user_agent=str(request.META.get('HTTP_USER_AGENT', '') or '')[:1000],
+                    user_agent=request.META.get('HTTP_USER_AGENT', ''),
                 )
         except Exception:
             pass
 
-        safe_name = _resolve_material_filename(material)
-        guessed_type, _ = mimetypes.guess_type(safe_name)
-        content_type = guessed_type or 'application/octet-stream'
-        return FileResponse(
-            material.file.open('rb'),
+        return serve_file(
+            request,
+            material.file,
+            _resolve_material_filename(material),
             as_attachment=False,
-            filename=safe_name,
-            content_type=content_type,
+            digest=material.sha256 or None,
         )
 
 
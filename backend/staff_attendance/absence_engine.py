@@ -0,0 +1,258 @@
+"""Batch re-evaluation of time-based absence for a date range.
+
+`AttendanceRecord.update_status()` resolves time limits with 3-5 queries per
+row and is followed by a `save()`. Re-running policy for a month after an HR
+settings change therefore costs tens of thousands of round trips. This engine:
+
+1. loads every limit source once (staff overrides, special date limits,
+   department settings, global settings) plus each staff member's current
+   department, and resolves limits from memory with the same priority order
+   as `update_status()`;
+2. loads only the columns it needs for the range as column arrays;
+3. runs the shared `status_rules.compute_attendance_statuses` over them;
+4. writes back only rows whose FN/AN/overall status changed, with `bulk_update`.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (
+    AttendanceRecord,
+    AttendanceSettings,
+    DepartmentAttendanceSettings,
+    SpecialDepartmentDateAttendanceLimit,
+    StaffAttendanceTimeLimitOverride,
+)
+from .status_rules import compute_attendance_statuses, needs_biometric_calc
+
+DEFAULT_IN_LIMIT = time(8, 45)
+DEFAULT_OUT_LIMIT = time(17, 0)
+DEFAULT_MID_SPLIT = time(13, 0)
+
+# Rows in these overall statuses are owned by other flows and never re-evaluated.
+SKIP_STATUSES = ('vacation',)
+
+
+@dataclass(frozen=True)
+class TimeLimits:
+    in_limit: time
+    out_limit: time
+    mid_split: time
+    apply_absence: bool
+
+    @classmethod
+    def from_config(cls, cfg) -> 'TimeLimits':
+        return cls(
+            in_limit=cfg.attendance_in_time_limit,
+            out_limit=cfg.attendance_out_time_limit,
+            mid_split=cfg.mid_time_split,
+            apply_absence=cfg.apply_time_based_absence,
+        )
+
+
+DEFAULT_LIMITS = TimeLimits(DEFAULT_IN_LIMIT, DEFAULT_OUT_LIMIT, DEFAULT_MID_SPLIT, True)
+
+
+def resolve_current_department_ids(user_ids: Iterable[int]) -> Dict[int, Optional[int]]:
+    """Batch equivalent of `StaffProfile.get_current_department()` keyed by user id."""
+    from academics.models import StaffDepartmentAssignment, StaffProfile
+
+    user_ids = list(user_ids)
+    departments: Dict[int, Optional[int]] = {}
+    for user_id, dept_id in StaffProfile.objects.filter(user_id__in=user_ids).values_list('user_id', 'department_id'):
+        departments[user_id] = dept_id
+
+    active = (
+        StaffDepartmentAssignment.objects.filter(staff__user_id__in=user_ids, end_date__isnull=True)
+        .order_by('staff__user_id', '-start_date')
+        .values_list('staff__user_id', 'department_id')
+    )
+    seen = set()
+    for user_id, dept_id in active:
+        if user_id in seen:
+            continue
+        seen.add(user_id)
+        if dept_id:
+            departments[user_id] = dept_id
+    return departments
+
+
+class PolicyResolver:
+    """In-memory time-limit resolution with `AttendanceRecord.update_status()` priority.
+
+    1) enabled staff override
+    2) special department date-range limit covering the date
+    3) first enabled DepartmentAttendanceSettings for the department
+    4) global AttendanceSettings
+    """
+
+    def __init__(self, user_ids: Iterable[int], date_from: date, date_to: date):
+        user_ids = list(user_ids)
+        global_cfg = AttendanceSettings.objects.first()
+        self.global_limits = TimeLimits.from_config(global_cfg) if global_cfg else DEFAULT_LIMITS
+
+        self.overrides: Dict[int, TimeLimits] = {
+            ov.user_id: TimeLimits.from_config(ov)
+            for ov in StaffAttendanceTimeLimitOverride.objects.filter(user_id__in=user_ids, enabled=True)
+        }
+
+        self.department_of = resolve_current_department_ids(user_ids)
+        dept_ids = {d for d in self.department_of.values() if d}
+
+        # Mirrors `.filter(departments=dept, enabled=True).first()` under Meta.ordering = ['name'].
+        self.department_limits: Dict[int, TimeLimits] = {}
+        dept_cfgs = (
+            DepartmentAttendanceSettings.objects.filter(enabled=True, departments__id__in=dept_ids)
+            .order_by('name', 'id')
+            .values_list('departments__id', 'attendance_in_time_limit', 'attendance_out_time_limit',
+                         'mid_time_split', 'apply_time_based_absence')
+        )
+        for dept_id, in_limit, out_limit, mid_split, apply_absence in dept_cfgs:
+            self.department_limits.setdefault(dept_id, TimeLimits(in_limit, out_limit, mid_split, apply_absence))
+
+        self.special_limits: Dict[int, List[Tuple[date, Optional[date], TimeLimits]]] = {}
+        specials = (
+            SpecialDepartmentDateAttendanceLimit.objects.filter(
+                enabled=True,
+                departments__id__in=dept_ids,
+                from_date__lte=date_to,
+            )
+            .order_by('-from_date', '-id')
+            .values_list('departments__id', 'from_date', 'to_date', 'attendance_in_time_limit',
+                         'attendance_out_time_limit', 'mid_time_split', 'apply_time_based_absence')
+        )
+        for dept_id, from_date, to_date, in_limit, out_limit, mid_split, apply_absence in specials:
+            if to_date is None and from_date < date_from:
+                continue
+            if to_date is not None and to_date < date_from:
+                continue
+            self.special_limits.setdefault(dept_id, []).append(
+                (from_date, to_date, TimeLimits(in_limit, out_limit, mid_split, apply_absence))
+            )
+
+        self._cache: Dict[Tuple[Optional[int], date], TimeLimits] = {}
+
+    def _department_limits_for(self, dept_id: Optional[int], target_date: date) -> TimeLimits:
+        key = (dept_id, target_date)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        limits = None
+        if dept_id:
+            for from_date, to_date, special in self.special_limits.get(dept_id, ()):
+                if from_date > target_date:
+                    continue
+                if (to_date is None and from_date == target_date) or (to_date is not None and to_date >= target_date):
+                    limits = special
+                    break
+            if limits is None:
+                limits = self.department_limits.get(dept_id)
+        if limits is None:
+            limits = self.global_limits
+
+        self._cache[key] = limits
+        return limits
+
+    def limits_for(self, user_id: int, target_date: date) -> TimeLimits:
+        override = self.overrides.get(user_id)
+        if override is not None:
+            return override
+        return self._department_limits_for(self.department_of.get(user_id), target_date)
+
+
+@dataclass(frozen=True)
+class StatusChange:
+    record_id: int
+    user_id: int
+    date: date
+    morning_in: Optional[time]
+    evening_out: Optional[time]
+    old: Tuple[Optional[str], Optional[str], str]
+    new: Tuple[Optional[str], Optional[str], str]
+
+
+@dataclass
+class RecalculationResult:
+    scanned: int = 0
+    evaluated: int = 0
+    changes: List[StatusChange] = field(default_factory=list)
+    written: int = 0
+
+    @property
+    def transitions(self) -> Counter:
+        return Counter((c.old[2], c.new[2]) for c in self.changes)
+
+    @property
+    def session_transitions(self) -> Counter:
+        counts: Counter = Counter()
+        for c in self.changes:
+            if c.old[0] != c.new[0]:
+                counts[('FN', c.old[0], c.new[0])] += 1
+            if c.old[1] != c.new[1]:
+                counts[('AN', c.old[1], c.new[1])] += 1
+        return counts
+
+
+def recalculate_time_based_absence(date_from: date, date_to: date, *, user_ids: Optional[Iterable[int]] = None,
+                                   dry_run: bool = False, batch_size: int = 1000) -> RecalculationResult:
+    """Re-apply time-based absence policy to every AttendanceRecord in [date_from, date_to]."""
+    qs = AttendanceRecord.objects.filter(date__gte=date_from, date__lte=date_to).exclude(status__in=SKIP_STATUSES)
+    if user_ids is not None:
+        qs = qs.filter(user_id__in=list(user_ids))
+
+    rows = list(qs.order_by().values_list(
+        'id', 'user_id', 'date', 'morning_in', 'evening_out', 'fn_status', 'an_status', 'status',
+    ))
+    result = RecalculationResult(scanned=len(rows))
+    if not rows:
+        return result
+
+    ids, users, dates, ins, outs, fns, ans, statuses = (list(col) for col in zip(*rows))
+    resolver = PolicyResolver(set(users), date_from, date_to)
+    today = timezone.localdate()
+
+    for i in range(len(ids)):
+        morning_in, evening_out, fn_status, an_status = ins[i], outs[i], fns[i], ans[i]
+        has_biometric = morning_in is not None or evening_out is not None
+        if not (needs_biometric_calc(fn_status, has_biometric) or needs_biometric_calc(an_status, has_biometric)):
+            # Leave-only rows: nothing biometric to recompute.
+            continue
+
+        result.evaluated += 1
+        limits = resolver.limits_for(users[i], dates[i])
+        new = compute_attendance_statuses(
+            morning_in,
+            evening_out,
+            fn_status,
+            an_status,
+            in_limit=limits.in_limit,
+            out_limit=limits.out_limit,
+            mid_split=limits.mid_split,
+            apply_absence=limits.apply_absence,
+            # Today's rows are still receiving realtime punches; match the ingest path.
+            defer_an_until_out=dates[i] == today and bool(morning_in and not evening_out),
+        )
+        old = (fn_status, an_status, statuses[i])
+        if new != old:
+            result.changes.append(StatusChange(ids[i], users[i], dates[i], morning_in, evening_out, old, new))
+
+    if dry_run or not result.changes:
+        return result
+
+    objs = [
+        AttendanceRecord(id=c.record_id, fn_status=c.new[0], an_status=c.new[1], status=c.new[2])
+        for c in result.changes
+    ]
+    with transaction.atomic():
+        AttendanceRecord.objects.bulk_update(objs, ['fn_status', 'an_status', 'status'], batch_size=batch_size)
+    result.written = len(objs)
+    return result
+
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import AttendanceRecord, UploadLog, Holiday, AttendanceSettings, DepartmentAttendanceSettings
+from .models import AttendanceRecord, UploadLog, Holiday, AttendanceSettings, DepartmentAttendanceSettings, EsslDevice
 
 
 @admin.register(AttendanceRecord)
@@ -113,6 +113,32 @@ class DepartmentAttendanceSettingsAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 
+@admin.register(EsslDevice)
+class EsslDeviceAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'enabled', 'status', 'last_punch_time', 'last_seen_at', 'ingest_lag_seconds', 'reconnect_count']
+    list_filter = ['enabled', 'status']
+    search_fields = ['name', 'ip_address']
+    readonly_fields = ['status', 'last_connected_at', 'last_seen_at', 'last_error', 'reconnect_count', 'ingest_lag_seconds', 'created_at', 'updated_at']
+
+    fieldsets = (
+        ('Device', {
+            'fields': ('name', 'ip_address', 'port', 'password', 'connect_timeout', 'enabled')
+        }),
+        ('Sync State', {
+            'fields': ('last_punch_time', 'status', 'last_connected_at', 'last_seen_at', 'ingest_lag_seconds', 'reconnect_count', 'last_error'),
+            'description': (
+                'Maintained by the sync_essl_devices supervisor, which overwrites last_punch_time from memory '
+                'while it runs. To replay punches, stop the supervisor, then clear last_punch_time (replays '
+                'the last --initial-catchup-hours) or set it to the time to replay from, and start it again.'
+            )
+        }),
+        ('Audit', {
+            'fields': ('created_at', 'updated_at'),
+            'classes': ('collapse',)
+        }),
+    )
+
+
 # Register any remaining staff_attendance models without explicit admin classes above.
 from django.apps import apps as django_apps
 from django.contrib.admin.sites import AlreadyRegistered
@@ -0,0 +1,473 @@
+"""Multi-device eSSL/ZKTeco sync supervisor.
+
+One process manages every enabled `EsslDevice`:
+
+- one lightweight thread per device does only network I/O (connect, catch-up
+  via `get_attendance()`, `live_capture()`), reconnecting with exponential
+  backoff when the device drops off the network;
+- punches from all devices go into a small, fixed pool of ingest threads that
+  own the DB connections (so N devices never means N connections). Punches are
+  sharded by staff key, which keeps each staff member's punches in order;
+- per-device health (state, lag, reconnects, high-water mark) is kept in memory
+  and written back to `EsslDevice` by the supervisor loop. A device's punches
+  are spread over several shards, so its high-water mark only advances to just
+  before the oldest punch still queued or being saved by any shard.
+
+Used by `python manage.py sync_essl_devices`.
+"""
+
+from __future__ import annotations
+
+import queue
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from .biometric import ingest_biometric_punch, parse_punch_time
+from .models import EsslDevice
+
+SOURCE = 'essl_realtime_device'
+
+
+@dataclass(frozen=True)
+class DeviceConfig:
+    key: str
+    ip: str
+    port: int
+    password: int = 0
+    timeout: int = 8
+    name: str = ''
+    device_id: Optional[int] = None
+    last_punch_time: Optional[datetime] = None
+
+    @classmethod
+    def from_model(cls, device: EsslDevice) -> 'DeviceConfig':
+        return cls(
+            key=f'{device.ip_address}:{device.port}',
+            ip=device.ip_address,
+            port=device.port,
+            password=device.password,
+            timeout=device.connect_timeout,
+            name=device.name,
+            device_id=device.id,
+            last_punch_time=device.last_punch_time,
+        )
+
+
+@dataclass
+class DeviceHealth:
+    status: str = EsslDevice.Status.UNKNOWN
+    connected_since: Optional[datetime] = None
+    last_seen_at: Optional[datetime] = None
+    last_punch_time: Optional[datetime] = None
+    last_error: str = ''
+    reconnects: int = 0
+    consecutive_failures: int = 0
+    punches_received: int = 0
+    punches_ingested: int = 0
+    caught_up: int = 0
+    last_lag_seconds: Optional[float] = None
+    max_lag_seconds: float = 0.0
+    # Punch times submitted to the ingest pool and not saved yet (a multiset: one
+    # device can report several punches with the same timestamp).
+    in_flight: Counter = field(default_factory=Counter, repr=False)
+    newest_ingested: Optional[datetime] = None
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def track_submitted(self, punch_time: datetime):
+        with self.lock:
+            self.in_flight[punch_time] += 1
+
+    def advance_high_water_mark(self, punch_time: datetime, lag_seconds: float):
+        with self.lock:
+            self.punches_ingested += 1
+            self.last_lag_seconds = lag_seconds
+            self.max_lag_seconds = max(self.max_lag_seconds, lag_seconds)
+            self.in_flight[punch_time] -= 1
+            if self.in_flight[punch_time] <= 0:
+                del self.in_flight[punch_time]
+            if self.newest_ingested is None or punch_time > self.newest_ingested:
+                self.newest_ingested = punch_time
+
+            # Another shard may still be saving an older punch of this device; stop
+            # just short of it so a restart's catch-up (punch_time > HWM) replays it.
+            # Replayed punches that were already saved are ignored by the ingest.
+            candidate = self.newest_ingested
+            if self.in_flight:
+                candidate = min(candidate, min(self.in_flight) - timedelta(microseconds=1))
+            if self.last_punch_time is None or candidate > self.last_punch_time:
+                self.last_punch_time = candidate
+
+
+@dataclass(frozen=True)
+class PunchEvent:
+    device: DeviceConfig
+    raw_uid: str
+    raw_staff_id: str
+    raw_direction: str
+    punch_time: datetime
+    received_at: float
+    payload: dict
+
+
+def _event_from_attendance(device: DeviceConfig, attendance) -> Optional[PunchEvent]:
+    raw_timestamp = getattr(attendance, 'timestamp', None)
+    punch_time = parse_punch_time(raw_timestamp) if raw_timestamp else None
+    if punch_time is None:
+        punch_time = timezone.localtime(timezone.now())
+
+    punch_value = getattr(attendance, 'punch', None)
+    raw_uid = str(getattr(attendance, 'uid', '') or '')
+    raw_staff_id = str(getattr(attendance, 'user_id', '') or '')
+    return PunchEvent(
+        device=device,
+        raw_uid=raw_uid,
+        raw_staff_id=raw_staff_id,
+        # ZKTeco punch state commonly uses 0=IN, 1=OUT; biometric.normalize_direction maps '0'/'1'.
+        raw_direction='' if punch_value is None else str(punch_value),
+        punch_time=punch_time,
+        received_at=time.monotonic(),
+        payload={
+            'uid': raw_uid,
+            'user_id': raw_staff_id,
+            'punch': punch_value,
+            'timestamp': str(raw_timestamp),
+        },
+    )
+
+
+class IngestPool:
+    """Fixed set of DB writer threads shared by every device worker."""
+
+    def __init__(self, size: int, health: Dict[str, DeviceHealth], log: Callable[[str], None],
+                 stop_event: threading.Event, max_retry_delay: float = 30.0):
+        self.size = max(1, int(size))
+        self.health = health
+        self.log = log
+        self.stop_event = stop_event
+        self.max_retry_delay = max_retry_delay
+        self.queues: List[queue.Queue] = [queue.Queue() for _ in range(self.size)]
+        self.threads: List[threading.Thread] = []
+
+    def start(self):
+        for idx, shard in enumerate(self.queues):
+            thread = threading.Thread(target=self._run, args=(shard,), name=f'essl-ingest-{idx}', daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, event: PunchEvent):
+        health = self.health.get(event.device.key)
+        if health is not None:
+            health.track_submitted(event.punch_time)
+        shard_key = (event.raw_staff_id or event.raw_uid or '').encode('utf-8')
+        self.queues[zlib.crc32(shard_key) % self.size].put(event)
+
+    def depth(self) -> int:
+        return sum(q.qsize() for q in self.queues)
+
+    def shutdown(self, timeout: float = 10.0):
+        for shard in self.queues:
+            shard.put(None)
+        for thread in self.threads:
+            thread.join(timeout=timeout)
+
+    def _run(self, shard: queue.Queue):
+        try:
+            while True:
+                event = shard.get()
+                if event is None:
+                    return
+                self._ingest_with_retry(event)
+        finally:
+            connection.close()
+
+    def _ingest_with_retry(self, event: PunchEvent):
+        # A punch is never dropped on DB errors: the shard blocks and retries with
+        # backoff. Until it is saved it stays in the device's in-flight set, which
+        # holds the high-water mark below it even while other shards move on.
+        attempt = 0
+        while True:
+            try:
+                result = ingest_biometric_punch(
+                    raw_uid=event.raw_uid,
+                    raw_staff_id=event.raw_staff_id,
+                    raw_direction=event.raw_direction,
+                    raw_timestamp=event.punch_time,
+                    source=SOURCE,
+                    device_ip=event.device.ip,
+                    device_port=event.device.port,
+                    payload=event.payload,
+                )
+                break
+            except Exception as exc:
+                attempt += 1
+                close_old_connections()
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+                delay = min(self.max_retry_delay, 2 ** min(attempt, 6) * 0.5)
+                self.log(f'[{event.device.key}] DB ingest failed ({exc}); retry #{attempt} in {delay:.1f}s')
+                if self.stop_event.wait(delay) and attempt >= 3:
+                    # Left in flight: the persisted high-water mark stays below it.
+                    self.log(f'[{event.device.key}] giving up on punch {event.punch_time.isoformat()} during shutdown')
+                    return
+
+        health = self.health.get(event.device.key)
+        if health is not None:
+            health.advance_high_water_mark(event.punch_time, time.monotonic() - event.received_at)
+
+        if result.get('created_log'):
+            staff_label = event.raw_staff_id or event.raw_uid or 'UNKNOWN'
+            mapped = 'mapped' if result['user'] else 'unmapped'
+            display_direction = result.get('effective_direction') or result['direction']
+            self.log(f"[{event.device.key}] [{result['punch_time'].isoformat()}] {staff_label} {display_direction} ({mapped})")
+
+
+class DeviceWorker(threading.Thread):
+    """Network-only worker for a single device: connect, catch up, live capture, back off."""
+
+    def __init__(self, device: DeviceConfig, health: DeviceHealth, pool: IngestPool, log: Callable[[str], None], *,
+                 base_delay: float = 2.0, max_delay: float = 300.0, initial_catchup: timedelta = timedelta(hours=24)):
+        super().__init__(name=f'essl-device-{device.key}', daemon=True)
+        self.device = device
+        self.health = health
+        self.pool = pool
+        self.log = log
+        self.base_delay = max(0.5, float(base_delay))
+        self.max_delay = max(self.base_delay, float(max_delay))
+        self.initial_catchup = initial_catchup
+        self.stop_event = threading.Event()
+        self._conn = None
+
+    def stop(self):
+        self.stop_event.set()
+        conn = self._conn
+        if conn is not None:
+            # pyzk checks this flag between live_capture polls.
+            conn.end_live_capture = True
+
+    def _set_status(self, status: str, error: str = ''):
+        with self.health.lock:
+            self.health.status = status
+            if error:
+                self.health.last_error = error
+
+    def _backoff_delay(self) -> float:
+        failures = self.health.consecutive_failures
+        delay = min(self.max_delay, self.base_delay * (2 ** max(0, failures - 1)))
+        return delay * random.uniform(0.8, 1.2)
+
+    def _catch_up(self, conn):
+        with self.health.lock:
+            high_water_mark = self.health.last_punch_time
+        if high_water_mark is None:
+            high_water_mark = timezone.localtime(timezone.now()) - self.initial_catchup
+
+        self._set_status(EsslDevice.Status.CATCHING_UP)
+        replayed = 0
+        for attendance in conn.get_attendance() or []:
+            event = _event_from_attendance(self.device, attendance)
+            if event is None or event.punch_time <= high_water_mark:
+                continue
+            self.pool.submit(event)
+            replayed += 1
+
+        with self.health.lock:
+            self.health.caught_up += replayed
+            self.health.punches_received += replayed
+        if replayed:
+            self.log(f'[{self.device.key}] catch-up queued {replayed} punch(es) newer than {high_water_mark.isoformat()}')
+
+    def run(self):
+        from zk import ZK  # type: ignore
+
+        while not self.stop_event.is_set():
+            conn = None
+            try:
+                zk = ZK(self.device.ip, port=self.device.port, timeout=self.device.timeout,
+                        password=self.device.password, force_udp=False, ommit_ping=False)
+                conn = zk.connect()
+                self._conn = conn
+                now = timezone.now()
+                with self.health.lock:
+                    if self.health.connected_since is not None or self.health.consecutive_failures:
+                        self.health.reconnects += 1
+                    self.health.connected_since = now
+                    self.health.last_seen_at = now
+                    self.health.consecutive_failures = 0
+                    self.health.last_error = ''
+                self.log(f'[{self.device.key}] connected')
+
+                conn.disable_device()
+                try:
+                    self._catch_up(conn)
+                finally:
+                    conn.enable_device()
+
+                self._set_status(EsslDevice.Status.ONLINE)
+                for attendance in conn.live_capture(new_timeout=10):
+                    with self.health.lock:
+                        self.health.last_seen_at = timezone.now()
+                    if self.stop_event.is_set():
+                        break
+                    if attendance is None:
+                        continue
+                    event = _event_from_attendance(self.device, attendance)
+                    if event is None:
+                        continue
+                    with self.health.lock:
+                        self.health.punches_received += 1
+                    self.pool.submit(event)
+
+            except Exception as exc:
+                with self.health.lock:
+                    self.health.consecutive_failures += 1
+                    self.health.connected_since = None
+                self._set_status(EsslDevice.Status.OFFLINE, error=str(exc)[:500])
+                delay = self._backoff_delay()
+                self.log(f'[{self.device.key}] device error: {exc}; reconnecting in {delay:.1f}s')
+                self.stop_event.wait(delay)
+            finally:
+                self._conn = None
+                if conn is not None:
+                    try:
+                        conn.disconnect()
+                    except Exception:
+                        pass
+
+        self._set_status(EsslDevice.Status.OFFLINE)
+
+
+class EsslSupervisor:
+    """Owns the ingest pool and device workers; reconciles them with the `EsslDevice` table."""
+
+    def __init__(self, *, extra_devices: List[DeviceConfig], log: Callable[[str], None], db_workers: int = 2,
+                 base_delay: float = 2.0, max_delay: float = 300.0, initial_catchup: timedelta = timedelta(hours=24),
+                 use_device_table: bool = True):
+        self.extra_devices = extra_devices
+        self.log = log
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.initial_catchup = initial_catchup
+        self.use_device_table = use_device_table
+        self.stop_event = threading.Event()
+        self.health: Dict[str, DeviceHealth] = {}
+        self.workers: Dict[str, DeviceWorker] = {}
+        self.pool = IngestPool(db_workers, self.health, log, self.stop_event)
+
+    def _load_devices(self) -> List[DeviceConfig]:
+        devices: Dict[str, DeviceConfig] = {}
+        if self.use_device_table:
+            for device in EsslDevice.objects.filter(enabled=True):
+                cfg = DeviceConfig.from_model(device)
+                devices[cfg.key] = cfg
+        for cfg in self.extra_devices:
+            devices.setdefault(cfg.key, cfg)
+        return list(devices.values())
+
+    def reconcile(self):
+        wanted = {cfg.key: cfg for cfg in self._load_devices()}
+
+        for key in list(self.workers):
+            if key not in wanted:
+                self.log(f'[{key}] disabled; stopping worker')
+                self.workers.pop(key).stop()
+
+        for key, cfg in wanted.items():
+            worker = self.workers.get(key)
+            if worker is not None and worker.is_alive():
+                continue
+            health = self.health.get(key)
+            if health is None:
+                health = DeviceHealth(last_punch_time=cfg.last_punch_time)
+                self.health[key] = health
+            worker = DeviceWorker(cfg, health, self.pool, self.log, base_delay=self.base_delay,
+                                  max_delay=self.max_delay, initial_catchup=self.initial_catchup)
+            self.workers[key] = worker
+            worker.start()
+
+    def persist_health(self):
+        for key, worker in self.workers.items():
+            device_id = worker.device.device_id
+            if device_id is None:
+                continue
+            health = self.health[key]
+            with health.lock:
+                updates = {
+                    'status': health.status,
+                    'last_seen_at': health.last_seen_at,
+                    'last_error': health.last_error,
+                    'reconnect_count': health.reconnects,
+                    'ingest_lag_seconds': health.last_lag_seconds,
+                    'updated_at': timezone.now(),
+                }
+                if health.connected_since is not None:
+                    updates['last_connected_at'] = health.connected_since
+                if health.last_punch_time is not None:
+                    updates['last_punch_time'] = health.last_punch_time
+            EsslDevice.objects.filter(pk=device_id).update(**updates)
+
+    def status_lines(self) -> List[str]:
+        lines = [f'ingest queue depth={self.pool.depth()} devices={len(self.workers)}']
+        for key in sorted(self.workers):
+            health = self.health[key]
+            with health.lock:
+                lag = '-' if health.last_lag_seconds is None else f'{health.last_lag_seconds:.2f}s'
+                hwm = health.last_punch_time.isoformat() if health.last_punch_time else '-'
+                lines.append(
+                    f'  {key}: {health.status} received={health.punches_received} ingested={health.punches_ingested} '
+                    f'caught_up={health.caught_up} lag={lag} max_lag={health.max_lag_seconds:.2f}s '
+                    f'reconnects={health.reconnects} hwm={hwm}'
+                )
+        return lines
+
+    def run(self, *, status_interval: float = 60.0, refresh_interval: float = 120.0):
+        self.pool.start()
+        self.reconcile()
+        if not self.workers:
+            self.log('No enabled eSSL devices configured.')
+
+        next_status = time.monotonic() + status_interval
+        next_refresh = time.monotonic() + refresh_interval
+        try:
+            while not self.stop_event.wait(1.0):
+                now = time.monotonic()
+                if now >= next_status:
+                    next_status = now + status_interval
+                    try:
+                        self.persist_health()
+                    except Exception as exc:
+                        close_old_connections()
+                        self.log(f'Failed to persist device health: {exc}')
+                    for line in self.status_lines():
+                        self.log(line)
+                if now >= next_refresh:
+                    next_refresh = now + refresh_interval
+                    try:
+                        self.reconcile()
+                    except Exception as exc:
+                        close_old_connections()
+                        self.log(f'Failed to refresh device list: {exc}')
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        self.stop_event.set()
+        for worker in self.workers.values():
+            worker.stop()
+        for worker in self.workers.values():
+            worker.join(timeout=15)
+        self.pool.shutdown()
+        try:
+            self.persist_health()
+        except Exception:
+            pass
@@ -0,0 +1,118 @@
+"""
+Batch re-evaluate FN/AN/overall attendance status for a date range after a
+time-limit settings change (global, department, special date or staff override).
+
+Unlike `apply_time_based_absence`, limits are resolved from memory and only
+changed rows are written (single bulk_update), so a full month runs in seconds.
+
+Usage:
+    python manage.py recalculate_attendance_status --date-from 2026-03-01 --date-to 2026-03-31 --dry-run
+    python manage.py recalculate_attendance_status --month 2026-03
+    python manage.py recalculate_attendance_status --month 2026-03 --staff-id 3171022 --csv /tmp/diff.csv
+"""
+
+import csv
+from calendar import monthrange
+from datetime import date, datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+from staff_attendance.absence_engine import recalculate_time_based_absence
+
+
+class Command(BaseCommand):
+    help = 'Batch re-apply time-based absence policy to attendance records and report the exact diff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date-from', type=str, help='Start date (YYYY-MM-DD)')
+        parser.add_argument('--date-to', type=str, help='End date (YYYY-MM-DD)')
+        parser.add_argument('--month', type=str, help='Whole month (YYYY-MM); alternative to --date-from/--date-to')
+        parser.add_argument('--staff-id', type=str, help='Apply only to specific staff ID (staff_id field)')
+        parser.add_argument('--dry-run', action='store_true', help='Compute and report the diff without writing')
+        parser.add_argument('--csv', type=str, help='Write the row-level diff to this CSV path')
+        parser.add_argument('--show', type=int, default=20, help='Number of changed rows to print (0 for none)')
+
+    def _parse_date(self, value, label):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            raise CommandError(f'Invalid {label} format. Use YYYY-MM-DD')
+
+    def _resolve_range(self, options):
+        if options['month']:
+            try:
+                year, month = (int(part) for part in options['month'].split('-', 1))
+                return date(year, month, 1), date(year, month, monthrange(year, month)[1])
+            except ValueError:
+                raise CommandError('Invalid --month format. Use YYYY-MM')
+        if not options['date_from'] or not options['date_to']:
+            raise CommandError('Provide --month or both --date-from and --date-to')
+        date_from = self._parse_date(options['date_from'], 'date-from')
+        date_to = self._parse_date(options['date_to'], 'date-to')
+        if date_to < date_from:
+            raise CommandError('--date-to must be on or after --date-from')
+        return date_from, date_to
+
+    def handle(self, *args, **options):
+        date_from, date_to = self._resolve_range(options)
+
+        user_ids = None
+        if options['staff_id']:
+            user = User.objects.filter(staff_profile__staff_id=options['staff_id']).first()
+            if not user:
+                raise CommandError(f"Staff with ID {options['staff_id']} not found")
+            user_ids = [user.id]
+            self.stdout.write(f"Filtering for staff: {user.username} (ID: {options['staff_id']})")
+
+        result = recalculate_time_based_absence(date_from, date_to, user_ids=user_ids, dry_run=options['dry_run'])
+
+        self.stdout.write(f'Range: {date_from} to {date_to}')
+        self.stdout.write(f'Scanned {result.scanned} records, evaluated {result.evaluated}, changed {len(result.changes)}')
+
+        if result.changes:
+            self.stdout.write('\nOverall status transitions:')
+            for (old, new), count in sorted(result.transitions.items(), key=lambda item: -item[1]):
+                self.stdout.write(f'  {old} → {new}: {count}')
+            self.stdout.write('Session transitions:')
+            for (session, old, new), count in sorted(result.session_transitions.items(), key=lambda item: -item[1]):
+                self.stdout.write(f'  {session} {old} → {new}: {count}')
+
+        if result.changes and (options['csv'] or options['show']):
+            usernames = dict(
+                User.objects.filter(id__in={c.user_id for c in result.changes}).values_list('id', 'username')
+            )
+        else:
+            usernames = {}
+
+        if options['show'] and result.changes:
+            self.stdout.write(f"\nFirst {min(options['show'], len(result.changes))} changed rows:")
+            for change in result.changes[:options['show']]:
+                self.stdout.write(
+                    f"  {usernames.get(change.user_id, change.user_id)} {change.date} "
+                    f"In={change.morning_in} Out={change.evening_out} "
+                    f"FN {change.old[0]} → {change.new[0]}, AN {change.old[1]} → {change.new[1]}, "
+                    f"status {change.old[2]} → {change.new[2]}"
+                )
+
+        if options['csv']:
+            with open(options['csv'], 'w', newline='', encoding='utf-8') as fh:
+                writer = csv.writer(fh)
+                writer.writerow([
+                    'record_id', 'username', 'date', 'morning_in', 'evening_out',
+                    'old_fn_status', 'new_fn_status', 'old_an_status', 'new_an_status', 'old_status', 'new_status',
+                ])
+                for change in result.changes:
+                    writer.writerow([
+                        change.record_id, usernames.get(change.user_id, change.user_id), change.date,
+                        change.morning_in or '', change.evening_out or '',
+                        change.old[0] or '', change.new[0] or '', change.old[1] or '', change.new[1] or '',
+                        change.old[2], change.new[2],
+                    ])
+            self.stdout.write(f"Diff written to {options['csv']}")
+
+        self.stdout.write('')
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'DRY RUN: would update {len(result.changes)} records'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Updated {result.written} records'))
@@ -0,0 +1,79 @@
+"""
+Supervise realtime sync for every eSSL biometric device from one process.
+
+Devices come from the EsslDevice table (enabled rows) plus any --device flags.
+Replaces running one `sync_essl_realtime` process per device.
+
+Examples:
+  python manage.py sync_essl_devices
+  python manage.py sync_essl_devices --device 192.168.81.80:4370 --device 192.168.81.81
+  python manage.py sync_essl_devices --db-workers 3 --status-interval 30
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from staff_attendance.essl_supervisor import DeviceConfig, EsslSupervisor
+
+
+class Command(BaseCommand):
+    help = 'Continuously sync realtime punches from all configured eSSL/ZKTeco devices using one supervisor process'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--device', action='append', default=[], help='Extra device as IP or IP:PORT (repeatable)')
+        parser.add_argument('--no-device-table', action='store_true', help='Ignore EsslDevice rows; only use --device flags')
+        parser.add_argument('--password', type=int, default=getattr(settings, 'ESSL_DEVICE_PASSWORD', 0), help='Comm key for --device entries')
+        parser.add_argument('--timeout', type=int, default=getattr(settings, 'ESSL_CONNECT_TIMEOUT', 8), help='Connection timeout for --device entries')
+        parser.add_argument('--db-workers', type=int, default=2, help='Number of DB ingest threads shared by all devices')
+        parser.add_argument('--reconnect-delay', type=float, default=getattr(settings, 'ESSL_RECONNECT_DELAY', 5), help='Initial reconnect backoff in seconds')
+        parser.add_argument('--max-reconnect-delay', type=float, default=300, help='Upper bound for exponential reconnect backoff')
+        parser.add_argument('--initial-catchup-hours', type=int, default=24, help='Catch-up window for devices without a high-water mark')
+        parser.add_argument('--status-interval', type=float, default=60, help='Seconds between health reports / EsslDevice status writes')
+        parser.add_argument('--refresh-interval', type=float, default=120, help='Seconds between re-reading the EsslDevice table')
+
+    def _parse_device(self, raw: str, password: int, timeout: int) -> DeviceConfig:
+        value = (raw or '').strip()
+        if not value:
+            raise CommandError('Empty --device value')
+        ip, _, port_part = value.partition(':')
+        try:
+            port = int(port_part) if port_part else int(getattr(settings, 'ESSL_DEVICE_PORT', 4370))
+        except ValueError:
+            raise CommandError(f'Invalid port in --device {raw!r}')
+        return DeviceConfig(key=f'{ip}:{port}', ip=ip, port=port, password=password, timeout=timeout)
+
+    def handle(self, *args, **options):
+        try:
+            import zk  # type: ignore  # noqa: F401
+        except ImportError:
+            self.stdout.write(self.style.ERROR('Missing dependency: pyzk. Install with: pip install pyzk'))
+            return
+
+        extra_devices = [
+            self._parse_device(raw, options['password'], options['timeout'])
+            for raw in options['device']
+        ]
+
+        def log(message: str):
+            self.stdout.write(message)
+            self.stdout.flush()
+
+        supervisor = EsslSupervisor(
+            extra_devices=extra_devices,
+            log=log,
+            db_workers=options['db_workers'],
+            base_delay=options['reconnect_delay'],
+            max_delay=options['max_reconnect_delay'],
+            initial_catchup=timedelta(hours=max(0, options['initial_catchup_hours'])),
+            use_device_table=not options['no_device_table'],
+        )
+
+        self.stdout.write(self.style.SUCCESS('Starting eSSL device supervisor (Ctrl+C to stop)'))
+        try:
+            supervisor.run(status_interval=options['status_interval'], refresh_interval=options['refresh_interval'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Stopping eSSL supervisor on user interrupt.'))
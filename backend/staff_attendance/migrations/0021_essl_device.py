@@ -0,0 +1,44 @@
+# Generated by Django 4.2.28 on 2026-10-18 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('staff_attendance', '0020_rename_staff_biome_user_id_16fc4d_idx_staff_biome_user_id_04f2e6_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EsslDevice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(blank=True, default='', max_length=100)),
+                ('ip_address', models.GenericIPAddressField()),
+                ('port', models.PositiveIntegerField(default=4370)),
+                ('password', models.PositiveIntegerField(default=0, help_text='Device comm key/password')),
+                ('connect_timeout', models.PositiveIntegerField(default=8, help_text='Connection timeout in seconds')),
+                ('enabled', models.BooleanField(default=True)),
+                ('last_punch_time', models.DateTimeField(blank=True, help_text='Latest punch timestamp ingested from this device (catch-up high-water mark)', null=True)),
+                ('status', models.CharField(choices=[('UNKNOWN', 'Unknown'), ('ONLINE', 'Online'), ('CATCHING_UP', 'Catching up'), ('OFFLINE', 'Offline')], default='UNKNOWN', max_length=20)),
+                ('last_connected_at', models.DateTimeField(blank=True, null=True)),
+                ('last_seen_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('reconnect_count', models.PositiveIntegerField(default=0)),
+                ('ingest_lag_seconds', models.FloatField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'eSSL Device',
+                'verbose_name_plural': 'eSSL Devices',
+                'db_table': 'staff_essl_device',
+                'ordering': ['ip_address', 'port'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='essldevice',
+            constraint=models.UniqueConstraint(fields=('ip_address', 'port'), name='unique_staff_essl_device_endpoint'),
+        ),
+    ]
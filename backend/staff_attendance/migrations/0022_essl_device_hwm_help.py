@@ -0,0 +1,18 @@
+# Generated by Django 4.2.28 on 2026-10-19 01:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('staff_attendance', '0021_essl_device'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='essldevice',
+            name='last_punch_time',
+            field=models.DateTimeField(blank=True, help_text='Catch-up high-water mark: every punch from this device up to this time has been ingested', null=True),
+        ),
+    ]
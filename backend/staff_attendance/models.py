@@ -3,6 +3,8 @@ from django.conf import settings
 from django.utils import timezone
 from django.db.models import Q
 
+from .status_rules import BIOMETRIC_STATUSES, combine_overall_status, compute_attendance_statuses
+
 
 class AttendanceRecord(models.Model):
     """Records daily attendance for staff members"""
@@ -61,19 +63,8 @@ class AttendanceRecord(models.Model):
         2. Global AttendanceSettings
         3. Defaults (08:45, 17:00, 13:00)
         """
-        # Define statuses that can be auto-updated from biometric data
-        BIOMETRIC_STATUSES = ['present', 'absent', 'partial', 'half_day']
-
-        has_biometric = self.morning_in is not None or self.evening_out is not None
-
-        # A session status should be recalculated if:
-        #  (a) it's already a biometric status (present/absent/partial/half_day), OR
-        #  (b) it's None but we have biometric scan data — meaning it was never set
-        #      and needs to be derived from the time data now.
-        # In both cases we must NOT touch a leave status (CL, OD, COL, etc.).
-        def _needs_biometric_calc(session_status):
-            return session_status in BIOMETRIC_STATUSES or (session_status is None and has_biometric)
-        
+        # Session rules live in status_rules so the batch re-evaluation engine
+        # applies exactly the same policy; this method only resolves the limits.
         try:
             # Get time limits with fallback order: staff override -> special date -> department -> global
             in_limit = '08:45:00'
@@ -150,120 +141,18 @@ class AttendanceRecord(models.Model):
                     mid_split = global_settings.mid_time_split
                     apply_absence = global_settings.apply_time_based_absence
             
-            if apply_absence:
-
-                fn_no_record_mode = in_limit == mid_split
-                an_no_record_mode = out_limit == mid_split
-
-                if _needs_biometric_calc(self.fn_status):
-                    if fn_no_record_mode:
-                        # When IN limit equals noon split, FN should be treated as no-record.
-                        self.fn_status = None
-                    else:
-                        if self.morning_in:
-                            # FN presence requires (1) not late by the IN limit and
-                            # (2) when an OUT time exists, the staff must have stayed
-                            # past the noon split time.
-                            #
-                            # This fixes cases like: In 08:18, Out 10:58, noon 13:00
-                            # where FN should be ABSENT (did not cross noon).
-                            if self.morning_in > in_limit:
-                                self.fn_status = 'absent'
-                            elif self.morning_in > mid_split:
-                                # Arrived after noon, cannot be FN present.
-                                self.fn_status = 'absent'
-                            elif self.evening_out is not None:
-                                # With an explicit OUT, FN is present only if OUT crosses noon.
-                                self.fn_status = 'present' if self.evening_out >= mid_split else 'absent'
-                            else:
-                                # Realtime stream often has IN first; keep FN present
-                                # until an OUT punch confirms early exit.
-                                self.fn_status = 'present'
-                        else:
-                            # No morning_in time - FN absent
-                            self.fn_status = 'absent'
-                # else: Preserve leave status (CL, OD, ML, COL, etc.)
-                
-                # === Calculate AN status ===
-                if _needs_biometric_calc(self.an_status):
-                    if an_no_record_mode:
-                        # When OUT limit equals noon split, AN should be treated as no-record.
-                        self.an_status = None
-                    elif self.morning_in and self.evening_out:
-                        # Has both in and out times
-                        # AN is absent if:
-                        # 1. Came after mid_split (came after 1 PM - missed forenoon and morning)
-                        # 2. OR left before out_limit (left early from afternoon session)
-                        if self.morning_in > mid_split:
-                            # Came after 1 PM - didn't attend morning/FN, so likely didn't attend full AN either
-                            self.an_status = 'absent'
-                        elif self.evening_out < out_limit:
-                            # Left before required out time - didn't complete AN session
-                            self.an_status = 'absent'
-                        else:
-                            # Came before/at 1 PM and left after required time - AN present
-                            self.an_status = 'present'
-                    elif self.morning_in:
-                        # Has morning_in but no evening_out - probably partial day
-                        if self.morning_in <= mid_split:
-                            # Realtime biometric flow can defer AN decision until
-                            # a valid OUT punch is captured.
-                            if defer_an_until_out:
-                                self.an_status = None
-                            else:
-                                self.an_status = 'absent'  # Has FN but no AN
-                        else:
-                            # Came after mid_split - no proper attendance
-                            self.an_status = 'absent'
-                    else:
-                        # No times at all
-                        self.an_status = 'absent'
-                # else: Preserve leave status (CL, OD, ML, COL, etc.)
-                
-            else:
-                # No settings OR time-based absence is disabled — simple present/absent logic
-                fn_no_record_mode = in_limit == mid_split
-                an_no_record_mode = out_limit == mid_split
-
-                if _needs_biometric_calc(self.fn_status):
-                    if fn_no_record_mode:
-                        self.fn_status = None
-                    else:
-                        self.fn_status = 'present' if self.morning_in else 'absent'
-                
-                if _needs_biometric_calc(self.an_status):
-                    if an_no_record_mode:
-                        self.an_status = None
-                    else:
-                        self.an_status = 'present' if self.evening_out else 'absent'
-            
-            # === Calculate overall status based on FN and AN ===
-            # Overall status logic:
-            # - If both FN and AN are null → absent (no data)
-            # - If one is null and other has value → use the non-null value
-            # - If both FN and AN have same status → use that status
-            # - If one is non-absent → half_day
-            # - If both absent → absent
-            
-            if self.fn_status is None and self.an_status is None:
-                # Both sessions null (no data)
-                self.status = 'absent'
-            elif self.fn_status is None:
-                # Only AN has data, use AN status
-                self.status = self.an_status
-            elif self.an_status is None:
-                # Only FN has data, use FN status
-                self.status = self.fn_status
-            elif self.fn_status == self.an_status:
-                # Both sessions have same status
-                self.status = self.fn_status
-            elif self.fn_status != 'absent' or self.an_status != 'absent':
-                # At least one session has non-absent status
-                self.status = 'half_day'
-            else:
-                # Both absent
-                self.status = 'absent'
-                
+            self.fn_status, self.an_status, self.status = compute_attendance_statuses(
+                self.morning_in,
+                self.evening_out,
+                self.fn_status,
+                self.an_status,
+                in_limit=in_limit,
+                out_limit=out_limit,
+                mid_split=mid_split,
+                apply_absence=apply_absence,
+                defer_an_until_out=defer_an_until_out,
+            )
+
         except Exception as e:
             # Fallback on any error - preserve leave statuses
             import logging
@@ -277,18 +166,7 @@ class AttendanceRecord(models.Model):
                 self.an_status = 'present' if self.evening_out else 'absent'
             
             # Recalculate overall (with null handling)
-            if self.fn_status is None and self.an_status is None:
-                self.status = 'absent'
-            elif self.fn_status is None:
-                self.status = self.an_status
-            elif self.an_status is None:
-                self.status = self.fn_status
-            elif self.fn_status == self.an_status:
-                self.status = self.fn_status
-            elif self.fn_status != 'absent' or self.an_status != 'absent':
-                self.status = 'half_day'
-            else:
-                self.status = 'absent'
+            self.status = combine_overall_status(self.fn_status, self.an_status)
 
 
 class UploadLog(models.Model):
@@ -661,3 +539,54 @@ class StaffBiometricPunchLog(models.Model):
     def __str__(self):
         who = self.raw_staff_id or self.raw_uid or 'unknown'
         return f"{who} {self.direction} @ {self.punch_time}"
+
+
+class EsslDevice(models.Model):
+    """eSSL/ZKTeco biometric device managed by the `sync_essl_devices` supervisor.
+
+    `last_punch_time` is the ingestion high-water mark: after a reconnect the
+    supervisor replays `get_attendance()` and only ingests punches newer than it.
+    The remaining status fields are written back periodically so HR/admin can
+    see which devices are online and how far behind they are.
+    """
+
+    class Status(models.TextChoices):
+        UNKNOWN = 'UNKNOWN', 'Unknown'
+        ONLINE = 'ONLINE', 'Online'
+        CATCHING_UP = 'CATCHING_UP', 'Catching up'
+        OFFLINE = 'OFFLINE', 'Offline'
+
+    name = models.CharField(max_length=100, blank=True, default='')
+    ip_address = models.GenericIPAddressField()
+    port = models.PositiveIntegerField(default=4370)
+    password = models.PositiveIntegerField(default=0, help_text='Device comm key/password')
+    connect_timeout = models.PositiveIntegerField(default=8, help_text='Connection timeout in seconds')
+    enabled = models.BooleanField(default=True)
+
+    last_punch_time = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text='Catch-up high-water mark: every punch from this device up to this time has been ingested'
+    )
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.UNKNOWN)
+    last_connected_at = models.DateTimeField(null=True, blank=True)
+    last_seen_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    reconnect_count = models.PositiveIntegerField(default=0)
+    ingest_lag_seconds = models.FloatField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'staff_essl_device'
+        verbose_name = 'eSSL Device'
+        verbose_name_plural = 'eSSL Devices'
+        ordering = ['ip_address', 'port']
+        constraints = [
+            models.UniqueConstraint(fields=['ip_address', 'port'], name='unique_staff_essl_device_endpoint')
+        ]
+
+    def __str__(self):
+        label = self.name or 'eSSL'
+        return f"{label} ({self.ip_address}:{self.port})"
@@ -0,0 +1,111 @@
+"""Pure FN/AN/overall status rules shared by `AttendanceRecord.update_status`
+and the batch re-evaluation engine (`staff_attendance.absence_engine`).
+
+No ORM access here: callers resolve the effective time limits first and pass
+plain values in, so the same rules can run per record or over whole columns.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+# Statuses that can be auto-updated from biometric data. Anything else
+# (CL, OD, ML, COL, ...) is a leave status and is preserved.
+BIOMETRIC_STATUSES = ('present', 'absent', 'partial', 'half_day')
+
+
+def needs_biometric_calc(session_status, has_biometric: bool) -> bool:
+    """A session is recalculated if it is already biometric, or is unset but scan data exists."""
+    return session_status in BIOMETRIC_STATUSES or (session_status is None and has_biometric)
+
+
+def combine_overall_status(fn_status: Optional[str], an_status: Optional[str]) -> str:
+    """Overall status from FN/AN.
+
+    - both null -> absent (no data)
+    - one null -> the other one
+    - same -> that status
+    - any non-absent -> half_day
+    - both absent -> absent
+    """
+    if fn_status is None and an_status is None:
+        return 'absent'
+    if fn_status is None:
+        return an_status
+    if an_status is None:
+        return fn_status
+    if fn_status == an_status:
+        return fn_status
+    if fn_status != 'absent' or an_status != 'absent':
+        return 'half_day'
+    return 'absent'
+
+
+def compute_attendance_statuses(morning_in, evening_out, fn_status, an_status, *, in_limit, out_limit, mid_split,
+                                apply_absence: bool, defer_an_until_out: bool = False) -> Tuple[Optional[str], Optional[str], str]:
+    """Return (fn_status, an_status, status) for one attendance row under the given limits."""
+    has_biometric = morning_in is not None or evening_out is not None
+    fn_no_record_mode = in_limit == mid_split
+    an_no_record_mode = out_limit == mid_split
+
+    if apply_absence:
+        if needs_biometric_calc(fn_status, has_biometric):
+            if fn_no_record_mode:
+                # When IN limit equals noon split, FN should be treated as no-record.
+                fn_status = None
+            elif morning_in:
+                # FN presence requires (1) not late by the IN limit and
+                # (2) when an OUT time exists, the staff must have stayed
+                # past the noon split time.
+                #
+                # This fixes cases like: In 08:18, Out 10:58, noon 13:00
+                # where FN should be ABSENT (did not cross noon).
+                if morning_in > in_limit:
+                    fn_status = 'absent'
+                elif morning_in > mid_split:
+                    # Arrived after noon, cannot be FN present.
+                    fn_status = 'absent'
+                elif evening_out is not None:
+                    # With an explicit OUT, FN is present only if OUT crosses noon.
+                    fn_status = 'present' if evening_out >= mid_split else 'absent'
+                else:
+                    # Realtime stream often has IN first; keep FN present
+                    # until an OUT punch confirms early exit.
+                    fn_status = 'present'
+            else:
+                # No morning_in time - FN absent
+                fn_status = 'absent'
+
+        if needs_biometric_calc(an_status, has_biometric):
+            if an_no_record_mode:
+                # When OUT limit equals noon split, AN should be treated as no-record.
+                an_status = None
+            elif morning_in and evening_out:
+                # AN is absent if the staff came after mid_split (missed the
+                # forenoon and morning) or left before out_limit.
+                if morning_in > mid_split:
+                    an_status = 'absent'
+                elif evening_out < out_limit:
+                    an_status = 'absent'
+                else:
+                    an_status = 'present'
+            elif morning_in:
+                # Has morning_in but no evening_out - probably partial day
+                if morning_in <= mid_split:
+                    # Realtime biometric flow can defer AN decision until
+                    # a valid OUT punch is captured.
+                    an_status = None if defer_an_until_out else 'absent'
+                else:
+                    # Came after mid_split - no proper attendance
+                    an_status = 'absent'
+            else:
+                # No times at all
+                an_status = 'absent'
+    else:
+        # No settings OR time-based absence is disabled — simple present/absent logic
+        if needs_biometric_calc(fn_status, has_biometric):
+            fn_status = None if fn_no_record_mode else ('present' if morning_in else 'absent')
+        if needs_biometric_calc(an_status, has_biometric):
+            an_status = None if an_no_record_mode else ('present' if evening_out else 'absent')
+
+    return fn_status, an_status, combine_overall_status(fn_status, an_status)
@@ -2474,8 +2474,14 @@ class StaffRequestViewSet(viewsets.ModelViewSet):
             application.current_step = None
             application.submitted_at = application.submitted_at or now
             application.final_decision_at = now
+            if application.gatepass_expires_at is None:
+                from applications.services.gatepass_utils import gatepass_hard_expiry
+
+                application.gatepass_expires_at = gatepass_hard_expiry(application)
             application.save(
-                update_fields=['current_state', 'status', 'current_step', 'submitted_at', 'final_decision_at']
+                update_fields=[
+                    'current_state', 'status', 'current_step', 'submitted_at', 'final_decision_at', 'gatepass_expires_at',
+                ]
             )
 
         return application
@@ -351,12 +351,11 @@ class SectionTimetableView(APIView):
                                 subj_text = f"{getattr(es, 'course_code', '')} - {getattr(es, 'course_name', '')}".strip(' -')
                                 elective_id = getattr(es, 'id', None)
                         else:
-                            from curriculum.models import ElectiveChoice
-                            ec = ElectiveChoice.objects.filter(student=student_profile, elective_subject__parent=a.curriculum_row, is_active=True, academic_year__is_active=True).select_related('elective_subject').first()
-                            if ec and getattr(ec, 'elective_subject', None):
-                                es = ec.elective_subject
-                                subj_text = f"{getattr(es, 'course_code', '')} - {getattr(es, 'course_name', '')}".strip(' -')
-                                elective_id = getattr(es, 'id', None)
+                            from academics.services import enrolled_subjects
+                            ec = enrolled_subjects.chosen_elective(student_profile.id, a.curriculum_row_id)
+                            if ec:
+                                subj_text = f"{ec['course_code']} - {ec['course_name']}".strip(' -')
+                                elective_id = ec['elective_subject_id']
                     else:
                         # For non-student views, prefer any TeachingAssignment elective mapping.
                         # Prefer section-scoped mapping first, then department-wide mappings
@@ -560,13 +559,12 @@ class SectionTimetableView(APIView):
                                     else:
                                         curr_obj = {'id': e.curriculum_row.id, 'course_code': getattr(e.curriculum_row, 'course_code', None), 'course_name': getattr(e.curriculum_row, 'course_name', None), 'mnemonic': getattr(e.curriculum_row, 'mnemonic', None)}
                                 else:
-                                    from curriculum.models import ElectiveChoice
-                                    ec = ElectiveChoice.objects.filter(student=student_profile, elective_subject__parent=e.curriculum_row, is_active=True, academic_year__is_active=True).select_related('elective_subject').first()
-                                    if ec and getattr(ec, 'elective_subject', None):
-                                        es = ec.elective_subject
-                                        subj_text = f"{getattr(es, 'course_code', '')} - {getattr(es, 'course_name', '')}".strip(' -')
-                                        elective_obj = {'id': es.pk, 'course_code': getattr(es, 'course_code', None), 'course_name': getattr(es, 'course_name', None)}
-                                        elective_id = es.pk
+                                    from academics.services import enrolled_subjects
+                                    ec = enrolled_subjects.chosen_elective(student_profile.id, e.curriculum_row_id)
+                                    if ec:
+                                        subj_text = f"{ec['course_code']} - {ec['course_name']}".strip(' -')
+                                        elective_obj = {'id': ec['elective_subject_id'], 'course_code': ec['course_code'], 'course_name': ec['course_name']}
+                                        elective_id = ec['elective_subject_id']
                                     else:
                                         curr_obj = {'id': e.curriculum_row.id, 'course_code': getattr(e.curriculum_row, 'course_code', None), 'course_name': getattr(e.curriculum_row, 'course_name', None), 'mnemonic': getattr(e.curriculum_row, 'mnemonic', None)}
                             else:
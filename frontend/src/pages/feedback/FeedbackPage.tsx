@@ -167,6 +167,7 @@ type FeedbackForm = {
   allow_hod_view?: boolean;
   anonymous?: boolean;
   form_name?: string;
+  response_stats?: ResponseStatistics;
 };
 
 type ResponseStatistics = {
@@ -217,6 +218,8 @@ type ResponseListData = {
   total_students: number;
   total_responded: number;
   total_non_responded: number;
+  next_cursor?: string | null;
+  has_more?: boolean;
 };
 
 type FeedbackResponse = {
@@ -376,6 +379,35 @@ const extractApiErrorMessage = (data: any): string => {
   return 'Request failed. Please check the form fields and try again.';
 };
 
+// Large exports are built in the background: a 202 carries the job to poll
+// until its file is ready; cached exports come back as the file directly.
+const FEEDBACK_EXPORT_POLL_MS = 2000;
+const FEEDBACK_EXPORT_MAX_POLLS = 300; // 10 minutes
+
+const resolveFeedbackExport = async (response: Response): Promise<Response> => {
+  if (response.status !== 202) return response;
+  const job = await response.json();
+  const toPath = (url: string) => {
+    try {
+      const parsed = new URL(url);
+      return parsed.pathname + parsed.search;
+    } catch {
+      return url;
+    }
+  };
+  for (let attempt = 0; attempt < FEEDBACK_EXPORT_MAX_POLLS; attempt += 1) {
+    await new Promise((resolve) => setTimeout(resolve, FEEDBACK_EXPORT_POLL_MS));
+    const statusResponse = await fetchWithAuth(toPath(job.status_url));
+    const statusData = await statusResponse.json().catch(() => ({}));
+    if (!statusResponse.ok) throw new Error(statusData?.detail || 'Export failed');
+    if (statusData.status === 'FAILED') throw new Error(statusData.error || 'Export failed');
+    if (statusData.status === 'READY' && statusData.download_url) {
+      return fetchWithAuth(toPath(statusData.download_url));
+    }
+  }
+  throw new Error('The export is taking too long. Please try again later.');
+};
+
 const getClassContextLines = (item: {
   class_context_display?: string[];
   context_display?: string;
@@ -473,6 +505,7 @@ export default function FeedbackPage() {
   const [selectedResponseView, setSelectedResponseView] = useState<ResponseListData | null>(null);
   const [loadingResponseView, setLoadingResponseView] = useState(false);
   const [responseViewError, setResponseViewError] = useState<string | null>(null);
+  const [loadingMoreResponses, setLoadingMoreResponses] = useState(false);
   const [exportingFormId, setExportingFormId] = useState<number | null>(null);
   const [exportingSubjectWiseReport, setExportingSubjectWiseReport] = useState(false);
   const [deactivatingAllForms, setDeactivatingAllForms] = useState(false);
@@ -1378,6 +1411,11 @@ export default function FeedbackPage() {
     const stats: Record<number, ResponseStatistics> = {};
     
     for (const form of forms) {
+      // The HOD form list already carries stored statistics; fetch only if missing.
+      if (form.response_stats) {
+        stats[form.id] = form.response_stats;
+        continue;
+      }
       try {
         const response = await fetchWithAuth(`/api/feedback/${form.id}/statistics/`);
         if (response.ok) {
@@ -1533,10 +1571,47 @@ export default function FeedbackPage() {
     }
   };
 
+  // Append the next page of respondents to the open response view
+  const handleLoadMoreResponses = async () => {
+    const current = selectedResponseView;
+    if (!current?.next_cursor) return;
+    setLoadingMoreResponses(true);
+    try {
+      const params = new URLSearchParams({ cursor: current.next_cursor });
+      const response = await fetchWithAuth(`/api/feedback/${current.feedback_form_id}/responses/?${params}`);
+      if (!response.ok) {
+        let errorMessage = 'Failed to load more responses';
+        try {
+          const errorData = await response.json();
+          errorMessage = errorData?.detail || errorMessage;
+        } catch {
+          // Keep fallback error message.
+        }
+        throw new Error(errorMessage);
+      }
+      const data = await response.json();
+      setSelectedResponseView(prev =>
+        prev && prev.feedback_form_id === current.feedback_form_id
+          ? {
+              ...prev,
+              responded: [...prev.responded, ...(data.responded || [])],
+              next_cursor: data.next_cursor,
+              has_more: data.has_more,
+            }
+          : prev
+      );
+    } catch (error: any) {
+      console.error('[Feedback] Loading more responses failed:', error);
+      alert(error?.message || 'Failed to load more responses');
+    } finally {
+      setLoadingMoreResponses(false);
+    }
+  };
+
   const handleExportResponsesExcel = async (formId: number) => {
     setExportingFormId(formId);
     try {
-      const response = await fetchWithAuth(`/api/feedback/${formId}/export-excel/`);
+      const response = await resolveFeedbackExport(await fetchWithAuth(`/api/feedback/${formId}/export-excel/`));
 
       if (!response.ok) {
         let errorMessage = 'Failed to export feedback responses';
@@ -1884,13 +1959,13 @@ export default function FeedbackPage() {
 
     setCommonExportDownloading(true);
     try {
-      const res = await fetchWithAuth('/api/feedback/common-export/', {
+      const res = await resolveFeedbackExport(await fetchWithAuth('/api/feedback/common-export/', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
         },
         body: JSON.stringify(payload),
-      });
+      }));
       if (!res.ok) {
         let msg = 'Failed to export feedback';
         try {
@@ -5837,6 +5912,19 @@ export default function FeedbackPage() {
                           );
                         }
                       })}
+                      {selectedResponseView.has_more && (
+                        <div className="text-center pt-1">
+                          <button
+                            onClick={handleLoadMoreResponses}
+                            disabled={loadingMoreResponses}
+                            className="px-4 py-2 text-sm font-medium text-blue-700 bg-blue-50 border border-blue-200 rounded-lg hover:bg-blue-100 disabled:opacity-50 disabled:cursor-not-allowed"
+                          >
+                            {loadingMoreResponses
+                              ? 'Loading...'
+                              : `Load more (${selectedResponseView.responded.length} of ${selectedResponseView.total_responded} shown)`}
+                          </button>
+                        </div>
+                      )}
                     </div>
                   ) : (
                     <div className="text-center py-8 bg-slate-50 rounded-lg border border-slate-200">